@@ -0,0 +1,91 @@
+"""
+Stateless, HMAC-signed auth tokens.
+
+A token is `v1.<kid>.<expires_at>.<nonce>.<signature>`, where the signature is
+an HMAC-SHA256 over everything before it, keyed by the secret named `kid`.
+Any worker holding the same keys can verify a token without shared state, and
+a token simply stops verifying once `expires_at` (unix seconds) has passed.
+
+Rotation: the first configured key signs new tokens; the remaining keys are
+accepted for verification only, so an old key can be retired once the tokens it
+signed have expired. Without configured keys each process signs with a random
+key of its own, so tokens do not survive a restart or cross workers.
+"""
+
+import base64
+import hashlib
+import hmac
+import logging
+import secrets
+import time
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger("negotiation-arena.auth")
+
+TOKEN_VERSION = "v1"
+_MIN_SECRET_CHARS = 32
+
+
+def parse_signing_keys(raw: Optional[str]) -> List[Tuple[str, bytes]]:
+    """Parse "kid:secret,kid:secret" (active key first), skipping malformed pairs."""
+    keys: List[Tuple[str, bytes]] = []
+    for item in str(raw or "").split(","):
+        kid, sep, secret = item.strip().partition(":")
+        kid = kid.strip()
+        secret = secret.strip()
+        if not sep or not kid or not secret or "." in kid or not kid.isascii():
+            if item.strip():
+                logger.warning("Ignoring malformed auth signing key entry for kid %r", kid)
+            continue
+        if len(secret) < _MIN_SECRET_CHARS:
+            logger.warning("Auth signing key %r is shorter than %s characters", kid, _MIN_SECRET_CHARS)
+        keys.append((kid, secret.encode("utf-8")))
+    return keys
+
+
+def ephemeral_signing_key() -> Tuple[str, bytes]:
+    """Random per-process fallback key; never derived from anything stored in the repo."""
+    logger.warning(
+        "AUTH_TOKEN_SIGNING_KEYS is not set; signing auth tokens with a random per-process key. "
+        "Tokens will stop verifying on restart and are not accepted by other workers."
+    )
+    secret = secrets.token_bytes(32)
+    return "tmp" + hashlib.sha256(secret).hexdigest()[:8], secret
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+class TokenSigner:
+    def __init__(self, keys: List[Tuple[str, bytes]], ttl_seconds: int) -> None:
+        if not keys:
+            raise ValueError("TokenSigner needs at least one signing key")
+        self.active_kid = keys[0][0]
+        self._keys: Dict[str, bytes] = dict(keys)
+        self.ttl_seconds = max(1, int(ttl_seconds))
+
+    def issue(self, now: Optional[float] = None) -> str:
+        expires_at = int(now if now is not None else time.time()) + self.ttl_seconds
+        body = f"{TOKEN_VERSION}.{self.active_kid}.{expires_at}.{secrets.token_urlsafe(12)}"
+        return f"{body}.{self._sign(self._keys[self.active_kid], body)}"
+
+    def verify(self, token: str, now: Optional[float] = None) -> bool:
+        token = str(token or "")
+        if not token.isascii():
+            return False
+        parts = token.split(".")
+        if len(parts) != 5 or parts[0] != TOKEN_VERSION:
+            return False
+        kid, expires_at = parts[1], parts[2]
+        key = self._keys.get(kid)
+        if key is None or not expires_at.isdigit():
+            return False
+        body, signature = token.rsplit(".", 1)
+        if not hmac.compare_digest(self._sign(key, body), signature):
+            return False
+        return (now if now is not None else time.time()) <= int(expires_at)
+
+    @staticmethod
+    def _sign(key: bytes, body: str) -> str:
+        return _b64(hmac.new(key, body.encode("ascii"), hashlib.sha256).digest())
@@ -0,0 +1,86 @@
+"""
+Micro-benchmark for offer extraction.
+
+Replays every transcript excerpt in the debug-trace corpus through the
+single-pass money scanner and through the per-unit regex passes it replaced,
+checks that both produce the same offers, and prints throughput.
+
+    python backend/benchmarks/bench_offer_extraction.py --repeat 200
+"""
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_DIR))
+
+from benchmarks.trace_corpus import DEFAULT_TRACE, load_trace_texts  # noqa: E402
+from money_scanner import scan_amounts  # noqa: E402
+
+
+def load_corpus(path: Path) -> List[str]:
+    return [text.lower() for text in load_trace_texts(path)]
+
+
+def _legacy_offer_candidates(raw: str) -> List[int]:
+    candidates = [int(float(m) * 100_000) for m in re.findall(r"(\d+(?:\.\d+)?)\s*(?:lakh|l\b)", raw)]
+    candidates += [int(m.replace(",", "")) for m in re.findall(r"(?:₹|inr|rs\.?)\s*([0-9][0-9,]{2,10})", raw)]
+    for m in re.findall(r"\b([1-9][0-9,]{4,10})\b", raw):
+        val = int(m.replace(",", ""))
+        if val > 5000:
+            candidates.append(val)
+    candidates += [int(m.replace(",", "")) for m in re.findall(r"\$([0-9][0-9,]{2,10})", raw)]
+    return candidates
+
+
+def _legacy_round(raw: str) -> Tuple[List[int], Optional[re.Match], bool]:
+    """What `_update_metrics` did per text before the scanner: offers, discount and reference checks."""
+    discount = re.search(r"discount\s*(?:of|up\s*to)?\s*(?:₹|inr|rs\.?)?\s*([0-9][0-9,]{3,10})", raw)
+    referencing = any(ref in raw for ref in ["the price of", "listed price", "original price", "price for the", "reduction of"])
+    return _legacy_offer_candidates(raw), discount, referencing
+
+
+def _scanner_round(raw: str) -> Tuple[List[int], Optional[int], bool]:
+    scan = scan_amounts(raw)
+    return scan.offer_values(), scan.discount_value(), scan.has_reference_phrase
+
+
+def _time(label: str, func: Callable[[str], object], texts: List[str], repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            func(text)
+    elapsed = time.perf_counter() - started
+    calls = repeat * len(texts)
+    print(f"{label:<10} {calls / elapsed:>12,.0f} texts/s  {elapsed * 1e6 / calls:>8.2f} us/text")
+    return elapsed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--trace", type=Path, default=DEFAULT_TRACE, help="debug-trace JSONL corpus")
+    parser.add_argument("--repeat", type=int, default=100, help="passes over the corpus per implementation")
+    args = parser.parse_args()
+
+    texts = load_corpus(args.trace)
+    if not texts:
+        print(f"No transcript text found in {args.trace}", file=sys.stderr)
+        return 1
+
+    mismatches = [text for text in texts if set(_legacy_offer_candidates(text)) != set(scan_amounts(text).offer_values())]
+    print(f"corpus: {len(texts)} texts, {sum(len(t) for t in texts):,} chars, {len(mismatches)} offer mismatches")
+    for text in mismatches[:5]:
+        print(f"  mismatch: {text[:120]!r}")
+
+    legacy = _time("legacy", _legacy_round, texts, args.repeat)
+    scanner = _time("scanner", _scanner_round, texts, args.repeat)
+    print(f"speedup    {legacy / scanner:.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
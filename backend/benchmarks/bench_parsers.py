@@ -0,0 +1,317 @@
+"""
+Micro-benchmarks for the per-turn parsing and metrics helpers.
+
+Builds a corpus of model outputs from the recorded debug trace (every `*_head`
+text field except prompts, with the "...(truncated N chars)" marker removed)
+plus messy variants synthesized from the tagged outputs: labelled instead of
+tagged fields, streams cut mid-tag, unclosed or upper-case tags, fenced output
+with loose stats JSON, and money amounts in every format the scanner accepts.
+Each function is timed over that corpus and its memory use per call is traced
+with tracemalloc in a separate pass (so tracing does not skew the timings):
+
+- ops_per_sec / median_us / best_us: from `--passes` passes of `--number` runs
+  over the corpus; median and best are per call;
+- alloc_peak_bytes: mean peak traced memory above the starting point during a call;
+- alloc_retained_bytes: mean memory still allocated after the call returns.
+
+Results can be saved as JSON and compared with a run from another commit:
+
+    python backend/benchmarks/bench_parsers.py --output /tmp/before.json
+    git checkout my-branch
+    python backend/benchmarks/bench_parsers.py --compare /tmp/before.json --fail-above 15
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import re
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_DIR))
+# Importing main must not start writing debug traces from the _update_metrics runs.
+os.environ.setdefault("NEGOTIATION_DEBUG_TRACE", "false")
+
+import main  # noqa: E402
+from benchmarks.trace_corpus import DEFAULT_TRACE, load_trace_texts  # noqa: E402
+from money_scanner import scan_amounts  # noqa: E402
+from report_renderer import clean_transcript_content  # noqa: E402
+
+SCHEMA_VERSION = 1
+SKIPPED_TEXT_FIELDS = {"prompt_head"}
+_TRUNCATION_MARKER = re.compile(r"\.\.\.\(truncated \d+ chars\)$")
+_TAG_BLOCK = re.compile(r"<(thought|message|intent|stats|techniques|emotional_state|confidence)>(.*?)</\1>", re.DOTALL)
+_LABELS = {
+    "thought": "INTERNAL_THOUGHT",
+    "message": "MESSAGE",
+    "intent": "STRATEGIC_INTENT",
+    "stats": "UPDATED_STATS",
+    "techniques": "TECHNIQUES_USED",
+    "emotional_state": "EMOTIONAL_STATE",
+    "confidence": "CONFIDENCE_SCORE",
+}
+_AMOUNT_PHRASES = (
+    "The listed price is ₹1,50,000 but I can do 1.35 lakh today.",
+    "My budget is Rs. 95,000, maybe INR 1,05,000 at a stretch.",
+    "A discount of ₹15,000 brings it to 1,35,000.",
+    "That is about $1,800, or 2 L if we include the add-ons.",
+    "Pay 45000 now and the rest (85,000) after placement.",
+    "EMI of rs 7,500 for 18 months, call me on 98765432101.",
+)
+_PROGRAM = {"program_name": "AI Bootcamp", "program_fee_inr": "INR 1,50,000", "duration": "6 months"}
+_PERSONA = {
+    "name": "Rahul Sharma",
+    "archetype_id": "skeptical_shopper",
+    "financial_anxiety": 70,
+    "skepticism": 65,
+    "willingness_to_invest_score": 55,
+    "primary_objections": ["Price", "Job Guarantee"],
+}
+
+
+@dataclass(frozen=True)
+class Corpus:
+    recorded: List[str]
+    synthesized: List[str]
+
+    @property
+    def texts(self) -> List[str]:
+        return self.recorded + self.synthesized
+
+
+@dataclass
+class Case:
+    name: str
+    func: Callable[[Any], Any]
+    items: List[Any]
+    reset: Optional[Callable[[], None]] = None
+
+
+def load_recorded(path: Path) -> List[str]:
+    return [_TRUNCATION_MARKER.sub("", text) for text in load_trace_texts(path, SKIPPED_TEXT_FIELDS)]
+
+
+def _labelled(text: str) -> str:
+    return _TAG_BLOCK.sub(lambda m: f"\n{_LABELS[m.group(1)]}: {m.group(2).strip()}\n", text)
+
+
+def synthesize(recorded: List[str], seed: int) -> List[str]:
+    """Messy variants of every tagged model output, deterministic for a given seed."""
+    rng = random.Random(seed)
+    variants: List[str] = []
+    for text in recorded:
+        if "<message>" not in text and "<thought>" not in text:
+            continue
+        amounts = " ".join(rng.sample(_AMOUNT_PHRASES, 2))
+        cut = rng.randint(len(text) // 3, max(len(text) // 3, len(text) - 1))
+        variants.extend(
+            [
+                _labelled(text),
+                text[:cut],
+                text.replace("</message>", ""),
+                re.sub(r"</?(message|thought|intent)>", lambda m: m.group(0).upper(), text),
+                "```xml\n" + text + '\n<stats>{"trust_score": 61, "skepticism_level": 58,}</stats>\n```',
+                text.replace("</message>", f" {amounts}</message>") if "</message>" in text else f"{text} {amounts}",
+            ]
+        )
+    return variants
+
+
+def build_corpus(trace: Path, seed: int) -> Corpus:
+    recorded = load_recorded(trace)
+    return Corpus(recorded=recorded, synthesized=synthesize(recorded, seed))
+
+
+def build_cases(corpus: Corpus) -> List[Case]:
+    texts = corpus.texts
+    lowered = [text.lower() for text in texts]
+    parsed = [main._extract_response_fields(text) for text in texts]
+    turns = [
+        {
+            "id": f"m{index}",
+            "round": index // 2 + 1,
+            "agent": "student" if index % 2 else "counsellor",
+            "content": fields["message"],
+            "techniques": tuple(fields["techniques"]),
+            "strategic_intent": fields["intent"],
+            "confidence_score": fields["confidence_score"],
+            "emotional_state": fields["emotional_state"],
+            "internal_thought": fields["internal_thought"],
+            "updated_stats": fields["updated_stats"],
+            "timestamp": datetime(2026, 1, 1).isoformat(),
+        }
+        for index, fields in enumerate(parsed)
+    ]
+    pairs = [(turns[index], turns[index + 1]) for index in range(0, len(turns) - 1, 2)]
+    state: Dict[str, Any] = {}
+
+    def reset_state() -> None:
+        state.clear()
+        state.update(main._initial_negotiation_state(dict(_PROGRAM), dict(_PERSONA), "ai_vs_ai"))
+
+    def update_metrics(pair: Any) -> None:
+        main._update_metrics(state, pair[0], pair[1])
+
+    reset_state()
+    return [
+        Case("extract_response_fields", main._extract_response_fields, texts),
+        Case("clean_transcript_content", clean_transcript_content, texts),
+        Case("update_metrics", update_metrics, pairs, reset=reset_state),
+        Case("to_plain_json", main._to_plain_json, turns),
+        Case("scan_amounts.offer_values", lambda text: scan_amounts(text).offer_values(), lowered),
+        Case("scan_amounts.discount_value", lambda text: scan_amounts(text).discount_value(), lowered),
+        Case("extract_inr_amount", main.extract_inr_amount, texts),
+    ]
+
+
+def time_case(case: Case, passes: int, number: int) -> Dict[str, float]:
+    per_call: List[float] = []
+    func = case.func
+    for _ in range(passes):
+        if case.reset is not None:
+            case.reset()
+        started = time.perf_counter()
+        for _ in range(number):
+            for item in case.items:
+                func(item)
+        per_call.append((time.perf_counter() - started) / (number * len(case.items)))
+    median = statistics.median(per_call)
+    return {"ops_per_sec": 1.0 / median, "median_us": median * 1e6, "best_us": min(per_call) * 1e6}
+
+
+def trace_allocations(case: Case) -> Dict[str, float]:
+    if case.reset is not None:
+        case.reset()
+    peak_total = 0
+    retained_total = 0
+    tracemalloc.start()
+    try:
+        for item in case.items:
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            result = case.func(item)
+            after, peak = tracemalloc.get_traced_memory()
+            del result
+            peak_total += peak - before
+            retained_total += after - before
+    finally:
+        tracemalloc.stop()
+    calls = len(case.items)
+    return {"alloc_peak_bytes": peak_total / calls, "alloc_retained_bytes": retained_total / calls}
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        completed = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BACKEND_DIR,
+            capture_output=True,
+            text=True,
+            timeout=10,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    if completed.returncode != 0:
+        return None
+    return completed.stdout.strip() or None
+
+
+def run(corpus: Corpus, passes: int, number: int, only: Optional[List[str]] = None) -> Dict[str, Any]:
+    results: Dict[str, Dict[str, Any]] = {}
+    for case in build_cases(corpus):
+        if only and case.name not in only:
+            continue
+        results[case.name] = {"calls_per_pass": len(case.items), **time_case(case, passes, number), **trace_allocations(case)}
+    return {
+        "schema_version": SCHEMA_VERSION,
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "passes": passes,
+            "number": number,
+            "corpus": {
+                "recorded": len(corpus.recorded),
+                "synthesized": len(corpus.synthesized),
+                "chars": sum(len(text) for text in corpus.texts),
+            },
+        },
+        "results": results,
+    }
+
+
+def print_results(report: Dict[str, Any]) -> None:
+    corpus = report["meta"]["corpus"]
+    print(f"corpus: {corpus['recorded']} recorded + {corpus['synthesized']} synthesized texts, {corpus['chars']:,} chars")
+    print(f"{'function':<30} {'ops/s':>12} {'median us':>10} {'best us':>9} {'peak B':>9} {'kept B':>8}")
+    for name, row in report["results"].items():
+        print(
+            f"{name:<30} {row['ops_per_sec']:>12,.0f} {row['median_us']:>10.2f} {row['best_us']:>9.2f}"
+            f" {row['alloc_peak_bytes']:>9,.0f} {row['alloc_retained_bytes']:>8,.0f}"
+        )
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], fail_above: Optional[float]) -> List[str]:
+    """Print per-function changes against `baseline`; returns the functions that slowed down by more than `fail_above` %."""
+    print(f"\ncompared with {baseline['meta'].get('commit') or 'baseline'} ({baseline['meta'].get('created_at', '?')}):")
+    print(f"{'function':<30} {'time':>9} {'peak alloc':>11}")
+    regressions: List[str] = []
+    for name, row in current["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if before is None:
+            print(f"{name:<30} {'new':>9}")
+            continue
+        time_change = (row["median_us"] / before["median_us"] - 1.0) * 100 if before["median_us"] else 0.0
+        alloc_change = (
+            (row["alloc_peak_bytes"] / before["alloc_peak_bytes"] - 1.0) * 100 if before["alloc_peak_bytes"] else 0.0
+        )
+        flag = ""
+        if fail_above is not None and time_change > fail_above:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<30} {time_change:>+8.1f}% {alloc_change:>+10.1f}%{flag}")
+    return regressions
+
+
+def main_cli() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--trace", type=Path, default=DEFAULT_TRACE, help="debug-trace JSONL corpus")
+    parser.add_argument("--seed", type=int, default=7, help="seed for the synthesized variants")
+    parser.add_argument("--passes", type=int, default=5, help="timed passes per function (median and best are reported)")
+    parser.add_argument("--number", type=int, default=20, help="runs over the corpus per pass")
+    parser.add_argument("--only", action="append", help="benchmark only this function (repeatable)")
+    parser.add_argument("--output", type=Path, help="write the results as JSON")
+    parser.add_argument("--compare", type=Path, help="results JSON from an earlier run to compare against")
+    parser.add_argument("--fail-above", type=float, help="with --compare, exit 1 if a function is this many %% slower")
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.trace, args.seed)
+    if not corpus.recorded:
+        print(f"No model output text found in {args.trace}", file=sys.stderr)
+        return 1
+    report = run(corpus, max(1, args.passes), max(1, args.number), args.only)
+    print_results(report)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        print(f"\nsaved {args.output}")
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        if compare(baseline, report, args.fail_above):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main_cli())
@@ -0,0 +1,34 @@
+"""
+Recorded corpus shared by the micro-benchmarks.
+
+Every `*_head` text field of the debug trace holds (the start of) a model
+output or prompt; the benchmarks replay those strings through the parsers.
+"""
+
+import json
+from pathlib import Path
+from typing import Collection, List
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+DEFAULT_TRACE = BACKEND_DIR / "human_vs_ai_negotiation_debug_trace.jonl"
+TEXT_FIELD_SUFFIX = "_head"
+
+
+def load_trace_texts(path: Path, skip_fields: Collection[str] = ()) -> List[str]:
+    """Every non-empty `*_head` string in the JSONL trace at `path`, in file order, minus `skip_fields`."""
+    texts: List[str] = []
+    with path.open("r", encoding="utf-8") as handle:
+        for line in handle:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            for key, value in entry.items():
+                if not key.endswith(TEXT_FIELD_SUFFIX) or key in skip_fields:
+                    continue
+                if isinstance(value, str) and value.strip():
+                    texts.append(value)
+    return texts
@@ -0,0 +1,101 @@
+"""
+Convergence-based early termination for AI-vs-AI negotiations.
+
+A `ConvergenceMonitor` is fed the state after every round (once the metrics
+update has run) and returns a stop reason as soon as further rounds are
+unlikely to change the outcome:
+
+- `student_walk_away` / `student_commitment`: the student turn carries an
+  explicit exit or unconditional commitment phrase (a phrase followed by a
+  condition, a "but ..." or a counter-question in the same sentence is still
+  bargaining, not a signal);
+- `offers_met`: the student's offer has reached the counsellor's;
+- `plateau`: neither offer moved and `close_probability` / `trust_index`
+  stayed within `tolerance` points over the last `window` rounds.
+
+The monitor only reads state; callers decide what stopping means (the judge
+still sees the transcript and metrics exactly as they stood).
+"""
+
+import re
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+STOP_WALK_AWAY = "student_walk_away"
+STOP_COMMITMENT = "student_commitment"
+STOP_OFFERS_MET = "offers_met"
+STOP_PLATEAU = "plateau"
+
+PLATEAU_METRICS = ("close_probability", "trust_index")
+
+# A phrase followed by a condition or a counter-offer in the same sentence ("I'll join if ...",
+# "I'm not interested unless ...", "I'll pass on the add-on, but ...") is still negotiating.
+_UNCONDITIONAL = r"(?![^.?!]*\b(?:if|unless|once|after|provided|but|except|instead)\b)"
+# Exits are also not final when the sentence ends in a question ("... not interested, can you do 1.2?").
+_FINAL_EXIT = _UNCONDITIONAL + r"(?![^.!]*\?)"
+_WALK_AWAY_PATTERN = re.compile(
+    r"\b(?:"
+    r"(?:i'?m|i am) not interested (?:in (?:this|the|your) (?:program|course|offer) )?(?:anymore|any more)"
+    r"|(?:i'?m|i am) no longer interested"
+    r"|(?:i'?m|i am) not interested(?=\s*(?:[.!]|$))"
+    r"|(?:i'?m|i am) not (?:going to|gonna) (?:enrol|enroll|join|pay|sign up)(?: (?:in|for) (?:this|it|the (?:program|course)))?(?=\s*(?:[.!]|$))"
+    r"|i(?:'ll| will) pass(?=\s*(?:[.!]|$))"
+    r"|i(?:'ll| will) (?:look|go) elsewhere"
+    r"|(?:i'?m|i am) walking away"
+    r"|(?:let'?s |i(?:'ll| will| want to| would like to) )?(?:end|stop) (?:this|the) (?:call|conversation|discussion)"
+    r")" + _FINAL_EXIT
+)
+_COMMITMENT_PATTERN = re.compile(
+    r"\b(?:"
+    r"sign me up"
+    r"|where do i (?:pay|sign)"
+    r"|(?:send|share) (?:me )?the payment link"
+    r"|it'?s a deal"
+    r"|i(?:'ll| will| am ready to|'m ready to) (?:enrol|enroll|join|register|pay)"
+    r"|let'?s (?:proceed|go ahead)"
+    r")\b" + _UNCONDITIONAL
+)
+
+
+def detect_signal(student_text: str) -> Optional[str]:
+    text = str(student_text or "").lower()
+    if _WALK_AWAY_PATTERN.search(text):
+        return STOP_WALK_AWAY
+    if _COMMITMENT_PATTERN.search(text):
+        return STOP_COMMITMENT
+    return None
+
+
+class ConvergenceMonitor:
+    def __init__(self, window: int = 3, tolerance: int = 2) -> None:
+        self.window = max(1, int(window))
+        self.tolerance = max(0, int(tolerance))
+        self._snapshots: Deque[Tuple[int, int, Tuple[int, ...]]] = deque(maxlen=self.window + 1)
+
+    def observe(self, state: Dict[str, Any], student_msg: Dict[str, Any]) -> Optional[str]:
+        """Record the round that just finished; return why the negotiation should stop, or None to continue."""
+        counsellor_offer = int(state["counsellor_position"]["current_offer"])
+        student_offer = int(state["student_position"]["current_offer"])
+        metrics = state["negotiation_metrics"]
+        self._snapshots.append(
+            (counsellor_offer, student_offer, tuple(int(metrics.get(name, 0)) for name in PLATEAU_METRICS))
+        )
+
+        signal = detect_signal(student_msg.get("content", ""))
+        if signal is not None:
+            return signal
+        if student_offer >= counsellor_offer:
+            return STOP_OFFERS_MET
+        if len(self._snapshots) > self.window and self._plateaued():
+            return STOP_PLATEAU
+        return None
+
+    def _plateaued(self) -> bool:
+        first = self._snapshots[0]
+        if any(snapshot[:2] != first[:2] for snapshot in self._snapshots):
+            return False
+        for index in range(len(PLATEAU_METRICS)):
+            values = [snapshot[2][index] for snapshot in self._snapshots]
+            if max(values) - min(values) > self.tolerance:
+                return False
+        return True
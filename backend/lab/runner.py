@@ -0,0 +1,343 @@
+"""
+Headless Lab runner: batches of AI-vs-AI negotiations without a browser.
+
+Each session reuses the arena's state setup, prompt assembler, metric updates
+and judge, but generates every turn with a single non-streaming call (nobody is
+watching tokens arrive) on the background scheduler lane, so a batch running
+next to the API never delays live sessions. Finished sessions are appended to a
+JSONL results file as they complete; `--parquet` additionally writes a flattened
+Parquet table at the end (requires pyarrow).
+
+    cd backend
+    python -m lab.runner --program-file program.json --sessions 1000 --concurrency 64
+    python -m lab.runner --url https://example.com/program --sessions 50 --archetypes drifter,fomo_victim
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+try:
+    from backend import main as arena
+except ImportError:
+    import main as arena
+
+logger = logging.getLogger("negotiation-arena.lab")
+
+LAB_OUTPUT_ROOT = Path(__file__).resolve().parents[1] / "outputs" / "lab"
+HEADLESS_MODE = "ai_vs_ai"
+
+ParseTurn = Callable[[str, str], Awaitable[Dict[str, Any]]]
+
+
+class ResultsWriter:
+    """Append-only JSONL store; one line per finished session, flushed as it lands so a killed batch keeps its results."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._handle = self.path.open("a", encoding="utf-8")
+        self.written = 0
+
+    def write(self, record: Dict[str, Any]) -> None:
+        self._handle.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        self._handle.flush()
+        self.written += 1
+
+    def close(self) -> None:
+        self._handle.close()
+
+
+def write_parquet(jsonl_path: Path, parquet_path: Path) -> int:
+    """Flatten a results file into Parquet: scalar fields become columns, nested ones JSON strings."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise RuntimeError("Parquet output needs pyarrow (pip install pyarrow)") from exc
+    rows: List[Dict[str, Any]] = []
+    with jsonl_path.open("r", encoding="utf-8") as handle:
+        for line in handle:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            rows.append(
+                {
+                    key: json.dumps(value, ensure_ascii=False) if isinstance(value, (dict, list)) else value
+                    for key, value in record.items()
+                }
+            )
+    pq.write_table(pa.Table.from_pylist(rows), parquet_path)
+    return len(rows)
+
+
+def _session_record(
+    index: int,
+    session_id: str,
+    state: Dict[str, Any],
+    analysis: Dict[str, Any],
+    generation_modes: Counter,
+    started_at: float,
+) -> Dict[str, Any]:
+    persona = state["persona"]
+    return {
+        "index": index,
+        "session_id": session_id,
+        "finished_at": datetime.now().isoformat(),
+        "duration_ms": round((time.perf_counter() - started_at) * 1000, 1),
+        "program_name": state["program"].get("program_name", ""),
+        "archetype_id": persona.get("archetype_id", ""),
+        "persona_name": persona.get("name", ""),
+        "deal_status": state["deal_status"],
+        "winner": analysis.get("winner", "no-deal"),
+        "rounds": len(state["history_for_reporting"]) // 2,
+        "early_stop": state.get("early_stop"),
+        "final_offers": {
+            "counsellor": state["counsellor_position"]["current_offer"],
+            "student": state["student_position"]["current_offer"],
+        },
+        "metrics": state["negotiation_metrics"],
+        "generation_modes": dict(generation_modes),
+        "analysis": analysis,
+        "persona": persona,
+        "transcript": state["history_for_reporting"],
+        "error": None,
+    }
+
+
+async def run_session(
+    index: int,
+    program: Dict[str, Any],
+    archetype_id: Optional[str] = None,
+    max_rounds: int = arena.DEFAULT_NEGOTIATION_MAX_ROUNDS,
+    parse_turn: Optional[ParseTurn] = None,
+    previous_analysis: Optional[Dict[str, Any]] = None,
+    persona: Optional[Dict[str, Any]] = None,
+    early_stop: Optional[bool] = None,
+) -> Dict[str, Any]:
+    """
+    Run one AI-vs-AI negotiation to a judged outcome and return its results record. Passing the persona
+    and judge analysis of an earlier run makes this a retry, exactly like `retry_mode` on the socket.
+    `early_stop` overrides NEGOTIATION_EARLY_STOP for this session.
+    """
+    started_at = time.perf_counter()
+    session_id = str(uuid.uuid4())
+    lane = arena.LANE_BACKGROUND
+    client, negotiation_model_name, _ = arena.get_client_and_models()
+    if persona is None:
+        # Every Lab session should face an independently sampled persona, not a cached copy.
+        persona = await arena._acquire_persona(program, archetype_id, lane=lane, use_cache=False)
+    state = arena._initial_negotiation_state(program, persona, HEADLESS_MODE, previous_analysis, max_rounds=max_rounds)
+    prompt_assembler = arena.SessionPromptAssembler()
+    convergence = arena._convergence_monitor(early_stop)
+    generation_modes: Counter = Counter()
+    student_generation_failures = 0
+
+    while state["round"] <= state["max_rounds"] and state["deal_status"] == "ongoing":
+        counsellor_msg = await arena._generate_agent_turn(
+            client,
+            negotiation_model_name,
+            prompt_assembler.counsellor_prompt(state),
+            "counsellor",
+            state["round"],
+            str(uuid.uuid4()),
+            arena._build_retry_context_prompt(state),
+            HEADLESS_MODE,
+            lane=lane,
+            parse_turn=parse_turn,
+        )
+        state["messages"].append(counsellor_msg)
+        state["history_for_reporting"].append(counsellor_msg)
+
+        student_msg = await arena._generate_agent_turn(
+            client,
+            negotiation_model_name,
+            prompt_assembler.student_prompt(state),
+            "student",
+            state["round"],
+            str(uuid.uuid4()),
+            arena._build_retry_context_prompt(state),
+            HEADLESS_MODE,
+            student_inner_state=state["student_inner_state"],
+            student_persona=state["persona"],
+            lane=lane,
+            parse_turn=parse_turn,
+        )
+        generation_modes[counsellor_msg["generation_mode"]] += 1
+        generation_modes[student_msg["generation_mode"]] += 1
+        if student_msg["generation_mode"] == "non_stream":
+            student_generation_failures = 0
+        else:
+            student_generation_failures += 1
+        if student_generation_failures >= 2:
+            state["deal_status"] = "failed"
+
+        spoken_student_msg = arena._record_student_turn(state, counsellor_msg, student_msg)
+        early_stop_reason = arena._check_early_stop(state, convergence, spoken_student_msg)
+        state["round"] += 1
+        if early_stop_reason is not None:
+            break
+
+    analysis = await arena._judge_outcome(state, lane=lane)
+    arena._sync_metrics_with_judge(state, analysis)
+    state["deal_status"] = arena._decide_outcome_from_judge(state, analysis)
+    return _session_record(index, session_id, state, analysis, generation_modes, started_at)
+
+
+async def run_batch(
+    program: Dict[str, Any],
+    sessions: int,
+    concurrency: int,
+    writer: ResultsWriter,
+    archetypes: Optional[List[str]] = None,
+    max_rounds: int = arena.DEFAULT_NEGOTIATION_MAX_ROUNDS,
+    parse_workers: int = 0,
+    early_stop: Optional[bool] = None,
+) -> Dict[str, Any]:
+    """Run `sessions` negotiations with at most `concurrency` in flight, writing each record as it finishes."""
+    loop = asyncio.get_running_loop()
+    arena.LLM_SCHEDULER.bind_loop(loop)
+    concurrency = max(1, min(int(concurrency), int(sessions) or 1))
+    # Structured retries, persona and judge calls run on worker threads; size the pool to the batch.
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=concurrency + 4, thread_name_prefix="lab"))
+    parse_pool: Optional[ProcessPoolExecutor] = None
+    if parse_workers > 0:
+        # spawn, not fork: the parent already has scheduler and trace-sink threads running.
+        parse_pool = ProcessPoolExecutor(parse_workers, mp_context=multiprocessing.get_context("spawn"))
+
+    async def parse_in_pool(agent: str, full_text: str) -> Dict[str, Any]:
+        return await loop.run_in_executor(parse_pool, arena._parse_turn_text, agent, full_text)
+
+    parse_turn = parse_in_pool if parse_pool is not None else None
+
+    outcomes: Counter = Counter()
+    early_stops: Counter = Counter()
+    agent_turns = 0
+    pending = iter(range(sessions))
+    progress_every = max(1, sessions // 20)
+    started_at = time.perf_counter()
+
+    async def worker() -> None:
+        # Workers share one index iterator, so at most `concurrency` sessions exist at any time.
+        nonlocal agent_turns
+        for index in pending:
+            archetype_id = archetypes[index % len(archetypes)] if archetypes else None
+            try:
+                record = await run_session(
+                    index, program, archetype_id, max_rounds=max_rounds, parse_turn=parse_turn, early_stop=early_stop
+                )
+            except Exception as exc:
+                logger.exception("Lab session %s failed", index)
+                record = {
+                    "index": index,
+                    "finished_at": datetime.now().isoformat(),
+                    "archetype_id": archetype_id or "",
+                    "deal_status": "error",
+                    "error": f"{type(exc).__name__}: {exc}",
+                }
+            writer.write(record)
+            outcomes[record["deal_status"]] += 1
+            agent_turns += sum(record.get("generation_modes", {}).values())
+            if record.get("early_stop"):
+                early_stops[record["early_stop"]["reason"]] += 1
+            if writer.written % progress_every == 0:
+                logger.info("Lab progress: %s/%s sessions %s", writer.written, sessions, dict(outcomes))
+
+    try:
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    finally:
+        if parse_pool is not None:
+            parse_pool.shutdown(cancel_futures=True)
+    elapsed = time.perf_counter() - started_at
+    return {
+        "sessions": writer.written,
+        "concurrency": concurrency,
+        "outcomes": dict(outcomes),
+        "agent_turns": agent_turns,
+        "early_stops": dict(early_stops),
+        "elapsed_seconds": round(elapsed, 2),
+        "sessions_per_minute": round(writer.written * 60 / elapsed, 2) if elapsed else None,
+        "results": str(writer.path),
+        "scheduler": arena.LLM_SCHEDULER.snapshot(),
+    }
+
+
+def _parse_archetypes(raw: Optional[str]) -> Optional[List[str]]:
+    archetypes = [item.strip().lower() for item in str(raw or "").split(",") if item.strip()]
+    unknown = [item for item in archetypes if item not in arena.ARCHETYPE_CONFIGS]
+    if unknown:
+        raise SystemExit(f"Unknown archetypes: {', '.join(unknown)} (choose from {', '.join(arena.ARCHETYPE_CONFIGS)})")
+    return archetypes or None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a batch of headless AI-vs-AI negotiations.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--url", help="Program page to analyse once and negotiate over")
+    source.add_argument("--program-file", type=Path, help="JSON program summary (e.g. the `program` of /analyze-url)")
+    parser.add_argument("--sessions", type=int, default=10, help="Number of negotiations to run")
+    parser.add_argument("--concurrency", type=int, default=8, help="Negotiations in flight at once")
+    parser.add_argument("--archetypes", help="Comma-separated archetype ids to cycle through (default: random)")
+    parser.add_argument("--max-rounds", type=int, default=arena.DEFAULT_NEGOTIATION_MAX_ROUNDS)
+    parser.add_argument("--output", type=Path, help="Results JSONL path (default: outputs/lab/lab_<timestamp>.jsonl)")
+    parser.add_argument("--parquet", action="store_true", help="Also write <output>.parquet when the batch ends")
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        default=0,
+        help="Parse turns in this many worker processes (0 parses inline; only pays off for very long turns)",
+    )
+    parser.add_argument(
+        "--early-stop",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="End sessions once offers and metrics converge (default: NEGOTIATION_EARLY_STOP)",
+    )
+    args = parser.parse_args()
+    archetypes = _parse_archetypes(args.archetypes)
+    output = args.output or LAB_OUTPUT_ROOT / f"lab_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+
+    async def _runner() -> Dict[str, Any]:
+        if args.program_file is not None:
+            program = arena.freeze_summary(json.loads(args.program_file.read_text(encoding="utf-8")))
+        else:
+            program, source_kind = await arena._analyze_program(args.url)
+            logger.info("Analysed %s (%s): %s", args.url, source_kind, program.get("program_name"))
+        writer = ResultsWriter(output)
+        try:
+            return await run_batch(
+                program,
+                sessions=max(0, args.sessions),
+                concurrency=args.concurrency,
+                writer=writer,
+                archetypes=archetypes,
+                max_rounds=max(1, args.max_rounds),
+                parse_workers=max(0, args.parse_workers),
+                early_stop=args.early_stop,
+            )
+        finally:
+            writer.close()
+            await arena.PERSONA_POOL.aclose()
+            if arena.HTTP_CLIENT is not None:
+                await arena.HTTP_CLIENT.aclose()
+
+    summary = asyncio.run(_runner())
+    if args.parquet:
+        parquet_path = output.with_suffix(".parquet")
+        summary["parquet_rows"] = write_parquet(output, parquet_path)
+        summary["parquet"] = str(parquet_path)
+    arena.TRACE_SINK.close()
+    print(json.dumps(summary, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,379 @@
+"""
+Resumable parameter sweeps for the Lab.
+
+A sweep spec (JSON) lists programs × archetypes × max_rounds × retry modes ×
+replicates; every combination becomes a work item with a stable id, so the same
+spec always expands to the same items on every machine:
+
+    {
+      "name": "overnight",
+      "programs": ["https://example.com/program", "programs/data_science.json"],
+      "archetypes": "all",
+      "max_rounds": [6, 10],
+      "retry_mode": [false, true],
+      "replicates": 3
+    }
+
+A replicate is only an index that makes otherwise identical items distinct; no
+RNG is seeded from it (model sampling and pooled personas are not reproducible
+anyway), so re-running a replicate gives a fresh session, not the same one.
+
+Progress is kept in a SQLite ledger. Each finished item's record is written to
+`<sweep-dir>/results/<item_id>.json` (atomic rename) before the ledger marks it
+done, and a result file found on startup counts as done, so a crash between the
+two never reruns a session. Items left `running` by a crash or Ctrl-C go back
+to pending. The first Ctrl-C stops claiming new items and lets in-flight
+sessions finish; a second one aborts.
+
+Sharding: `--shard K/N` runs only the items whose id hashes to K mod N. Point
+every machine at the same (shared) `--sweep-dir`, give each its own K, and keep
+one process per shard; each shard has its own ledger file.
+
+    cd backend
+    python -m lab.sweep sweeps/overnight.json --concurrency 32 --shard 0/2
+    python -m lab.sweep sweeps/overnight.json --status
+    python -m lab.sweep sweeps/overnight.json --export overnight.jsonl
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import signal
+import sqlite3
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    from backend.lab import runner
+except ImportError:
+    from lab import runner
+
+arena = runner.arena
+logger = logging.getLogger("negotiation-arena.lab.sweep")
+
+SWEEP_OUTPUT_ROOT = runner.LAB_OUTPUT_ROOT / "sweeps"
+STATUS_PENDING = "pending"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+
+@dataclass(frozen=True)
+class WorkItem:
+    program: str
+    archetype_id: str
+    max_rounds: int
+    retry_mode: bool
+    replicate: int
+
+    @property
+    def item_id(self) -> str:
+        canonical = json.dumps(asdict(self), sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:24]
+
+    def shard(self, count: int) -> int:
+        return int(self.item_id, 16) % max(1, count)
+
+
+def _as_list(value: Any) -> List[Any]:
+    return list(value) if isinstance(value, (list, tuple)) else [value]
+
+
+def expand_sweep(spec: Dict[str, Any]) -> List[WorkItem]:
+    programs = [str(program) for program in _as_list(spec.get("programs") or [])]
+    if not programs:
+        raise ValueError("Sweep spec needs at least one entry in `programs`")
+    archetypes = spec.get("archetypes", "all")
+    archetype_ids = list(arena.ARCHETYPE_CONFIGS) if archetypes == "all" else [str(a).strip().lower() for a in _as_list(archetypes)]
+    unknown = [archetype_id for archetype_id in archetype_ids if archetype_id not in arena.ARCHETYPE_CONFIGS]
+    if unknown:
+        raise ValueError(f"Unknown archetypes in sweep spec: {', '.join(unknown)}")
+    max_rounds = [max(1, int(rounds)) for rounds in _as_list(spec.get("max_rounds", arena.DEFAULT_NEGOTIATION_MAX_ROUNDS))]
+    retry_modes = [bool(mode) for mode in _as_list(spec.get("retry_mode", False))]
+    replicates = range(max(1, int(spec.get("replicates", 1))))
+    return [
+        WorkItem(program, archetype_id, rounds, retry_mode, replicate)
+        for program in programs
+        for archetype_id in archetype_ids
+        for rounds in max_rounds
+        for retry_mode in retry_modes
+        for replicate in replicates
+    ]
+
+
+def parse_shard(raw: Optional[str]) -> Tuple[int, int]:
+    index, sep, count = str(raw or "0/1").partition("/")
+    try:
+        shard = (int(index), int(count or 1))
+    except ValueError:
+        raise ValueError(f"Invalid shard {raw!r}; expected K/N, e.g. 0/4") from None
+    if not sep or shard[1] < 1 or not 0 <= shard[0] < shard[1]:
+        raise ValueError(f"Invalid shard {raw!r}; expected K/N with 0 <= K < N")
+    return shard
+
+
+class SweepLedger:
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), timeout=30)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS items ("
+            "item_id TEXT PRIMARY KEY, params TEXT NOT NULL, status TEXT NOT NULL, attempts INTEGER NOT NULL, "
+            "updated_at REAL NOT NULL, result_path TEXT, error TEXT)"
+        )
+        self._conn.commit()
+
+    def sync(self, items: Iterable[WorkItem]) -> None:
+        now = time.time()
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO items (item_id, params, status, attempts, updated_at) VALUES (?, ?, ?, 0, ?)",
+                [(item.item_id, json.dumps(asdict(item)), STATUS_PENDING, now) for item in items],
+            )
+
+    def recover(self) -> int:
+        """Return items a crashed or interrupted run left `running` to the queue."""
+        with self._conn:
+            cursor = self._conn.execute(
+                "UPDATE items SET status = ?, updated_at = ? WHERE status = ?",
+                (STATUS_PENDING, time.time(), STATUS_RUNNING),
+            )
+        return cursor.rowcount
+
+    def status(self, item_id: str) -> Optional[str]:
+        row = self._conn.execute("SELECT status FROM items WHERE item_id = ?", (item_id,)).fetchone()
+        return row[0] if row else None
+
+    def runnable(self, item_ids: Iterable[str], max_attempts: int) -> List[str]:
+        wanted = set(item_ids)
+        rows = self._conn.execute(
+            "SELECT item_id FROM items WHERE status IN (?, ?) AND attempts < ? ORDER BY item_id",
+            (STATUS_PENDING, STATUS_FAILED, max_attempts),
+        ).fetchall()
+        return [row[0] for row in rows if row[0] in wanted]
+
+    def mark_running(self, item_id: str) -> None:
+        self._update(item_id, "status = ?, attempts = attempts + 1", STATUS_RUNNING)
+
+    def mark_done(self, item_id: str, result_path: Path) -> None:
+        self._update(item_id, "status = ?, result_path = ?, error = NULL", STATUS_DONE, str(result_path))
+
+    def mark_failed(self, item_id: str, error: str) -> None:
+        self._update(item_id, "status = ?, error = ?", STATUS_FAILED, error[:2000])
+
+    def counts(self) -> Dict[str, int]:
+        return dict(self._conn.execute("SELECT status, COUNT(*) FROM items GROUP BY status").fetchall())
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def _update(self, item_id: str, assignments: str, *values: Any) -> None:
+        with self._conn:
+            self._conn.execute(
+                f"UPDATE items SET {assignments}, updated_at = ? WHERE item_id = ?",
+                (*values, time.time(), item_id),
+            )
+
+
+def _result_path(sweep_dir: Path, item_id: str) -> Path:
+    return sweep_dir / "results" / f"{item_id}.json"
+
+
+def _write_result(path: Path, record: Dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(json.dumps(record, ensure_ascii=False, default=str), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+async def _load_program(ref: str, spec_dir: Path) -> Dict[str, Any]:
+    if ref.startswith(("http://", "https://")):
+        program, source = await arena._analyze_program(ref)
+        if source == "fallback":
+            raise RuntimeError(f"Could not extract program details from {ref}")
+        return program
+    path = Path(ref)
+    path = path if path.is_absolute() else spec_dir / path
+    return arena.freeze_summary(json.loads(path.read_text(encoding="utf-8")))
+
+
+async def run_item(item: WorkItem, program: Dict[str, Any], parse_turn: Optional[runner.ParseTurn] = None) -> Dict[str, Any]:
+    """Run one work item; retry-mode items run a baseline negotiation and then the retry that learns from it."""
+    record = await runner.run_session(
+        item.replicate, program, item.archetype_id, max_rounds=item.max_rounds, parse_turn=parse_turn
+    )
+    if item.retry_mode:
+        baseline = record
+        record = await runner.run_session(
+            item.replicate,
+            program,
+            item.archetype_id,
+            max_rounds=item.max_rounds,
+            parse_turn=parse_turn,
+            previous_analysis=baseline["analysis"],
+            persona=baseline["persona"],
+        )
+        record["baseline"] = {
+            "session_id": baseline["session_id"],
+            "deal_status": baseline["deal_status"],
+            "winner": baseline["winner"],
+            "negotiation_score": baseline["analysis"].get("negotiation_score"),
+            "metrics": baseline["metrics"],
+        }
+    record["sweep"] = {"item_id": item.item_id, **asdict(item)}
+    return record
+
+
+async def run_sweep(
+    spec: Dict[str, Any],
+    spec_dir: Path,
+    sweep_dir: Path,
+    ledger: SweepLedger,
+    shard: Tuple[int, int] = (0, 1),
+    concurrency: int = 8,
+    max_attempts: int = 2,
+) -> Dict[str, Any]:
+    loop = asyncio.get_running_loop()
+    arena.LLM_SCHEDULER.bind_loop(loop)
+    items = [item for item in expand_sweep(spec) if item.shard(shard[1]) == shard[0]]
+    by_id = {item.item_id: item for item in items}
+    ledger.sync(items)
+    recovered = ledger.recover()
+    if recovered:
+        logger.info("Re-queued %s items left running by an interrupted run", recovered)
+    for item_id in by_id:
+        # The result landed but the ledger update did not; never pay for that session twice.
+        if ledger.status(item_id) != STATUS_DONE and _result_path(sweep_dir, item_id).exists():
+            ledger.mark_done(item_id, _result_path(sweep_dir, item_id))
+    queue = ledger.runnable(by_id, max_attempts)
+    logger.info("Sweep shard %s/%s: %s items, %s to run", shard[0], shard[1], len(items), len(queue))
+
+    programs: Dict[str, Dict[str, Any]] = {}
+    for ref in sorted({by_id[item_id].program for item_id in queue}):
+        programs[ref] = await _load_program(ref, spec_dir)
+
+    draining = asyncio.Event()
+
+    def _drain() -> None:
+        logger.warning("Interrupt received: finishing in-flight sessions, no new ones will start (Ctrl-C again to abort)")
+        draining.set()
+        loop.remove_signal_handler(signal.SIGINT)
+
+    try:
+        loop.add_signal_handler(signal.SIGINT, _drain)
+    except (NotImplementedError, RuntimeError):
+        pass
+
+    completed = failed = 0
+    pending = iter(queue)
+
+    async def worker() -> None:
+        nonlocal completed, failed
+        for item_id in pending:
+            if draining.is_set():
+                return
+            item = by_id[item_id]
+            ledger.mark_running(item_id)
+            try:
+                record = await run_item(item, programs[item.program])
+            except Exception as exc:
+                logger.exception("Sweep item %s failed", item_id)
+                ledger.mark_failed(item_id, f"{type(exc).__name__}: {exc}")
+                failed += 1
+                continue
+            result_path = _result_path(sweep_dir, item_id)
+            await asyncio.to_thread(_write_result, result_path, record)
+            ledger.mark_done(item_id, result_path)
+            completed += 1
+            if completed % 10 == 0:
+                logger.info("Sweep progress: %s done, %s failed, %s queued this run", completed, failed, len(queue))
+
+    started_at = time.perf_counter()
+    try:
+        await asyncio.gather(*(worker() for _ in range(max(1, min(concurrency, len(queue) or 1)))))
+    finally:
+        try:
+            loop.remove_signal_handler(signal.SIGINT)
+        except (NotImplementedError, RuntimeError):
+            pass
+    return {
+        "shard": f"{shard[0]}/{shard[1]}",
+        "items": len(items),
+        "completed_this_run": completed,
+        "failed_this_run": failed,
+        "interrupted": draining.is_set(),
+        "elapsed_seconds": round(time.perf_counter() - started_at, 2),
+        "ledger": ledger.counts(),
+    }
+
+
+def export_results(sweep_dir: Path, output: Path) -> int:
+    """Merge every shard's result files into one JSONL file."""
+    count = 0
+    with output.open("w", encoding="utf-8") as handle:
+        for path in sorted((sweep_dir / "results").glob("*.json")):
+            handle.write(path.read_text(encoding="utf-8").strip() + "\n")
+            count += 1
+    return count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a resumable Lab parameter sweep.")
+    parser.add_argument("spec", type=Path, help="Sweep spec JSON")
+    parser.add_argument("--sweep-dir", type=Path, help="Shared results directory (default: outputs/lab/sweeps/<name>)")
+    parser.add_argument("--ledger", type=Path, help="SQLite ledger (default: <sweep-dir>/ledger-shard<K>of<N>.sqlite3)")
+    parser.add_argument("--shard", default="0/1", help="Run only shard K of N, e.g. 1/4")
+    parser.add_argument("--concurrency", type=int, default=8, help="Work items in flight at once")
+    parser.add_argument("--max-attempts", type=int, default=2, help="Give up on an item after this many failures")
+    parser.add_argument("--status", action="store_true", help="Print ledger counts and exit")
+    parser.add_argument("--export", type=Path, help="Merge all results into this JSONL file and exit")
+    args = parser.parse_args()
+
+    spec = json.loads(args.spec.read_text(encoding="utf-8"))
+    sweep_dir = args.sweep_dir or SWEEP_OUTPUT_ROOT / str(spec.get("name") or args.spec.stem)
+    if args.export is not None:
+        print(json.dumps({"exported": export_results(sweep_dir, args.export), "output": str(args.export)}))
+        return
+    try:
+        shard = parse_shard(args.shard)
+    except ValueError as exc:
+        raise SystemExit(str(exc)) from None
+    ledger = SweepLedger(args.ledger or sweep_dir / f"ledger-shard{shard[0]}of{shard[1]}.sqlite3")
+    try:
+        if args.status:
+            print(json.dumps({"ledger": str(ledger.path), "counts": ledger.counts()}, indent=2))
+            return
+
+        async def _runner() -> Dict[str, Any]:
+            try:
+                return await run_sweep(
+                    spec,
+                    args.spec.resolve().parent,
+                    sweep_dir,
+                    ledger,
+                    shard=shard,
+                    concurrency=args.concurrency,
+                    max_attempts=max(1, args.max_attempts),
+                )
+            finally:
+                await arena.PERSONA_POOL.aclose()
+                if arena.HTTP_CLIENT is not None:
+                    await arena.HTTP_CLIENT.aclose()
+
+        summary = asyncio.run(_runner())
+        summary["finished_at"] = datetime.now().isoformat()
+        print(json.dumps(summary, indent=2))
+    finally:
+        ledger.close()
+        arena.TRACE_SINK.close()
+
+
+if __name__ == "__main__":
+    main()
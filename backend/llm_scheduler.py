@@ -0,0 +1,307 @@
+"""
+Process-wide scheduler that every Gemini request goes through.
+
+Requests queue per model behind a token bucket (requests per minute + burst)
+and a max in-flight cap. When capacity frees up, waiters are served strictly by
+lane priority, so live turns are never stuck behind a Lab batch or RAG ingestion.
+
+Async code uses `slot()`; synchronous helpers running on worker threads use
+`hold()`, which hands the wait back to the event loop the scheduler is bound to.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Deque, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger("negotiation-arena.scheduler")
+
+LANE_INTERACTIVE = "interactive"
+LANE_COPILOT = "copilot"
+LANE_JUDGE = "judge"
+LANE_SETUP = "setup"
+LANE_BACKGROUND = "background"
+
+# Lower value is served first.
+LANE_PRIORITY: Dict[str, int] = {
+    LANE_INTERACTIVE: 0,
+    LANE_COPILOT: 1,
+    LANE_JUDGE: 2,
+    LANE_SETUP: 3,
+    LANE_BACKGROUND: 4,
+}
+
+
+@dataclass(frozen=True)
+class ModelLimits:
+    requests_per_minute: float
+    burst: int
+    max_in_flight: int
+
+
+@dataclass
+class SchedulerTicket:
+    model: str
+    lane: str
+    granted_at: float
+    wait_ms: float
+
+
+@dataclass
+class _ModelState:
+    limits: ModelLimits
+    tokens: float
+    refilled_at: float
+    in_flight: int = 0
+    waiters: List[Tuple[int, int, float, str, "asyncio.Future[SchedulerTicket]"]] = field(default_factory=list)
+    timer: Optional[asyncio.TimerHandle] = None
+
+
+@dataclass
+class _LaneStats:
+    queued: int = 0
+    granted: int = 0
+    total_wait_ms: float = 0.0
+    max_wait_ms: float = 0.0
+    recent_waits_ms: Deque[float] = field(default_factory=lambda: deque(maxlen=512))
+
+
+def _percentile(values: List[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round((pct / 100.0) * (len(ordered) - 1)))))
+    return round(ordered[index], 1)
+
+
+def parse_model_limits(raw: Optional[str], default: ModelLimits) -> Dict[str, ModelLimits]:
+    """Parse "model=rpm:max_in_flight,model=rpm:max_in_flight" overrides."""
+    limits: Dict[str, ModelLimits] = {}
+    for item in str(raw or "").split(","):
+        model, sep, spec = item.partition("=")
+        model = model.strip()
+        if not sep or not model:
+            continue
+        rpm_raw, _, in_flight_raw = spec.partition(":")
+        try:
+            rpm = float(rpm_raw) if rpm_raw.strip() else default.requests_per_minute
+            in_flight = int(in_flight_raw) if in_flight_raw.strip() else default.max_in_flight
+        except ValueError:
+            logger.warning("Ignoring invalid scheduler limit override %r", item)
+            continue
+        limits[model] = ModelLimits(max(0.1, rpm), default.burst, max(1, in_flight))
+    return limits
+
+
+class LLMScheduler:
+    def __init__(
+        self,
+        default_limits: ModelLimits,
+        model_limits: Optional[Dict[str, ModelLimits]] = None,
+        enabled: bool = True,
+    ) -> None:
+        self.default_limits = default_limits
+        self.model_limits: Dict[str, ModelLimits] = dict(model_limits or {})
+        self.enabled = enabled
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._models: Dict[str, _ModelState] = {}
+        self._lanes: Dict[str, _LaneStats] = {lane: _LaneStats() for lane in LANE_PRIORITY}
+        self._seq = itertools.count()
+
+    @classmethod
+    def from_env(cls) -> "LLMScheduler":
+        def _number(name: str, default: float) -> float:
+            try:
+                return float(os.getenv(name, default))
+            except ValueError:
+                return default
+
+        enabled = str(os.getenv("LLM_SCHEDULER_ENABLED", "true")).strip().lower() in {"1", "true", "yes", "on"}
+        default = ModelLimits(
+            requests_per_minute=max(0.1, _number("LLM_SCHEDULER_RPM", 300)),
+            burst=max(1, int(_number("LLM_SCHEDULER_BURST", 20))),
+            max_in_flight=max(1, int(_number("LLM_SCHEDULER_MAX_IN_FLIGHT", 16))),
+        )
+        return cls(default, parse_model_limits(os.getenv("LLM_SCHEDULER_MODEL_LIMITS"), default), enabled=enabled)
+
+    def bind_loop(self, loop: asyncio.AbstractEventLoop) -> None:
+        if self._loop is not loop:
+            # Waiters and timers belong to the previous loop; start fresh on the new one.
+            self._models.clear()
+            for stats in self._lanes.values():
+                stats.queued = 0
+            self._loop = loop
+
+    async def acquire(self, model: str, lane: str = LANE_INTERACTIVE) -> SchedulerTicket:
+        lane = lane if lane in LANE_PRIORITY else LANE_INTERACTIVE
+        loop = asyncio.get_running_loop()
+        self.bind_loop(loop)
+        enqueued_at = time.perf_counter()
+        if not self.enabled:
+            return self._grant_ticket(model, lane, enqueued_at)
+
+        state = self._state(model)
+        self._refill(state)
+        if not state.waiters and self._has_capacity(state):
+            state.tokens -= 1
+            state.in_flight += 1
+            return self._grant_ticket(model, lane, enqueued_at)
+
+        future: "asyncio.Future[SchedulerTicket]" = loop.create_future()
+        heapq.heappush(state.waiters, (LANE_PRIORITY[lane], next(self._seq), enqueued_at, lane, future))
+        self._lanes[lane].queued += 1
+        self._dispatch(model)
+        try:
+            return await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release(future.result())
+            raise
+
+    def try_acquire(self, model: str, lane: str = LANE_INTERACTIVE) -> Optional[SchedulerTicket]:
+        """Grant immediately if capacity is free and nobody is queued, otherwise return None."""
+        lane = lane if lane in LANE_PRIORITY else LANE_INTERACTIVE
+        enqueued_at = time.perf_counter()
+        if not self.enabled:
+            return self._grant_ticket(model, lane, enqueued_at)
+        state = self._state(model)
+        self._refill(state)
+        if state.waiters or not self._has_capacity(state):
+            return None
+        state.tokens -= 1
+        state.in_flight += 1
+        return self._grant_ticket(model, lane, enqueued_at)
+
+    def release(self, ticket: Optional[SchedulerTicket]) -> None:
+        if ticket is None or not self.enabled:
+            return
+        state = self._models.get(ticket.model)
+        if state is None:
+            return
+        state.in_flight = max(0, state.in_flight - 1)
+        self._dispatch(ticket.model)
+
+    @asynccontextmanager
+    async def slot(self, model: str, lane: str = LANE_INTERACTIVE) -> AsyncIterator[SchedulerTicket]:
+        ticket = await self.acquire(model, lane)
+        try:
+            yield ticket
+        finally:
+            self.release(ticket)
+
+    @contextmanager
+    def hold(self, model: str, lane: str = LANE_INTERACTIVE) -> Iterator[Optional[SchedulerTicket]]:
+        """Blocking variant for worker threads; bypassed when no loop is bound or when called on the loop itself."""
+        loop = self._loop
+        if loop is None or loop.is_closed() or not loop.is_running() or self._on_loop_thread(loop):
+            if loop is not None and self._on_loop_thread(loop):
+                logger.warning("LLM call for %s issued on the event loop thread; bypassing scheduler", model)
+            yield None
+            return
+        ticket = asyncio.run_coroutine_threadsafe(self.acquire(model, lane), loop).result()
+        try:
+            yield ticket
+        finally:
+            try:
+                loop.call_soon_threadsafe(self.release, ticket)
+            except RuntimeError:
+                logger.debug("Scheduler loop closed before release of %s ticket", model)
+
+    def snapshot(self) -> Dict[str, Any]:
+        lanes: Dict[str, Any] = {}
+        for lane, stats in self._lanes.items():
+            recent = list(stats.recent_waits_ms)
+            lanes[lane] = {
+                "queue_depth": stats.queued,
+                "granted": stats.granted,
+                "avg_wait_ms": round(stats.total_wait_ms / stats.granted, 1) if stats.granted else 0.0,
+                "max_wait_ms": round(stats.max_wait_ms, 1),
+                "p50_wait_ms": _percentile(recent, 50),
+                "p95_wait_ms": _percentile(recent, 95),
+            }
+        models: Dict[str, Any] = {}
+        for model, state in self._models.items():
+            self._refill(state)
+            models[model] = {
+                "in_flight": state.in_flight,
+                "max_in_flight": state.limits.max_in_flight,
+                "queue_depth": len([w for w in state.waiters if not w[4].done()]),
+                "tokens_available": round(state.tokens, 2),
+                "requests_per_minute": state.limits.requests_per_minute,
+            }
+        return {"enabled": self.enabled, "lanes": lanes, "models": models}
+
+    def _state(self, model: str) -> _ModelState:
+        state = self._models.get(model)
+        if state is None:
+            limits = self.model_limits.get(model, self.default_limits)
+            state = _ModelState(limits=limits, tokens=float(limits.burst), refilled_at=time.monotonic())
+            self._models[model] = state
+        return state
+
+    def _refill(self, state: _ModelState) -> None:
+        now = time.monotonic()
+        rate_per_second = state.limits.requests_per_minute / 60.0
+        state.tokens = min(float(state.limits.burst), state.tokens + (now - state.refilled_at) * rate_per_second)
+        state.refilled_at = now
+
+    @staticmethod
+    def _has_capacity(state: _ModelState) -> bool:
+        return state.in_flight < state.limits.max_in_flight and state.tokens >= 1.0
+
+    @staticmethod
+    def _on_loop_thread(loop: asyncio.AbstractEventLoop) -> bool:
+        try:
+            return asyncio.get_running_loop() is loop
+        except RuntimeError:
+            return False
+
+    def _grant_ticket(self, model: str, lane: str, enqueued_at: float) -> SchedulerTicket:
+        now = time.perf_counter()
+        wait_ms = (now - enqueued_at) * 1000
+        stats = self._lanes[lane]
+        stats.granted += 1
+        stats.total_wait_ms += wait_ms
+        stats.max_wait_ms = max(stats.max_wait_ms, wait_ms)
+        stats.recent_waits_ms.append(wait_ms)
+        return SchedulerTicket(model=model, lane=lane, granted_at=now, wait_ms=round(wait_ms, 1))
+
+    def _dispatch(self, model: str) -> None:
+        state = self._models.get(model)
+        if state is None:
+            return
+        self._refill(state)
+        while state.waiters:
+            _, _, enqueued_at, lane, future = state.waiters[0]
+            if future.done():
+                heapq.heappop(state.waiters)
+                self._lanes[lane].queued = max(0, self._lanes[lane].queued - 1)
+                continue
+            if not self._has_capacity(state):
+                break
+            heapq.heappop(state.waiters)
+            self._lanes[lane].queued = max(0, self._lanes[lane].queued - 1)
+            state.tokens -= 1
+            state.in_flight += 1
+            future.set_result(self._grant_ticket(model, lane, enqueued_at))
+
+        waiting_on_tokens = state.waiters and state.in_flight < state.limits.max_in_flight and state.tokens < 1.0
+        if waiting_on_tokens and state.timer is None and self._loop is not None:
+            delay = (1.0 - state.tokens) / (state.limits.requests_per_minute / 60.0)
+            state.timer = self._loop.call_later(max(0.001, delay), self._on_refill_timer, model)
+
+    def _on_refill_timer(self, model: str) -> None:
+        state = self._models.get(model)
+        if state is None:
+            return
+        state.timer = None
+        self._dispatch(model)
+
+
+LLM_SCHEDULER = LLMScheduler.from_env()
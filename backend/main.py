@@ -4,39 +4,84 @@ URL-grounded analysis + Gemini-powered streamed negotiation.
 """
 
 import asyncio
+import atexit
 import hashlib
 import hmac
 import json
 import logging
 import os
-import queue
 import random
 import re
-import threading
+import time
 import uuid
+from collections import deque
+from contextlib import asynccontextmanager
 from datetime import datetime
-from io import BytesIO
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set, Tuple
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, List, Optional, Set, Tuple
 
-import requests
+import httpx
 from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from google.protobuf.json_format import MessageToDict
 from google import genai
 from google.genai import types
 from pydantic import BaseModel, HttpUrl
-from reportlab.lib.pagesizes import letter
-from reportlab.lib import colors
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
-from reportlab.platypus import PageBreak, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
 from typing_extensions import TypedDict
-from xml.sax.saxutils import escape as xml_escape
+
+try:
+    from backend.auth_tokens import TokenSigner, ephemeral_signing_key, parse_signing_keys
+    from backend.early_stop import ConvergenceMonitor
+    from backend.llm_scheduler import (
+        LANE_BACKGROUND,
+        LANE_COPILOT,
+        LANE_INTERACTIVE,
+        LANE_JUDGE,
+        LANE_SETUP,
+        LLM_SCHEDULER,
+    )
+    from backend.metrics_registry import COUNT_BUCKETS, FAST_LATENCY_BUCKETS, MetricsRegistry
+    from backend.mock_genai import MOCK_MODEL_NAME, MockGenaiClient
+    from backend.money_scanner import scan_amounts
+    from backend.persona_pool import PersonaPool
+    from backend.program_summaries import ProgramSummaryRegistry, freeze_summary, summary_key
+    from backend.report_renderer import ReportRenderer, iter_file_chunks
+    from backend.response_cache import ResponseCache, parse_ttl_overrides
+    from backend.session_store import SessionStore
+    from backend.tag_stream_parser import TagEvent, TagStreamParser
+    from backend.trace_sink import TraceSink, parse_sample_rates
+    from backend.traceability_store import TraceabilityStore
+    from backend.tracing import Tracer
+    from backend.url_cache import CachedPage, UrlContentCache
+    from backend.ws_outbox import WebSocketOutbox
+except ImportError:
+    from auth_tokens import TokenSigner, ephemeral_signing_key, parse_signing_keys
+    from early_stop import ConvergenceMonitor
+    from llm_scheduler import (
+        LANE_BACKGROUND,
+        LANE_COPILOT,
+        LANE_INTERACTIVE,
+        LANE_JUDGE,
+        LANE_SETUP,
+        LLM_SCHEDULER,
+    )
+    from metrics_registry import COUNT_BUCKETS, FAST_LATENCY_BUCKETS, MetricsRegistry
+    from mock_genai import MOCK_MODEL_NAME, MockGenaiClient
+    from money_scanner import scan_amounts
+    from persona_pool import PersonaPool
+    from program_summaries import ProgramSummaryRegistry, freeze_summary, summary_key
+    from report_renderer import ReportRenderer, iter_file_chunks
+    from response_cache import ResponseCache, parse_ttl_overrides
+    from session_store import SessionStore
+    from tag_stream_parser import TagEvent, TagStreamParser
+    from trace_sink import TraceSink, parse_sample_rates
+    from traceability_store import TraceabilityStore
+    from tracing import Tracer
+    from url_cache import CachedPage, UrlContentCache
+    from ws_outbox import WebSocketOutbox
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("negotiation-arena")
@@ -53,6 +98,15 @@ def _env_int(name: str, default: int, minimum: int, maximum: int) -> int:
     return max(minimum, min(maximum, value))
 
 
+def _env_float(name: str, default: float, minimum: float, maximum: float) -> float:
+    raw = os.getenv(name)
+    try:
+        value = float(raw) if raw is not None else default
+    except ValueError:
+        value = default
+    return max(minimum, min(maximum, value))
+
+
 def _env_bool(name: str, default: bool) -> bool:
     raw = os.getenv(name)
     if raw is None:
@@ -64,10 +118,60 @@ DEFAULT_NEGOTIATION_MAX_ROUNDS = _env_int("NEGOTIATION_MAX_ROUNDS", 10, 1, 50)
 NEGOTIATION_MAX_ROUNDS_LIMIT = _env_int("NEGOTIATION_MAX_ROUNDS_LIMIT", 20, 1, 100)
 AUTH_TOKEN_TTL_SECONDS = _env_int("AUTH_TOKEN_TTL_SECONDS", 43200, 60, 604800)
 NEGOTIATION_DEBUG_TRACE = _env_bool("NEGOTIATION_DEBUG_TRACE", True)
+NEGOTIATION_TRACE_FLUSH_MS = _env_int("NEGOTIATION_TRACE_FLUSH_MS", 500, 10, 60000)
+NEGOTIATION_TRACE_BATCH_SIZE = _env_int("NEGOTIATION_TRACE_BATCH_SIZE", 256, 1, 100000)
+NEGOTIATION_TRACE_ROTATE_MB = _env_int("NEGOTIATION_TRACE_ROTATE_MB", 50, 0, 100000)
+NEGOTIATION_TRACE_ROTATE_HOURS = _env_int("NEGOTIATION_TRACE_ROTATE_HOURS", 0, 0, 24 * 365)
+NEGOTIATION_TRACE_COMPRESS = _env_bool("NEGOTIATION_TRACE_COMPRESS", True)
+TRACEABILITY_SEGMENT_MB = _env_int("TRACEABILITY_SEGMENT_MB", 64, 1, 100000)
+NEGOTIATION_SPAN_SAMPLE_RATE = _env_float("NEGOTIATION_SPAN_SAMPLE_RATE", 0.0, 0.0, 1.0)
+NEGOTIATION_SPAN_MAX_PER_TRACE = _env_int("NEGOTIATION_SPAN_MAX_PER_TRACE", 20000, 100, 1000000)
 NEGOTIATION_STREAM_CONSOLE_LOG = _env_bool("NEGOTIATION_STREAM_CONSOLE_LOG", True)
 NEGOTIATION_STREAM_IDLE_TIMEOUT_SECONDS = _env_int("NEGOTIATION_STREAM_IDLE_TIMEOUT_SECONDS", 25, 5, 120)
-
-app = FastAPI(title="AI Negotiation Arena")
+NEGOTIATION_STREAM_HEDGE_ENABLED = _env_bool("NEGOTIATION_STREAM_HEDGE_ENABLED", False)
+NEGOTIATION_STREAM_HEDGE_PERCENTILE = _env_int("NEGOTIATION_STREAM_HEDGE_PERCENTILE", 95, 50, 99)
+NEGOTIATION_STREAM_HEDGE_MIN_SAMPLES = _env_int("NEGOTIATION_STREAM_HEDGE_MIN_SAMPLES", 20, 1, 1000)
+NEGOTIATION_STREAM_HEDGE_MIN_DELAY_MS = _env_int("NEGOTIATION_STREAM_HEDGE_MIN_DELAY_MS", 750, 50, 60000)
+NEGOTIATION_WS_COALESCE_MS = _env_int("NEGOTIATION_WS_COALESCE_MS", 30, 0, 1000)
+NEGOTIATION_WS_COALESCE_MAX_CHARS = _env_int("NEGOTIATION_WS_COALESCE_MAX_CHARS", 1024, 1, 65536)
+NEGOTIATION_INCREMENTAL_JUDGE = _env_bool("NEGOTIATION_INCREMENTAL_JUDGE", False)
+NEGOTIATION_EARLY_STOP = _env_bool("NEGOTIATION_EARLY_STOP", False)
+NEGOTIATION_EARLY_STOP_WINDOW = _env_int("NEGOTIATION_EARLY_STOP_WINDOW", 3, 1, 20)
+NEGOTIATION_EARLY_STOP_TOLERANCE = _env_int("NEGOTIATION_EARLY_STOP_TOLERANCE", 2, 0, 50)
+LLM_RESPONSE_CACHE_ENABLED = _env_bool("LLM_RESPONSE_CACHE_ENABLED", True)
+LLM_RESPONSE_CACHE_DISK = _env_bool("LLM_RESPONSE_CACHE_DISK", True)
+LLM_RESPONSE_CACHE_MAX_ENTRIES = _env_int("LLM_RESPONSE_CACHE_MAX_ENTRIES", 512, 1, 100000)
+SESSION_STORE_TTL_SECONDS = _env_int("SESSION_STORE_TTL_SECONDS", 6 * 3600, 60, 30 * 86400)
+SESSION_STORE_MAX_SESSIONS = _env_int("SESSION_STORE_MAX_SESSIONS", 1000, 1, 1000000)
+SESSION_STORE_MEMORY_MB = _env_int("SESSION_STORE_MEMORY_MB", 256, 1, 65536)
+SESSION_STORE_SPILL_AFTER_SECONDS = _env_int("SESSION_STORE_SPILL_AFTER_SECONDS", 600, 0, 30 * 86400)
+SESSION_STORE_SPILL_DISK = _env_bool("SESSION_STORE_SPILL_DISK", True)
+URL_CACHE_ENABLED = _env_bool("URL_CACHE_ENABLED", True)
+URL_CACHE_FRESH_SECONDS = _env_int("URL_CACHE_FRESH_SECONDS", 6 * 3600, 0, 30 * 86400)
+URL_CACHE_MAX_AGE_DAYS = _env_int("URL_CACHE_MAX_AGE_DAYS", 30, 1, 3650)
+PERSONA_POOL_DEPTH = _env_int("PERSONA_POOL_DEPTH", 1, 0, 10)
+PERSONA_POOL_MAX_PROGRAMS = _env_int("PERSONA_POOL_MAX_PROGRAMS", 32, 1, 1000)
+PERSONA_POOL_CONCURRENCY = _env_int("PERSONA_POOL_CONCURRENCY", 2, 1, 16)
+PERSONA_POOL_PRIME_SIBLINGS = _env_bool("PERSONA_POOL_PRIME_SIBLINGS", False)
+REPORT_RENDER_WORKERS = _env_int("REPORT_RENDER_WORKERS", 2, 0, 16)
+REPORT_CACHE_MAX_FILES = _env_int("REPORT_CACHE_MAX_FILES", 200, 1, 100000)
+
+
+@asynccontextmanager
+async def _lifespan(_: FastAPI) -> AsyncIterator[None]:
+    # Worker-thread Gemini calls block on this loop's scheduler queues via LLM_SCHEDULER.hold().
+    LLM_SCHEDULER.bind_loop(asyncio.get_running_loop())
+    yield
+    await PERSONA_POOL.aclose()
+    if HTTP_CLIENT is not None:
+        await HTTP_CLIENT.aclose()
+    REPORT_RENDERER.close()
+    await asyncio.to_thread(TRACEABILITY_STORE.close)
+    await asyncio.to_thread(TRACER.close)
+    await asyncio.to_thread(TRACE_SINK.close)
+
+
+app = FastAPI(title="AI Negotiation Arena", lifespan=_lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -78,6 +182,12 @@ app.add_middleware(
 
 
 def _configure_models() -> Tuple[genai.Client, str, str]:
+    if os.getenv("GEMINI_BACKEND", "").strip().lower() == "mock":
+        # Offline backend for load tests; see mock_genai.py for the MOCK_GENAI_* knobs. GEMINI_MODEL is
+        # ignored: model names key the response and program-summary caches, so mock output must never
+        # be stored under a real model's name.
+        logger.warning("GEMINI_BACKEND=mock: using the offline mock Gemini client")
+        return MockGenaiClient.from_env(), MOCK_MODEL_NAME, MOCK_MODEL_NAME
     api_key = os.getenv("GEMINI_API_KEY")
     if not api_key:
         raise RuntimeError("GEMINI_API_KEY is not set")
@@ -92,6 +202,8 @@ def _configure_models() -> Tuple[genai.Client, str, str]:
 CLIENT: Optional[genai.Client] = None
 NEGOTIATION_MODEL_NAME: Optional[str] = None
 JUDGE_MODEL_NAME: Optional[str] = None
+HTTP_CLIENT: Optional[httpx.AsyncClient] = None
+HTTP_CLIENT_LOOP: Optional[asyncio.AbstractEventLoop] = None
 
 
 def get_client_and_models() -> Tuple[genai.Client, str, str]:
@@ -342,8 +454,14 @@ class NegotiationState(TypedDict):
     retry_context: Dict[str, Any]
 
 
-SESSION_STORE: Dict[str, Dict[str, Any]] = {}
-AUTH_TOKENS: Dict[str, float] = {}
+SESSION_SPILL_DIR = Path(__file__).resolve().parent / "outputs" / "sessions"
+SESSION_STORE = SessionStore(
+    SESSION_SPILL_DIR if SESSION_STORE_SPILL_DISK else None,
+    ttl_seconds=SESSION_STORE_TTL_SECONDS,
+    max_sessions=SESSION_STORE_MAX_SESSIONS,
+    memory_budget_bytes=SESSION_STORE_MEMORY_MB * 1024 * 1024,
+    spill_after_seconds=SESSION_STORE_SPILL_AFTER_SECONDS,
+)
 AUTH_FILE = Path(__file__).with_name("auth.json")
 TRACE_OUTPUT_ROOT = Path(__file__).resolve().parent / "outputs" / "tracebility" / "runtime"
 TRACE_PIPELINE_DIRS: Dict[str, str] = {
@@ -351,8 +469,96 @@ TRACE_PIPELINE_DIRS: Dict[str, str] = {
     "human_vs_ai": "human_vs_ai",
     "agent_powered_human_vs_ai": "agent_powered_human_vs_ai",
 }
-PDF_HINDI_FONT_NAME = "CloseWireHindi"
-PDF_HINDI_FONT_BOLD_NAME = "CloseWireHindiBold"
+RESPONSE_CACHE_FILE = Path(__file__).resolve().parent / "outputs" / "cache" / "llm_responses.sqlite3"
+# Seconds a structured result stays reusable per function; unlisted functions (e.g. stream retries) are never cached.
+RESPONSE_CACHE_DEFAULT_TTLS: Dict[str, int] = {
+    "set_program_summary": 7 * 86400,
+    "program_summary": 7 * 86400,
+    "set_persona": 86400,
+    "set_negotiation_judgement": 86400,
+    "set_copilot_coaching_tips": 3600,
+    "set_human_shadow_observer": 86400,
+}
+RESPONSE_CACHE: Optional[ResponseCache] = (
+    ResponseCache(
+        RESPONSE_CACHE_FILE if LLM_RESPONSE_CACHE_DISK else None,
+        max_memory_entries=LLM_RESPONSE_CACHE_MAX_ENTRIES,
+        ttls={**RESPONSE_CACHE_DEFAULT_TTLS, **parse_ttl_overrides(os.getenv("LLM_RESPONSE_CACHE_TTLS"))},
+    )
+    if LLM_RESPONSE_CACHE_ENABLED
+    else None
+)
+# Sessions for the same page content share one read-only summary object.
+PROGRAM_SUMMARIES = ProgramSummaryRegistry()
+URL_CACHE_FILE = Path(__file__).resolve().parent / "outputs" / "cache" / "url_content.sqlite3"
+URL_CACHE: Optional[UrlContentCache] = (
+    UrlContentCache(
+        URL_CACHE_FILE,
+        fresh_seconds=URL_CACHE_FRESH_SECONDS,
+        max_age_seconds=URL_CACHE_MAX_AGE_DAYS * 86400,
+    )
+    if URL_CACHE_ENABLED
+    else None
+)
+REPORT_RENDERER = ReportRenderer(
+    Path(__file__).resolve().parent / "outputs" / "reports",
+    workers=REPORT_RENDER_WORKERS,
+    max_cached=REPORT_CACHE_MAX_FILES,
+)
+TRACE_SINK = TraceSink(
+    serializer=lambda entry: _to_plain_json(entry),
+    batch_size=NEGOTIATION_TRACE_BATCH_SIZE,
+    flush_interval_seconds=NEGOTIATION_TRACE_FLUSH_MS / 1000.0,
+    rotate_bytes=NEGOTIATION_TRACE_ROTATE_MB * 1024 * 1024,
+    rotate_seconds=NEGOTIATION_TRACE_ROTATE_HOURS * 3600,
+    compress_rotated=NEGOTIATION_TRACE_COMPRESS,
+    sample_rates=parse_sample_rates(os.getenv("NEGOTIATION_TRACE_SAMPLE_RATES")),
+)
+atexit.register(TRACE_SINK.close)
+# Every finished run's traceability payload, kept for the harvester and analytics.
+TRACEABILITY_STORE = TraceabilityStore(
+    TRACE_OUTPUT_ROOT / "sessions",
+    segment_bytes=TRACEABILITY_SEGMENT_MB * 1024 * 1024,
+)
+# Sampled sessions are written as Chrome trace JSON (one file per session) for flame-chart views.
+TRACER = Tracer(
+    TRACE_OUTPUT_ROOT / "spans",
+    sample_rate=NEGOTIATION_SPAN_SAMPLE_RATE,
+    max_spans=NEGOTIATION_SPAN_MAX_PER_TRACE,
+)
+# Recent time-to-first-chunk samples (ms) that drive the hedge delay for streamed turns.
+STREAM_TTFT_SAMPLES_MS: Deque[float] = deque(maxlen=200)
+STREAM_HEDGE_STATS: Dict[str, int] = {"streams": 0, "hedged": 0, "hedge_wins": 0, "hedge_skipped_no_capacity": 0}
+# Served at /metrics; updates are a dict lookup plus a short lock, so they stay on in production.
+METRICS = MetricsRegistry()
+STREAM_TTFT_SECONDS = METRICS.histogram(
+    "negotiation_stream_ttft_seconds", "Time from stream start to first chunk per streamed turn.", ("agent",)
+)
+STREAM_DURATION_SECONDS = METRICS.histogram(
+    "negotiation_stream_duration_seconds", "Wall time of a streamed turn, excluding scheduler queueing.", ("agent",)
+)
+STREAM_CHUNKS = METRICS.histogram(
+    "negotiation_stream_chunks", "Chunks received per streamed turn.", ("agent",), buckets=COUNT_BUCKETS
+)
+FUNCTION_CALL_SECONDS = METRICS.histogram(
+    "negotiation_function_call_seconds", "Latency of structured function-calling requests.", ("function",)
+)
+JUDGE_SECONDS = METRICS.histogram(
+    "negotiation_judge_seconds", "Time to the final judge verdict of a run.", ("mode", "incremental")
+)
+WS_SEND_SECONDS = METRICS.histogram(
+    "negotiation_ws_send_seconds", "Latency of one WebSocket frame write.", buckets=FAST_LATENCY_BUCKETS
+)
+STRUCTURED_RETRIES = METRICS.counter(
+    "negotiation_structured_retries_total", "Turns that fell back to a structured JSON retry.", ("agent",)
+)
+TURN_FALLBACKS = METRICS.counter(
+    "negotiation_turn_fallbacks_total", "Turns that ended with a canned fallback message.", ("agent",)
+)
+ROLE_DRIFT_REWRITES = METRICS.counter(
+    "negotiation_role_drift_rewrites_total", "Student retries rewritten after drifting into the counsellor role.", ("result",)
+)
+ACTIVE_SESSIONS = METRICS.gauge("negotiation_active_sessions", "Negotiation sockets currently running.", ("mode",))
 
 
 def _pipeline_trace_dir(mode: str) -> Path:
@@ -365,10 +571,6 @@ def _pipeline_debug_trace_file(mode: str) -> Path:
     return _pipeline_trace_dir(mode) / "negotiation_debug_trace.jsonl"
 
 
-def _pipeline_traceability_file(mode: str) -> Path:
-    return _pipeline_trace_dir(mode) / "conversation_traceability.json"
-
-
 def _is_rag_pipeline_enabled() -> bool:
     raw = str(os.getenv("RAG_PIPELINE_ENABLED", "false")).strip().lower()
     # Accept common typo "flase" as false to avoid accidental activation.
@@ -379,45 +581,7 @@ def _is_rag_pipeline_enabled() -> bool:
     return False
 
 
-def _has_devanagari(value: str) -> bool:
-    text = str(value or "")
-    return any("\u0900" <= ch <= "\u097F" for ch in text)
-
-
-def _configure_pdf_fonts() -> Tuple[str, str]:
-    base_font = "Helvetica"
-    bold_font = "Helvetica-Bold"
-    candidate_paths = [
-        Path(__file__).resolve().parent / "assets" / "fonts" / "NotoSansDevanagari-Regular.ttf",
-        Path(__file__).resolve().parent / "assets" / "fonts" / "NotoSansDevanagari-Bold.ttf",
-        Path("/usr/share/fonts/truetype/noto/NotoSansDevanagari-Regular.ttf"),
-        Path("/usr/share/fonts/truetype/noto/NotoSansDevanagari-Bold.ttf"),
-        Path("/usr/share/fonts/opentype/noto/NotoSansDevanagari-Regular.ttf"),
-        Path("/usr/share/fonts/opentype/noto/NotoSansDevanagari-Bold.ttf"),
-        Path("C:/Windows/Fonts/Nirmala.ttf"),
-        Path("C:/Windows/Fonts/mangal.ttf"),
-    ]
-    regular_path = None
-    bold_path = None
-    for candidate in candidate_paths:
-        lowered = candidate.name.lower()
-        if "bold" in lowered and bold_path is None and candidate.exists():
-            bold_path = candidate
-        if "bold" not in lowered and regular_path is None and candidate.exists():
-            regular_path = candidate
-    if not regular_path:
-        return base_font, bold_font
-    try:
-        pdfmetrics.registerFont(TTFont(PDF_HINDI_FONT_NAME, str(regular_path)))
-        if bold_path:
-            pdfmetrics.registerFont(TTFont(PDF_HINDI_FONT_BOLD_NAME, str(bold_path)))
-            return PDF_HINDI_FONT_NAME, PDF_HINDI_FONT_BOLD_NAME
-        return PDF_HINDI_FONT_NAME, PDF_HINDI_FONT_NAME
-    except Exception:
-        logger.exception("Failed to register Hindi PDF font. Falling back to Helvetica.")
-        return base_font, bold_font
-
-
+@TRACER.traced("post_session_jobs", track="post_session")
 async def _run_post_session_jobs_safe(session_id: str, mode: str, trace_payload: Dict[str, Any]) -> None:
     if not _is_rag_pipeline_enabled():
         _write_debug_trace(
@@ -479,12 +643,15 @@ def _load_password_hash() -> str:
 
 
 PASSWORD_SHA256 = _load_password_hash()
+# Tokens are verified by signature alone, so every worker configured with the same keys accepts them.
+AUTH_TOKEN_SIGNER = TokenSigner(
+    parse_signing_keys(os.getenv("AUTH_TOKEN_SIGNING_KEYS")) or [ephemeral_signing_key()],
+    ttl_seconds=AUTH_TOKEN_TTL_SECONDS,
+)
 
 
 def _issue_auth_token() -> str:
-    token = uuid.uuid4().hex
-    AUTH_TOKENS[token] = datetime.now().timestamp() + AUTH_TOKEN_TTL_SECONDS
-    return token
+    return AUTH_TOKEN_SIGNER.issue()
 
 
 def _truncate_trace_text(value: Any, limit: int = 240) -> str:
@@ -524,18 +691,8 @@ def _write_debug_trace(event: str, payload: Dict[str, Any]) -> None:
     if not NEGOTIATION_DEBUG_TRACE:
         return
     mode = str(payload.get("mode", "ai_vs_ai")).strip().lower()
-    target_file = _pipeline_debug_trace_file(mode)
-    entry = {
-        "ts": datetime.now().isoformat(),
-        "event": event,
-        **payload,
-    }
-    try:
-        target_file.parent.mkdir(parents=True, exist_ok=True)
-        with target_file.open("a", encoding="utf-8") as handle:
-            handle.write(json.dumps(_to_plain_json(entry), ensure_ascii=False) + "\n")
-    except Exception:
-        logger.exception("Failed to write debug trace event=%s", event)
+    # Serialization and file I/O happen on the sink's writer thread.
+    TRACE_SINK.emit(_pipeline_debug_trace_file(mode), event, payload)
 
 
 def _build_traceability_payload(session_id: str, state: NegotiationState, analysis: Dict[str, Any]) -> Dict[str, Any]:
@@ -545,6 +702,7 @@ def _build_traceability_payload(session_id: str, state: NegotiationState, analys
         "deal_status": state.get("deal_status"),
         "round": state.get("round"),
         "max_rounds": state.get("max_rounds"),
+        "early_stop": state.get("early_stop"),
         "persona": state.get("persona"),
         "program": {
             "program_name": state.get("program", {}).get("program_name"),
@@ -562,23 +720,16 @@ def _build_traceability_payload(session_id: str, state: NegotiationState, analys
     }
 
 
-def _emit_conversation_traceability(session_id: str, state: NegotiationState, analysis: Dict[str, Any]) -> None:
-    trace_payload = _build_traceability_payload(session_id, state, analysis)
-    mode = str(state.get("mode", "ai_vs_ai")).strip().lower()
-    target_file = _pipeline_traceability_file(mode)
-    target_file.parent.mkdir(parents=True, exist_ok=True)
-    target_file.write_text(json.dumps(trace_payload, indent=2, ensure_ascii=False), encoding="utf-8")
+@TRACER.traced()
+async def _emit_conversation_traceability(trace_payload: Dict[str, Any], mode: str) -> None:
+    try:
+        await asyncio.to_thread(TRACEABILITY_STORE.append, trace_payload, str(mode or "ai_vs_ai").strip().lower())
+    except Exception:
+        logger.exception("Failed to store traceability for session %s", trace_payload.get("session_id"))
 
 
 def _validate_auth_token(token: str) -> bool:
-    expiry = AUTH_TOKENS.get(token)
-    now = datetime.now().timestamp()
-    if not expiry:
-        return False
-    if now > expiry:
-        AUTH_TOKENS.pop(token, None)
-        return False
-    return True
+    return AUTH_TOKEN_SIGNER.verify(token)
 
 
 def _require_auth_token(token: str) -> None:
@@ -645,6 +796,7 @@ def _to_plain_json(value: Any) -> Any:
     return str(value)
 
 
+@TRACER.traced(attrs=("function_name", "lane"))
 def _call_function_json(
     client: genai.Client,
     model_name: str,
@@ -653,7 +805,17 @@ def _call_function_json(
     function_description: str,
     parameters_schema: Dict[str, Any],
     fallback: Dict[str, Any],
+    lane: str = LANE_INTERACTIVE,
+    use_cache: bool = True,
 ) -> Dict[str, Any]:
+    # use_cache=False forces a fresh sample (and doesn't store it) for callers that want distinct results.
+    cache_key = None
+    if use_cache and RESPONSE_CACHE is not None and RESPONSE_CACHE.ttl_for(function_name) > 0:
+        cache_key = ResponseCache.make_key(model_name, prompt, function_name, function_description, parameters_schema)
+        cached = RESPONSE_CACHE.get(function_name, cache_key)
+        if cached is not None:
+            return cached
+
     declaration = types.FunctionDeclaration(
         name=function_name,
         description=function_description,
@@ -670,19 +832,30 @@ def _call_function_json(
         ),
     )
 
+    def _cached_result(args: Dict[str, Any]) -> Dict[str, Any]:
+        result = _to_plain_json(args)
+        if cache_key is not None:
+            RESPONSE_CACHE.put(function_name, cache_key, result)
+        return result
+
     response = None
     try:
-        response = client.models.generate_content(
-            model=model_name,
-            contents=prompt,
-            config=config,
-        )
+        with LLM_SCHEDULER.hold(model_name, lane):
+            call_started_at = time.perf_counter()
+            try:
+                response = client.models.generate_content(
+                    model=model_name,
+                    contents=prompt,
+                    config=config,
+                )
+            finally:
+                FUNCTION_CALL_SECONDS.labels(function_name).observe(time.perf_counter() - call_started_at)
         calls = getattr(response, "function_calls", None) or []
         for call in calls:
             if getattr(call, "name", "") == function_name:
                 args = dict(getattr(call, "args", {}) or {})
                 if args:
-                    return _to_plain_json(args)
+                    return _cached_result(args)
         for candidate in getattr(response, "candidates", []) or []:
             content = getattr(candidate, "content", None)
             if not content:
@@ -692,7 +865,7 @@ def _call_function_json(
                 if call and getattr(call, "name", "") == function_name:
                     args = dict(getattr(call, "args", {}) or {})
                     if args:
-                        return _to_plain_json(args)
+                        return _cached_result(args)
     except Exception:
         logger.exception("Gemini function-calling failed for %s", function_name)
 
@@ -721,68 +894,7 @@ def sanitize_text(text: str) -> str:
 
 
 def extract_inr_amount(text: str) -> int:
-    raw = (text or "").lower()
-    
-    # Check for Lakhs/L
-    lakh_matches = re.findall(r"(\d+(?:\.\d+)?)\s*(?:lakh|l\b)", raw)
-    if lakh_matches:
-        values = [int(float(v) * 100_000) for v in lakh_matches]
-        return max(1000, max(values))
-
-    currency_matches = re.findall(
-        r"(?:\u20b9|inr|rs\.?)\s*([0-9][0-9,]{3,10})",
-        raw,
-        flags=re.IGNORECASE,
-    )
-    if currency_matches:
-        values = [int(v.replace(",", "")) for v in currency_matches]
-        return max(1000, max(values))
-
-    generic_matches = re.findall(r"\b([0-9][0-9,]{3,10})\b", raw)
-    if generic_matches:
-        values = [int(v.replace(",", "")) for v in generic_matches]
-        return max(1000, max(values))
-    return 4500
-
-
-def _extract_all_offer_candidates(text: str) -> List[int]:
-    raw = (text or "").lower()
-    candidates = []
-    
-    # 1. Handle Lakhs/L
-    lakh_matches = re.findall(r"(\d+(?:\.\d+)?)\s*(?:lakh|l\b)", raw)
-    for m in lakh_matches:
-        try:
-            candidates.append(int(float(m) * 100_000))
-        except ValueError:
-            pass
-
-    # 2. INR prefix
-    inr_matches = re.findall(r"(?:\u20b9|inr|rs\.?)\s*([0-9][0-9,]{2,10})", raw)
-    for m in inr_matches:
-        try:
-            candidates.append(int(m.replace(",", "")))
-        except ValueError:
-            pass
-
-    # 3. Generic large numbers
-    generic_matches = re.findall(r"\b([1-9][0-9,]{4,10})\b", raw)
-    for m in generic_matches:
-        try:
-            val = int(m.replace(",", ""))
-            if val > 5000:
-                candidates.append(val)
-        except ValueError:
-            pass
-
-    usd_matches = re.findall(r"\$([0-9][0-9,]{2,10})", raw)
-    for m in usd_matches:
-        try:
-            candidates.append(int(m.replace(",", "")))
-        except ValueError:
-            pass
-
-    return candidates
+    return scan_amounts(text).listed_amount()
 
 
 def _derive_financials(program: Dict[str, Any], persona: Dict[str, Any]) -> Dict[str, int]:
@@ -805,31 +917,131 @@ def _derive_financials(program: Dict[str, Any], persona: Dict[str, Any]) -> Dict
     }
 
 
-def extract_from_url(url: str) -> str:
+def _http_client() -> httpx.AsyncClient:
+    """Pooled client shared by URL fetches on the running loop (a new loop, e.g. in tests, gets its own)."""
+    global HTTP_CLIENT, HTTP_CLIENT_LOOP
+    loop = asyncio.get_running_loop()
+    if HTTP_CLIENT is None or HTTP_CLIENT.is_closed or HTTP_CLIENT_LOOP is not loop:
+        HTTP_CLIENT = httpx.AsyncClient(
+            headers={"User-Agent": "Mozilla/5.0"},
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+        )
+        HTTP_CLIENT_LOOP = loop
+    return HTTP_CLIENT
+
+
+def _html_to_text(html: str) -> str:
+    soup = BeautifulSoup(html, "html.parser")
+    for tag in soup(["script", "style", "nav", "footer", "svg", "header"]):
+        tag.decompose()
+    return sanitize_text(soup.get_text(separator=" "))
+
+
+async def _fetch_via_jina(
+    client: httpx.AsyncClient, url: str, conditional_headers: Optional[Dict[str, str]] = None
+) -> Optional[Tuple[Optional[str], httpx.Headers]]:
+    response = await client.get(f"https://r.jina.ai/{url}", timeout=20, headers=conditional_headers)
+    if response.status_code == 304 and conditional_headers:
+        return None, response.headers
+    if response.status_code == 200 and len(response.text.strip()) > 200:
+        return await asyncio.to_thread(sanitize_text, response.text), response.headers
+    logger.warning("Jina Reader returned no usable content for %s (status %s)", url, response.status_code)
+    return None
+
+
+async def _fetch_direct(
+    client: httpx.AsyncClient, url: str, conditional_headers: Optional[Dict[str, str]] = None
+) -> Optional[Tuple[Optional[str], httpx.Headers]]:
+    response = await client.get(url, timeout=15, headers=conditional_headers)
+    if response.status_code == 304 and conditional_headers:
+        return None, response.headers
+    response.raise_for_status()
+    return await asyncio.to_thread(_html_to_text, response.text), response.headers
+
+
+async def _race_url_fetch(
+    client: httpx.AsyncClient, url: str, cached: Optional[CachedPage] = None
+) -> Tuple[str, str, Optional[httpx.Headers]]:
     """
-    Scrapes text from a URL. Uses Jina Reader as a primary method for better LLM formatting.
+    Race Jina Reader (better LLM formatting) against a direct fetch and return (text, outcome, headers)
+    for the first usable body; the other request is cancelled. When a stale cached page is given, the
+    fetcher that produced it sends a conditional GET and a 304 wins with the cached text ("not_modified").
+    Fetchers return None as the text only for that 304, so an empty 200 body is never taken as one.
     """
-    # Try Jina Reader first
+    fetchers = {"jina": _fetch_via_jina, "direct": _fetch_direct}
+    attempts = {}
+    for name, fetch in fetchers.items():
+        conditional = cached.conditional_headers() if cached is not None and cached.fetcher == name else None
+        attempts[asyncio.create_task(fetch(client, url, conditional or None))] = name
+    pending = set(attempts)
+    fallback: Optional[Tuple[str, str, Optional[httpx.Headers]]] = None
+    errors: List[str] = []
     try:
-        jina_url = f"https://r.jina.ai/{url}"
-        response = requests.get(jina_url, timeout=20, headers={"User-Agent": "Mozilla/5.0"})
-        if response.status_code == 200 and len(response.text.strip()) > 200:
-            return sanitize_text(response.text)
-    except Exception as exc:
-        logger.warning("Jina Reader failed for %s: %s. Falling back to direct scraping.", url, str(exc))
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                name = attempts[task]
+                try:
+                    result = task.result()
+                except Exception as exc:
+                    logger.warning("%s fetch failed for %s: %s", name, url, str(exc))
+                    errors.append(str(exc))
+                    continue
+                if result is None:
+                    continue
+                text, headers = result
+                if text is None:
+                    if cached is not None and cached.fetcher == name:
+                        return cached.text, "not_modified", headers
+                    continue
+                # A direct fetch of a script-rendered page can come back almost empty; keep waiting for Jina then.
+                if name == "jina" or len(text) >= 300:
+                    return text, name, headers
+                fallback = fallback or (text, name, headers)
+    finally:
+        for task in pending:
+            task.cancel()
+    if fallback is not None:
+        return fallback
+    logger.error("Scraping fully failed for %s: %s", url, "; ".join(errors) or "no usable content")
+    return f"Error extracting from URL: {errors[-1] if errors else 'no usable content'}", "error", None
 
-    # Fallback to direct requests
-    try:
-        response = requests.get(url, timeout=15, headers={"User-Agent": "Mozilla/5.0"})
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, "html.parser")
-        for tag in soup(["script", "style", "nav", "footer", "svg", "header"]):
-            tag.decompose()
-        text = soup.get_text(separator=" ")
-        return sanitize_text(text)
-    except Exception as exc:
-        logger.error("Scraping fully failed for %s: %s", url, str(exc))
-        return f"Error extracting from URL: {str(exc)}"
+
+async def fetch_program_page(url: str, client: Optional[httpx.AsyncClient] = None) -> Tuple[str, str]:
+    """
+    Return (page_text, source); source is "url_cache", "url_cache_revalidated", "url_cache_stale" (the re-fetch
+    failed, so the stale cached copy is served) or "url_content".
+    """
+    cached = await asyncio.to_thread(URL_CACHE.get, url) if URL_CACHE is not None else None
+    if cached is not None and cached.fresh:
+        return cached.text, "url_cache"
+    revalidate = cached if cached is not None and cached.has_validators else None
+    text, outcome, headers = await _race_url_fetch(client or _http_client(), url, revalidate)
+    if outcome == "not_modified" and URL_CACHE is not None:
+        await asyncio.to_thread(URL_CACHE.mark_revalidated, url)
+        return text, "url_cache_revalidated"
+    if outcome == "error" and cached is not None:
+        logger.warning("Re-fetch failed for %s; serving the stale cached copy", url)
+        return cached.text, "url_cache_stale"
+    if URL_CACHE is not None and outcome in {"jina", "direct"} and len(text) >= 300:
+        await asyncio.to_thread(
+            URL_CACHE.put,
+            url,
+            text,
+            outcome,
+            etag=(headers or {}).get("etag", ""),
+            last_modified=(headers or {}).get("last-modified", ""),
+        )
+    return text, "url_content"
+
+
+async def extract_from_url(url: str, client: Optional[httpx.AsyncClient] = None) -> str:
+    """
+    Scrapes text from a URL, racing Jina Reader against a direct fetch and reusing the URL cache when it can.
+    """
+    text, _ = await fetch_program_page(url, client)
+    return text
 
 
 def _extract_labeled_block(raw: str, label: str, stop_labels: List[str]) -> str:
@@ -966,9 +1178,32 @@ def _extract_response_text_from_non_stream(response: Any) -> str:
     return "".join(parts).strip()
 
 
+def _parse_techniques_block(techniques_raw: str) -> List[str]:
+    if not techniques_raw:
+        return []
+    parsed_techniques = _extract_first_json_object(f"{{\"items\": {techniques_raw}}}").get("items", [])
+    if isinstance(parsed_techniques, list):
+        return [str(item).strip() for item in parsed_techniques if str(item).strip()]
+    return [item.strip() for item in techniques_raw.split(",") if item.strip()]
+
+
+def _fields_from_tag_blocks(blocks: Dict[str, str]) -> Dict[str, Any]:
+    """Build response fields from blocks collected by TagStreamParser (tag-formatted output only)."""
+    confidence_raw = blocks.get("confidence") or blocks.get("confidence_score")
+    message = re.sub(r"\s+\n", "\n", blocks.get("message", "")).strip()
+    return {
+        "message": message or "...",
+        "techniques": _parse_techniques_block(blocks.get("techniques", "")),
+        "intent": blocks.get("intent", ""),
+        "confidence_score": _clamp_score(confidence_raw, 60) if confidence_raw else 60,
+        "emotional_state": blocks.get("emotional_state") or blocks.get("emotion") or "calm",
+        "internal_thought": blocks.get("thought", ""),
+        "updated_stats": _extract_first_json_object(blocks.get("stats", "")),
+    }
+
+
 def _extract_response_fields(text: str) -> Dict[str, Any]:
     raw = text or ""
-    techniques: List[str] = []
     message = _extract_tag_block(raw, "message") or _extract_message_block(raw)
     thought = _extract_tag_block(raw, "thought") or _extract_labeled_block(
         raw,
@@ -1002,13 +1237,7 @@ def _extract_response_fields(text: str) -> Dict[str, Any]:
         )
     updated_stats = _extract_first_json_object(updated_stats_raw)
 
-    techniques_raw = _extract_tag_block(raw, "techniques")
-    if techniques_raw:
-        parsed_techniques = _extract_first_json_object(f"{{\"items\": {techniques_raw}}}").get("items", [])
-        if isinstance(parsed_techniques, list):
-            techniques = [str(item).strip() for item in parsed_techniques if str(item).strip()]
-        elif not techniques:
-            techniques = [item.strip() for item in techniques_raw.split(",") if item.strip()]
+    techniques = _parse_techniques_block(_extract_tag_block(raw, "techniques"))
     if not techniques:
         techniques_match = re.search(r"TECHNIQUES_USED:\s*\[(.*?)\]", raw, flags=re.IGNORECASE | re.DOTALL)
         if techniques_match:
@@ -1069,10 +1298,22 @@ def _extract_counsellor_message(text: str) -> str:
     return re.sub(r"\s+\n", "\n", raw).strip() or "..."
 
 
+COUNSELLOR_PROMPT_TRANSCRIPT_MESSAGES = 12
+STUDENT_PROMPT_TRANSCRIPT_MESSAGES = 6
+
+
 def _trim_messages(messages: List[Dict[str, Any]], max_messages: int = 12) -> List[Dict[str, Any]]:
     return messages[-max_messages:]
 
 
+def _transcript_line(message: Dict[str, Any]) -> str:
+    return f"{message['agent'].upper()}: {message['content']}"
+
+
+def _render_transcript(messages: List[Dict[str, Any]], max_messages: int) -> str:
+    return "\n".join(_transcript_line(m) for m in _trim_messages(messages, max_messages))
+
+
 def _compact_text(value: Any, limit: int) -> str:
     text = str(value or "").strip()
     if len(text) <= limit:
@@ -1127,10 +1368,9 @@ def _student_program_snapshot(program: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
+@TRACER.traced()
 def _build_retry_context_prompt(state: NegotiationState) -> str:
-    transcript = "\n".join(
-        f"{m['agent'].upper()}: {m['content']}" for m in _trim_messages(state.get("messages", []), 6)
-    )
+    transcript = _render_transcript(state.get("messages", []), 6)
     return (
         "RETRY_CONTEXT:\n"
         f"PROGRAM_SNAPSHOT:\n{json.dumps(_student_program_snapshot(state.get('program', {})), ensure_ascii=False)}\n"
@@ -1153,6 +1393,7 @@ def _resolve_selected_archetype(archetype_id: Optional[str]) -> Optional[str]:
     return None
 
 
+@TRACER.traced(track="copilot")
 async def _generate_coaching_tips(
     client: genai.Client,
     model_name: str,
@@ -1266,6 +1507,7 @@ OUTPUT JSON:
             "required": ["analysis", "suggestions", "fact_check"],
         },
         fallback,
+        lane=LANE_COPILOT,
     )
     parsed = _to_plain_json(parsed)
     
@@ -1311,6 +1553,7 @@ OUTPUT JSON:
     return normalized
 
 
+@TRACER.traced(attrs=("round_number", "message_id"))
 async def _classify_human_input(
     client: genai.Client,
     model_name: str,
@@ -1368,6 +1611,7 @@ CONTEXT:
             "required": ["techniques", "strategic_intent", "confidence_score", "emotional_state"],
         },
         fallback,
+        lane=LANE_INTERACTIVE,
     )
     parsed = _to_plain_json(parsed)
     techniques = [str(item).strip() for item in (parsed.get("techniques") or []) if str(item).strip()][:8]
@@ -1404,16 +1648,36 @@ CONTEXT:
     }
 
 
-def _analyze_program(url: str, archetype_id: Optional[str] = None) -> Tuple[ProgramSummary, str]:
-    client, negotiation_model_name, _ = get_client_and_models()
-    source = "url_content"
-    clean_text = extract_from_url(url)[:25000]
+# Part of the program-summary cache key: bump whenever the extraction prompt or its schema changes.
+PROGRAM_SUMMARY_PROMPT_VERSION = "1"
+
+
+async def _analyze_program(url: str, archetype_id: Optional[str] = None) -> Tuple[ProgramSummary, str]:
+    clean_text, source = await fetch_program_page(url)
+    clean_text = clean_text[:25000]
     
     is_product = str(archetype_id).strip().lower() in ["car_buyer", "discount_hunter"]
     
     if clean_text.startswith("Error extracting from URL:") or len(clean_text) < 300:
         source = "fallback"
-        
+
+    product_type_hint = "PRODUCT (e.g., Car, Gadget)" if is_product else "PROGRAM (e.g., Course, Bootcamp)"
+    client, negotiation_model_name, _ = get_client_and_models()
+    # Keyed by page content rather than URL; fallback pages are never cached so a transient error can't stick.
+    content_key = (
+        summary_key(clean_text, product_type_hint, negotiation_model_name, PROGRAM_SUMMARY_PROMPT_VERSION)
+        if source != "fallback"
+        else None
+    )
+    if content_key is not None:
+        shared = PROGRAM_SUMMARIES.get(content_key)
+        if shared is not None:
+            return shared, source
+        if RESPONSE_CACHE is not None:
+            cached = await asyncio.to_thread(RESPONSE_CACHE.get, "program_summary", content_key)
+            if cached is not None:
+                return PROGRAM_SUMMARIES.intern(content_key, cached), source
+
     fallback = {
         "program_name": "Unknown Product" if is_product else "Unknown Program",
         "value_proposition": "High-quality product value." if is_product else "Career outcomes through practical learning.",
@@ -1435,9 +1699,7 @@ def _analyze_program(url: str, archetype_id: Optional[str] = None) -> Tuple[Prog
         "tools_frameworks_technologies": [],
         "emi_or_financing_options": "Available",
     }
-    
-    product_type_hint = "PRODUCT (e.g., Car, Gadget)" if is_product else "PROGRAM (e.g., Course, Bootcamp)"
-    
+
     prompt = f"""
 Analyze content of this URL for an expert specialist. Extract concrete facts only.
 If the content is missing or unreachable, return the fallback values provided in the tool schema.
@@ -1448,7 +1710,8 @@ URL: {url}
 PAGE_TEXT:
 {clean_text}
 """
-    parsed = _call_function_json(
+    parsed = await asyncio.to_thread(
+        _call_function_json,
         client=client,
         model_name=negotiation_model_name,
         prompt=prompt,
@@ -1500,11 +1763,22 @@ PAGE_TEXT:
             ],
         },
         fallback=fallback,
+        lane=LANE_SETUP,
     )
-    return _to_plain_json(parsed), source
-
-
-def _generate_persona(program: ProgramSummary, forced_archetype_id: Optional[str] = None) -> StudentPersona:
+    summary = _to_plain_json(parsed)
+    if content_key is None or summary == fallback:
+        return freeze_summary(summary), source
+    if RESPONSE_CACHE is not None:
+        await asyncio.to_thread(RESPONSE_CACHE.put, "program_summary", content_key, summary)
+    return PROGRAM_SUMMARIES.intern(content_key, summary), source
+
+
+def _generate_persona(
+    program: ProgramSummary,
+    forced_archetype_id: Optional[str] = None,
+    lane: str = LANE_SETUP,
+    use_cache: bool = True,
+) -> StudentPersona:
     client, negotiation_model_name, _ = get_client_and_models()
     if forced_archetype_id and forced_archetype_id in ARCHETYPE_CONFIGS:
         archetype_id = forced_archetype_id
@@ -1629,6 +1903,8 @@ PROGRAM/PRODUCT:
             ],
         },
         fallback=fallback,
+        lane=lane,
+        use_cache=use_cache,
     )
     parsed = _to_plain_json(parsed)
     parsed["name"] = str(parsed.get("name") or fallback["name"]).strip() or fallback["name"]
@@ -1671,6 +1947,41 @@ PROGRAM/PRODUCT:
     return parsed
 
 
+def _pooled_persona(program: ProgramSummary, archetype_id: str) -> StudentPersona:
+    # Bypass the response cache: the persona prompt barely varies, so cached calls would fill a slot with copies.
+    return _to_plain_json(
+        _generate_persona(program, forced_archetype_id=archetype_id, lane=LANE_BACKGROUND, use_cache=False)
+    )
+
+
+# Pre-generated personas per (program, archetype), refilled on the background lane as sessions consume them.
+PERSONA_POOL = PersonaPool(
+    _pooled_persona,
+    depth=PERSONA_POOL_DEPTH,
+    max_programs=PERSONA_POOL_MAX_PROGRAMS,
+    max_concurrent_refills=PERSONA_POOL_CONCURRENCY,
+)
+
+
+async def _acquire_persona(
+    program: ProgramSummary,
+    archetype_id: Optional[str] = None,
+    lane: str = LANE_SETUP,
+    use_cache: bool = True,
+) -> StudentPersona:
+    """Take a warm persona from the pool, generating one inline only when the pool has none ready."""
+    if archetype_id not in ARCHETYPE_CONFIGS:
+        archetype_id = random.choice(list(ARCHETYPE_CONFIGS.keys()))
+    persona = PERSONA_POOL.take(program, archetype_id)
+    if persona is not None and persona.get("archetype_id") == archetype_id and _is_valid_student_persona_schema(persona):
+        return persona
+    return _to_plain_json(
+        await asyncio.to_thread(
+            _generate_persona, program, forced_archetype_id=archetype_id, lane=lane, use_cache=use_cache
+        )
+    )
+
+
 def _is_valid_student_persona_schema(persona: Dict[str, Any]) -> bool:
     required = {
         "gender",
@@ -1693,10 +2004,8 @@ def _is_valid_student_persona_schema(persona: Dict[str, Any]) -> bool:
     return required.issubset(set(persona.keys()))
 
 
-def _build_counsellor_prompt(state: NegotiationState) -> str:
-    transcript = "\n".join(
-        f"{m['agent'].upper()}: {m['content']}" for m in _trim_messages(state["messages"], 12)
-    )
+def _counsellor_prompt_sections(state: NegotiationState) -> Dict[str, str]:
+    """Static counsellor prompt sections; the transcript goes between "program" and "instructions"."""
     retry_context = state.get("retry_context", {})
     retry_note = ""
     if retry_context.get("is_retry"):
@@ -1777,7 +2086,8 @@ TECHNICAL SPECIFICATIONS & DETAILS:
         # Default Admissions context
         data_block = f"{product_label} DATA:\n{json.dumps(state['program'])}"
 
-    return f"""
+    return {
+        "role": f"""
 ROLE: {role_title}.
 CRITICAL IDENTITY RULE: You are selling the {product_label} named "{state['program'].get('program_name')}". 
 DO NOT mention or sell any other items, routers, courses, or programs.
@@ -1788,10 +2098,12 @@ Guide the {customer_term} toward a confident {objective_term} decision using onl
 DO NOT:
 {do_not_rules}
 
-{data_block}
+""",
+        "program": f"""{data_block}
 
 PRIOR TRANSCRIPT:
-{transcript}
+""",
+        "instructions": f"""
 {retry_note}
 {counsellor_language_rules}
 
@@ -1826,15 +2138,19 @@ Quality constraints:
 - For very specific user question, keep it to 1-2 focused sentences + optional 1 follow-up question.
 - Always end with a complete sentence.
 - Do not end mid-phrase (for example ending with words like "to", "and", "if this is", "aapki", etc.).
-"""
+""",
+    }
 
 
-def _build_student_prompt(state: NegotiationState) -> str:
-    transcript = "\n".join(
-        f"{m['agent'].upper()}: {m['content']}" for m in _trim_messages(state["messages"], 6)
-    )
+def _build_counsellor_prompt(state: NegotiationState) -> str:
+    sections = _counsellor_prompt_sections(state)
+    transcript = _render_transcript(state["messages"], COUNSELLOR_PROMPT_TRANSCRIPT_MESSAGES)
+    return sections["role"] + sections["program"] + transcript + sections["instructions"]
+
+
+def _student_prompt_sections(state: NegotiationState) -> Dict[str, str]:
+    """Static student prompt sections; the live state block follows "persona" and the transcript follows "program"."""
     persona = state["persona"]
-    inner_state = state.get("student_inner_state", {})
     config = ARCHETYPE_CONFIGS.get(persona.get("archetype_id", "desperate_switcher"), ARCHETYPE_CONFIGS["desperate_switcher"])
     mode = str(state.get("mode", "ai_vs_ai")).strip().lower()
     archetype_id = str(persona.get("archetype_id", "")).strip().lower()
@@ -1866,7 +2182,8 @@ def _build_student_prompt(state: NegotiationState) -> str:
         
     product_label = "PRODUCT" if archetype_id in ["car_buyer", "discount_hunter"] else "PROGRAM"
 
-    return f"""
+    return {
+        "persona": f"""
 ROLE: You are {persona.get('name')}, a {persona.get('age')} year old {persona.get('current_role')}.
 ARCHETYPE: {persona.get('archetype_label')}
 CITY CONTEXT: {persona.get('city_tier')}
@@ -1883,17 +2200,13 @@ LANGUAGE STYLE: {language_style}
 LANGUAGE INSTRUCTION: {language_instruction}
 COMMON VOCABULARY: {vocabulary}
 
-CURRENT STATE:
-- sentiment: {inner_state.get('sentiment', 'curious')}
-- resistance_level: {inner_state.get('skepticism_level', 50)}/100
-- trust_level: {inner_state.get('trust_score', 50)}/100
-- unresolved_concerns: {", ".join(inner_state.get('unresolved_concerns', [])) or "none"}
-
-{product_label}:
+""",
+        "program": f"""{product_label}:
 {json.dumps(program_snapshot)}
 
 TRANSCRIPT SO FAR:
-{transcript}
+""",
+        "instructions": f"""
 
 --- INSTRUCTIONS ---
 1. ANALYZE RESPONSE:
@@ -1920,15 +2233,125 @@ TRANSCRIPT SO FAR:
 <emotional_state>calm/frustrated/confused/excited/skeptical</emotional_state>
 <intent>why responding this way</intent>
 Do not output anything outside these tags.
+""",
+    }
+
+
+def _student_state_section(inner_state: Dict[str, Any]) -> str:
+    return f"""CURRENT STATE:
+- sentiment: {inner_state.get('sentiment', 'curious')}
+- resistance_level: {inner_state.get('skepticism_level', 50)}/100
+- trust_level: {inner_state.get('trust_score', 50)}/100
+- unresolved_concerns: {", ".join(inner_state.get('unresolved_concerns', [])) or "none"}
+
 """
 
 
+def _build_student_prompt(state: NegotiationState) -> str:
+    sections = _student_prompt_sections(state)
+    return (
+        sections["persona"]
+        + _student_state_section(state.get("student_inner_state", {}))
+        + sections["program"]
+        + _render_transcript(state["messages"], STUDENT_PROMPT_TRANSCRIPT_MESSAGES)
+        + sections["instructions"]
+    )
+
+
+class SessionPromptAssembler:
+    """
+    Session-scoped builder for the counsellor and student prompts.
+
+    Static sections are rendered once per (program, persona, mode, retry context) and
+    reused every round; transcript lines are rendered once as messages are appended.
+    Output is byte-identical to `_build_counsellor_prompt` / `_build_student_prompt`.
+    `section_bytes[agent]` holds the UTF-8 size of each section of the last prompt built.
+    """
+
+    def __init__(self) -> None:
+        self._static: Dict[str, Tuple[Tuple[Any, ...], Dict[str, str], Dict[str, int]]] = {}
+        self._messages: Optional[List[Dict[str, Any]]] = None
+        self._lines: List[str] = []
+        self.section_bytes: Dict[str, Dict[str, int]] = {}
+        self.stats: Dict[str, int] = {"static_renders": 0, "static_reuses": 0, "lines_rendered": 0}
+
+    @TRACER.traced("build_counsellor_prompt")
+    def counsellor_prompt(self, state: NegotiationState) -> str:
+        sections, sizes = self._static_sections("counsellor", state, _counsellor_prompt_sections)
+        transcript = self._transcript(state["messages"], COUNSELLOR_PROMPT_TRANSCRIPT_MESSAGES)
+        return self._assemble(
+            "counsellor",
+            sections,
+            sizes,
+            [("role", None), ("program", None), ("transcript", transcript), ("instructions", None)],
+        )
+
+    @TRACER.traced("build_student_prompt")
+    def student_prompt(self, state: NegotiationState) -> str:
+        sections, sizes = self._static_sections("student", state, _student_prompt_sections)
+        live_state = _student_state_section(state.get("student_inner_state", {}))
+        transcript = self._transcript(state["messages"], STUDENT_PROMPT_TRANSCRIPT_MESSAGES)
+        return self._assemble(
+            "student",
+            sections,
+            sizes,
+            [("persona", None), ("state", live_state), ("program", None), ("transcript", transcript), ("instructions", None)],
+        )
+
+    def _static_sections(
+        self, agent: str, state: NegotiationState, render: Callable[[NegotiationState], Dict[str, str]]
+    ) -> Tuple[Dict[str, str], Dict[str, int]]:
+        # Program, persona and retry context are fixed for a session, so identity is enough to key them.
+        key = (id(state["program"]), id(state["persona"]), str(state.get("mode", "")), id(state.get("retry_context")))
+        cached = self._static.get(agent)
+        if cached is not None and cached[0] == key:
+            self.stats["static_reuses"] += 1
+            return cached[1], cached[2]
+        sections = render(state)
+        sizes = {name: len(text.encode("utf-8")) for name, text in sections.items()}
+        self._static[agent] = (key, sections, sizes)
+        self.stats["static_renders"] += 1
+        return sections, sizes
+
+    def _transcript(self, messages: List[Dict[str, Any]], max_messages: int) -> str:
+        # Messages are append-only within a session; a different list (or a shorter one) starts over.
+        if messages is not self._messages or len(messages) < len(self._lines):
+            self._messages = messages
+            self._lines = []
+        for message in messages[len(self._lines) :]:
+            self._lines.append(_transcript_line(message))
+            self.stats["lines_rendered"] += 1
+        return "\n".join(self._lines[-max_messages:])
+
+    def _assemble(
+        self,
+        agent: str,
+        sections: Dict[str, str],
+        sizes: Dict[str, int],
+        layout: List[Tuple[str, Optional[str]]],
+    ) -> str:
+        parts: List[str] = []
+        section_bytes: Dict[str, int] = {}
+        for name, dynamic in layout:
+            if dynamic is None:
+                parts.append(sections[name])
+                section_bytes[name] = sizes[name]
+            else:
+                parts.append(dynamic)
+                section_bytes[name] = len(dynamic.encode("utf-8"))
+        section_bytes["total"] = sum(section_bytes.values())
+        self.section_bytes[agent] = section_bytes
+        return "".join(parts)
+
+
+@TRACER.traced(attrs=("agent",))
 def _retry_with_structured_json(
     client: genai.Client,
     model_name: str,
     agent: str,
     retry_context_prompt: str,
     student_persona: Optional[Dict[str, Any]] = None,
+    lane: str = LANE_INTERACTIVE,
 ) -> Dict[str, Any]:
     if agent == "student":
         persona_name = str((student_persona or {}).get("name", "the learner")).strip()
@@ -1975,6 +2398,7 @@ ROLE LOCK (MANDATORY):
                 "required": ["message"],
             },
             fallback=fallback,
+            lane=lane,
         )
         payload = _to_plain_json(parsed)
         message = str(payload.get("message", "")).strip()
@@ -2016,10 +2440,13 @@ INVALID MESSAGE:
                         "required": ["message"],
                     },
                     fallback=fallback,
+                    lane=lane,
                 )
             )
             repaired_message = str(payload.get("message", "")).strip()
-            if _looks_like_student_role_drift(repaired_message):
+            drifted_again = _looks_like_student_role_drift(repaired_message)
+            ROLE_DRIFT_REWRITES.labels("fallback" if drifted_again else "repaired").inc()
+            if drifted_again:
                 logger.warning("Student retry rewrite still drifted; applying safe learner fallback message.")
                 payload["message"] = fallback["message"]
                 payload["internal_thought"] = fallback["internal_thought"]
@@ -2062,135 +2489,531 @@ Use only this context and do not invent details outside it.
             "required": ["message"],
         },
         fallback=fallback,
+        lane=lane,
     )
     return _to_plain_json(parsed)
 
 
-async def _stream_agent_response(
-    websocket: WebSocket,
+def _stream_latency_summary(
+    started_at: float,
+    first_chunk_at: Optional[float],
+    chunk_gaps_ms: List[float],
+) -> Dict[str, Any]:
+    # The first gap is the time-to-first-token itself; inter-chunk gaps start after it.
+    inter_chunk_gaps = chunk_gaps_ms[1:]
+    return {
+        "ttft_ms": round((first_chunk_at - started_at) * 1000, 1) if first_chunk_at is not None else None,
+        "stream_ms": round((time.perf_counter() - started_at) * 1000, 1),
+        "chunk_gap_ms_avg": round(sum(inter_chunk_gaps) / len(inter_chunk_gaps), 1) if inter_chunk_gaps else None,
+        "chunk_gap_ms_max": max(inter_chunk_gaps) if inter_chunk_gaps else None,
+    }
+
+
+async def _close_response_stream(response_stream: Any) -> None:
+    # Closing the async generator cancels the underlying HTTP stream instead of leaving it to drain.
+    aclose = getattr(response_stream, "aclose", None)
+    if aclose is None:
+        return
+    try:
+        await aclose()
+    except Exception:
+        logger.debug("Ignoring error while closing Gemini response stream", exc_info=True)
+
+
+async def _next_stream_chunk(stream_iterator: Any, agent: str) -> Optional[Any]:
+    try:
+        return await asyncio.wait_for(
+            stream_iterator.__anext__(),
+            timeout=NEGOTIATION_STREAM_IDLE_TIMEOUT_SECONDS,
+        )
+    except StopAsyncIteration:
+        return None
+    except asyncio.TimeoutError as timeout_exc:
+        raise TimeoutError(f"{agent} stream idle timeout after {NEGOTIATION_STREAM_IDLE_TIMEOUT_SECONDS}s") from timeout_exc
+
+
+async def _open_stream_until_first_chunk(
     client: genai.Client,
     model_name: str,
     prompt: str,
+    config: types.GenerateContentConfig,
     agent: str,
-    round_number: int,
-    message_id: str,
-    demo_mode: bool,
-    retry_context_prompt: str,
-    mode: str,
-    student_inner_state: Optional[Dict[str, int]] = None,
-    student_persona: Optional[Dict[str, Any]] = None,
-) -> Dict[str, Any]:
-    full_text = ""
-    stream_chunk_count = 0
-    stream_nonempty_chunk_count = 0
-    stream_finish_reasons: List[str] = []
-    _write_debug_trace(
-        "turn_start",
-        {
-            "agent": agent,
-            "mode": mode,
-            "round": round_number,
-            "message_id": message_id,
-            "model": model_name,
-            "prompt_len": len(prompt or ""),
-            "prompt_sha256": _sha256_hex(prompt or ""),
-            "prompt_head": _truncate_trace_text(prompt, 180),
-        },
-    )
+) -> Tuple[Any, Any, Optional[Any], float]:
+    """Open a Gemini stream and wait for its first chunk; returns (stream, iterator, first_chunk, first_chunk_at)."""
+    started_at = time.perf_counter()
     try:
-        config_kwargs: Dict[str, Any] = {
-            "temperature": 0.85,
-            "top_p": 0.95,
-        }
-        config = types.GenerateContentConfig(
-            **config_kwargs,
-        )
-        stream_queue: queue.Queue = queue.Queue()
-
-        def _stream_worker() -> None:
-            try:
-                response_stream = client.models.generate_content_stream(
+        try:
+            response_stream = await asyncio.wait_for(
+                client.aio.models.generate_content_stream(
                     model=model_name,
                     contents=prompt,
                     config=config,
-                )
-                for next_chunk in response_stream:
-                    stream_queue.put(("chunk", next_chunk))
-                stream_queue.put(("done", None))
-            except Exception as worker_exc:
-                stream_queue.put(("error", worker_exc))
+                ),
+                timeout=NEGOTIATION_STREAM_IDLE_TIMEOUT_SECONDS,
+            )
+        except asyncio.TimeoutError as timeout_exc:
+            raise TimeoutError(f"{agent} stream open timeout after {NEGOTIATION_STREAM_IDLE_TIMEOUT_SECONDS}s") from timeout_exc
+        stream_iterator = response_stream.__aiter__()
+        try:
+            first_chunk = await _next_stream_chunk(stream_iterator, agent)
+        except BaseException:
+            await _close_response_stream(response_stream)
+            raise
+    except Exception:
+        # Failed and timed-out starts count at their elapsed time; sampling only successful starts would
+        # bias the hedge percentile towards the fast ones. Cancelled hedge losers are not sampled.
+        STREAM_TTFT_SAMPLES_MS.append((time.perf_counter() - started_at) * 1000)
+        raise
+    return response_stream, stream_iterator, first_chunk, time.perf_counter()
 
-        threading.Thread(target=_stream_worker, daemon=True).start()
 
-        while True:
-            try:
-                event_type, payload = await asyncio.wait_for(
-                    asyncio.to_thread(stream_queue.get),
-                    timeout=NEGOTIATION_STREAM_IDLE_TIMEOUT_SECONDS,
-                )
-            except asyncio.TimeoutError as timeout_exc:
-                raise TimeoutError(
-                    f"{agent} stream idle timeout after {NEGOTIATION_STREAM_IDLE_TIMEOUT_SECONDS}s"
-                ) from timeout_exc
+def _stream_hedge_delay_seconds() -> Optional[float]:
+    if not NEGOTIATION_STREAM_HEDGE_ENABLED or len(STREAM_TTFT_SAMPLES_MS) < NEGOTIATION_STREAM_HEDGE_MIN_SAMPLES:
+        return None
+    ordered = sorted(STREAM_TTFT_SAMPLES_MS)
+    index = min(len(ordered) - 1, int(round((NEGOTIATION_STREAM_HEDGE_PERCENTILE / 100.0) * (len(ordered) - 1))))
+    return max(ordered[index], float(NEGOTIATION_STREAM_HEDGE_MIN_DELAY_MS)) / 1000.0
 
-            if event_type == "done":
-                break
-            if event_type == "error":
-                raise payload
-
-            chunk = payload
-            stream_chunk_count += 1
-            chunk_reasons = _collect_chunk_finish_reasons(chunk)
-            if chunk_reasons:
-                stream_finish_reasons.extend(chunk_reasons)
-            text = _extract_chunk_text(chunk)
-            if not text:
-                if NEGOTIATION_STREAM_CONSOLE_LOG:
-                    logger.info(
-                        "[LLM_STREAM] agent=%s round=%s message_id=%s chunk=%s chars=0 finish_reasons=%s",
-                        agent,
-                        round_number,
-                        message_id,
-                        stream_chunk_count,
-                        chunk_reasons,
-                    )
-                continue
-            stream_nonempty_chunk_count += 1
-            full_text += text
-            if NEGOTIATION_STREAM_CONSOLE_LOG:
-                logger.info(
-                    "[LLM_STREAM] agent=%s round=%s message_id=%s chunk=%s chars=%s finish_reasons=%s text=%r",
-                    agent,
-                    round_number,
-                    message_id,
-                    stream_chunk_count,
-                    len(text),
-                    chunk_reasons,
-                    text,
-                )
-            await _ws_send_json(
-                websocket,
-                {"type": "stream_chunk", "data": {"agent": agent, "text": text, "message_id": message_id}},
-            )
-            if demo_mode:
-                await asyncio.sleep(0.03)
-    except Exception as exc:
-        if isinstance(exc, TimeoutError):
-            logger.warning("Streaming idle timeout for %s; switching to structured retry.", agent)
-            _write_debug_trace(
-                "stream_timeout",
-                {
-                    "agent": agent,
-                    "mode": mode,
-                    "round": round_number,
-                    "message_id": message_id,
-                    "error": _truncate_trace_text(exc),
+
+async def _discard_stream_attempt(task: "asyncio.Task[Any]") -> None:
+    if not task.done():
+        task.cancel()
+    try:
+        response_stream, _, _, _ = await task
+    except BaseException:
+        return
+    await _close_response_stream(response_stream)
+
+
+async def _start_agent_stream(
+    client: genai.Client,
+    model_name: str,
+    prompt: str,
+    config: types.GenerateContentConfig,
+    agent: str,
+    lane: str,
+    trace_context: Dict[str, Any],
+) -> Tuple[Any, Any, Optional[Any], float, Optional[Any]]:
+    """
+    Start the stream for a turn, hedging with a duplicate request when the first chunk is slower
+    than the configured percentile of recent TTFTs. The first attempt to produce a chunk wins and the
+    other is cancelled. Returns the winning attempt plus the hedge's scheduler ticket, if one was taken.
+    """
+    STREAM_HEDGE_STATS["streams"] += 1
+    started_at = time.perf_counter()
+    primary = asyncio.create_task(_open_stream_until_first_chunk(client, model_name, prompt, config, agent))
+    hedge_delay = _stream_hedge_delay_seconds()
+    if hedge_delay is None:
+        result = await primary
+        STREAM_TTFT_SAMPLES_MS.append((result[3] - started_at) * 1000)
+        return (*result, None)
+
+    done, _ = await asyncio.wait({primary}, timeout=hedge_delay)
+    if done:
+        result = primary.result()
+        STREAM_TTFT_SAMPLES_MS.append((result[3] - started_at) * 1000)
+        return (*result, None)
+
+    # Hedges never queue: under load they would only add to the backlog they are trying to beat.
+    hedge_ticket = LLM_SCHEDULER.try_acquire(model_name, lane)
+    if hedge_ticket is None:
+        STREAM_HEDGE_STATS["hedge_skipped_no_capacity"] += 1
+        result = await primary
+        STREAM_TTFT_SAMPLES_MS.append((result[3] - started_at) * 1000)
+        return (*result, None)
+
+    STREAM_HEDGE_STATS["hedged"] += 1
+    hedge_started_at = time.perf_counter()
+    hedge = asyncio.create_task(_open_stream_until_first_chunk(client, model_name, prompt, config, agent))
+    attempts = {primary: "primary", hedge: "hedge"}
+    pending = set(attempts)
+    winner: Optional["asyncio.Task[Any]"] = None
+    try:
+        while pending and winner is None:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if winner is None and task.exception() is None:
+                    winner = task
+    except BaseException:
+        for task in attempts:
+            await _discard_stream_attempt(task)
+        LLM_SCHEDULER.release(hedge_ticket)
+        raise
+
+    for task in attempts:
+        if task is not winner:
+            await _discard_stream_attempt(task)
+    if winner is None:
+        LLM_SCHEDULER.release(hedge_ticket)
+        # Both attempts failed; surface the primary's error so the usual timeout/retry path runs.
+        raise primary.exception()  # type: ignore[misc]
+
+    winner_name = attempts[winner]
+    if winner_name == "hedge":
+        STREAM_HEDGE_STATS["hedge_wins"] += 1
+    else:
+        LLM_SCHEDULER.release(hedge_ticket)
+        hedge_ticket = None
+    result = winner.result()
+    attempt_started_at = hedge_started_at if winner_name == "hedge" else started_at
+    STREAM_TTFT_SAMPLES_MS.append((result[3] - attempt_started_at) * 1000)
+    _write_debug_trace(
+        "stream_hedge",
+        {
+            **trace_context,
+            "hedge_delay_ms": round(hedge_delay * 1000, 1),
+            "winner": winner_name,
+            "winner_ttft_ms": round((result[3] - attempt_started_at) * 1000, 1),
+            "turn_ttft_ms": round((result[3] - started_at) * 1000, 1),
+            "hedge_rate": round(STREAM_HEDGE_STATS["hedged"] / STREAM_HEDGE_STATS["streams"], 4),
+            "hedge_win_rate": round(STREAM_HEDGE_STATS["hedge_wins"] / STREAM_HEDGE_STATS["hedged"], 4),
+        },
+    )
+    return (*result, hedge_ticket)
+
+
+class _StudentTurnStream:
+    """Forwards only the spoken <message> text of a student turn and surfaces thought/stats as soon as they close."""
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        round_number: int,
+        message_id: str,
+        student_inner_state: Optional[Dict[str, int]],
+    ) -> None:
+        self.websocket = websocket
+        self.round_number = round_number
+        self.message_id = message_id
+        self.student_inner_state = student_inner_state
+        self.parser = TagStreamParser()
+        self.sent_thought: Optional[Tuple[str, Dict[str, Any]]] = None
+
+    async def feed(self, text: str) -> None:
+        await self._handle(self.parser.feed(text))
+
+    async def finish(self) -> None:
+        await self._handle(self.parser.finish())
+
+    def restart(self) -> None:
+        self.parser = TagStreamParser()
+
+    def fields(self, full_text: str) -> Dict[str, Any]:
+        if "message" in self.parser.blocks:
+            return _fields_from_tag_blocks(self.parser.blocks)
+        # Legacy labeled or untagged output still needs the full regex extraction.
+        return _extract_response_fields(full_text)
+
+    def thought_payload(self, thought: str, updated_stats: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if not thought or self.sent_thought == (thought, updated_stats):
+            return None
+        self.sent_thought = (thought, updated_stats)
+        return {
+            "type": "student_thought",
+            "data": {
+                "round": self.round_number,
+                "message_id": self.message_id,
+                "thought": thought,
+                "updated_stats": updated_stats,
+            },
+        }
+
+    async def _handle(self, events: List[TagEvent]) -> None:
+        for kind, value in events:
+            if kind == "message":
+                await _ws_send_json(
+                    self.websocket,
+                    {"type": "stream_chunk", "data": {"agent": "student", "text": value, "message_id": self.message_id}},
+                )
+            elif value in {"thought", "stats"}:
+                blocks = self.parser.blocks
+                merged_state = _merge_student_inner_state(
+                    dict(self.student_inner_state or {}),
+                    _extract_first_json_object(blocks.get("stats", "")),
+                )
+                payload = self.thought_payload(blocks.get("thought", ""), merged_state)
+                if payload is not None:
+                    await _ws_send_json(self.websocket, payload)
+
+
+def _parse_turn_text(agent: str, full_text: str) -> Dict[str, Any]:
+    """Parse a complete (non-streamed) turn. Module-level so the Lab runner can ship it to worker processes."""
+    fields = _extract_response_fields(full_text)
+    if agent == "counsellor":
+        fields["message"] = _extract_counsellor_message(full_text)
+    return fields
+
+
+def _finish_turn(
+    agent: str,
+    mode: str,
+    round_number: int,
+    message_id: str,
+    full_text: str,
+    fields: Dict[str, Any],
+    student_inner_state: Optional[Dict[str, int]],
+    generation_mode: str,
+) -> Dict[str, Any]:
+    _write_debug_trace(
+        "parse_result",
+        {
+            "agent": agent,
+            "mode": mode,
+            "round": round_number,
+            "message_id": message_id,
+            "message_chars": len(fields.get("message", "")),
+            "intent_chars": len(fields.get("intent", "")),
+            "thought_chars": len(fields.get("internal_thought", "")),
+            "has_updated_stats": bool(fields.get("updated_stats")),
+            "emotional_state": fields.get("emotional_state"),
+        },
+    )
+    if _looks_truncated_message(fields.get("message", "")):
+        _write_debug_trace(
+            "message_truncated_heuristic",
+            {
+                "agent": agent,
+                "mode": mode,
+                "round": round_number,
+                "message_id": message_id,
+                "message_chars": len(fields.get("message", "")),
+                "message_tail": _truncate_trace_text(fields.get("message", "")[-80:], 120),
+            },
+        )
+    if not fields.get("message", "").strip():
+        fields["message"] = "..."
+        _write_debug_trace(
+            "parse_message_fallback",
+            {
+                "agent": agent,
+                "mode": mode,
+                "round": round_number,
+                "message_id": message_id,
+                "raw_head": _truncate_trace_text(full_text, 260),
+            },
+        )
+    merged_state = dict(student_inner_state or {})
+    if agent == "student":
+        merged_state = _merge_student_inner_state(merged_state or {}, fields.get("updated_stats", {}))
+    if generation_mode == "structured_retry":
+        STRUCTURED_RETRIES.labels(agent).inc()
+    elif generation_mode == "fallback":
+        TURN_FALLBACKS.labels(agent).inc()
+
+    return {
+        "id": message_id,
+        "round": round_number,
+        "agent": agent,
+        "content": fields["message"],
+        "techniques": fields["techniques"],
+        "strategic_intent": fields["intent"],
+        "confidence_score": fields["confidence_score"],
+        "emotional_state": fields["emotional_state"],
+        "internal_thought": fields.get("internal_thought", ""),
+        "updated_stats": merged_state,
+        "updated_state": merged_state,
+        "timestamp": datetime.now().isoformat(),
+        "generation_mode": generation_mode,
+    }
+
+
+@TRACER.traced(attrs=("agent",))
+async def _structured_retry_text(
+    client: genai.Client,
+    model_name: str,
+    agent: str,
+    retry_context_prompt: str,
+    student_persona: Optional[Dict[str, Any]],
+    lane: str,
+    trace_context: Dict[str, Any],
+) -> str:
+    """Recover an empty turn with one structured function call, rendered back into the tag format the parsers expect."""
+    _write_debug_trace("nonstream_retry_start", trace_context)
+    retry_payload = await asyncio.to_thread(
+        _retry_with_structured_json,
+        client=client,
+        model_name=model_name,
+        agent=agent,
+        retry_context_prompt=retry_context_prompt,
+        student_persona=student_persona,
+        lane=lane,
+    )
+    retry_message = str(retry_payload.get("message", "")).strip()
+    if not retry_message:
+        retry_message = (
+            "I am still evaluating this. Please share your top concern so I can respond precisely."
+            if agent == "student"
+            else "Could you share your top concern so I can address it directly?"
+        )
+    retry_thought = str(retry_payload.get("internal_thought", "")).strip() or "No internal thought captured"
+    retry_intent = str(retry_payload.get("intent", "")).strip() or "No Intent detected"
+    retry_emotion = str(retry_payload.get("emotional_state", "")).strip() or "calm"
+    retry_stats = retry_payload.get("updated_stats", {})
+    if not isinstance(retry_stats, dict):
+        retry_stats = {}
+
+    if agent == "student":
+        full_text = (
+            f"<thought>{retry_thought}</thought>\n"
+            f"<stats>{json.dumps(retry_stats, ensure_ascii=False)}</stats>\n"
+            f"<message>{retry_message}</message>\n"
+            f"<emotional_state>{retry_emotion}</emotional_state>\n"
+            f"<intent>{retry_intent}</intent>"
+        )
+    else:
+        full_text = retry_message
+
+    _write_debug_trace(
+        "nonstream_retry_complete",
+        {
+            **trace_context,
+            "retry_chars": len(full_text),
+            "finish_reasons": ["structured_json_retry"],
+            "retry_head": _truncate_trace_text(full_text, 220),
+        },
+    )
+    return full_text
+
+
+# Sampling shared by streamed (live) and non-streamed (Lab) agent turns, so the two paths can't drift apart.
+AGENT_TURN_SAMPLING: Dict[str, Any] = {"temperature": 0.85, "top_p": 0.95}
+
+
+def _agent_turn_config() -> types.GenerateContentConfig:
+    return types.GenerateContentConfig(**AGENT_TURN_SAMPLING)
+
+
+@TRACER.traced(attrs=("agent", "round_number", "message_id", "lane"))
+async def _stream_agent_response(
+    websocket: WebSocket,
+    client: genai.Client,
+    model_name: str,
+    prompt: str,
+    agent: str,
+    round_number: int,
+    message_id: str,
+    demo_mode: bool,
+    retry_context_prompt: str,
+    mode: str,
+    student_inner_state: Optional[Dict[str, int]] = None,
+    student_persona: Optional[Dict[str, Any]] = None,
+    lane: str = LANE_INTERACTIVE,
+    prompt_sections: Optional[Dict[str, int]] = None,
+) -> Dict[str, Any]:
+    full_text = ""
+    stream_chunk_count = 0
+    stream_nonempty_chunk_count = 0
+    stream_finish_reasons: List[str] = []
+    stream_started_at = time.perf_counter()
+    last_chunk_at = stream_started_at
+    first_chunk_at: Optional[float] = None
+    chunk_gaps_ms: List[float] = []
+    student_stream = (
+        _StudentTurnStream(websocket, round_number, message_id, student_inner_state) if agent == "student" else None
+    )
+    _write_debug_trace(
+        "turn_start",
+        {
+            "agent": agent,
+            "mode": mode,
+            "round": round_number,
+            "message_id": message_id,
+            "model": model_name,
+            "prompt_len": len(prompt or ""),
+            "prompt_sha256": _sha256_hex(prompt or ""),
+            "prompt_head": _truncate_trace_text(prompt, 180),
+            "prompt_section_bytes": prompt_sections or {},
+        },
+    )
+    try:
+        config = _agent_turn_config()
+        async with LLM_SCHEDULER.slot(model_name, lane):
+            # Queue time for a scheduler slot is excluded from the stream latency figures.
+            stream_started_at = time.perf_counter()
+            last_chunk_at = stream_started_at
+            response_stream, stream_iterator, chunk, chunk_at, hedge_ticket = await _start_agent_stream(
+                client,
+                model_name,
+                prompt,
+                config,
+                agent,
+                lane,
+                {"agent": agent, "mode": mode, "round": round_number, "message_id": message_id, "model": model_name},
+            )
+            try:
+                while chunk is not None:
+                    if first_chunk_at is None:
+                        first_chunk_at = chunk_at
+                    chunk_gap_ms = round((chunk_at - last_chunk_at) * 1000, 1)
+                    chunk_gaps_ms.append(chunk_gap_ms)
+                    last_chunk_at = chunk_at
+                    stream_chunk_count += 1
+                    chunk_reasons = _collect_chunk_finish_reasons(chunk)
+                    if chunk_reasons:
+                        stream_finish_reasons.extend(chunk_reasons)
+                    text = _extract_chunk_text(chunk)
+                    if not text:
+                        if NEGOTIATION_STREAM_CONSOLE_LOG:
+                            logger.info(
+                                "[LLM_STREAM] agent=%s round=%s message_id=%s chunk=%s chars=0 gap_ms=%s finish_reasons=%s",
+                                agent,
+                                round_number,
+                                message_id,
+                                stream_chunk_count,
+                                chunk_gap_ms,
+                                chunk_reasons,
+                            )
+                    else:
+                        stream_nonempty_chunk_count += 1
+                        full_text += text
+                        if NEGOTIATION_STREAM_CONSOLE_LOG:
+                            logger.info(
+                                "[LLM_STREAM] agent=%s round=%s message_id=%s chunk=%s chars=%s gap_ms=%s finish_reasons=%s text=%r",
+                                agent,
+                                round_number,
+                                message_id,
+                                stream_chunk_count,
+                                len(text),
+                                chunk_gap_ms,
+                                chunk_reasons,
+                                text,
+                            )
+                        if student_stream is not None:
+                            await student_stream.feed(text)
+                        else:
+                            await _ws_send_json(
+                                websocket,
+                                {"type": "stream_chunk", "data": {"agent": agent, "text": text, "message_id": message_id}},
+                            )
+                        if demo_mode:
+                            await asyncio.sleep(0.03)
+                    chunk = await _next_stream_chunk(stream_iterator, agent)
+                    chunk_at = time.perf_counter()
+                if student_stream is not None:
+                    await student_stream.finish()
+            finally:
+                await _close_response_stream(response_stream)
+                LLM_SCHEDULER.release(hedge_ticket)
+    except Exception as exc:
+        if isinstance(exc, TimeoutError):
+            logger.warning("Streaming idle timeout for %s; switching to structured retry.", agent)
+            _write_debug_trace(
+                "stream_timeout",
+                {
+                    "agent": agent,
+                    "mode": mode,
+                    "round": round_number,
+                    "message_id": message_id,
+                    "error": _truncate_trace_text(exc),
                     "chunk_count": stream_chunk_count,
                     "nonempty_chunk_count": stream_nonempty_chunk_count,
                     "buffer_chars": len(full_text),
+                    **_stream_latency_summary(stream_started_at, first_chunk_at, chunk_gaps_ms),
                 },
             )
             full_text = ""
+            if student_stream is not None:
+                student_stream.restart()
         else:
             marker = f"{type(exc).__name__}: {exc}"
             disconnected = (
@@ -2222,6 +3045,11 @@ async def _stream_agent_response(
                 logger.info("Skipped error send because websocket already closed")
             raise
 
+    stream_latency = _stream_latency_summary(stream_started_at, first_chunk_at, chunk_gaps_ms)
+    if first_chunk_at is not None:
+        STREAM_TTFT_SECONDS.labels(agent).observe(first_chunk_at - stream_started_at)
+    STREAM_DURATION_SECONDS.labels(agent).observe(stream_latency["stream_ms"] / 1000)
+    STREAM_CHUNKS.labels(agent).observe(stream_chunk_count)
     _write_debug_trace(
         "stream_complete",
         {
@@ -2234,17 +3062,20 @@ async def _stream_agent_response(
             "buffer_chars": len(full_text),
             "buffer_head": _truncate_trace_text(full_text, 220),
             "finish_reasons": stream_finish_reasons,
+            **stream_latency,
         },
     )
     if NEGOTIATION_STREAM_CONSOLE_LOG:
         logger.info(
-            "[LLM_STREAM_END] agent=%s round=%s message_id=%s chunks=%s nonempty=%s chars=%s finish_reasons=%s text=%r",
+            "[LLM_STREAM_END] agent=%s round=%s message_id=%s chunks=%s nonempty=%s chars=%s ttft_ms=%s stream_ms=%s finish_reasons=%s text=%r",
             agent,
             round_number,
             message_id,
             stream_chunk_count,
             stream_nonempty_chunk_count,
             len(full_text),
+            stream_latency["ttft_ms"],
+            stream_latency["stream_ms"],
             stream_finish_reasons,
             full_text,
         )
@@ -2253,60 +3084,19 @@ async def _stream_agent_response(
     if not full_text.strip():
         generation_mode = "structured_retry"
         logger.warning("Empty stream text for %s; retrying once with structured JSON call.", agent)
-        _write_debug_trace(
-            "nonstream_retry_start",
-            {
-                "agent": agent,
-                "mode": mode,
-                "round": round_number,
-                "message_id": message_id,
-            },
-        )
-        retry_payload = _retry_with_structured_json(
-            client=client,
-            model_name=model_name,
-            agent=agent,
-            retry_context_prompt=retry_context_prompt,
-            student_persona=student_persona,
-        )
-        retry_message = str(retry_payload.get("message", "")).strip()
-        if not retry_message:
-            retry_message = (
-                "I am still evaluating this. Please share your top concern so I can respond precisely."
-                if agent == "student"
-                else "Could you share your top concern so I can address it directly?"
-            )
-        retry_thought = str(retry_payload.get("internal_thought", "")).strip() or "No internal thought captured"
-        retry_intent = str(retry_payload.get("intent", "")).strip() or "No Intent detected"
-        retry_emotion = str(retry_payload.get("emotional_state", "")).strip() or "calm"
-        retry_stats = retry_payload.get("updated_stats", {})
-        if not isinstance(retry_stats, dict):
-            retry_stats = {}
-
-        if agent == "student":
-            full_text = (
-                f"<thought>{retry_thought}</thought>\n"
-                f"<stats>{json.dumps(retry_stats, ensure_ascii=False)}</stats>\n"
-                f"<message>{retry_message}</message>\n"
-                f"<emotional_state>{retry_emotion}</emotional_state>\n"
-                f"<intent>{retry_intent}</intent>"
-            )
-        else:
-            full_text = retry_message
-
-        _write_debug_trace(
-            "nonstream_retry_complete",
-            {
-                "agent": agent,
-                "mode": mode,
-                "round": round_number,
-                "message_id": message_id,
-                "retry_chars": len(full_text),
-                "finish_reasons": ["structured_json_retry"],
-                "retry_head": _truncate_trace_text(full_text, 220),
-            },
+        full_text = await _structured_retry_text(
+            client,
+            model_name,
+            agent,
+            retry_context_prompt,
+            student_persona,
+            lane,
+            {"agent": agent, "mode": mode, "round": round_number, "message_id": message_id},
         )
-        if full_text.strip():
+        if student_stream is not None:
+            await student_stream.feed(full_text)
+            await student_stream.finish()
+        elif full_text.strip():
             await _ws_send_json(
                 websocket,
                 {"type": "stream_chunk", "data": {"agent": agent, "text": full_text, "message_id": message_id}},
@@ -2326,87 +3116,109 @@ async def _stream_agent_response(
             )
             full_text = "<message>...</message>"
 
-    fields = _extract_response_fields(full_text)
-    if agent == "counsellor":
-        fields["message"] = _extract_counsellor_message(full_text)
+    if student_stream is not None:
+        fields = student_stream.fields(full_text)
+    else:
+        fields = _parse_turn_text(agent, full_text)
+    msg = _finish_turn(
+        agent, mode, round_number, message_id, full_text, fields, student_inner_state, generation_mode
+    )
+    merged_state = msg["updated_stats"]
+    if student_stream is not None:
+        # Usually already sent while streaming; only re-sent if the final parse differs.
+        thought_payload = student_stream.thought_payload(fields.get("internal_thought", ""), merged_state)
+        if thought_payload is not None:
+            await _ws_send_json(websocket, thought_payload)
+    await _ws_send_json(websocket, {"type": "intent_update", "data": {"agent": agent, "intent": fields["intent"]}})
+    await _ws_send_json(websocket, {"type": "message_complete", "data": msg})
+    return msg
+
+
+async def _generate_agent_turn(
+    client: genai.Client,
+    model_name: str,
+    prompt: str,
+    agent: str,
+    round_number: int,
+    message_id: str,
+    retry_context_prompt: str,
+    mode: str,
+    student_inner_state: Optional[Dict[str, int]] = None,
+    student_persona: Optional[Dict[str, Any]] = None,
+    lane: str = LANE_BACKGROUND,
+    parse_turn: Optional[Callable[[str, str], Awaitable[Dict[str, Any]]]] = None,
+) -> Dict[str, Any]:
+    """
+    Non-streaming counterpart of _stream_agent_response for runs with no UI attached (the Lab runner):
+    one generate_content call per turn, the same structured-retry recovery and the same turn message shape.
+    `parse_turn` lets the caller move parsing off the event loop, e.g. into a process pool.
+    """
+    trace_context = {"agent": agent, "mode": mode, "round": round_number, "message_id": message_id}
     _write_debug_trace(
-        "parse_result",
+        "turn_start",
         {
-            "agent": agent,
-            "mode": mode,
-            "round": round_number,
-            "message_id": message_id,
-            "message_chars": len(fields.get("message", "")),
-            "intent_chars": len(fields.get("intent", "")),
-            "thought_chars": len(fields.get("internal_thought", "")),
-            "has_updated_stats": bool(fields.get("updated_stats")),
-            "emotional_state": fields.get("emotional_state"),
+            **trace_context,
+            "model": model_name,
+            "prompt_len": len(prompt or ""),
+            "prompt_sha256": _sha256_hex(prompt or ""),
+            "generation": "non_stream",
         },
     )
-    if _looks_truncated_message(fields.get("message", "")):
-        _write_debug_trace(
-            "message_truncated_heuristic",
-            {
-                "agent": agent,
-                "mode": mode,
-                "round": round_number,
-                "message_id": message_id,
-                "message_chars": len(fields.get("message", "")),
-                "message_tail": _truncate_trace_text(fields.get("message", "")[-80:], 120),
-            },
-        )
-    if not fields.get("message", "").strip():
-        fields["message"] = "..."
+    full_text = ""
+    started_at = time.perf_counter()
+    try:
+        async with LLM_SCHEDULER.slot(model_name, lane):
+            response = await client.aio.models.generate_content(
+                model=model_name,
+                contents=prompt,
+                config=_agent_turn_config(),
+            )
+        full_text = _extract_chunk_text(response)
+    except Exception as exc:
+        logger.warning("Non-streaming generation failed for %s: %s", agent, exc)
         _write_debug_trace(
-            "parse_message_fallback",
-            {
-                "agent": agent,
-                "mode": mode,
-                "round": round_number,
-                "message_id": message_id,
-                "raw_head": _truncate_trace_text(full_text, 260),
-            },
+            "nonstream_exception",
+            {**trace_context, "error_type": type(exc).__name__, "error": _truncate_trace_text(exc)},
         )
-    merged_state = dict(student_inner_state or {})
-    if agent == "student":
-        merged_state = _merge_student_inner_state(merged_state or {}, fields.get("updated_stats", {}))
+    _write_debug_trace(
+        "nonstream_complete",
+        {
+            **trace_context,
+            "buffer_chars": len(full_text),
+            "generate_ms": round((time.perf_counter() - started_at) * 1000, 1),
+        },
+    )
 
-    msg = {
-        "id": message_id,
-        "round": round_number,
-        "agent": agent,
-        "content": fields["message"],
-        "techniques": fields["techniques"],
-        "strategic_intent": fields["intent"],
-        "confidence_score": fields["confidence_score"],
-        "emotional_state": fields["emotional_state"],
-        "internal_thought": fields.get("internal_thought", ""),
-        "updated_stats": merged_state,
-        "updated_state": merged_state,
-        "timestamp": datetime.now().isoformat(),
-        "generation_mode": generation_mode,
-    }
-    if agent == "student" and fields.get("internal_thought"):
-        await _ws_send_json(
-            websocket,
-            {
-                "type": "student_thought",
-                "data": {
-                    "round": round_number,
-                    "message_id": message_id,
-                    "thought": fields["internal_thought"],
-                    "updated_stats": merged_state,
-                },
-            },
+    generation_mode = "non_stream"
+    if not full_text.strip():
+        generation_mode = "structured_retry"
+        full_text = await _structured_retry_text(
+            client, model_name, agent, retry_context_prompt, student_persona, lane, trace_context
         )
-    await _ws_send_json(websocket, {"type": "intent_update", "data": {"agent": agent, "intent": fields["intent"]}})
-    await _ws_send_json(websocket, {"type": "message_complete", "data": msg})
-    return msg
+        if not full_text.strip():
+            generation_mode = "fallback"
+            full_text = "<message>...</message>"
+
+    fields = await parse_turn(agent, full_text) if parse_turn is not None else _parse_turn_text(agent, full_text)
+    return _finish_turn(
+        agent, mode, round_number, message_id, full_text, fields, student_inner_state, generation_mode
+    )
 
 
 async def _ws_send_json(websocket: WebSocket, payload: Dict[str, Any]) -> None:
+    outbox: Optional[WebSocketOutbox] = getattr(getattr(websocket, "state", None), "ws_outbox", None)
+    if outbox is not None:
+        await outbox.send(payload)
+        return
+    await _ws_send_json_direct(websocket, payload)
+
+
+@TRACER.traced("ws_send", track="websocket")
+async def _ws_send_json_direct(websocket: WebSocket, payload: Dict[str, Any]) -> None:
+    started_at = time.perf_counter()
     try:
         await websocket.send_json(payload)
+        WS_SEND_SECONDS.observe(time.perf_counter() - started_at)
     except Exception as exc:
         marker = f"{type(exc).__name__}: {exc}"
         disconnected = (
@@ -2419,6 +3231,7 @@ async def _ws_send_json(websocket: WebSocket, payload: Dict[str, Any]) -> None:
         raise
 
 
+@TRACER.traced()
 def _update_metrics(state: NegotiationState, counsellor_msg: Dict[str, Any], student_msg: Dict[str, Any]) -> None:
     metrics = state["negotiation_metrics"]
     prev_offer = state["counsellor_position"]["current_offer"]
@@ -2427,17 +3240,13 @@ def _update_metrics(state: NegotiationState, counsellor_msg: Dict[str, Any], stu
     # --- Specialist (Counsellor) Concession Logic ---
     coun_offer = prev_offer
     counsellor_text = counsellor_msg["content"].lower()
-    coun_candidates = _extract_all_offer_candidates(counsellor_text)
+    counsellor_scan = scan_amounts(counsellor_text)
+    coun_candidates = counsellor_scan.offer_values()
     
     # Also detect "discount of X" and apply as relative reduction
-    discount_match = re.search(r"discount\s*(?:of|up\s*to)?\s*(?:\u20b9|inr|rs\.?)?\s*([0-9][0-9,]{3,10})", counsellor_text)
-    if discount_match:
-        try:
-            d_val = int(discount_match.group(1).replace(",", ""))
-            if d_val < (prev_offer * 0.6):
-                coun_candidates.append(prev_offer - d_val)
-        except ValueError:
-            pass
+    d_val = counsellor_scan.discount_value()
+    if d_val is not None and d_val < (prev_offer * 0.6):
+        coun_candidates.append(prev_offer - d_val)
 
     if coun_candidates:
         floor = state["counsellor_position"]["floor_offer"]
@@ -2451,7 +3260,8 @@ def _update_metrics(state: NegotiationState, counsellor_msg: Dict[str, Any], stu
     # --- Customer (Student) Concession Logic ---
     stu_offer = prev_student_offer
     student_text = student_msg["content"].lower()
-    stu_candidates = _extract_all_offer_candidates(student_text)
+    student_scan = scan_amounts(student_text)
+    stu_candidates = student_scan.offer_values()
     
     if stu_candidates:
         budget = state["student_position"]["budget"]
@@ -2460,8 +3270,7 @@ def _update_metrics(state: NegotiationState, counsellor_msg: Dict[str, Any], stu
             candidate_bid = max(valid_stu)
             # If they mention the EXACT current offer of the specialist, 
             # check if it's an agreement or just a reference.
-            is_referencing = any(ref in student_text for ref in ["the price of", "listed price", "original price", "price for the", "reduction of"])
-            if candidate_bid == prev_offer and is_referencing:
+            if candidate_bid == prev_offer and student_scan.has_reference_phrase:
                 pass
             else:
                 stu_offer = candidate_bid
@@ -2544,53 +3353,103 @@ def _decide_outcome_from_judge(state: NegotiationState, analysis: Dict[str, Any]
     return "failed"
 
 
-async def _judge_outcome(state: NegotiationState) -> Dict[str, Any]:
-    client, _, judge_model_name = get_client_and_models()
-    transcript = "\n\n".join(
-        f"Round {m['round']} {m['agent'].upper()}: {m['content']}" for m in state["messages"]
-    )
-    
+JUDGE_PARAMETERS_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "winner": {"type": "string"},
+        "why": {"type": "string"},
+        "commitment_signal": {
+            "type": "string",
+            "enum": ["none", "soft_commitment", "conditional_commitment", "strong_commitment"],
+        },
+        "enrollment_likelihood": {"type": "number"},
+        "primary_unresolved_objection": {"type": "string"},
+        "trust_delta": {"type": "number"},
+        "strengths": {"type": "array", "items": {"type": "string"}},
+        "mistakes": {"type": "array", "items": {"type": "string"}},
+        "pivotal_moments": {"type": "array", "items": {"type": "string"}},
+        "skill_recommendations": {"type": "array", "items": {"type": "string"}},
+    },
+    "required": [
+        "winner",
+        "why",
+        "commitment_signal",
+        "enrollment_likelihood",
+        "primary_unresolved_objection",
+        "trust_delta",
+        "strengths",
+        "mistakes",
+        "pivotal_moments",
+        "skill_recommendations",
+    ],
+}
+JUDGE_FALLBACK: Dict[str, Any] = {
+    "winner": "no-deal",
+    "why": "Unable to parse analysis output.",
+    "commitment_signal": "none",
+    "enrollment_likelihood": 0,
+    "primary_unresolved_objection": "Unknown",
+    "trust_delta": 0,
+    "strengths": [],
+    "mistakes": [],
+    "pivotal_moments": [],
+    "skill_recommendations": [],
+}
+
+
+def _judge_transcript(messages: List[Dict[str, Any]]) -> str:
+    return "\n\n".join(f"Round {m['round']} {m['agent'].upper()}: {m['content']}" for m in messages)
+
+
+def _judge_context(state: NegotiationState) -> Dict[str, str]:
     archetype_id = str(state.get("persona", {}).get("archetype_id", "")).strip().lower()
     if archetype_id in ["car_buyer", "discount_hunter"]:
-        evaluator_role = "expert automotive sales auditor and retail experience evaluator"
-        interaction_type = "automotive sales consultation transcript"
-        metrics_focus = "Purchase likelihood (intent to book or test-drive)"
-        winner_counsellor = "specialist (customer ready to proceed or booked)"
-        winner_student = "customer (remained unconvinced or walked away)"
-        specific_rules = """
+        return {
+            "evaluator_role": "expert automotive sales auditor and retail experience evaluator",
+            "interaction_type": "automotive sales consultation transcript",
+            "metrics_focus": "Purchase likelihood (intent to book or test-drive)",
+            "winner_counsellor": "specialist (customer ready to proceed or booked)",
+            "winner_student": "customer (remained unconvinced or walked away)",
+            "specific_rules": """
         - Evaluate objection handling regarding pricing, financing, features, and test-drives.
         - Check if the specialist focused on value-selling and consultative advice.
         - Look for signals of 'Dealer Trust' vs 'Sales Pressure Anxiety'.
-        """
-    else:
-        evaluator_role = "expert academic admissions auditor and enrollment counselor"
-        interaction_type = "enrollment counselling transcript"
-        metrics_focus = "Enrollment likelihood (intent to apply or pay fee)"
-        winner_counsellor = "counsellor (student likely to enroll)"
-        winner_student = "student (remained unconvinced)"
-        specific_rules = """
+        """,
+        }
+    return {
+        "evaluator_role": "expert academic admissions auditor and enrollment counselor",
+        "interaction_type": "enrollment counselling transcript",
+        "metrics_focus": "Enrollment likelihood (intent to apply or pay fee)",
+        "winner_counsellor": "counsellor (student likely to enroll)",
+        "winner_student": "student (remained unconvinced)",
+        "specific_rules": """
         - Evaluate objection handling regarding curriculum, career outcomes, and eligibility.
         - Check if the counsellor focused on career ROI and skill gaps.
         - Look for signals of 'Learning Confidence' vs 'Academic/Career Anxiety'.
-        """
+        """,
+    }
 
-    prompt = f"""
-You are an {evaluator_role}.
 
-Analyze the full {interaction_type}.
+def _build_judge_prompt(state: NegotiationState) -> str:
+    ctx = _judge_context(state)
+    transcript = _judge_transcript(state["messages"])
+    return f"""
+You are an {ctx['evaluator_role']}.
+
+Analyze the full {ctx['interaction_type']}.
 
 Determine:
 1. Commitment signal level (none, soft, conditional, strong)
-2. {metrics_focus} (0-100)
+2. {ctx['metrics_focus']} (0-100)
 3. Primary unresolved objection
 4. Trust delta (-20 to +20)
 5. Who won:
-   - {winner_counsellor}
-   - {winner_student}
+   - {ctx['winner_counsellor']}
+   - {ctx['winner_student']}
    - no-deal
 
 EVALUATION RULES:
-{specific_rules}
+{ctx['specific_rules']}
 - Do NOT evaluate based on price convergence alone.
 - Focus on emotional trajectory and objection handling.
 - Be realistic and critical; high scores (85+) must be earned through exceptional handling.
@@ -2607,56 +3466,59 @@ DEAL_STATUS:
 TRANSCRIPT:
 {transcript}
 """
-    parsed = _call_function_json(
-        client=client,
-        model_name=judge_model_name,
-        prompt=prompt,
-        function_name="set_negotiation_judgement",
-        function_description="Return structured judgement for a negotiation run.",
-        parameters_schema={
-            "type": "object",
-            "properties": {
-                "winner": {"type": "string"},
-                "why": {"type": "string"},
-                "commitment_signal": {
-                    "type": "string",
-                    "enum": ["none", "soft_commitment", "conditional_commitment", "strong_commitment"],
-                },
-                "enrollment_likelihood": {"type": "number"},
-                "primary_unresolved_objection": {"type": "string"},
-                "trust_delta": {"type": "number"},
-                "strengths": {"type": "array", "items": {"type": "string"}},
-                "mistakes": {"type": "array", "items": {"type": "string"}},
-                "pivotal_moments": {"type": "array", "items": {"type": "string"}},
-                "skill_recommendations": {"type": "array", "items": {"type": "string"}},
-            },
-            "required": [
-                "winner",
-                "why",
-                "commitment_signal",
-                "enrollment_likelihood",
-                "primary_unresolved_objection",
-                "trust_delta",
-                "strengths",
-                "mistakes",
-                "pivotal_moments",
-                "skill_recommendations",
-            ],
-        },
-        fallback={
-            "winner": "no-deal",
-            "why": "Unable to parse analysis output.",
-            "commitment_signal": "none",
-            "enrollment_likelihood": 0,
-            "primary_unresolved_objection": "Unknown",
-            "trust_delta": 0,
-            "strengths": [],
-            "mistakes": [],
-            "pivotal_moments": [],
-            "skill_recommendations": [],
-        },
-    )
 
+
+def _build_incremental_judge_prompt(
+    state: NegotiationState,
+    running_assessment: Dict[str, Any],
+    delta_messages: List[Dict[str, Any]],
+    metrics: Dict[str, Any],
+    final: bool,
+) -> str:
+    ctx = _judge_context(state)
+    if final:
+        task = "The negotiation has ended. Merge the new rounds into the running assessment and return the final structured verdict."
+    else:
+        task = "The negotiation is still in progress. Merge the new rounds into the running assessment and return the updated verdict so far."
+    return f"""
+You are an {ctx['evaluator_role']} keeping a rolling assessment of an {ctx['interaction_type']}.
+
+{task}
+
+Determine:
+1. Commitment signal level (none, soft, conditional, strong)
+2. {ctx['metrics_focus']} (0-100)
+3. Primary unresolved objection
+4. Trust delta (-20 to +20), measured from the start of the conversation
+5. Who won:
+   - {ctx['winner_counsellor']}
+   - {ctx['winner_student']}
+   - no-deal
+
+EVALUATION RULES:
+{ctx['specific_rules']}
+- Do NOT evaluate based on price convergence alone.
+- Focus on emotional trajectory and objection handling.
+- Be realistic and critical; high scores (85+) must be earned through exceptional handling.
+- Keep strengths, mistakes and pivotal moments from earlier rounds unless the new rounds overturn them; cite round numbers in pivotal moments.
+
+Return structured function output only.
+
+RUNNING_ASSESSMENT (covers every round before the new rounds):
+{json.dumps(running_assessment, ensure_ascii=False)}
+
+METRICS_SNAPSHOT:
+{json.dumps(metrics)}
+
+DEAL_STATUS:
+{state['deal_status']}
+
+NEW_ROUNDS:
+{_judge_transcript(delta_messages)}
+"""
+
+
+def _score_judgement(state: NegotiationState, parsed: Dict[str, Any]) -> Dict[str, Any]:
     # Calculate Negotiation Score via math formula instead of LLM
     # Win Probability (40%) + Trust Index (30%) + (100 - Concession Score) (30%)
     # Note: Higher score for GIVING LESS discount while still getting a "Win".
@@ -2678,7 +3540,283 @@ TRANSCRIPT:
     bonus = 10 if ("specialist" in winner or "counsellor" in winner) else 0
     parsed["negotiation_score"] = min(100, base_score + bonus)
     return parsed
-    return parsed
+
+
+class IncrementalJudge:
+    """
+    Keeps a running judge verdict for a live session so the end-of-session judgement only merges the
+    final round. Updates run in the background, one at a time and in round order, each on a snapshot
+    of the transcript so later rounds never race ahead of the assessment they extend.
+    """
+
+    def __init__(self, client: genai.Client, model_name: str, mode: str) -> None:
+        self.client = client
+        self.model_name = model_name
+        self.mode = mode
+        self.assessment: Optional[Dict[str, Any]] = None
+        self.covered_messages = 0
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    def schedule_update(self, state: NegotiationState) -> None:
+        messages = list(state["messages"])
+        metrics = dict(state["negotiation_metrics"])
+        previous = self._task
+        self._task = asyncio.create_task(self._update_after(previous, state, messages, metrics))
+
+    @TRACER.traced("incremental_judge_finalize")
+    async def finalize(self, state: NegotiationState) -> Optional[Dict[str, Any]]:
+        """Merge whatever the running assessment has not seen yet; None means fall back to a full judge call."""
+        await self._drain()
+        if self.assessment is None:
+            return None
+        delta = state["messages"][self.covered_messages:]
+        if not delta:
+            return dict(self.assessment)
+        prompt = _build_incremental_judge_prompt(
+            state, self.assessment, delta, state["negotiation_metrics"], final=True
+        )
+        merged = await self._merge(prompt, "set_negotiation_judgement")
+        _write_debug_trace(
+            "incremental_judge_finalize",
+            {
+                "mode": self.mode,
+                "covered_messages": self.covered_messages,
+                "delta_messages": len(delta),
+                "prompt_len": len(prompt),
+                "merged": merged is not None,
+            },
+        )
+        return merged
+
+    def cancel(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+
+    async def _drain(self) -> None:
+        if self._task is None:
+            return
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Incremental judge update failed")
+
+    async def _update_after(
+        self,
+        previous: Optional["asyncio.Task[None]"],
+        state: NegotiationState,
+        messages: List[Dict[str, Any]],
+        metrics: Dict[str, Any],
+    ) -> None:
+        if previous is not None:
+            try:
+                await previous
+            except Exception:
+                logger.exception("Incremental judge update failed")
+        # Span opened only now, so chained updates sit side by side on the judge track instead of overlapping.
+        await self._update(state, messages, metrics)
+
+    @TRACER.traced("incremental_judge_update", track="judge")
+    async def _update(self, state: NegotiationState, messages: List[Dict[str, Any]], metrics: Dict[str, Any]) -> None:
+        delta = messages[self.covered_messages:]
+        if not delta:
+            return
+        if self.assessment is None:
+            prompt = _build_judge_prompt({**state, "messages": messages, "negotiation_metrics": metrics})
+        else:
+            prompt = _build_incremental_judge_prompt(state, self.assessment, delta, metrics, final=False)
+        merged = await self._merge(prompt, "set_running_judgement")
+        if merged is None:
+            # Leave the rounds uncovered; the next update or the final merge picks them up.
+            return
+        self.assessment = merged
+        self.covered_messages = len(messages)
+        _write_debug_trace(
+            "incremental_judge_update",
+            {
+                "mode": self.mode,
+                "round": metrics.get("round"),
+                "covered_messages": self.covered_messages,
+                "delta_messages": len(delta),
+                "prompt_len": len(prompt),
+                "enrollment_likelihood": merged.get("enrollment_likelihood"),
+            },
+        )
+
+    async def _merge(self, prompt: str, function_name: str) -> Optional[Dict[str, Any]]:
+        parsed = await asyncio.to_thread(
+            _call_function_json,
+            client=self.client,
+            model_name=self.model_name,
+            prompt=prompt,
+            function_name=function_name,
+            function_description="Return structured judgement for a negotiation run.",
+            parameters_schema=JUDGE_PARAMETERS_SCHEMA,
+            fallback={},
+            lane=LANE_JUDGE,
+        )
+        parsed = _to_plain_json(parsed)
+        return parsed if parsed else None
+
+
+@TRACER.traced()
+async def _judge_outcome(
+    state: NegotiationState,
+    incremental_judge: Optional[IncrementalJudge] = None,
+    lane: str = LANE_JUDGE,
+) -> Dict[str, Any]:
+    client, _, judge_model_name = get_client_and_models()
+    started_at = time.perf_counter()
+    judge_seconds = JUDGE_SECONDS.labels(state.get("mode", "ai_vs_ai"), str(incremental_judge is not None).lower())
+    try:
+        if incremental_judge is not None:
+            merged = await incremental_judge.finalize(state)
+            if merged is not None:
+                return _score_judgement(state, {**JUDGE_FALLBACK, **merged})
+
+        parsed = await asyncio.to_thread(
+            _call_function_json,
+            client=client,
+            model_name=judge_model_name,
+            prompt=_build_judge_prompt(state),
+            function_name="set_negotiation_judgement",
+            function_description="Return structured judgement for a negotiation run.",
+            parameters_schema=JUDGE_PARAMETERS_SCHEMA,
+            fallback=dict(JUDGE_FALLBACK),
+            lane=lane,
+        )
+        return _score_judgement(state, parsed)
+    finally:
+        judge_seconds.observe(time.perf_counter() - started_at)
+
+
+def _record_student_turn(
+    state: NegotiationState,
+    counsellor_msg: Dict[str, Any],
+    student_msg: Dict[str, Any],
+) -> Dict[str, Any]:
+    """Fold a finished round into state; returns the student message as spoken (thoughts and stats stripped)."""
+    state["student_inner_state"] = _merge_student_inner_state(
+        state["student_inner_state"],
+        student_msg.get("updated_stats", {}),
+    )
+    spoken_student_msg = dict(student_msg)
+    spoken_student_msg["internal_thought"] = ""
+    spoken_student_msg["updated_stats"] = {}
+    spoken_student_msg["updated_state"] = {}
+    state["messages"].append(spoken_student_msg)
+    state["history_for_reporting"].append(student_msg)
+    _update_metrics(state, counsellor_msg, spoken_student_msg)
+    state["negotiation_metrics"]["round"] = state["round"]
+    state["negotiation_metrics"]["max_rounds"] = state["max_rounds"]
+    return spoken_student_msg
+
+
+def _convergence_monitor(enabled: Optional[bool] = None) -> Optional[ConvergenceMonitor]:
+    if not (NEGOTIATION_EARLY_STOP if enabled is None else enabled):
+        return None
+    return ConvergenceMonitor(window=NEGOTIATION_EARLY_STOP_WINDOW, tolerance=NEGOTIATION_EARLY_STOP_TOLERANCE)
+
+
+def _check_early_stop(
+    state: NegotiationState,
+    monitor: Optional[ConvergenceMonitor],
+    student_msg: Dict[str, Any],
+) -> Optional[str]:
+    """Ask the monitor whether the round just recorded settles the negotiation; records and traces the reason."""
+    if monitor is None:
+        return None
+    reason = monitor.observe(state, student_msg)
+    if reason is None:
+        return None
+    # Kept outside negotiation_metrics so the judge sees the same inputs as a full-length run.
+    state["early_stop"] = {"reason": reason, "round": state["round"], "max_rounds": state["max_rounds"]}
+    _write_debug_trace(
+        "negotiation_early_stop",
+        {
+            "mode": state.get("mode", "ai_vs_ai"),
+            "reason": reason,
+            "round": state["round"],
+            "max_rounds": state["max_rounds"],
+            "counsellor_offer": state["counsellor_position"]["current_offer"],
+            "student_offer": state["student_position"]["current_offer"],
+            "close_probability": state["negotiation_metrics"].get("close_probability"),
+            "trust_index": state["negotiation_metrics"].get("trust_index"),
+        },
+    )
+    return reason
+
+
+def _sync_metrics_with_judge(state: NegotiationState, analysis: Dict[str, Any]) -> None:
+    # Sync live state with judge analysis to ensure UI consistency
+    if "enrollment_likelihood" in analysis:
+        state["negotiation_metrics"]["close_probability"] = int(analysis["enrollment_likelihood"])
+
+    baseline_trust = 50 + state["negotiation_metrics"]["retry_modifier"]
+    if "trust_delta" in analysis:
+        new_trust_index = baseline_trust + int(analysis["trust_delta"])
+        state["negotiation_metrics"]["trust_index"] = max(0, min(100, new_trust_index))
+
+
+def _initial_negotiation_state(
+    program: ProgramSummary,
+    persona: StudentPersona,
+    mode: str,
+    previous_analysis: Optional[Dict[str, Any]] = None,
+    max_rounds: int = DEFAULT_NEGOTIATION_MAX_ROUNDS,
+) -> NegotiationState:
+    previous_analysis = previous_analysis or {}
+    financials = _derive_financials(program, persona)
+    retry_modifier = min(15, int(float(previous_analysis.get("negotiation_score", 0)) / 10)) if previous_analysis else 0
+    retry_context = {
+        "is_retry": bool(previous_analysis),
+        "mistakes": previous_analysis.get("mistakes", []),
+        "primary_unresolved_objection": previous_analysis.get("primary_unresolved_objection", ""),
+        "retry_modifier": retry_modifier,
+    }
+
+    state: NegotiationState = {
+        "round": 1,
+        "max_rounds": max_rounds,
+        "messages": [],
+        "history_for_reporting": [],
+        "counsellor_position": {
+            "target_offer": financials["counsellor_offer"],
+            "current_offer": financials["counsellor_offer"],
+            "floor_offer": financials["floor_offer"],
+            "program_fee_inr": str(program.get("program_fee_inr", f"INR {financials['listed_fee']:,}")),
+        },
+        "student_position": {
+            "budget": financials["student_budget"],
+            "current_offer": financials["student_opening"],
+        },
+        "student_inner_state": {
+            "sentiment": "anxious" if int(persona.get("financial_anxiety", 50)) > 65 else "curious",
+            "skepticism_level": _clamp_score(persona.get("skepticism", 50)),
+            "trust_score": _clamp_score(55 - (int(persona.get("skepticism", 50)) // 3), 45),
+            "unresolved_concerns": ["Price", "Job Guarantee"],
+        },
+        "program": program,
+        "persona": persona,
+        "mode": mode,
+        "deal_status": "ongoing",
+        "negotiation_metrics": {
+            "round": 1,
+            "max_rounds": max_rounds,
+            "concession_count_counsellor": 0,
+            "concession_count_student": 0,
+            "tone_escalation": max(0, 15 - retry_modifier),
+            "objection_intensity": 45,
+            "trust_index": min(100, 50 + retry_modifier),
+            "close_probability": 45,
+            "concession_score": 0,
+            "sentiment_indicator": "neutral",
+            "retry_modifier": retry_modifier,
+        },
+        "retry_context": retry_context,
+    }
+    return state
 
 
 @app.post("/auth/login", response_model=LoginResponse)
@@ -2695,18 +3833,34 @@ async def analyze_url(payload: AnalyzeUrlRequest) -> AnalyzeUrlResponse:
     _require_auth_token(payload.auth_token)
     url = str(payload.url)
     archetype_id = payload.archetype_id
-    program, source = _analyze_program(url, archetype_id=archetype_id)
-    program = _to_plain_json(program)
+    program, source = await _analyze_program(url, archetype_id=archetype_id)
     forced_archetype_id = _resolve_selected_archetype(archetype_id)
-    persona = _generate_persona(program, forced_archetype_id=forced_archetype_id)
-    persona = _to_plain_json(persona)
+    persona = await _acquire_persona(program, forced_archetype_id)
+    if PERSONA_POOL_PRIME_SIBLINGS:
+        # Warm the other archetypes of the same kind so switching persona in /negotiate doesn't wait on Gemini.
+        # Costs one background persona call per sibling archetype, so it is opt-in.
+        product_archetypes = ["car_buyer", "discount_hunter"]
+        is_product = str(archetype_id).strip().lower() in product_archetypes
+        PERSONA_POOL.prime(
+            program,
+            [
+                aid
+                for aid in ARCHETYPE_CONFIGS
+                if (aid in product_archetypes) == is_product and aid != persona.get("archetype_id")
+            ],
+        )
     session_id = str(uuid.uuid4())
-    SESSION_STORE[session_id] = {
-        "url": url,
-        "program": program,
-        "persona": persona,
-        "created_at": datetime.now().isoformat(),
-    }
+    # put() serializes the session and may gzip-spill others to disk to stay within limits.
+    await asyncio.to_thread(
+        SESSION_STORE.put,
+        session_id,
+        {
+            "url": url,
+            "program": program,
+            "persona": persona,
+            "created_at": datetime.now().isoformat(),
+        },
+    )
     logger.info("Created session %s for %s", session_id, url)
     return AnalyzeUrlResponse(session_id=session_id, program=program, persona=persona, source=source)
 
@@ -2714,11 +3868,24 @@ async def analyze_url(payload: AnalyzeUrlRequest) -> AnalyzeUrlResponse:
 @app.websocket("/negotiate")
 async def negotiate_websocket(websocket: WebSocket) -> None:
     await websocket.accept()
+    incremental_judge: Optional[IncrementalJudge] = None
+    outbox: Optional[WebSocketOutbox] = None
+    active_sessions: Any = None
+    session_trace = None
+    round_span: Any = None
+    if NEGOTIATION_WS_COALESCE_MS > 0:
+        outbox = WebSocketOutbox(
+            lambda payload: _ws_send_json_direct(websocket, payload),
+            window_seconds=NEGOTIATION_WS_COALESCE_MS / 1000.0,
+            max_chunk_chars=NEGOTIATION_WS_COALESCE_MAX_CHARS,
+        )
+        websocket.state.ws_outbox = outbox
     try:
         raw_config = await websocket.receive_json()
         config = NegotiationConfig(**raw_config)
         _require_auth_token(config.auth_token)
-        session = SESSION_STORE.get(config.session_id)
+        # A spilled last run is read back from disk, so keep the lookup off the event loop.
+        session = await asyncio.to_thread(SESSION_STORE.get, config.session_id)
         if not session:
             await _ws_send_json(websocket, {"type": "error", "data": {"message": "Invalid session_id"}})
             return
@@ -2727,18 +3894,21 @@ async def negotiate_websocket(websocket: WebSocket) -> None:
         persona = session["persona"]
         if not _is_valid_student_persona_schema(persona):
             logger.warning("Session %s had legacy persona schema. Regenerating StudentPersona.", config.session_id)
-            persona = _to_plain_json(_generate_persona(program))
+            persona = await _acquire_persona(program)
             session["persona"] = persona
         mode = str(config.mode or "ai_vs_ai").strip().lower()
         if mode not in {"ai_vs_ai", "human_vs_ai", "agent_powered_human_vs_ai"}:
             mode = "ai_vs_ai"
+        active_sessions = ACTIVE_SESSIONS.labels(mode)
+        active_sessions.inc()
+        session_trace = TRACER.start_trace("negotiation", session_id=config.session_id, mode=mode)
         forced_archetype_id = str(config.archetype_id or "").strip().lower()
         if forced_archetype_id == "random":
             forced_archetype_id = ""
         if forced_archetype_id in ARCHETYPE_CONFIGS:
             current_archetype = str(persona.get("archetype_id", "")).strip()
             if current_archetype != forced_archetype_id:
-                persona = _to_plain_json(_generate_persona(program, forced_archetype_id=forced_archetype_id))
+                persona = await _acquire_persona(program, forced_archetype_id)
                 session["persona"] = persona
         if mode in {"human_vs_ai", "agent_powered_human_vs_ai"}:
             if str(persona.get("archetype_id", "")).strip().lower() == "skeptical_shopper":
@@ -2746,57 +3916,9 @@ async def negotiate_websocket(websocket: WebSocket) -> None:
             else:
                 persona["language_style"] = "UK English"
 
-        financials = _derive_financials(program, persona)
         last_run = session.get("last_run", {})
         previous_analysis = last_run.get("analysis", {}) if config.retry_mode else {}
-        retry_modifier = min(15, int(float(previous_analysis.get("negotiation_score", 0)) / 10)) if previous_analysis else 0
-        retry_context = {
-            "is_retry": bool(previous_analysis),
-            "mistakes": previous_analysis.get("mistakes", []),
-            "primary_unresolved_objection": previous_analysis.get("primary_unresolved_objection", ""),
-            "retry_modifier": retry_modifier,
-        }
-
-        state: NegotiationState = {
-            "round": 1,
-            "max_rounds": DEFAULT_NEGOTIATION_MAX_ROUNDS,
-            "messages": [],
-            "history_for_reporting": [],
-            "counsellor_position": {
-                "target_offer": financials["counsellor_offer"],
-                "current_offer": financials["counsellor_offer"],
-                "floor_offer": financials["floor_offer"],
-                "program_fee_inr": str(program.get("program_fee_inr", f"INR {financials['listed_fee']:,}")),
-            },
-            "student_position": {
-                "budget": financials["student_budget"],
-                "current_offer": financials["student_opening"],
-            },
-            "student_inner_state": {
-                "sentiment": "anxious" if int(persona.get("financial_anxiety", 50)) > 65 else "curious",
-                "skepticism_level": _clamp_score(persona.get("skepticism", 50)),
-                "trust_score": _clamp_score(55 - (int(persona.get("skepticism", 50)) // 3), 45),
-                "unresolved_concerns": ["Price", "Job Guarantee"],
-            },
-            "program": program,
-            "persona": persona,
-            "mode": mode,
-            "deal_status": "ongoing",
-            "negotiation_metrics": {
-                "round": 1,
-                "max_rounds": DEFAULT_NEGOTIATION_MAX_ROUNDS,
-                "concession_count_counsellor": 0,
-                "concession_count_student": 0,
-                "tone_escalation": max(0, 15 - retry_modifier),
-                "objection_intensity": 45,
-                "trust_index": min(100, 50 + retry_modifier),
-                "close_probability": 45,
-                "concession_score": 0,
-                "sentiment_indicator": "neutral",
-                "retry_modifier": retry_modifier,
-            },
-            "retry_context": retry_context,
-        }
+        state = _initial_negotiation_state(program, persona, mode, previous_analysis)
 
         await _ws_send_json(
             websocket,
@@ -2817,9 +3939,14 @@ async def negotiate_websocket(websocket: WebSocket) -> None:
         )
         await _ws_send_json(websocket, {"type": "metrics_update", "data": state["negotiation_metrics"]})
 
-        client, negotiation_model_name, _ = get_client_and_models()
+        client, negotiation_model_name, judge_model_name = get_client_and_models()
         student_generation_failures = 0
         background_tasks: Set[asyncio.Task] = set()
+        if NEGOTIATION_INCREMENTAL_JUDGE:
+            incremental_judge = IncrementalJudge(client, judge_model_name, mode)
+        # Human-driven sessions always run until the human or max_rounds ends them.
+        convergence = _convergence_monitor() if mode == "ai_vs_ai" else None
+        prompt_assembler = SessionPromptAssembler()
 
         while state["round"] <= state["max_rounds"] and state["deal_status"] == "ongoing":
             if mode in {"human_vs_ai", "agent_powered_human_vs_ai"}:
@@ -2838,6 +3965,7 @@ async def negotiate_websocket(websocket: WebSocket) -> None:
                         {"type": "warning", "data": {"message": "Empty human input ignored. Please speak or type a message."}},
                     )
                     continue
+                round_span = TRACER.start_span("round", round=state["round"])
                 counsellor_id = str(uuid.uuid4())
                 counsellor_msg = await _classify_human_input(
                     client=client,
@@ -2853,18 +3981,20 @@ async def negotiate_websocket(websocket: WebSocket) -> None:
                 )
                 await _ws_send_json(websocket, {"type": "message_complete", "data": counsellor_msg})
             else:
+                round_span = TRACER.start_span("round", round=state["round"])
                 counsellor_id = str(uuid.uuid4())
                 counsellor_msg = await _stream_agent_response(
                     websocket,
                     client,
                     negotiation_model_name,
-                    _build_counsellor_prompt(state),
+                    prompt_assembler.counsellor_prompt(state),
                     "counsellor",
                     state["round"],
                     counsellor_id,
                     config.demo_mode,
                     _build_retry_context_prompt(state),
                     mode=mode,
+                    prompt_sections=prompt_assembler.section_bytes.get("counsellor"),
                 )
             state["messages"].append(counsellor_msg)
             state["history_for_reporting"].append(counsellor_msg)
@@ -2874,7 +4004,7 @@ async def negotiate_websocket(websocket: WebSocket) -> None:
                 websocket,
                 client,
                 negotiation_model_name,
-                _build_student_prompt(state),
+                prompt_assembler.student_prompt(state),
                 "student",
                 state["round"],
                 student_id,
@@ -2883,6 +4013,7 @@ async def negotiate_websocket(websocket: WebSocket) -> None:
                 mode=mode,
                 student_inner_state=state["student_inner_state"],
                 student_persona=state["persona"],
+                prompt_sections=prompt_assembler.section_bytes.get("student"),
             )
             if str(student_msg.get("generation_mode", "stream")) == "stream":
                 student_generation_failures = 0
@@ -2910,16 +4041,8 @@ async def negotiate_websocket(websocket: WebSocket) -> None:
                     },
                 )
 
-            state["student_inner_state"] = _merge_student_inner_state(
-                state["student_inner_state"],
-                student_msg.get("updated_stats", {}),
-            )
-            spoken_student_msg = dict(student_msg)
-            spoken_student_msg["internal_thought"] = ""
-            spoken_student_msg["updated_stats"] = {}
-            spoken_student_msg["updated_state"] = {}
-            state["messages"].append(spoken_student_msg)
-            state["history_for_reporting"].append(student_msg)
+            spoken_student_msg = _record_student_turn(state, counsellor_msg, student_msg)
+            early_stop_reason = _check_early_stop(state, convergence, spoken_student_msg)
 
             if mode == "agent_powered_human_vs_ai":
                 current_round = int(state["round"])
@@ -2960,10 +4083,6 @@ async def negotiate_websocket(websocket: WebSocket) -> None:
                 background_tasks.add(task)
                 task.add_done_callback(background_tasks.discard)
 
-            _update_metrics(state, counsellor_msg, spoken_student_msg)
-            state["negotiation_metrics"]["round"] = state["round"]
-            state["negotiation_metrics"]["max_rounds"] = state["max_rounds"]
-
             await _ws_send_json(
                 websocket,
                 {
@@ -2979,20 +4098,23 @@ async def negotiate_websocket(websocket: WebSocket) -> None:
                 },
             )
             await _ws_send_json(websocket, {"type": "metrics_update", "data": state["negotiation_metrics"]})
+            round_span.end(deal_status=state["deal_status"])
 
             state["round"] += 1
+            if early_stop_reason is not None:
+                break
+            if (
+                incremental_judge is not None
+                and state["round"] <= state["max_rounds"]
+                and state["deal_status"] == "ongoing"
+            ):
+                # The last round is left for the final merge in _judge_outcome.
+                incremental_judge.schedule_update(state)
             if config.demo_mode:
                 await asyncio.sleep(0.6)
 
-        analysis = await _judge_outcome(state)
-        # Sync live state with judge analysis to ensure UI consistency
-        if "enrollment_likelihood" in analysis:
-            state["negotiation_metrics"]["close_probability"] = int(analysis["enrollment_likelihood"])
-        
-        baseline_trust = 50 + state["negotiation_metrics"]["retry_modifier"]
-        if "trust_delta" in analysis:
-            new_trust_index = baseline_trust + int(analysis["trust_delta"])
-            state["negotiation_metrics"]["trust_index"] = max(0, min(100, new_trust_index))
+        analysis = await _judge_outcome(state, incremental_judge)
+        _sync_metrics_with_judge(state, analysis)
 
         # Push final synced metrics to frontend (updates bottom ribbon)
         await _ws_send_json(websocket, {"type": "metrics_update", "data": state["negotiation_metrics"]})
@@ -3015,17 +4137,18 @@ async def negotiate_websocket(websocket: WebSocket) -> None:
                 },
             },
         )
-        SESSION_STORE[config.session_id]["last_run"] = {
+        session["last_run"] = {
             "transcript": state["messages"],
             "history_for_reporting": state["history_for_reporting"],
             "analysis": analysis,
             "deal_status": state["deal_status"],
         }
+        await asyncio.to_thread(SESSION_STORE.put, config.session_id, session)
         if background_tasks:
             await asyncio.gather(*background_tasks, return_exceptions=True)
-        _emit_conversation_traceability(config.session_id, state, analysis)
+        trace_payload = _build_traceability_payload(config.session_id, state, analysis)
+        await _emit_conversation_traceability(trace_payload, mode)
         if _is_rag_pipeline_enabled():
-            trace_payload = _build_traceability_payload(config.session_id, state, analysis)
             asyncio.create_task(
                 _run_post_session_jobs_safe(
                     session_id=config.session_id,
@@ -3061,370 +4184,66 @@ async def negotiate_websocket(websocket: WebSocket) -> None:
             await _ws_send_json(websocket, {"type": "error", "data": {"message": str(exc)}})
         except ClientStreamClosed:
             logger.info("Skipped error send because websocket already closed")
+    finally:
+        if active_sessions is not None:
+            active_sessions.dec()
+        if round_span is not None:
+            round_span.end(interrupted=True)
+        if incremental_judge is not None:
+            incremental_judge.cancel()
+        if outbox is not None:
+            await outbox.aclose()
+            _write_debug_trace(
+                "ws_outbox_stats",
+                {"mode": str(locals().get("mode", "ai_vs_ai")), **outbox.stats},
+            )
+        TRACER.end_trace(session_trace, deal_status=str(locals().get("state", {}).get("deal_status", "")))
 
 
 
-def _clean_transcript_content(content: str) -> str:
-    # 1. XML Block Match
-    xml_match = re.search(r"<message>\s*(.*?)\s*</message>", content, re.IGNORECASE | re.DOTALL)
-    if xml_match:
-        return xml_match.group(1).strip()
-    
-    # 2. Inline prefix Match
-    inline_match = re.search(r"MESSAGE:\s*(.*?)(?:(?:\n|\r|\s)(?:INTERNAL_THOUGHT|UPDATED_STATS|UPDATED_STATE|EMOTIONAL_STATE|STRATEGIC_INTENT|TECHNIQUES_USED|CONFIDENCE_SCORE)\s*:|$)", content, re.IGNORECASE | re.DOTALL)
-    if inline_match:
-        return inline_match.group(1).strip()
-
-    # 3. Line-by-line filtering fallback
-    lines = []
-    for line in content.splitlines():
-        line = line.strip()
-        if not line: 
-            continue
-        upper = line.upper()
-        if any(upper.startswith(p) for p in ["INTERNAL_THOUGHT:", "UPDATED_STATS:", "UPDATED_STATE:", "EMOTIONAL_STATE:", "STRATEGIC_INTENT:", "TECHNIQUES_USED:"]):
-            continue
-        if upper.startswith("<THOUGHT>") or upper.startswith("</THOUGHT>"):
-            continue
-        if upper.startswith("<STATS>") or upper.startswith("</STATS>"):
-            continue
-        if upper.startswith("<INTENT>") or upper.startswith("</INTENT>"):
-            continue
-        if upper.startswith("<EMOTIONAL_STATE>") or upper.startswith("</EMOTIONAL_STATE>"):
-            continue
-            
-        # Handle <message> tags on single lines
-        if upper.startswith("<MESSAGE>") or upper.startswith("</MESSAGE>"):
-            clean = re.sub(r"</?message>", "", line, flags=re.IGNORECASE).strip()
-            if clean:
-                lines.append(clean)
-            continue
-            
-        # Handle MESSAGE: prefix on single line
-        if upper.startswith("MESSAGE:"):
-            clean = line[8:].strip()
-            if clean:
-                lines.append(clean)
-            continue
-            
-        lines.append(line)
-        
-    return " ".join(lines).strip()
-
-
 @app.post("/generate-report")
 async def generate_report(payload: ReportRequest) -> StreamingResponse:
     _require_auth_token(payload.auth_token)
-    session = SESSION_STORE.get(payload.session_id, {})
-    program = session.get("program", {})
-    persona = session.get("persona", {})
+    session = await asyncio.to_thread(SESSION_STORE.get, payload.session_id) or {}
     session_last_run = session.get("last_run", {})
-
-    buf = BytesIO()
-    doc = SimpleDocTemplate(
-        buf,
-        pagesize=letter,
-        title="Program Counsellor Report",
-        leftMargin=30,
-        rightMargin=30,
-        topMargin=26,
-        bottomMargin=26,
-    )
-    styles = getSampleStyleSheet()
-    story: List[Any] = []
-    hindi_font_name, _ = _configure_pdf_fonts()
-    archetype_id = str(persona.get("archetype_id", "")).strip().lower()
-    use_hindi_transcript = archetype_id == "skeptical_shopper"
-
-    judge = payload.analysis or {}
-    winner = str(judge.get("winner", "no-deal"))
-    commitment = str(judge.get("commitment_signal", "none"))
-    duration_seconds = 0
-    if isinstance(payload.analysis, dict):
-        try:
-            duration_seconds = int(float(payload.analysis.get("duration_seconds", 0)))
-        except Exception:
-            duration_seconds = 0
-    duration_hms = ""
-    if isinstance(payload.analysis, dict):
-        duration_hms = str(payload.analysis.get("duration_hms", "")).strip()
-
-    if not duration_hms:
-        transcript_with_ts = session_last_run.get("history_for_reporting") or payload.transcript or []
-        timestamps: List[datetime] = []
-        for msg in transcript_with_ts:
-            ts = str((msg or {}).get("timestamp", "")).strip()
-            if not ts:
-                continue
-            try:
-                timestamps.append(datetime.fromisoformat(ts))
-            except Exception:
-                continue
-        if len(timestamps) >= 2:
-            duration_seconds = max(0, int((max(timestamps) - min(timestamps)).total_seconds()))
-
-    if not duration_hms:
-        hours = duration_seconds // 3600
-        minutes = (duration_seconds % 3600) // 60
-        seconds = duration_seconds % 60
-        duration_hms = f"{hours:02d}:{minutes:02d}:{seconds:02d}"
-
-    commitment_map = {
-        "none": "No Commitment",
-        "soft_commitment": "Exploring Enrollment",
-        "conditional_commitment": "Conditional Yes",
-        "strong_commitment": "Confirmed Enrollment",
-    }
-
-    title_style = ParagraphStyle(
-        "ReportTitle",
-        parent=styles["Title"],
-        fontName="Helvetica-Bold",
-        fontSize=22,
-        leading=26,
-        textColor=colors.HexColor("#0B1A37"),
-        spaceAfter=6,
+    transcript = session_last_run.get("history_for_reporting") or payload.transcript or []
+    # Rendering runs in REPORT_RENDERER's worker processes; identical reports come straight from its cache.
+    handle = await REPORT_RENDERER.open_report(
+        session.get("program", {}),
+        session.get("persona", {}),
+        transcript,
+        payload.analysis or {},
     )
-    subtitle_style = ParagraphStyle(
-        "ReportSubTitle",
-        parent=styles["Normal"],
-        fontName="Helvetica",
-        fontSize=9,
-        leading=12,
-        textColor=colors.HexColor("#4A638F"),
-        spaceAfter=10,
-    )
-    section_style = ParagraphStyle(
-        "SectionHeading",
-        parent=styles["Heading2"],
-        fontName="Helvetica-Bold",
-        fontSize=12,
-        leading=14,
-        textColor=colors.HexColor("#1D4A8C"),
-        spaceBefore=8,
-        spaceAfter=6,
-    )
-    body_style = ParagraphStyle(
-        "ReportBody",
-        parent=styles["BodyText"],
-        fontName="Helvetica",
-        fontSize=9.5,
-        leading=13.5,
-        textColor=colors.HexColor("#1C2F52"),
-    )
-    meta_style = ParagraphStyle(
-        "ReportMeta",
-        parent=styles["BodyText"],
-        fontName="Helvetica",
-        fontSize=8.8,
-        leading=12,
-        textColor=colors.HexColor("#4B6087"),
-    )
-    thought_style = ParagraphStyle(
-        "ThoughtStyle",
-        parent=styles["BodyText"],
-        fontSize=8.6,
-        leading=12,
-        textColor=colors.HexColor("#6A7386"),
-        fontName="Helvetica-Oblique",
-        leftIndent=10,
-    )
-    transcript_hindi_style: Optional[ParagraphStyle] = None
-    thought_hindi_style: Optional[ParagraphStyle] = None
-    if use_hindi_transcript and hindi_font_name != "Helvetica":
-        transcript_hindi_style = ParagraphStyle(
-            "TranscriptHindi",
-            parent=body_style,
-            fontName=hindi_font_name,
-        )
-        thought_hindi_style = ParagraphStyle(
-            "ThoughtHindi",
-            parent=thought_style,
-            fontName=hindi_font_name,
-        )
-
-    def _paragraph_text(value: Any, allow_breaks: bool = False) -> str:
-        safe = xml_escape(str(value or ""))
-        return safe.replace("\n", "<br/>") if allow_breaks else safe
-
-    def _make_paragraph(value: Any, primary: ParagraphStyle, devanagari: Optional[ParagraphStyle] = None, allow_breaks: bool = False) -> Paragraph:
-        text = _paragraph_text(value, allow_breaks=allow_breaks)
-        style = primary
-        if devanagari and _has_devanagari(str(value or "")):
-            style = devanagari
-        return Paragraph(text, style)
-
-    def card_table(rows: List[List[str]], col_widths: Optional[List[int]] = None) -> Table:
-        table = Table(rows, colWidths=col_widths)
-        table.setStyle(
-            TableStyle(
-                [
-                    ("BACKGROUND", (0, 0), (-1, -1), colors.HexColor("#F4F8FF")),
-                    ("BOX", (0, 0), (-1, -1), 0.8, colors.HexColor("#C1D3F2")),
-                    ("INNERGRID", (0, 0), (-1, -1), 0.4, colors.HexColor("#D7E4FA")),
-                    ("LEFTPADDING", (0, 0), (-1, -1), 8),
-                    ("RIGHTPADDING", (0, 0), (-1, -1), 8),
-                    ("TOPPADDING", (0, 0), (-1, -1), 6),
-                    ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
-                    ("VALIGN", (0, 0), (-1, -1), "TOP"),
-                ]
-            )
-        )
-        return table
-
-    def append_bullets(title: str, items: List[str], fallback_text: str) -> None:
-        story.append(_make_paragraph(title, section_style))
-        if not items:
-            story.append(_make_paragraph(fallback_text, body_style))
-            story.append(Spacer(1, 6))
-            return
-        for item in items:
-            story.append(_make_paragraph(f"- {str(item)}", body_style))
-        story.append(Spacer(1, 6))
-
-    story.append(_make_paragraph("Program Counsellor Report", title_style))
-    story.append(_make_paragraph(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", subtitle_style))
-
-    summary_rows = [
-        ["Outcome", winner],
-        ["Duration", duration_hms],
-        ["Final Score", f"{judge.get('negotiation_score', 0)} / 100"],
-        ["Commitment Signal", commitment_map.get(commitment, commitment)],
-        ["Win Probability", f"{judge.get('enrollment_likelihood', 0)}%"],
-        ["Trust Delta", str(judge.get("trust_delta", 0))],
-    ]
-    story.append(_make_paragraph("Outcome Summary", section_style))
-    story.append(card_table(summary_rows, [130, 390]))
-    story.append(Spacer(1, 8))
-    story.append(_make_paragraph(str(judge.get("why", "No summary available.")), body_style))
-    story.append(Spacer(1, 10))
-
-    story.append(_make_paragraph("Persona and Context", section_style))
-    persona_rows = [
-        ["Student", str(persona.get("name", "Unknown"))],
-        ["Persona Type", str(persona.get("persona_type", "n/a"))],
-        ["Career Stage", str(persona.get("career_stage", "n/a"))],
-        ["Risk Tolerance", str(persona.get("risk_tolerance", "n/a"))],
-        ["Program", str(program.get("program_name", "Unknown"))],
-    ]
-    story.append(card_table(persona_rows, [130, 390]))
-    story.append(Spacer(1, 8))
-    story.append(_make_paragraph("Primary Unresolved Objection", section_style))
-    story.append(_make_paragraph(str(judge.get("primary_unresolved_objection", "Not specified")), body_style))
-    story.append(Spacer(1, 8))
-
-    run_history = payload.analysis.get("run_history", []) if isinstance(payload.analysis, dict) else []
-    if isinstance(run_history, list) and len(run_history) > 1:
-        story.append(_make_paragraph("Performance Progression", section_style))
-        progression_rows = [["Run", "Score", "Delta vs Previous", "Delta vs Baseline"]]
-        baseline_score = float(run_history[0].get("score", 0))
-        previous_score = None
-        for idx, run in enumerate(run_history):
-            score = float(run.get("score", 0))
-            delta_prev = "-" if previous_score is None else f"{score - previous_score:+.0f}"
-            delta_base = f"{score - baseline_score:+.0f}"
-            progression_rows.append([f"Run {idx + 1}", f"{score:.0f}", delta_prev, delta_base])
-            previous_score = score
-        progression_table = Table(progression_rows, colWidths=[90, 70, 150, 150])
-        progression_table.setStyle(
-            TableStyle(
-                [
-                    ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#DCEBFF")),
-                    ("TEXTCOLOR", (0, 0), (-1, 0), colors.HexColor("#133A77")),
-                    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                    ("BACKGROUND", (0, 1), (-1, -1), colors.HexColor("#F7FAFF")),
-                    ("GRID", (0, 0), (-1, -1), 0.5, colors.HexColor("#C9DCF7")),
-                    ("ALIGN", (1, 1), (-1, -1), "CENTER"),
-                    ("LEFTPADDING", (0, 0), (-1, -1), 6),
-                    ("RIGHTPADDING", (0, 0), (-1, -1), 6),
-                    ("TOPPADDING", (0, 0), (-1, -1), 5),
-                    ("BOTTOMPADDING", (0, 0), (-1, -1), 5),
-                ]
-            )
-        )
-        story.append(progression_table)
-        story.append(Spacer(1, 8))
-
-    append_bullets("Key Turning Points", [str(x) for x in judge.get("pivotal_moments", [])], "No pivotal moments captured.")
-    append_bullets("Strengths", [str(x) for x in judge.get("strengths", [])], "No strengths captured.")
-    append_bullets("Mistakes", [str(x) for x in judge.get("mistakes", [])], "No mistakes captured.")
-    append_bullets(
-        "Opportunities and Coaching Insights",
-        [str(x) for x in judge.get("skill_recommendations", [])],
-        "No coaching recommendations captured.",
-    )
-
-    story.append(PageBreak())
-    story.append(_make_paragraph("Conversation Metrics Timeline", section_style))
-    metric_events = judge.get("metric_events", [])
-    if metric_events:
-        metric_rows = [["Round", "Tone", "Event"]]
-        for event in metric_events[-40:]:
-            metric_rows.append(
-                [
-                    str(event.get("round", "-")),
-                    str(event.get("tone", "neutral")),
-                    str(event.get("text", "")).strip()[:120],
-                ]
-            )
-        metric_table = Table(metric_rows, colWidths=[60, 90, 370])
-        metric_table.setStyle(
-            TableStyle(
-                [
-                    ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#E6EFFF")),
-                    ("TEXTCOLOR", (0, 0), (-1, 0), colors.HexColor("#133A77")),
-                    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                    ("GRID", (0, 0), (-1, -1), 0.45, colors.HexColor("#C9DCF7")),
-                    ("BACKGROUND", (0, 1), (-1, -1), colors.HexColor("#F9FBFF")),
-                    ("VALIGN", (0, 0), (-1, -1), "TOP"),
-                    ("LEFTPADDING", (0, 0), (-1, -1), 6),
-                    ("RIGHTPADDING", (0, 0), (-1, -1), 6),
-                    ("TOPPADDING", (0, 0), (-1, -1), 4),
-                    ("BOTTOMPADDING", (0, 0), (-1, -1), 4),
-                ]
-            )
-        )
-        story.append(metric_table)
-    else:
-        story.append(_make_paragraph("No metric events captured.", body_style))
-    story.append(Spacer(1, 10))
-
-    story.append(_make_paragraph("Transcript", section_style))
-    transcript_for_report = session_last_run.get("history_for_reporting") or payload.transcript
-    for msg in transcript_for_report:
-        agent = str(msg.get("agent", "")).upper() or "UNKNOWN"
-        rnd = msg.get("round", "-")
-        content = _clean_transcript_content(str(msg.get("content", "")))
-        story.append(_make_paragraph(f"Round {rnd} - {agent}", meta_style))
-        thought = str(msg.get("internal_thought", "")).strip()
-        if thought and str(msg.get("agent", "")).lower() == "student":
-            story.append(
-                _make_paragraph(
-                    f"Psychological Analysis: {thought}",
-                    thought_style,
-                    devanagari=thought_hindi_style,
-                )
-            )
-        story.append(
-            _make_paragraph(
-                content,
-                body_style,
-                devanagari=transcript_hindi_style,
-                allow_breaks=True,
-            )
-        )
-        story.append(Spacer(1, 6))
-
-    doc.build(story)
-    buf.seek(0)
     filename = f"Program_Counsellor_Report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
     return StreamingResponse(
-        buf,
+        iter_file_chunks(handle),
         media_type="application/pdf",
         headers={"Content-Disposition": f'attachment; filename="{filename}"'},
     )
 
 
+@app.get("/runtime/stats")
+async def runtime_stats() -> Dict[str, Any]:
+    return {
+        "response_cache": RESPONSE_CACHE.stats() if RESPONSE_CACHE is not None else {"enabled": False},
+        "llm_scheduler": LLM_SCHEDULER.snapshot(),
+        "stream_hedge": {**STREAM_HEDGE_STATS, "ttft_samples": len(STREAM_TTFT_SAMPLES_MS)},
+        "trace_sink": TRACE_SINK.stats(),
+        "traceability_store": TRACEABILITY_STORE.stats(),
+        "tracing": TRACER.stats(),
+        "session_store": SESSION_STORE.stats(),
+        "program_summaries": PROGRAM_SUMMARIES.stats(),
+        "persona_pool": PERSONA_POOL.stats(),
+        "url_cache": URL_CACHE.stats() if URL_CACHE is not None else {"enabled": False},
+        "report_renderer": REPORT_RENDERER.stats(),
+    }
+
+
+@app.get("/metrics")
+async def metrics() -> PlainTextResponse:
+    return PlainTextResponse(METRICS.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 @app.get("/")
 async def root() -> Dict[str, str]:
     return {"message": "AI Negotiation Arena API"}
@@ -0,0 +1,314 @@
+"""
+Offline stand-in for the slice of `genai.Client` the backend uses.
+
+Select it with GEMINI_BACKEND=mock. Structured calls return function-call args
+generated from the tool declaration's schema; free-text calls return
+tag-formatted student turns, plain counsellor dialogue or JSON, depending on
+what the prompt asks for. Latency, chunking and failure rates come from a named
+profile (MOCK_GENAI_PROFILE) with per-field env overrides, and all output is
+seeded so the same prompt yields the same text across runs.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass, replace
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from google.genai import errors, types
+
+MOCK_MODEL_NAME = "mock-gemini"
+
+
+@dataclass(frozen=True)
+class MockLatencyProfile:
+    ttft_ms: float
+    ttft_jitter_ms: float
+    chunk_interval_ms: float
+    chunk_chars: int
+    call_ms: float
+    error_rate: float = 0.0
+    tail_rate: float = 0.0
+    tail_ms: float = 0.0
+
+
+MOCK_LATENCY_PROFILES: Dict[str, MockLatencyProfile] = {
+    "instant": MockLatencyProfile(ttft_ms=0, ttft_jitter_ms=0, chunk_interval_ms=0, chunk_chars=48, call_ms=0),
+    "fast": MockLatencyProfile(ttft_ms=120, ttft_jitter_ms=40, chunk_interval_ms=15, chunk_chars=32, call_ms=250),
+    "realistic": MockLatencyProfile(
+        ttft_ms=650, ttft_jitter_ms=250, chunk_interval_ms=45, chunk_chars=24, call_ms=1400, error_rate=0.01
+    ),
+    # Mostly quick, with occasional multi-second stalls before the first chunk.
+    "slow_tail": MockLatencyProfile(
+        ttft_ms=500, ttft_jitter_ms=150, chunk_interval_ms=45, chunk_chars=24, call_ms=1400, tail_rate=0.05, tail_ms=8000
+    ),
+}
+
+_COUNSELLOR_LINES = [
+    "I understand the fee feels like a big step, so let me walk you through what is included.",
+    "Most learners in your position were worried about time too, and the weekend schedule helped them.",
+    "The programme fee is ₹{offer}, and we can split it into no-cost EMIs if that helps.",
+    "Our placement team works with over two hundred hiring partners across product and services companies.",
+    "If you enrol this week, I can hold a scholarship that brings it down to ₹{offer}.",
+    "What matters most to you right now, the salary jump or the confidence to switch roles?",
+    "You will build six portfolio projects that mirror real industry work.",
+    "Would it help if I shared a few alumni profiles with a background similar to yours?",
+]
+_STUDENT_LINES = [
+    "Honestly the fee is more than I had planned for this year.",
+    "Can you do something closer to ₹{offer}? That is what I can manage right now.",
+    "I have heard these courses promise placements but do not deliver.",
+    "How many hours a week will this actually take with my job?",
+    "That sounds useful, but I need to talk to my family before I decide.",
+    "What happens if I cannot keep up with the live sessions?",
+    "Okay, the EMI option makes it easier to think about.",
+    "I am not sure the certificate is valued by recruiters.",
+]
+_THOUGHTS = [
+    "They keep talking about outcomes but I still do not know if I can afford this.",
+    "This sounds rehearsed. I need proof, not a pitch.",
+    "Maybe this could actually work if the payments are spread out.",
+    "I feel pressured. Why do they want me to decide today?",
+]
+_EMOTIONS = ["calm", "skeptical", "confused", "frustrated", "excited"]
+_CONCERNS = ["Price", "Job Guarantee", "Effort/Time", "Credibility"]
+_TECHNIQUES = ["Reframing", "Social Proof", "Anchoring", "Empathy", "Scarcity"]
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def _enum_name(value: Any) -> str:
+    return str(getattr(value, "value", value) or "").upper()
+
+
+def _field(schema: Any, name: str) -> Any:
+    if isinstance(schema, dict):
+        return schema.get(name)
+    return getattr(schema, name, None)
+
+
+class MockGenaiClient:
+    """Duck-typed replacement for `genai.Client` exposing `.models` and `.aio.models`."""
+
+    def __init__(self, profile: MockLatencyProfile, seed: int = 0) -> None:
+        self.profile = profile
+        self.seed = seed
+        self._latency_rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self.call_count = 0
+        self.models = _MockModels(self)
+        self.aio = _MockAio(_MockAsyncModels(self))
+
+    @classmethod
+    def from_env(cls) -> "MockGenaiClient":
+        name = os.getenv("MOCK_GENAI_PROFILE", "realistic").strip().lower()
+        profile = MOCK_LATENCY_PROFILES.get(name, MOCK_LATENCY_PROFILES["realistic"])
+        profile = replace(
+            profile,
+            ttft_ms=max(0.0, _env_float("MOCK_GENAI_TTFT_MS", profile.ttft_ms)),
+            chunk_interval_ms=max(0.0, _env_float("MOCK_GENAI_CHUNK_INTERVAL_MS", profile.chunk_interval_ms)),
+            chunk_chars=max(1, int(_env_float("MOCK_GENAI_CHUNK_CHARS", profile.chunk_chars))),
+            call_ms=max(0.0, _env_float("MOCK_GENAI_CALL_MS", profile.call_ms)),
+            error_rate=min(1.0, max(0.0, _env_float("MOCK_GENAI_ERROR_RATE", profile.error_rate))),
+        )
+        return cls(profile, seed=int(_env_float("MOCK_GENAI_SEED", 0)))
+
+    # --- latency / failure ---
+
+    def _draw_ttft_seconds(self) -> float:
+        with self._rng_lock:
+            self.call_count += 1
+            jitter = self._latency_rng.uniform(-self.profile.ttft_jitter_ms, self.profile.ttft_jitter_ms)
+            tail = self.profile.tail_ms if self._latency_rng.random() < self.profile.tail_rate else 0.0
+        return max(0.0, self.profile.ttft_ms + jitter + tail) / 1000.0
+
+    def _draw_call_seconds(self) -> float:
+        with self._rng_lock:
+            self.call_count += 1
+            jitter = self._latency_rng.uniform(0.75, 1.25)
+        return self.profile.call_ms * jitter / 1000.0
+
+    def _maybe_fail(self, model: str) -> None:
+        with self._rng_lock:
+            failed = self._latency_rng.random() < self.profile.error_rate
+        if failed:
+            raise errors.ServerError(
+                503,
+                {"error": {"code": 503, "status": "UNAVAILABLE", "message": f"Mock {model} overloaded"}},
+            )
+
+    # --- content ---
+
+    def _content_rng(self, model: str, contents: Any) -> random.Random:
+        digest = hashlib.sha256(f"{self.seed}:{model}:{contents}".encode("utf-8")).hexdigest()
+        return random.Random(int(digest[:16], 16))
+
+    def build_response(self, model: str, contents: Any, config: Any = None) -> types.GenerateContentResponse:
+        rng = self._content_rng(model, contents)
+        declaration = _first_function_declaration(config)
+        if declaration is not None:
+            schema = declaration.parameters if declaration.parameters is not None else declaration.parameters_json_schema
+            args = _value_for_schema(schema or {"type": "object"}, rng, declaration.name or "result")
+            part = types.Part(function_call=types.FunctionCall(name=declaration.name, args=args))
+        else:
+            part = types.Part(text=_text_for_prompt(str(contents or ""), rng))
+        return types.GenerateContentResponse(
+            candidates=[
+                types.Candidate(
+                    content=types.Content(role="model", parts=[part]),
+                    finish_reason=types.FinishReason.STOP,
+                )
+            ]
+        )
+
+    def stream_chunks(self, model: str, contents: Any) -> List[types.GenerateContentResponse]:
+        text = _text_for_prompt(str(contents or ""), self._content_rng(model, contents))
+        size = self.profile.chunk_chars
+        pieces = [text[i : i + size] for i in range(0, len(text), size)] or [""]
+        chunks = []
+        for index, piece in enumerate(pieces):
+            last = index == len(pieces) - 1
+            chunks.append(
+                types.GenerateContentResponse(
+                    candidates=[
+                        types.Candidate(
+                            content=types.Content(role="model", parts=[types.Part(text=piece)]),
+                            finish_reason=types.FinishReason.STOP if last else None,
+                        )
+                    ]
+                )
+            )
+        return chunks
+
+
+class _MockModels:
+    def __init__(self, client: MockGenaiClient) -> None:
+        self._client = client
+
+    def generate_content(self, *, model: str, contents: Any, config: Any = None) -> types.GenerateContentResponse:
+        time.sleep(self._client._draw_call_seconds())
+        self._client._maybe_fail(model)
+        return self._client.build_response(model, contents, config)
+
+    def generate_content_stream(
+        self, *, model: str, contents: Any, config: Any = None
+    ) -> Iterator[types.GenerateContentResponse]:
+        self._client._maybe_fail(model)
+        ttft = self._client._draw_ttft_seconds()
+        interval = self._client.profile.chunk_interval_ms / 1000.0
+        for index, chunk in enumerate(self._client.stream_chunks(model, contents)):
+            time.sleep(ttft if index == 0 else interval)
+            yield chunk
+
+
+class _MockAsyncModels:
+    def __init__(self, client: MockGenaiClient) -> None:
+        self._client = client
+
+    async def generate_content(self, *, model: str, contents: Any, config: Any = None) -> types.GenerateContentResponse:
+        await asyncio.sleep(self._client._draw_call_seconds())
+        self._client._maybe_fail(model)
+        return self._client.build_response(model, contents, config)
+
+    async def generate_content_stream(
+        self, *, model: str, contents: Any, config: Any = None
+    ) -> AsyncIterator[types.GenerateContentResponse]:
+        self._client._maybe_fail(model)
+        ttft = self._client._draw_ttft_seconds()
+        interval = self._client.profile.chunk_interval_ms / 1000.0
+        chunks = self._client.stream_chunks(model, contents)
+
+        async def _iterate() -> AsyncIterator[types.GenerateContentResponse]:
+            for index, chunk in enumerate(chunks):
+                await asyncio.sleep(ttft if index == 0 else interval)
+                yield chunk
+
+        return _iterate()
+
+
+class _MockAio:
+    def __init__(self, models: _MockAsyncModels) -> None:
+        self.models = models
+
+
+def _first_function_declaration(config: Any) -> Optional[types.FunctionDeclaration]:
+    for tool in getattr(config, "tools", None) or []:
+        for declaration in getattr(tool, "function_declarations", None) or []:
+            return declaration
+    return None
+
+
+def _value_for_schema(schema: Any, rng: random.Random, name: str) -> Any:
+    enum = _field(schema, "enum")
+    if enum:
+        return rng.choice(list(enum))
+    kind = _enum_name(_field(schema, "type")) or "OBJECT"
+    if kind == "OBJECT":
+        properties = _field(schema, "properties") or {}
+        return {key: _value_for_schema(sub, rng, key) for key, sub in properties.items()}
+    if kind == "ARRAY":
+        low = int(_field(schema, "min_items") or _field(schema, "minItems") or 1)
+        high = int(_field(schema, "max_items") or _field(schema, "maxItems") or max(low, 3))
+        items = _field(schema, "items") or {"type": "string"}
+        return [_value_for_schema(items, rng, name) for _ in range(rng.randint(low, max(low, high)))]
+    if kind in {"NUMBER", "INTEGER"}:
+        low = _field(schema, "minimum")
+        high = _field(schema, "maximum")
+        low = 0 if low is None else low
+        high = 100 if high is None else high
+        return rng.randint(int(low), int(high)) if kind == "INTEGER" else round(rng.uniform(low, high), 1)
+    if kind == "BOOLEAN":
+        return rng.random() < 0.5
+    return _string_for_field(name, rng)
+
+
+def _string_for_field(name: str, rng: random.Random) -> str:
+    lowered = name.lower()
+    if "fee" in lowered or "price" in lowered:
+        return f"INR {rng.randrange(80, 400) * 1000:,}"
+    if "technique" in lowered:
+        return rng.choice(_TECHNIQUES)
+    if "emotion" in lowered or "sentiment" in lowered:
+        return rng.choice(_EMOTIONS)
+    if "objection" in lowered or "concern" in lowered:
+        return rng.choice(_CONCERNS)
+    if lowered in {"message", "response", "suggestions", "analysis", "why"}:
+        return rng.choice(_COUNSELLOR_LINES).format(offer=f"{rng.randrange(80, 300) * 1000:,}")
+    return f"Mock {name.replace('_', ' ')} {rng.randint(1, 999)}"
+
+
+def _text_for_prompt(prompt: str, rng: random.Random) -> str:
+    offer = f"{rng.randrange(80, 300) * 1000:,}"
+    if "<thought>" in prompt and "<message>" in prompt:
+        stats = {
+            "resistance": rng.randint(20, 90),
+            "trust": rng.randint(20, 90),
+            "sentiment": rng.choice(["anxious", "curious", "skeptical"]),
+            "unresolved_concerns": rng.sample(_CONCERNS, k=rng.randint(1, 2)),
+        }
+        message = " ".join(line.format(offer=offer) for line in rng.sample(_STUDENT_LINES, k=rng.randint(1, 3)))
+        return (
+            f"<thought>{rng.choice(_THOUGHTS)}</thought>\n"
+            f"<stats>{json.dumps(stats)}</stats>\n"
+            f"<message>{message}</message>\n"
+            f"<emotional_state>{rng.choice(_EMOTIONS)}</emotional_state>\n"
+            f"<intent>Testing whether the offer holds up.</intent>"
+        )
+    if "OUTPUT JSON" in prompt:
+        return json.dumps(
+            {
+                "trigger": rng.choice(_STUDENT_LINES).format(offer=offer),
+                "response": rng.choice(_COUNSELLOR_LINES).format(offer=offer),
+                "technique": rng.choice(_TECHNIQUES),
+            }
+        )
+    return " ".join(line.format(offer=offer) for line in rng.sample(_COUNSELLOR_LINES, k=rng.randint(2, 4)))
@@ -0,0 +1,163 @@
+"""
+Single-pass money amount scanner for offer tracking.
+
+`scan_amounts()` walks a lowercased turn once with one precompiled pattern and
+returns typed `AmountCandidate`s: the value, its span, the unit (lakh, INR or
+USD), whether it follows a "discount of ..." lead-in, and whether it directly
+follows a reference phrase such as "the listed price". Offer extraction, the
+listed-fee parser and discount detection all read from the same scan instead of
+running their own regex passes.
+
+Bare numbers count only when they stand alone as a word, and digit runs longer
+than 11 characters (phone numbers, ids) are ignored.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+UNIT_LAKH = "lakh"
+UNIT_INR = "inr"
+UNIT_USD = "usd"
+
+REFERENCE_PHRASES = ("the price of", "listed price", "original price", "price for the", "reduction of")
+DEFAULT_LISTED_AMOUNT = 4500
+
+_MAX_DIGITS = 11
+# Longest lead-in worth looking at: "discount up to rs. " plus slack for extra whitespace.
+_LEAD_WINDOW = 40
+
+# The scan is anchored on digits so the regex engine can skip ahead by character class;
+# currency and discount lead-ins are then matched backwards from each amount.
+_AMOUNT_PATTERN = re.compile(r"(?P<digits>[0-9](?:[0-9,]*[0-9])?)(?P<fraction>\.[0-9]+)?(?P<lakh>\s*(?:lakh|l\b))?")
+_CURRENCY_MARKS = ("₹", "inr", "rs", "rs.")
+_DISCOUNT_LEAD_PATTERN = re.compile(r"discount\s*(?:of|up\s*to)?\s*\Z")
+# What may sit between a reference phrase and the amount it introduces ("listed price is ₹1,50,000").
+_REFERENCE_LEAD_PATTERN = re.compile(
+    r"(?:" + "|".join(re.escape(phrase) for phrase in REFERENCE_PHRASES) + r")[\s:,-]*(?:(?:is|was|of)\b[\s:,-]*)?\Z"
+)
+
+
+@dataclass(frozen=True)
+class AmountCandidate:
+    value: int
+    unit: str
+    span: Tuple[int, int]
+    digits: str
+    currency_marked: bool
+    is_discount: bool
+    is_reference: bool
+    bounded: bool
+
+
+@dataclass(frozen=True)
+class MoneyScan:
+    candidates: Tuple[AmountCandidate, ...]
+    has_reference_phrase: bool
+
+    def offer_values(self) -> List[int]:
+        """Every amount that could be a price offer in this turn."""
+        values: List[int] = []
+        for candidate in self.candidates:
+            if candidate.unit == UNIT_LAKH:
+                values.append(candidate.value)
+            elif candidate.currency_marked:
+                if len(candidate.digits) >= 3:
+                    values.append(candidate.value)
+            elif (
+                candidate.bounded
+                and len(candidate.digits) >= 5
+                and candidate.digits[0] != "0"
+                and candidate.value > 5000
+            ):
+                values.append(candidate.value)
+        return values
+
+    def listed_amount(self, default: int = DEFAULT_LISTED_AMOUNT) -> int:
+        """Read a listed fee: lakh amounts win, then ₹/INR/Rs amounts, then any standalone number."""
+        lakh = [c.value for c in self.candidates if c.unit == UNIT_LAKH]
+        if lakh:
+            return max(1000, max(lakh))
+        currency = [
+            c.value for c in self.candidates if c.unit == UNIT_INR and c.currency_marked and len(c.digits) >= 4
+        ]
+        if currency:
+            return max(1000, max(currency))
+        generic = [c.value for c in self.candidates if c.unit != UNIT_LAKH and c.bounded and len(c.digits) >= 4]
+        if generic:
+            return max(1000, max(generic))
+        return default
+
+    def discount_value(self) -> Optional[int]:
+        """The first rupee amount introduced by "discount (of|up to)", if any."""
+        for candidate in self.candidates:
+            if candidate.is_discount and candidate.unit == UNIT_INR and len(candidate.digits) >= 4:
+                return candidate.value
+        return None
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+def scan_amounts(text: str) -> MoneyScan:
+    raw = (text or "").lower()
+    has_reference = any(phrase in raw for phrase in REFERENCE_PHRASES)
+    has_discount = "discount" in raw
+    candidates: List[AmountCandidate] = []
+    length = len(raw)
+    for match in _AMOUNT_PATTERN.finditer(raw):
+        digits = match.group("digits")
+        if len(digits) > _MAX_DIGITS:
+            continue
+        start, end = match.span("digits")
+        if start and raw[start - 1] in "0123456789.":
+            # Tail of a longer token (e.g. the decimals of an over-long number), not an amount of its own.
+            continue
+        has_lakh = match.group("lakh") is not None
+        if len(digits) < 3 and not has_lakh:
+            # Too short to be a fee or an offer on its own ("28 year old", "3 months").
+            continue
+        bounded = (start == 0 or not _is_word_char(raw[start - 1])) and (end == length or not _is_word_char(raw[end]))
+        lead_start, currency, usd = start, False, False
+        mark_end = start
+        while mark_end and raw[mark_end - 1].isspace():
+            mark_end -= 1
+        if start and raw[start - 1] == "$":
+            usd, lead_start = True, start - 1
+        else:
+            for mark in _CURRENCY_MARKS:
+                mark_start = mark_end - len(mark)
+                if (
+                    mark_start >= 0
+                    and raw.startswith(mark, mark_start)
+                    and (mark == "₹" or mark_start == 0 or not _is_word_char(raw[mark_start - 1]))
+                ):
+                    currency, lead_start = True, mark_start
+        discount = None
+        if has_discount:
+            discount = _DISCOUNT_LEAD_PATTERN.search(raw, max(0, lead_start - _LEAD_WINDOW), lead_start)
+        if discount is not None:
+            lead_start = discount.start()
+        number = digits.replace(",", "")
+        if has_lakh:
+            unit = UNIT_LAKH
+            value = int(float(number + (match.group("fraction") or "")) * 100_000)
+        else:
+            unit = UNIT_USD if usd else UNIT_INR
+            value = int(number)
+        candidates.append(
+            AmountCandidate(
+                value=value,
+                unit=unit,
+                span=(lead_start, match.end()),
+                digits=digits,
+                currency_marked=currency or usd,
+                is_discount=discount is not None,
+                is_reference=has_reference
+                and lead_start > 0
+                and _REFERENCE_LEAD_PATTERN.search(raw, max(0, lead_start - _LEAD_WINDOW), lead_start) is not None,
+                bounded=bounded,
+            )
+        )
+    return MoneyScan(candidates=tuple(candidates), has_reference_phrase=has_reference)
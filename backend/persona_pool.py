@@ -0,0 +1,146 @@
+"""
+Warm pool of pre-generated student personas.
+
+Personas are kept per (program hash, archetype) and handed out at most once.
+Every `take()` (hit or miss) schedules background generation to bring that
+slot back to `depth`, so after a miss the caller generates inline once and the
+next session for that program and archetype is served warm. `prime()` fills
+slots for a freshly analysed program before anyone asks for them. Generation runs on worker threads, at most
+`max_concurrent_refills` at a time, so a burst of new programs cannot starve
+the default executor. Only the `max_programs` most recently used programs are
+kept; personas generated for an evicted program are dropped.
+
+All methods are meant to be called from the event loop thread.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+from collections import OrderedDict, deque
+from typing import Any, Callable, Deque, Dict, Iterable, Optional, Set
+
+logger = logging.getLogger("negotiation-arena.persona-pool")
+
+PersonaFactory = Callable[[Dict[str, Any], str], Dict[str, Any]]
+
+
+class _Slot:
+    __slots__ = ("ready", "in_flight")
+
+    def __init__(self) -> None:
+        self.ready: Deque[Dict[str, Any]] = deque()
+        self.in_flight = 0
+
+
+def program_key(program: Dict[str, Any]) -> str:
+    canonical = json.dumps(program, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class PersonaPool:
+    def __init__(
+        self,
+        generate: PersonaFactory,
+        depth: int = 1,
+        max_programs: int = 32,
+        max_concurrent_refills: int = 2,
+    ) -> None:
+        self._generate = generate
+        self.depth = max(0, int(depth))
+        self.max_programs = max(1, int(max_programs))
+        self.max_concurrent_refills = max(1, int(max_concurrent_refills))
+        self._programs: "OrderedDict[str, Dict[str, _Slot]]" = OrderedDict()
+        self._tasks: Set["asyncio.Task[None]"] = set()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._counters: Dict[str, int] = {"hits": 0, "misses": 0, "generated": 0, "refill_errors": 0, "evicted": 0}
+
+    def take(self, program: Dict[str, Any], archetype_id: str) -> Optional[Dict[str, Any]]:
+        """Pop a ready persona for this program and archetype (None on a miss) and top the slot back up."""
+        key = program_key(program)
+        slot = self._slot(key, archetype_id)
+        persona = slot.ready.popleft() if slot.ready else None
+        self._counters["hits" if persona is not None else "misses"] += 1
+        self._schedule(key, program, archetype_id, slot)
+        return persona
+
+    def prime(self, program: Dict[str, Any], archetype_ids: Iterable[str]) -> None:
+        key = program_key(program)
+        for archetype_id in archetype_ids:
+            self._schedule(key, program, archetype_id, self._slot(key, archetype_id))
+
+    async def aclose(self) -> None:
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        depth_by_archetype: Dict[str, int] = {}
+        ready = in_flight = 0
+        for slots in self._programs.values():
+            for archetype_id, slot in slots.items():
+                depth_by_archetype[archetype_id] = depth_by_archetype.get(archetype_id, 0) + len(slot.ready)
+                ready += len(slot.ready)
+                in_flight += slot.in_flight
+        lookups = self._counters["hits"] + self._counters["misses"]
+        return {
+            **self._counters,
+            "hit_rate": round(self._counters["hits"] / lookups, 4) if lookups else 0.0,
+            "target_depth": self.depth,
+            "programs": len(self._programs),
+            "ready_personas": ready,
+            "in_flight": in_flight,
+            "depth_by_archetype": depth_by_archetype,
+        }
+
+    def _slot(self, key: str, archetype_id: str) -> _Slot:
+        slots = self._programs.get(key)
+        if slots is None:
+            slots = self._programs[key] = {}
+            while len(self._programs) > self.max_programs:
+                self._programs.popitem(last=False)
+                self._counters["evicted"] += 1
+        self._programs.move_to_end(key)
+        slot = slots.get(archetype_id)
+        if slot is None:
+            slot = slots[archetype_id] = _Slot()
+        return slot
+
+    def _schedule(self, key: str, program: Dict[str, Any], archetype_id: str, slot: _Slot) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        missing = self.depth - len(slot.ready) - slot.in_flight
+        for _ in range(max(0, missing)):
+            slot.in_flight += 1
+            task = loop.create_task(self._refill(key, program, archetype_id, slot))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _refill(self, key: str, program: Dict[str, Any], archetype_id: str, slot: _Slot) -> None:
+        try:
+            async with self._limiter():
+                persona = await asyncio.to_thread(self._generate, program, archetype_id)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self._counters["refill_errors"] += 1
+            logger.exception("Background persona generation failed for archetype %s", archetype_id)
+            return
+        finally:
+            slot.in_flight -= 1
+        self._counters["generated"] += 1
+        # The program may have been evicted while this persona was being generated.
+        if self._programs.get(key, {}).get(archetype_id) is slot:
+            slot.ready.append(persona)
+
+    def _limiter(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent_refills)
+            self._semaphore_loop = loop
+        return self._semaphore
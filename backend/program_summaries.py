@@ -0,0 +1,83 @@
+"""
+Shared, read-only program summaries.
+
+Summaries are keyed by a hash of the cleaned page text, the product/program
+type, the model that extracted it and the extraction prompt/schema version, so
+re-analysing a page (or reaching the same page through another URL) reuses one
+extraction while a model or prompt change starts fresh. Interned summaries are deep-frozen and tracked in a weak
+registry: while any session still holds a summary, every new session for the
+same content references that one object instead of carrying its own copy.
+"""
+
+import hashlib
+import threading
+import weakref
+from typing import Any, Dict, Optional
+
+
+class FrozenSummary(dict):
+    """A dict that refuses in-place edits; build a new dict (e.g. `dict(summary)`) to change a field."""
+
+    __slots__ = ("__weakref__",)
+
+    def _read_only(self, *args: Any, **kwargs: Any) -> None:
+        raise TypeError("Program summaries are shared between sessions and cannot be modified in place")
+
+    __setitem__ = __delitem__ = __ior__ = _read_only  # type: ignore[assignment]
+    clear = pop = popitem = setdefault = update = _read_only  # type: ignore[assignment]
+
+    def __reduce__(self) -> Any:
+        return (FrozenSummary, (dict(self),))
+
+
+def freeze_summary(value: Any) -> Any:
+    """Recursively convert dicts to FrozenSummary and lists to tuples (both still serialize as JSON)."""
+    if isinstance(value, FrozenSummary):
+        return value
+    if isinstance(value, dict):
+        return FrozenSummary((str(key), freeze_summary(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze_summary(item) for item in value)
+    return value
+
+
+def summary_key(clean_text: str, product_type: str, model_name: str, prompt_version: str) -> str:
+    digest = hashlib.sha256()
+    for part in (prompt_version, model_name, product_type):
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\x00")
+    digest.update(str(clean_text).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class ProgramSummaryRegistry:
+    def __init__(self) -> None:
+        self._live: "weakref.WeakValueDictionary[str, FrozenSummary]" = weakref.WeakValueDictionary()
+        self._lock = threading.Lock()
+        self._counters: Dict[str, int] = {"shared_hits": 0, "interned": 0}
+
+    def get(self, key: str) -> Optional[FrozenSummary]:
+        with self._lock:
+            summary = self._live.get(key)
+            if summary is not None:
+                self._counters["shared_hits"] += 1
+            return summary
+
+    def intern(self, key: str, summary: Dict[str, Any]) -> FrozenSummary:
+        """Return the live summary for `key`, registering a frozen copy of `summary` if there is none."""
+        with self._lock:
+            existing = self._live.get(key)
+            if existing is not None:
+                self._counters["shared_hits"] += 1
+                return existing
+            frozen = freeze_summary(summary)
+            self._live[key] = frozen
+            self._counters["interned"] += 1
+            return frozen
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._counters, "live_summaries": len(self._live)}
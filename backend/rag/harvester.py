@@ -7,6 +7,13 @@ from typing import Any, Dict, List
 from dotenv import load_dotenv
 from google import genai
 
+try:
+    from backend.llm_scheduler import LANE_BACKGROUND, LLM_SCHEDULER
+    from backend.mock_genai import MOCK_MODEL_NAME, MockGenaiClient
+except ImportError:
+    from llm_scheduler import LANE_BACKGROUND, LLM_SCHEDULER
+    from mock_genai import MOCK_MODEL_NAME, MockGenaiClient
+
 load_dotenv()
 
 
@@ -117,10 +124,11 @@ OUTPUT JSON:
   "technique": "Reframing"
 }}
 """
-    response = client.models.generate_content(
-        model=model_name,
-        contents=prompt,
-    )
+    with LLM_SCHEDULER.hold(model_name, LANE_BACKGROUND):
+        response = client.models.generate_content(
+            model=model_name,
+            contents=prompt,
+        )
     raw = str(getattr(response, "text", "") or "").strip()
     parsed = _parse_json_object(raw, fallback)
     return {
@@ -131,6 +139,8 @@ OUTPUT JSON:
 
 
 def get_gemini_client_and_model() -> tuple[genai.Client, str]:
+    if os.getenv("GEMINI_BACKEND", "").strip().lower() == "mock":
+        return MockGenaiClient.from_env(), MOCK_MODEL_NAME
     api_key = os.getenv("GEMINI_API_KEY", "").strip()
     if not api_key:
         raise RuntimeError("Missing GEMINI_API_KEY in environment.")
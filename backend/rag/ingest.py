@@ -4,8 +4,9 @@ import hashlib
 import json
 import os
 import uuid
+from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 from dotenv import load_dotenv
 from litellm import embedding as litellm_embedding
@@ -14,12 +15,16 @@ from sqlalchemy import text
 try:
     from backend.rag.database import AsyncSessionLocal, KnowledgeNugget
     from backend.rag.harvester import get_gemini_client_and_model, identify_winning_triads, normalize_triad
+    from backend.traceability_store import TraceabilityStore
 except ImportError:
     from rag.database import AsyncSessionLocal, KnowledgeNugget
     from rag.harvester import get_gemini_client_and_model, identify_winning_triads, normalize_triad
+    from traceability_store import TraceabilityStore
 
 load_dotenv()
 
+TRACEABILITY_STORE_DIR = Path(__file__).resolve().parents[1] / "outputs" / "tracebility" / "runtime" / "sessions"
+
 
 def _normalize_program_identifier(payload: Dict[str, Any], source_file: Path) -> str:
     raw = str(payload.get("url") or payload.get("program", {}).get("url") or "").strip().lower()
@@ -100,7 +105,7 @@ async def ingest_trace_payload(payload: Dict[str, Any], source_name: str = "trac
     inserted_nuggets: List[Dict[str, Any]] = []
     async with AsyncSessionLocal() as session:
         for triad in triads:
-            normalized = normalize_triad(gemini_client, gemini_model, triad)
+            normalized = await asyncio.to_thread(normalize_triad, gemini_client, gemini_model, triad)
             vector = _azure_embed(normalized["trigger"])
 
             nugget = KnowledgeNugget(
@@ -142,20 +147,54 @@ async def ingest_trace_file(file_path: Path) -> int:
     return inserted
 
 
+def _stored_payloads(
+    store_dir: Path,
+    session_id: Optional[str],
+    since: Optional[str],
+    until: Optional[str],
+    mode: Optional[str],
+) -> List[Dict[str, Any]]:
+    store = TraceabilityStore(store_dir)
+    try:
+        if session_id:
+            payload = store.get(session_id)
+            return [payload] if payload is not None else []
+        start = datetime.fromisoformat(since).timestamp() if since else None
+        end = datetime.fromisoformat(until).timestamp() if until else None
+        return list(store.iter_range(start, end, mode=mode))
+    finally:
+        store.close()
+
+
 def main() -> None:
-    parser = argparse.ArgumentParser(description="Ingest winning triads from a traceability JSON file.")
-    parser.add_argument("--file", required=True, help="Path to conversation_traceability.json")
+    parser = argparse.ArgumentParser(description="Ingest winning triads from a traceability JSON file or the traceability store.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--file", help="Path to a single traceability JSON payload")
+    source.add_argument("--session-id", help="Ingest the latest stored run of this session")
+    source.add_argument("--since", help="Ingest every stored run finished at or after this ISO timestamp")
+    parser.add_argument("--until", help="With --since: only runs finished before this ISO timestamp")
+    parser.add_argument("--mode", help="With --since: only runs of this pipeline mode")
+    parser.add_argument("--store", type=Path, default=TRACEABILITY_STORE_DIR, help="Traceability store directory")
     parser.add_argument("--migrate", action="store_true", help="Run DB migration SQL before ingest.")
     args = parser.parse_args()
 
-    file_path = Path(args.file).resolve()
-    if not file_path.exists():
+    file_path = Path(args.file).resolve() if args.file else None
+    if file_path is not None and not file_path.exists():
         raise SystemExit(f"File not found: {file_path}")
 
     async def _runner() -> None:
         if args.migrate:
             await _run_migration_sql()
-        count = await ingest_trace_file(file_path)
+        if file_path is not None:
+            count = await ingest_trace_file(file_path)
+        else:
+            payloads = _stored_payloads(args.store, args.session_id, args.since, args.until, args.mode)
+            if not payloads:
+                raise SystemExit("No matching runs in the traceability store")
+            count = 0
+            for payload in payloads:
+                inserted, _ = await ingest_trace_payload(payload, source_name=f"{payload.get('session_id', 'session')}.json")
+                count += inserted
         print(f"Ingestion complete. knowledge_nuggets inserted: {count}")
 
     asyncio.run(_runner())
@@ -6,9 +6,11 @@ from pathlib import Path
 from typing import Any, Dict, List, Optional
 
 try:
-    from backend.rag.ingest import ingest_trace_payload
+    from backend.rag.ingest import TRACEABILITY_STORE_DIR, ingest_trace_payload
+    from backend.traceability_store import TraceabilityStore
 except ImportError:
-    from rag.ingest import ingest_trace_payload
+    from rag.ingest import TRACEABILITY_STORE_DIR, ingest_trace_payload
+    from traceability_store import TraceabilityStore
 
 TRACE_OUTPUT_ROOT = Path(__file__).resolve().parents[1] / "outputs" / "tracebility" / "rag"
 
@@ -102,13 +104,23 @@ async def run_post_session_jobs(
 
 
 def main() -> None:
-    parser = argparse.ArgumentParser(description="Run post-session jobs from a traceability JSON file.")
-    parser.add_argument("--file", required=True, help="Path to conversation_traceability.json")
+    parser = argparse.ArgumentParser(description="Run post-session jobs from a traceability JSON file or the traceability store.")
+    parser.add_argument("--file", help="Path to a traceability JSON payload (default: latest stored run of --session-id)")
+    parser.add_argument("--store", type=Path, default=TRACEABILITY_STORE_DIR, help="Traceability store directory")
     parser.add_argument("--mode", required=True, help="Pipeline mode: ai_vs_ai|human_vs_ai|agent_powered_human_vs_ai")
     parser.add_argument("--session-id", required=True, help="Session ID")
     args = parser.parse_args()
 
-    trace_payload = json.loads(Path(args.file).read_text(encoding="utf-8"))
+    if args.file:
+        trace_payload = json.loads(Path(args.file).read_text(encoding="utf-8"))
+    else:
+        store = TraceabilityStore(args.store)
+        try:
+            trace_payload = store.get(args.session_id)
+        finally:
+            store.close()
+        if trace_payload is None:
+            raise SystemExit(f"No stored traceability for session {args.session_id}")
 
     async def _runner() -> None:
         result = await run_post_session_jobs(args.session_id, args.mode, trace_payload)
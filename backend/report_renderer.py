@@ -0,0 +1,628 @@
+"""
+PDF rendering for /generate-report.
+
+Reports are rendered off the event loop in a small process pool. Each worker
+registers the TTF fonts and builds the paragraph styles once, renders straight
+into a temp file in the cache directory and renames it into place under a hash
+of the report inputs, so the PDF never sits in memory as a whole and repeat
+downloads of the same report are served from disk. Concurrent requests for the
+same report share one render; only the `max_cached` most recently used PDFs are
+kept.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import re
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+from xml.sax.saxutils import escape as xml_escape
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.platypus import PageBreak, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+logger = logging.getLogger("negotiation-arena.report-renderer")
+
+PDF_HINDI_FONT_NAME = "CloseWireHindi"
+PDF_HINDI_FONT_BOLD_NAME = "CloseWireHindiBold"
+CHUNK_SIZE = 64 * 1024
+
+_STYLES: Optional[Dict[str, Optional[ParagraphStyle]]] = None
+
+
+def has_devanagari(value: str) -> bool:
+    text = str(value or "")
+    return any("\u0900" <= ch <= "\u097F" for ch in text)
+
+
+def configure_pdf_fonts() -> Tuple[str, str]:
+    base_font = "Helvetica"
+    bold_font = "Helvetica-Bold"
+    candidate_paths = [
+        Path(__file__).resolve().parent / "assets" / "fonts" / "NotoSansDevanagari-Regular.ttf",
+        Path(__file__).resolve().parent / "assets" / "fonts" / "NotoSansDevanagari-Bold.ttf",
+        Path("/usr/share/fonts/truetype/noto/NotoSansDevanagari-Regular.ttf"),
+        Path("/usr/share/fonts/truetype/noto/NotoSansDevanagari-Bold.ttf"),
+        Path("/usr/share/fonts/opentype/noto/NotoSansDevanagari-Regular.ttf"),
+        Path("/usr/share/fonts/opentype/noto/NotoSansDevanagari-Bold.ttf"),
+        Path("C:/Windows/Fonts/Nirmala.ttf"),
+        Path("C:/Windows/Fonts/mangal.ttf"),
+    ]
+    regular_path = None
+    bold_path = None
+    for candidate in candidate_paths:
+        lowered = candidate.name.lower()
+        if "bold" in lowered and bold_path is None and candidate.exists():
+            bold_path = candidate
+        if "bold" not in lowered and regular_path is None and candidate.exists():
+            regular_path = candidate
+    if not regular_path:
+        return base_font, bold_font
+    try:
+        pdfmetrics.registerFont(TTFont(PDF_HINDI_FONT_NAME, str(regular_path)))
+        if bold_path:
+            pdfmetrics.registerFont(TTFont(PDF_HINDI_FONT_BOLD_NAME, str(bold_path)))
+            return PDF_HINDI_FONT_NAME, PDF_HINDI_FONT_BOLD_NAME
+        return PDF_HINDI_FONT_NAME, PDF_HINDI_FONT_NAME
+    except Exception:
+        logger.exception("Failed to register Hindi PDF font. Falling back to Helvetica.")
+        return base_font, bold_font
+
+
+def clean_transcript_content(content: str) -> str:
+    # 1. XML Block Match
+    xml_match = re.search(r"<message>\s*(.*?)\s*</message>", content, re.IGNORECASE | re.DOTALL)
+    if xml_match:
+        return xml_match.group(1).strip()
+    
+    # 2. Inline prefix Match
+    inline_match = re.search(r"MESSAGE:\s*(.*?)(?:(?:\n|\r|\s)(?:INTERNAL_THOUGHT|UPDATED_STATS|UPDATED_STATE|EMOTIONAL_STATE|STRATEGIC_INTENT|TECHNIQUES_USED|CONFIDENCE_SCORE)\s*:|$)", content, re.IGNORECASE | re.DOTALL)
+    if inline_match:
+        return inline_match.group(1).strip()
+
+    # 3. Line-by-line filtering fallback
+    lines = []
+    for line in content.splitlines():
+        line = line.strip()
+        if not line: 
+            continue
+        upper = line.upper()
+        if any(upper.startswith(p) for p in ["INTERNAL_THOUGHT:", "UPDATED_STATS:", "UPDATED_STATE:", "EMOTIONAL_STATE:", "STRATEGIC_INTENT:", "TECHNIQUES_USED:"]):
+            continue
+        if upper.startswith("<THOUGHT>") or upper.startswith("</THOUGHT>"):
+            continue
+        if upper.startswith("<STATS>") or upper.startswith("</STATS>"):
+            continue
+        if upper.startswith("<INTENT>") or upper.startswith("</INTENT>"):
+            continue
+        if upper.startswith("<EMOTIONAL_STATE>") or upper.startswith("</EMOTIONAL_STATE>"):
+            continue
+            
+        # Handle <message> tags on single lines
+        if upper.startswith("<MESSAGE>") or upper.startswith("</MESSAGE>"):
+            clean = re.sub(r"</?message>", "", line, flags=re.IGNORECASE).strip()
+            if clean:
+                lines.append(clean)
+            continue
+            
+        # Handle MESSAGE: prefix on single line
+        if upper.startswith("MESSAGE:"):
+            clean = line[8:].strip()
+            if clean:
+                lines.append(clean)
+            continue
+            
+        lines.append(line)
+        
+    return " ".join(lines).strip()
+
+
+def _build_report_styles() -> Dict[str, Optional[ParagraphStyle]]:
+    styles = getSampleStyleSheet()
+    hindi_font_name, _ = configure_pdf_fonts()
+    title_style = ParagraphStyle(
+        "ReportTitle",
+        parent=styles["Title"],
+        fontName="Helvetica-Bold",
+        fontSize=22,
+        leading=26,
+        textColor=colors.HexColor("#0B1A37"),
+        spaceAfter=6,
+    )
+    subtitle_style = ParagraphStyle(
+        "ReportSubTitle",
+        parent=styles["Normal"],
+        fontName="Helvetica",
+        fontSize=9,
+        leading=12,
+        textColor=colors.HexColor("#4A638F"),
+        spaceAfter=10,
+    )
+    section_style = ParagraphStyle(
+        "SectionHeading",
+        parent=styles["Heading2"],
+        fontName="Helvetica-Bold",
+        fontSize=12,
+        leading=14,
+        textColor=colors.HexColor("#1D4A8C"),
+        spaceBefore=8,
+        spaceAfter=6,
+    )
+    body_style = ParagraphStyle(
+        "ReportBody",
+        parent=styles["BodyText"],
+        fontName="Helvetica",
+        fontSize=9.5,
+        leading=13.5,
+        textColor=colors.HexColor("#1C2F52"),
+    )
+    meta_style = ParagraphStyle(
+        "ReportMeta",
+        parent=styles["BodyText"],
+        fontName="Helvetica",
+        fontSize=8.8,
+        leading=12,
+        textColor=colors.HexColor("#4B6087"),
+    )
+    thought_style = ParagraphStyle(
+        "ThoughtStyle",
+        parent=styles["BodyText"],
+        fontSize=8.6,
+        leading=12,
+        textColor=colors.HexColor("#6A7386"),
+        fontName="Helvetica-Oblique",
+        leftIndent=10,
+    )
+    transcript_hindi_style: Optional[ParagraphStyle] = None
+    thought_hindi_style: Optional[ParagraphStyle] = None
+    if hindi_font_name != "Helvetica":
+        transcript_hindi_style = ParagraphStyle(
+            "TranscriptHindi",
+            parent=body_style,
+            fontName=hindi_font_name,
+        )
+        thought_hindi_style = ParagraphStyle(
+            "ThoughtHindi",
+            parent=thought_style,
+            fontName=hindi_font_name,
+        )
+
+    return {
+        "title": title_style,
+        "subtitle": subtitle_style,
+        "section": section_style,
+        "body": body_style,
+        "meta": meta_style,
+        "thought": thought_style,
+        "transcript_hindi": transcript_hindi_style,
+        "thought_hindi": thought_hindi_style,
+    }
+
+
+def _report_styles() -> Dict[str, Optional[ParagraphStyle]]:
+    """Fonts are registered and styles built once per process, not once per report."""
+    global _STYLES
+    if _STYLES is None:
+        _STYLES = _build_report_styles()
+    return _STYLES
+
+
+def report_key(
+    program: Dict[str, Any],
+    persona: Dict[str, Any],
+    transcript: List[Dict[str, Any]],
+    analysis: Dict[str, Any],
+) -> str:
+    canonical = json.dumps(
+        {"program": program, "persona": persona, "transcript": transcript, "analysis": analysis},
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def render_report(
+    path: str,
+    program: Dict[str, Any],
+    persona: Dict[str, Any],
+    transcript: List[Dict[str, Any]],
+    analysis: Dict[str, Any],
+) -> None:
+    """Build the report PDF at `path` (atomically: readers never see a partial file)."""
+    styles = _report_styles()
+    title_style = styles["title"]
+    subtitle_style = styles["subtitle"]
+    section_style = styles["section"]
+    body_style = styles["body"]
+    meta_style = styles["meta"]
+    thought_style = styles["thought"]
+    archetype_id = str(persona.get("archetype_id", "")).strip().lower()
+    use_hindi_transcript = archetype_id == "skeptical_shopper"
+    transcript_hindi_style = styles["transcript_hindi"] if use_hindi_transcript else None
+    thought_hindi_style = styles["thought_hindi"] if use_hindi_transcript else None
+    story: List[Any] = []
+
+    judge = analysis or {}
+    winner = str(judge.get("winner", "no-deal"))
+    commitment = str(judge.get("commitment_signal", "none"))
+    duration_seconds = 0
+    if isinstance(analysis, dict):
+        try:
+            duration_seconds = int(float(analysis.get("duration_seconds", 0)))
+        except Exception:
+            duration_seconds = 0
+    duration_hms = ""
+    if isinstance(analysis, dict):
+        duration_hms = str(analysis.get("duration_hms", "")).strip()
+
+    timestamps: List[datetime] = []
+    for msg in transcript:
+        ts = str((msg or {}).get("timestamp", "")).strip()
+        if not ts:
+            continue
+        try:
+            timestamps.append(datetime.fromisoformat(ts))
+        except Exception:
+            continue
+    if not duration_hms and len(timestamps) >= 2:
+        duration_seconds = max(0, int((max(timestamps) - min(timestamps)).total_seconds()))
+
+    if not duration_hms:
+        hours = duration_seconds // 3600
+        minutes = (duration_seconds % 3600) // 60
+        seconds = duration_seconds % 60
+        duration_hms = f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+
+    commitment_map = {
+        "none": "No Commitment",
+        "soft_commitment": "Exploring Enrollment",
+        "conditional_commitment": "Conditional Yes",
+        "strong_commitment": "Confirmed Enrollment",
+    }
+
+    def _paragraph_text(value: Any, allow_breaks: bool = False) -> str:
+        safe = xml_escape(str(value or ""))
+        return safe.replace("\n", "<br/>") if allow_breaks else safe
+
+    def _make_paragraph(value: Any, primary: ParagraphStyle, devanagari: Optional[ParagraphStyle] = None, allow_breaks: bool = False) -> Paragraph:
+        text = _paragraph_text(value, allow_breaks=allow_breaks)
+        style = primary
+        if devanagari and has_devanagari(str(value or "")):
+            style = devanagari
+        return Paragraph(text, style)
+
+    def card_table(rows: List[List[str]], col_widths: Optional[List[int]] = None) -> Table:
+        table = Table(rows, colWidths=col_widths)
+        table.setStyle(
+            TableStyle(
+                [
+                    ("BACKGROUND", (0, 0), (-1, -1), colors.HexColor("#F4F8FF")),
+                    ("BOX", (0, 0), (-1, -1), 0.8, colors.HexColor("#C1D3F2")),
+                    ("INNERGRID", (0, 0), (-1, -1), 0.4, colors.HexColor("#D7E4FA")),
+                    ("LEFTPADDING", (0, 0), (-1, -1), 8),
+                    ("RIGHTPADDING", (0, 0), (-1, -1), 8),
+                    ("TOPPADDING", (0, 0), (-1, -1), 6),
+                    ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
+                    ("VALIGN", (0, 0), (-1, -1), "TOP"),
+                ]
+            )
+        )
+        return table
+
+    def append_bullets(title: str, items: List[str], fallback_text: str) -> None:
+        story.append(_make_paragraph(title, section_style))
+        if not items:
+            story.append(_make_paragraph(fallback_text, body_style))
+            story.append(Spacer(1, 6))
+            return
+        for item in items:
+            story.append(_make_paragraph(f"- {str(item)}", body_style))
+        story.append(Spacer(1, 6))
+
+    story.append(_make_paragraph("Program Counsellor Report", title_style))
+    # Dated by the session itself, not the render: a cached PDF is served again for the same inputs.
+    if timestamps:
+        story.append(_make_paragraph(f"Session: {max(timestamps).strftime('%Y-%m-%d %H:%M:%S')}", subtitle_style))
+
+    summary_rows = [
+        ["Outcome", winner],
+        ["Duration", duration_hms],
+        ["Final Score", f"{judge.get('negotiation_score', 0)} / 100"],
+        ["Commitment Signal", commitment_map.get(commitment, commitment)],
+        ["Win Probability", f"{judge.get('enrollment_likelihood', 0)}%"],
+        ["Trust Delta", str(judge.get("trust_delta", 0))],
+    ]
+    story.append(_make_paragraph("Outcome Summary", section_style))
+    story.append(card_table(summary_rows, [130, 390]))
+    story.append(Spacer(1, 8))
+    story.append(_make_paragraph(str(judge.get("why", "No summary available.")), body_style))
+    story.append(Spacer(1, 10))
+
+    story.append(_make_paragraph("Persona and Context", section_style))
+    persona_rows = [
+        ["Student", str(persona.get("name", "Unknown"))],
+        ["Persona Type", str(persona.get("persona_type", "n/a"))],
+        ["Career Stage", str(persona.get("career_stage", "n/a"))],
+        ["Risk Tolerance", str(persona.get("risk_tolerance", "n/a"))],
+        ["Program", str(program.get("program_name", "Unknown"))],
+    ]
+    story.append(card_table(persona_rows, [130, 390]))
+    story.append(Spacer(1, 8))
+    story.append(_make_paragraph("Primary Unresolved Objection", section_style))
+    story.append(_make_paragraph(str(judge.get("primary_unresolved_objection", "Not specified")), body_style))
+    story.append(Spacer(1, 8))
+
+    run_history = analysis.get("run_history", []) if isinstance(analysis, dict) else []
+    if isinstance(run_history, list) and len(run_history) > 1:
+        story.append(_make_paragraph("Performance Progression", section_style))
+        progression_rows = [["Run", "Score", "Delta vs Previous", "Delta vs Baseline"]]
+        baseline_score = float(run_history[0].get("score", 0))
+        previous_score = None
+        for idx, run in enumerate(run_history):
+            score = float(run.get("score", 0))
+            delta_prev = "-" if previous_score is None else f"{score - previous_score:+.0f}"
+            delta_base = f"{score - baseline_score:+.0f}"
+            progression_rows.append([f"Run {idx + 1}", f"{score:.0f}", delta_prev, delta_base])
+            previous_score = score
+        progression_table = Table(progression_rows, colWidths=[90, 70, 150, 150])
+        progression_table.setStyle(
+            TableStyle(
+                [
+                    ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#DCEBFF")),
+                    ("TEXTCOLOR", (0, 0), (-1, 0), colors.HexColor("#133A77")),
+                    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+                    ("BACKGROUND", (0, 1), (-1, -1), colors.HexColor("#F7FAFF")),
+                    ("GRID", (0, 0), (-1, -1), 0.5, colors.HexColor("#C9DCF7")),
+                    ("ALIGN", (1, 1), (-1, -1), "CENTER"),
+                    ("LEFTPADDING", (0, 0), (-1, -1), 6),
+                    ("RIGHTPADDING", (0, 0), (-1, -1), 6),
+                    ("TOPPADDING", (0, 0), (-1, -1), 5),
+                    ("BOTTOMPADDING", (0, 0), (-1, -1), 5),
+                ]
+            )
+        )
+        story.append(progression_table)
+        story.append(Spacer(1, 8))
+
+    append_bullets("Key Turning Points", [str(x) for x in judge.get("pivotal_moments", [])], "No pivotal moments captured.")
+    append_bullets("Strengths", [str(x) for x in judge.get("strengths", [])], "No strengths captured.")
+    append_bullets("Mistakes", [str(x) for x in judge.get("mistakes", [])], "No mistakes captured.")
+    append_bullets(
+        "Opportunities and Coaching Insights",
+        [str(x) for x in judge.get("skill_recommendations", [])],
+        "No coaching recommendations captured.",
+    )
+
+    story.append(PageBreak())
+    story.append(_make_paragraph("Conversation Metrics Timeline", section_style))
+    metric_events = judge.get("metric_events", [])
+    if metric_events:
+        metric_rows = [["Round", "Tone", "Event"]]
+        for event in metric_events[-40:]:
+            metric_rows.append(
+                [
+                    str(event.get("round", "-")),
+                    str(event.get("tone", "neutral")),
+                    str(event.get("text", "")).strip()[:120],
+                ]
+            )
+        metric_table = Table(metric_rows, colWidths=[60, 90, 370])
+        metric_table.setStyle(
+            TableStyle(
+                [
+                    ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#E6EFFF")),
+                    ("TEXTCOLOR", (0, 0), (-1, 0), colors.HexColor("#133A77")),
+                    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+                    ("GRID", (0, 0), (-1, -1), 0.45, colors.HexColor("#C9DCF7")),
+                    ("BACKGROUND", (0, 1), (-1, -1), colors.HexColor("#F9FBFF")),
+                    ("VALIGN", (0, 0), (-1, -1), "TOP"),
+                    ("LEFTPADDING", (0, 0), (-1, -1), 6),
+                    ("RIGHTPADDING", (0, 0), (-1, -1), 6),
+                    ("TOPPADDING", (0, 0), (-1, -1), 4),
+                    ("BOTTOMPADDING", (0, 0), (-1, -1), 4),
+                ]
+            )
+        )
+        story.append(metric_table)
+    else:
+        story.append(_make_paragraph("No metric events captured.", body_style))
+    story.append(Spacer(1, 10))
+
+    story.append(_make_paragraph("Transcript", section_style))
+    for msg in transcript:
+        agent = str(msg.get("agent", "")).upper() or "UNKNOWN"
+        rnd = msg.get("round", "-")
+        content = clean_transcript_content(str(msg.get("content", "")))
+        story.append(_make_paragraph(f"Round {rnd} - {agent}", meta_style))
+        thought = str(msg.get("internal_thought", "")).strip()
+        if thought and str(msg.get("agent", "")).lower() == "student":
+            story.append(
+                _make_paragraph(
+                    f"Psychological Analysis: {thought}",
+                    thought_style,
+                    devanagari=thought_hindi_style,
+                )
+            )
+        story.append(
+            _make_paragraph(
+                content,
+                body_style,
+                devanagari=transcript_hindi_style,
+                allow_breaks=True,
+            )
+        )
+        story.append(Spacer(1, 6))
+
+    target = Path(path)
+    fd, tmp_name = tempfile.mkstemp(prefix=".render-", suffix=".tmp", dir=str(target.parent))
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            doc = SimpleDocTemplate(
+                handle,
+                pagesize=letter,
+                title="Program Counsellor Report",
+                leftMargin=30,
+                rightMargin=30,
+                topMargin=26,
+                bottomMargin=26,
+            )
+            doc.build(story)
+        os.replace(tmp_name, target)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def iter_file_chunks(handle: Any, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield an open binary file in chunks and close it at the end (or when the consumer stops early)."""
+    try:
+        while True:
+            chunk = handle.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+    finally:
+        handle.close()
+
+
+class ReportRenderer:
+    def __init__(self, cache_dir: Path, workers: int = 2, max_cached: int = 200) -> None:
+        self.cache_dir = cache_dir
+        self.workers = max(0, int(workers))
+        self.max_cached = max(1, int(max_cached))
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        self._in_flight: Dict[str, "asyncio.Future[Path]"] = {}
+        self._counters: Dict[str, int] = {"hits": 0, "renders": 0, "joined": 0, "errors": 0}
+
+    async def render(
+        self,
+        program: Dict[str, Any],
+        persona: Dict[str, Any],
+        transcript: List[Dict[str, Any]],
+        analysis: Dict[str, Any],
+    ) -> Path:
+        """Return the cached PDF for these inputs, rendering it first if needed."""
+        key = report_key(program, persona, transcript, analysis)
+        path = self.cache_dir / f"{key}.pdf"
+        if await asyncio.to_thread(self._touch, path):
+            self._counters["hits"] += 1
+            return path
+        pending = self._in_flight.get(key)
+        if pending is not None:
+            self._counters["joined"] += 1
+            return await asyncio.shield(pending)
+
+        future: "asyncio.Future[Path]" = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            await self._render_to(path, program, persona, transcript, analysis)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            self._counters["errors"] += 1
+            future.set_exception(exc)
+            # Retrieve it here so a failure nobody joined is not reported again at garbage collection.
+            future.exception()
+            raise
+        finally:
+            self._in_flight.pop(key, None)
+        self._counters["renders"] += 1
+        future.set_result(path)
+        await asyncio.to_thread(self._prune)
+        return path
+
+    async def open_report(
+        self,
+        program: Dict[str, Any],
+        persona: Dict[str, Any],
+        transcript: List[Dict[str, Any]],
+        analysis: Dict[str, Any],
+    ) -> BinaryIO:
+        """Render (or reuse) the report and open it for reading."""
+        path = await self.render(program, persona, transcript, analysis)
+        try:
+            return await asyncio.to_thread(open, path, "rb")
+        except FileNotFoundError:
+            # Pruned by a concurrent render between the cache hit and the open; render it again.
+            path = await self.render(program, persona, transcript, analysis)
+            return await asyncio.to_thread(open, path, "rb")
+
+    def close(self) -> None:
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._counters,
+            "workers": self.workers,
+            "in_flight": len(self._in_flight),
+            "max_cached": self.max_cached,
+        }
+
+    async def _render_to(
+        self,
+        path: Path,
+        program: Dict[str, Any],
+        persona: Dict[str, Any],
+        transcript: List[Dict[str, Any]],
+        analysis: Dict[str, Any],
+    ) -> None:
+        await asyncio.to_thread(self.cache_dir.mkdir, parents=True, exist_ok=True)
+        args = (str(path), dict(program), dict(persona), list(transcript), dict(analysis))
+        if self.workers == 0:
+            await asyncio.to_thread(render_report, *args)
+            return
+        await asyncio.get_running_loop().run_in_executor(self._executor(), render_report, *args)
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                # spawn, not fork: the server process already runs scheduler and trace-sink threads.
+                self._pool = ProcessPoolExecutor(
+                    self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_report_styles,
+                )
+            return self._pool
+
+    @staticmethod
+    def _touch(path: Path) -> bool:
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def _prune(self) -> None:
+        cached = []
+        for item in self.cache_dir.glob("*.pdf"):
+            try:
+                cached.append((item.stat().st_mtime, item))
+            except FileNotFoundError:
+                continue
+        cached.sort(reverse=True)
+        for _, stale in cached[self.max_cached :]:
+            try:
+                stale.unlink()
+            except FileNotFoundError:
+                pass
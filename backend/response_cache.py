@@ -0,0 +1,186 @@
+"""
+Content-addressed cache for structured Gemini responses.
+
+Entries live in a small in-memory LRU tier backed by an optional SQLite tier so
+repeats survive restarts. Values are stored as JSON text, so every hit hands the
+caller a fresh copy it is free to mutate.
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger("negotiation-arena.cache")
+
+
+def parse_ttl_overrides(raw: Optional[str]) -> Dict[str, int]:
+    """Parse "name=seconds,name=seconds" into a TTL mapping, skipping malformed pairs."""
+    overrides: Dict[str, int] = {}
+    for item in str(raw or "").split(","):
+        name, sep, value = item.partition("=")
+        name = name.strip()
+        if not sep or not name:
+            continue
+        try:
+            overrides[name] = max(0, int(value.strip()))
+        except ValueError:
+            logger.warning("Ignoring invalid cache TTL override %r", item)
+    return overrides
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        db_path: Optional[Path],
+        max_memory_entries: int = 512,
+        ttls: Optional[Dict[str, int]] = None,
+        default_ttl: int = 0,
+    ) -> None:
+        self.db_path = db_path
+        self.max_memory_entries = max(1, int(max_memory_entries))
+        self.ttls: Dict[str, int] = dict(ttls or {})
+        self.default_ttl = max(0, int(default_ttl))
+        self._memory: "OrderedDict[str, Tuple[float, str, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._disk_failed = False
+        self._counters: Dict[str, Dict[str, int]] = {}
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        canonical = json.dumps(parts, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def ttl_for(self, namespace: str) -> int:
+        return self.ttls.get(namespace, self.default_ttl)
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, _, payload = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self._count(namespace, "memory_hits")
+                    return json.loads(payload)
+                self._memory.pop(key, None)
+
+            row = self._disk_get(key, now)
+            if row is not None:
+                expires_at, payload = row
+                self._remember(key, expires_at, namespace, payload)
+                self._count(namespace, "disk_hits")
+                return json.loads(payload)
+
+            self._count(namespace, "misses")
+            return None
+
+    def put(self, namespace: str, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        ttl_seconds = self.ttl_for(namespace) if ttl is None else max(0, int(ttl))
+        if ttl_seconds <= 0:
+            return
+        try:
+            payload = json.dumps(value, ensure_ascii=False)
+        except (TypeError, ValueError):
+            logger.warning("Skipping cache store for %s: value is not JSON serializable", namespace)
+            return
+        expires_at = time.time() + ttl_seconds
+        with self._lock:
+            self._remember(key, expires_at, namespace, payload)
+            self._disk_put(key, namespace, payload, expires_at)
+            self._count(namespace, "stores")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            totals = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0}
+            for counters in self._counters.values():
+                for name, value in counters.items():
+                    totals[name] = totals.get(name, 0) + value
+            lookups = totals["memory_hits"] + totals["disk_hits"] + totals["misses"]
+            return {
+                "memory_entries": len(self._memory),
+                "max_memory_entries": self.max_memory_entries,
+                "disk_enabled": self.db_path is not None and not self._disk_failed,
+                "hit_rate": round((totals["memory_hits"] + totals["disk_hits"]) / lookups, 4) if lookups else 0.0,
+                "totals": totals,
+                "by_namespace": {name: dict(counters) for name, counters in self._counters.items()},
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            conn = self._connection()
+            if conn is not None:
+                try:
+                    conn.execute("DELETE FROM responses")
+                    conn.commit()
+                except sqlite3.Error:
+                    logger.exception("Failed to clear response cache at %s", self.db_path)
+
+    def _count(self, namespace: str, name: str) -> None:
+        counters = self._counters.setdefault(namespace, {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0})
+        counters[name] = counters.get(name, 0) + 1
+
+    def _remember(self, key: str, expires_at: float, namespace: str, payload: str) -> None:
+        self._memory[key] = (expires_at, namespace, payload)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        if self.db_path is None or self._disk_failed:
+            return None
+        if self._conn is None:
+            try:
+                self.db_path.parent.mkdir(parents=True, exist_ok=True)
+                conn = sqlite3.connect(str(self.db_path), check_same_thread=False, timeout=5)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS responses ("
+                    "key TEXT PRIMARY KEY, namespace TEXT NOT NULL, value TEXT NOT NULL, "
+                    "expires_at REAL NOT NULL, created_at REAL NOT NULL)"
+                )
+                conn.commit()
+                self._conn = conn
+            except sqlite3.Error:
+                logger.exception("Response cache disk tier unavailable at %s; using memory only", self.db_path)
+                self._disk_failed = True
+                return None
+        return self._conn
+
+    def _disk_get(self, key: str, now: float) -> Optional[Tuple[float, str]]:
+        conn = self._connection()
+        if conn is None:
+            return None
+        try:
+            row = conn.execute("SELECT expires_at, value FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if float(row[0]) <= now:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                conn.commit()
+                return None
+            return float(row[0]), str(row[1])
+        except sqlite3.Error:
+            logger.exception("Response cache disk read failed")
+            return None
+
+    def _disk_put(self, key: str, namespace: str, payload: str, expires_at: float) -> None:
+        conn = self._connection()
+        if conn is None:
+            return
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, namespace, value, expires_at, created_at) VALUES (?, ?, ?, ?, ?)",
+                (key, namespace, payload, expires_at, time.time()),
+            )
+            conn.commit()
+        except sqlite3.Error:
+            logger.exception("Response cache disk write failed")
@@ -0,0 +1,239 @@
+"""
+Bounded in-process store for negotiation sessions.
+
+Sessions expire after `ttl_seconds` without being read, and the least recently
+used ones are evicted once `max_sessions` or the memory budget is exceeded.
+Before a whole session is evicted for memory, cold `last_run` payloads (the full
+transcript kept for reports and retries) are spilled to gzipped JSON on disk;
+`get()` loads them back transparently. Sizes are estimated from the JSON
+encoding when a session is `put()`, so in-place edits to a returned session are
+only re-measured when it is stored again.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger("negotiation-arena.sessions")
+
+SPILLED_FIELD = "last_run"
+
+
+def _json_size(value: Any) -> int:
+    return len(json.dumps(value, ensure_ascii=False, default=str).encode("utf-8"))
+
+
+class _Entry:
+    __slots__ = ("session", "base_bytes", "spill_bytes", "touched_at", "spilled")
+
+    def __init__(self, session: Dict[str, Any], base_bytes: int, spill_bytes: int, touched_at: float) -> None:
+        self.session = session
+        self.base_bytes = base_bytes
+        self.spill_bytes = spill_bytes
+        self.touched_at = touched_at
+        self.spilled = False
+
+    @property
+    def resident_bytes(self) -> int:
+        return self.base_bytes + (0 if self.spilled else self.spill_bytes)
+
+
+class SessionStore:
+    def __init__(
+        self,
+        spill_dir: Optional[Path],
+        ttl_seconds: float = 6 * 3600,
+        max_sessions: int = 1000,
+        memory_budget_bytes: int = 256 * 1024 * 1024,
+        spill_after_seconds: float = 600,
+    ) -> None:
+        self.spill_dir = spill_dir
+        self.ttl_seconds = max(1.0, float(ttl_seconds))
+        self.max_sessions = max(1, int(max_sessions))
+        self.memory_budget_bytes = max(1, int(memory_budget_bytes))
+        self.spill_after_seconds = max(0.0, float(spill_after_seconds))
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._resident_bytes = 0
+        self._lock = threading.RLock()
+        self._spill_dir_ready = False
+        self._counters: Dict[str, int] = {
+            "puts": 0,
+            "hits": 0,
+            "misses": 0,
+            "expired": 0,
+            "evicted": 0,
+            "spills": 0,
+            "rehydrations": 0,
+            "spill_errors": 0,
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, session_id: object) -> bool:
+        with self._lock:
+            entry = self._entries.get(str(session_id))
+            return entry is not None and not self._is_expired(entry, time.time())
+
+    def put(self, session_id: str, session: Dict[str, Any]) -> None:
+        now = time.time()
+        base = {key: value for key, value in session.items() if key != SPILLED_FIELD}
+        entry = _Entry(session, _json_size(base), 0, now)
+        with self._lock:
+            previous = self._entries.pop(session_id, None)
+            if previous is not None:
+                self._resident_bytes -= previous.resident_bytes
+                if previous.spilled and SPILLED_FIELD not in session:
+                    # The caller holds a session whose last run is on disk; keep it there.
+                    entry.spilled = True
+                    entry.spill_bytes = previous.spill_bytes
+                elif previous.spilled:
+                    self._remove_spill_file(session_id)
+            if not entry.spilled and SPILLED_FIELD in session:
+                entry.spill_bytes = _json_size(session[SPILLED_FIELD])
+            self._entries[session_id] = entry
+            self._resident_bytes += entry.resident_bytes
+            self._counters["puts"] += 1
+            self._enforce_limits(now, keep=session_id)
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is not None and self._is_expired(entry, now):
+                self._drop(session_id, "expired")
+                entry = None
+            if entry is None:
+                self._counters["misses"] += 1
+                return None
+            entry.touched_at = now
+            self._entries.move_to_end(session_id)
+            if entry.spilled:
+                self._rehydrate(session_id, entry)
+            self._counters["hits"] += 1
+            self._enforce_limits(now, keep=session_id)
+            return entry.session
+
+    def sweep(self) -> None:
+        """Expire idle sessions and spill cold last runs without waiting for the next put/get."""
+        with self._lock:
+            self._enforce_limits(time.time())
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._counters,
+                "sessions": len(self._entries),
+                "spilled_sessions": sum(1 for entry in self._entries.values() if entry.spilled),
+                "resident_bytes": self._resident_bytes,
+                "memory_budget_bytes": self.memory_budget_bytes,
+                "max_sessions": self.max_sessions,
+                "ttl_seconds": self.ttl_seconds,
+                "spill_enabled": self.spill_dir is not None,
+            }
+
+    def _is_expired(self, entry: _Entry, now: float) -> bool:
+        return now - entry.touched_at > self.ttl_seconds
+
+    def _enforce_limits(self, now: float, keep: Optional[str] = None) -> None:
+        # Entries are kept in access order, so every pass can stop at the first entry that is still warm.
+        while self._entries:
+            session_id, entry = next(iter(self._entries.items()))
+            if not self._is_expired(entry, now):
+                break
+            self._drop(session_id, "expired")
+
+        if self.spill_dir is not None:
+            for session_id, entry in list(self._entries.items()):
+                if session_id != keep and now - entry.touched_at < self.spill_after_seconds:
+                    break
+                if session_id != keep and not entry.spilled and entry.spill_bytes:
+                    self._spill(session_id, entry)
+            if self._resident_bytes > self.memory_budget_bytes:
+                for session_id, entry in list(self._entries.items()):
+                    if self._resident_bytes <= self.memory_budget_bytes:
+                        break
+                    if session_id != keep and not entry.spilled and entry.spill_bytes:
+                        self._spill(session_id, entry)
+
+        for session_id in list(self._entries):
+            if len(self._entries) <= self.max_sessions and self._resident_bytes <= self.memory_budget_bytes:
+                break
+            if session_id != keep:
+                self._drop(session_id, "evicted")
+
+    def _drop(self, session_id: str, reason: str) -> None:
+        entry = self._entries.pop(session_id, None)
+        if entry is None:
+            return
+        self._resident_bytes -= entry.resident_bytes
+        if entry.spilled:
+            self._remove_spill_file(session_id)
+        self._counters[reason] += 1
+
+    def _spill_path(self, session_id: str) -> Path:
+        assert self.spill_dir is not None
+        digest = hashlib.sha256(session_id.encode("utf-8")).hexdigest()
+        return self.spill_dir / f"{digest}.json.gz"
+
+    def _prepare_spill_dir(self) -> None:
+        if self._spill_dir_ready or self.spill_dir is None:
+            return
+        self.spill_dir.mkdir(parents=True, exist_ok=True)
+        # Spill files outlive the process that wrote them; anything older than the TTL is orphaned.
+        cutoff = time.time() - self.ttl_seconds
+        for path in self.spill_dir.glob("*.json.gz"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+            except OSError:
+                pass
+        self._spill_dir_ready = True
+
+    def _spill(self, session_id: str, entry: _Entry) -> None:
+        try:
+            self._prepare_spill_dir()
+            path = self._spill_path(session_id)
+            tmp_path = path.with_name(f"{path.name}.tmp")
+            payload = json.dumps(entry.session[SPILLED_FIELD], ensure_ascii=False, default=str)
+            with gzip.open(tmp_path, "wt", encoding="utf-8") as handle:
+                handle.write(payload)
+            os.replace(tmp_path, path)
+        except Exception:
+            self._counters["spill_errors"] += 1
+            logger.exception("Failed to spill last run of session %s", session_id)
+            return
+        entry.session.pop(SPILLED_FIELD, None)
+        entry.spilled = True
+        self._resident_bytes -= entry.spill_bytes
+        self._counters["spills"] += 1
+
+    def _rehydrate(self, session_id: str, entry: _Entry) -> None:
+        try:
+            with gzip.open(self._spill_path(session_id), "rt", encoding="utf-8") as handle:
+                entry.session[SPILLED_FIELD] = json.load(handle)
+            self._counters["rehydrations"] += 1
+        except Exception:
+            self._counters["spill_errors"] += 1
+            entry.spill_bytes = 0
+            logger.exception("Failed to load spilled last run of session %s; continuing without it", session_id)
+        entry.spilled = False
+        self._resident_bytes += entry.spill_bytes
+        self._remove_spill_file(session_id)
+
+    def _remove_spill_file(self, session_id: str) -> None:
+        if self.spill_dir is None:
+            return
+        try:
+            self._spill_path(session_id).unlink()
+        except FileNotFoundError:
+            pass
+        except OSError:
+            logger.warning("Could not remove spill file for session %s", session_id, exc_info=True)
@@ -0,0 +1,140 @@
+"""
+Incremental parser for tag-formatted agent turns.
+
+Student turns arrive as `<thought>…</thought><stats>…</stats><message>…</message>…`
+split across arbitrary chunk boundaries. `TagStreamParser.feed()` consumes each
+chunk once and returns events: `("message", text)` for spoken text as it
+streams, and `("closed", tag)` when a block finishes. When the stream ends,
+`blocks` holds the stripped content of every tag, so nothing has to rescan the
+full buffer.
+
+Only the first block of each tag is kept, matching the regex extraction it
+replaces. A known opening tag inside an unclosed block implicitly closes that
+block, so a missing `</message>` never leaks later tags into the spoken text.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+KNOWN_TAGS = (
+    "thought",
+    "stats",
+    "message",
+    "emotional_state",
+    "emotion",
+    "intent",
+    "techniques",
+    "confidence",
+    "confidence_score",
+)
+SPOKEN_TAG = "message"
+_MAX_TAG_LEN = max(len(tag) for tag in KNOWN_TAGS) + len("</>")
+
+TagEvent = Tuple[str, str]
+
+
+class TagStreamParser:
+    def __init__(self) -> None:
+        self.blocks: Dict[str, str] = {}
+        self._outside: List[str] = []
+        self._current: Optional[str] = None
+        self._capturing = False
+        self._parts: List[str] = []
+        self._pending = ""
+        self._message_started = False
+        self._held_whitespace = ""
+
+    @property
+    def outside_text(self) -> str:
+        return "".join(self._outside)
+
+    def feed(self, text: str) -> List[TagEvent]:
+        events: List[TagEvent] = []
+        data = self._pending + (text or "")
+        self._pending = ""
+        pos = 0
+        length = len(data)
+        while pos < length:
+            lt = data.find("<", pos)
+            if lt == -1:
+                self._append(data[pos:], events)
+                break
+            if lt > pos:
+                self._append(data[pos:lt], events)
+            gt = data.find(">", lt + 1, lt + _MAX_TAG_LEN + 1)
+            if gt == -1:
+                if length - lt <= _MAX_TAG_LEN and "<" not in data[lt + 1 :]:
+                    # Possibly a tag split across chunks; wait for the rest.
+                    self._pending = data[lt:]
+                    break
+                self._append("<", events)
+                pos = lt + 1
+                continue
+            token = data[lt + 1 : gt].strip().lower()
+            closing = token.startswith("/")
+            name = token[1:].strip() if closing else token
+            if name not in KNOWN_TAGS:
+                self._append("<", events)
+                pos = lt + 1
+                continue
+            if closing:
+                if name == self._current:
+                    self._close(events)
+            else:
+                self._open(name, events)
+            pos = gt + 1
+        return events
+
+    def finish(self) -> List[TagEvent]:
+        """Flush a dangling partial tag and close any block the model left open."""
+        events: List[TagEvent] = []
+        if self._pending:
+            pending, self._pending = self._pending, ""
+            self._append(pending, events)
+        if self._current is not None:
+            self._close(events)
+        return events
+
+    def _open(self, name: str, events: List[TagEvent]) -> None:
+        if self._current == name:
+            return
+        if self._current is not None:
+            self._close(events)
+        self._current = name
+        self._capturing = name not in self.blocks
+        self._parts = []
+
+    def _close(self, events: List[TagEvent]) -> None:
+        name = self._current
+        self._current = None
+        if name is None or not self._capturing:
+            return
+        self.blocks[name] = "".join(self._parts).strip()
+        self._parts = []
+        events.append(("closed", name))
+
+    def _append(self, text: str, events: List[TagEvent]) -> None:
+        if not text:
+            return
+        if self._current is None:
+            self._outside.append(text)
+            return
+        if not self._capturing:
+            return
+        self._parts.append(text)
+        if self._current == SPOKEN_TAG:
+            self._emit_spoken(text, events)
+
+    def _emit_spoken(self, text: str, events: List[TagEvent]) -> None:
+        if not self._message_started:
+            text = text.lstrip()
+            if not text:
+                return
+            self._message_started = True
+        stripped = text.rstrip()
+        if not stripped:
+            # Hold trailing whitespace until more spoken text follows, so the closing tag never
+            # leaves a dangling space or newline in the streamed draft.
+            self._held_whitespace += text
+            return
+        events.append(("message", self._held_whitespace + stripped))
+        self._held_whitespace = text[len(stripped) :]
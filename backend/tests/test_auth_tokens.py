@@ -0,0 +1,93 @@
+import hashlib
+import hmac
+import importlib.util
+import pathlib
+import unittest
+
+
+def _load_module(name, relative_path):
+    repo_root = pathlib.Path(__file__).resolve().parents[2]
+    spec = importlib.util.spec_from_file_location(name, repo_root / "backend" / relative_path)
+    if spec is None or spec.loader is None:
+        raise RuntimeError(f"Unable to load backend/{relative_path} for tests")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+auth_tokens = _load_module("negotiation_auth_tokens", "auth_tokens.py")
+main = _load_module("negotiation_main_auth_tokens", "main.py")
+
+CURRENT_KEY = ("2026a", b"current-signing-secret-0123456789abcdef")
+OLD_KEY = ("2025b", b"previous-signing-secret-0123456789abcdef")
+
+
+class TokenSignerTests(unittest.TestCase):
+    def test_token_verifies_on_any_signer_with_the_same_keys(self):
+        issuing_worker = auth_tokens.TokenSigner([CURRENT_KEY], ttl_seconds=600)
+        other_worker = auth_tokens.TokenSigner([CURRENT_KEY], ttl_seconds=600)
+
+        token = issuing_worker.issue(now=1000)
+
+        self.assertTrue(token.startswith("v1.2026a.1600."))
+        self.assertTrue(other_worker.verify(token, now=1599))
+
+    def test_token_expires_without_server_state(self):
+        signer = auth_tokens.TokenSigner([CURRENT_KEY], ttl_seconds=600)
+        token = signer.issue(now=1000)
+
+        self.assertTrue(signer.verify(token, now=1600))
+        self.assertFalse(signer.verify(token, now=1601))
+
+    def test_tampered_or_malformed_tokens_are_rejected(self):
+        signer = auth_tokens.TokenSigner([CURRENT_KEY], ttl_seconds=600)
+        version, kid, expires_at, nonce, signature = signer.issue(now=1000).split(".")
+
+        extended = ".".join([version, kid, "999999", nonce, signature])
+        self.assertFalse(signer.verify(extended, now=1000))
+        self.assertFalse(signer.verify(".".join([version, "unknown", expires_at, nonce, signature]), now=1000))
+        self.assertFalse(signer.verify("0f1e2d3c4b5a69788796a5b4c3d2e1f0", now=1000))
+        self.assertFalse(signer.verify("v1.2026a.1600.ñonce.sig", now=1000))
+        self.assertFalse(signer.verify("", now=1000))
+
+    def test_rotation_keeps_old_tokens_valid_until_the_key_is_removed(self):
+        before_rotation = auth_tokens.TokenSigner([OLD_KEY], ttl_seconds=600)
+        old_token = before_rotation.issue(now=1000)
+
+        after_rotation = auth_tokens.TokenSigner([CURRENT_KEY, OLD_KEY], ttl_seconds=600)
+        self.assertTrue(after_rotation.verify(old_token, now=1100))
+        self.assertTrue(after_rotation.issue(now=1100).startswith("v1.2026a."))
+
+        old_key_retired = auth_tokens.TokenSigner([CURRENT_KEY], ttl_seconds=600)
+        self.assertFalse(old_key_retired.verify(old_token, now=1100))
+
+    def test_parse_signing_keys_keeps_order_and_skips_malformed_entries(self):
+        keys = auth_tokens.parse_signing_keys("2026a:" + "a" * 40 + ", broken ,bad.kid:" + "b" * 40 + ",2025b:" + "c" * 40)
+        self.assertEqual([kid for kid, _ in keys], ["2026a", "2025b"])
+        self.assertEqual(auth_tokens.parse_signing_keys(""), [])
+
+    def test_fallback_key_is_random_per_process_not_derived_from_the_password(self):
+        first = auth_tokens.ephemeral_signing_key()
+        second = auth_tokens.ephemeral_signing_key()
+        token = auth_tokens.TokenSigner([first], ttl_seconds=600).issue()
+
+        self.assertNotEqual(first, second)
+        self.assertFalse(auth_tokens.TokenSigner([second], ttl_seconds=600).verify(token))
+
+    def test_token_signed_with_the_committed_password_hash_is_rejected(self):
+        # The password hash lives in auth.json in the repo, so it must never feed the signing key.
+        secret = hmac.new(main.PASSWORD_SHA256.encode("utf-8"), b"negotiation-arena auth token", hashlib.sha256).digest()
+        forged_kid = "pw" + hashlib.sha256(secret).hexdigest()[:8]
+        forged = auth_tokens.TokenSigner([(forged_kid, secret)], ttl_seconds=10**9).issue()
+
+        self.assertFalse(main._validate_auth_token(forged))
+
+    def test_main_issues_tokens_that_pass_the_auth_check(self):
+        token = main._issue_auth_token()
+        main._require_auth_token(token)
+        with self.assertRaises(main.HTTPException):
+            main._require_auth_token(token + "x")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import importlib.util
+import pathlib
+import unittest
+
+
+def _load_module(name, relative_path):
+    repo_root = pathlib.Path(__file__).resolve().parents[2]
+    spec = importlib.util.spec_from_file_location(name, repo_root / "backend" / relative_path)
+    if spec is None or spec.loader is None:
+        raise RuntimeError(f"Unable to load backend/{relative_path} for tests")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+early_stop = _load_module("negotiation_early_stop", "early_stop.py")
+
+
+def _state(counsellor_offer=200000, student_offer=150000, close_probability=50, trust_index=55):
+    return {
+        "counsellor_position": {"current_offer": counsellor_offer},
+        "student_position": {"current_offer": student_offer},
+        "negotiation_metrics": {"close_probability": close_probability, "trust_index": trust_index},
+    }
+
+
+def _turn(content="Can you tell me more about placements?"):
+    return {"agent": "student", "content": content}
+
+
+class DetectSignalTests(unittest.TestCase):
+    def test_walk_away_and_commitment_phrases(self):
+        self.assertEqual(early_stop.detect_signal("Sorry, I'm not interested anymore."), early_stop.STOP_WALK_AWAY)
+        self.assertEqual(early_stop.detect_signal("I will look elsewhere then."), early_stop.STOP_WALK_AWAY)
+        self.assertEqual(early_stop.detect_signal("Okay sir, sign me up!"), early_stop.STOP_COMMITMENT)
+        self.assertEqual(early_stop.detect_signal("Fine, I'll enroll today."), early_stop.STOP_COMMITMENT)
+
+    def test_counter_offers_and_conditions_are_not_walk_aways(self):
+        self.assertIsNone(early_stop.detect_signal("I'm not interested in paying 1.5 lakh, can you do 1.2?"))
+        self.assertIsNone(early_stop.detect_signal("I am not interested unless you include placement support."))
+        self.assertIsNone(early_stop.detect_signal("I will pass on the add-on, but what about the base fee?"))
+        self.assertIsNone(early_stop.detect_signal("I'm not interested, can you do 1.2 lakh?"))
+        self.assertIsNone(early_stop.detect_signal("Should I just look elsewhere?"))
+        self.assertIsNone(early_stop.detect_signal("I'll look elsewhere if the EMI stays this high."))
+
+    def test_real_exits_are_walk_aways(self):
+        for text in (
+            "I'm not interested.",
+            "Honestly, I am no longer interested.",
+            "I am not interested in this program anymore.",
+            "Thanks, but I'll pass.",
+            "I'm not going to enroll in this.",
+            "I'm not going to pay for it.",
+            "Let's end this call.",
+            "I'm walking away from this.",
+        ):
+            with self.subTest(text=text):
+                self.assertEqual(early_stop.detect_signal(text), early_stop.STOP_WALK_AWAY)
+
+    def test_conditional_or_negated_commitment_is_not_a_signal(self):
+        self.assertIsNone(early_stop.detect_signal("I'll enroll if you give me the EMI option."))
+        self.assertIsNone(early_stop.detect_signal("I'm not ready to pay this much."))
+        self.assertIsNone(early_stop.detect_signal("What is the placement record?"))
+
+
+class ConvergenceMonitorTests(unittest.TestCase):
+    def test_plateau_needs_window_rounds_without_movement(self):
+        monitor = early_stop.ConvergenceMonitor(window=3, tolerance=2)
+
+        reasons = [monitor.observe(_state(close_probability=50 + (i % 2)), _turn()) for i in range(3)]
+        self.assertEqual(reasons, [None, None, None])
+        self.assertEqual(monitor.observe(_state(close_probability=51), _turn()), early_stop.STOP_PLATEAU)
+
+    def test_offer_movement_or_metric_swings_reset_the_plateau(self):
+        monitor = early_stop.ConvergenceMonitor(window=2, tolerance=2)
+
+        monitor.observe(_state(), _turn())
+        monitor.observe(_state(student_offer=155000), _turn())
+        self.assertIsNone(monitor.observe(_state(student_offer=155000), _turn()))
+        self.assertIsNone(monitor.observe(_state(student_offer=155000, trust_index=70), _turn()))
+
+    def test_signals_and_met_offers_stop_immediately(self):
+        self.assertEqual(
+            early_stop.ConvergenceMonitor().observe(_state(), _turn("It's a deal.")), early_stop.STOP_COMMITMENT
+        )
+        self.assertEqual(
+            early_stop.ConvergenceMonitor().observe(_state(student_offer=200000), _turn()), early_stop.STOP_OFFERS_MET
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
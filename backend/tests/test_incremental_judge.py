@@ -0,0 +1,92 @@
+import asyncio
+import importlib.util
+import pathlib
+import tempfile
+import unittest
+from types import SimpleNamespace
+
+
+def _load_main_module():
+    repo_root = pathlib.Path(__file__).resolve().parents[2]
+    main_path = repo_root / "backend" / "main.py"
+    spec = importlib.util.spec_from_file_location("negotiation_main_incremental_judge", main_path)
+    if spec is None or spec.loader is None:
+        raise RuntimeError("Unable to load backend/main.py for tests")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+main = _load_main_module()
+
+
+class _RecordingJudgeClient:
+    def __init__(self):
+        self.calls = []
+        self.models = SimpleNamespace(generate_content=self._generate_content)
+
+    def _generate_content(self, model, contents, config=None):
+        function_name = config.tools[0].function_declarations[0].name
+        self.calls.append((function_name, contents))
+        args = dict(main.JUDGE_FALLBACK)
+        args.update({"winner": "counsellor", "why": f"call {len(self.calls)}", "enrollment_likelihood": 70})
+        return SimpleNamespace(function_calls=[SimpleNamespace(name=function_name, args=args)], candidates=[])
+
+
+def _state(rounds):
+    messages = []
+    for round_number in range(1, rounds + 1):
+        messages.append({"round": round_number, "agent": "counsellor", "content": f"counsellor line {round_number}"})
+        messages.append({"round": round_number, "agent": "student", "content": f"student line {round_number}"})
+    return {
+        "messages": messages,
+        "persona": {"archetype_id": "skeptical_student"},
+        "deal_status": "ongoing",
+        "negotiation_metrics": {"round": rounds, "trust_index": 50, "concession_score": 20, "close_probability": 45},
+    }
+
+
+class IncrementalJudgeTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self._saved = (main.TRACE_OUTPUT_ROOT, main.RESPONSE_CACHE, main.get_client_and_models)
+        main.TRACE_OUTPUT_ROOT = pathlib.Path(self._tmp.name)
+        main.RESPONSE_CACHE = None
+        self.client = _RecordingJudgeClient()
+        main.get_client_and_models = lambda: (self.client, "negotiation-model", "judge-model")
+
+    def tearDown(self):
+        main.TRACE_OUTPUT_ROOT, main.RESPONSE_CACHE, main.get_client_and_models = self._saved
+        self._tmp.cleanup()
+
+    def test_final_judgement_only_merges_last_round(self):
+        full_state = _state(3)
+
+        async def _run():
+            judge = main.IncrementalJudge(self.client, "judge-model", "ai_vs_ai")
+            for rounds in (1, 2):
+                judge.schedule_update(_state(rounds))
+            return await main._judge_outcome(full_state, judge)
+
+        analysis = asyncio.run(_run())
+        self.assertEqual(
+            [name for name, _ in self.client.calls],
+            ["set_running_judgement", "set_running_judgement", "set_negotiation_judgement"],
+        )
+        final_prompt = self.client.calls[-1][1]
+        self.assertIn("student line 3", final_prompt)
+        self.assertNotIn("student line 2", final_prompt.split("NEW_ROUNDS:")[1])
+        self.assertEqual(set(analysis) - {"negotiation_score"}, set(main.JUDGE_PARAMETERS_SCHEMA["properties"]))
+        self.assertIn("negotiation_score", analysis)
+
+    def test_without_running_assessment_falls_back_to_full_transcript(self):
+        full_state = _state(2)
+        analysis = asyncio.run(main._judge_outcome(full_state, main.IncrementalJudge(self.client, "judge-model", "ai_vs_ai")))
+        self.assertEqual(len(self.client.calls), 1)
+        self.assertEqual(self.client.calls[0][1], main._build_judge_prompt(full_state))
+        self.assertIn("student line 1", self.client.calls[0][1])
+        self.assertEqual(analysis["winner"], "counsellor")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import asyncio
+import importlib.util
+import json
+import os
+import pathlib
+import tempfile
+import unittest
+from unittest import mock
+
+
+def _load_module(name, relative_path):
+    repo_root = pathlib.Path(__file__).resolve().parents[2]
+    spec = importlib.util.spec_from_file_location(name, repo_root / "backend" / relative_path)
+    if spec is None or spec.loader is None:
+        raise RuntimeError(f"Unable to load backend/{relative_path} for tests")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+runner = _load_module("negotiation_lab_runner", "lab/runner.py")
+arena = runner.arena
+
+PROGRAM = {
+    "program_name": "Applied Data Science",
+    "program_fee_inr": "INR 2,50,000",
+    "value_proposition": "Job-ready data science skills",
+    "curriculum_modules": ["SQL", "Machine Learning"],
+    "key_features": ["Capstone projects"],
+}
+
+
+class LabRunnerTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        env = mock.patch.dict(os.environ, {"GEMINI_BACKEND": "mock", "MOCK_GENAI_PROFILE": "instant"})
+        env.start()
+        self.addCleanup(env.stop)
+        names = ("CLIENT", "NEGOTIATION_MODEL_NAME", "JUDGE_MODEL_NAME", "RESPONSE_CACHE", "NEGOTIATION_DEBUG_TRACE")
+        saved = {name: getattr(arena, name) for name in names}
+        self.addCleanup(lambda: [setattr(arena, name, value) for name, value in saved.items()])
+        arena.CLIENT = arena.NEGOTIATION_MODEL_NAME = arena.JUDGE_MODEL_NAME = None
+        arena.RESPONSE_CACHE = None
+        arena.NEGOTIATION_DEBUG_TRACE = False
+
+    def _run_batch(self, **kwargs):
+        writer = runner.ResultsWriter(pathlib.Path(self._tmp.name) / "lab.jsonl")
+
+        async def run():
+            try:
+                return await runner.run_batch(arena.freeze_summary(PROGRAM), writer=writer, **kwargs)
+            finally:
+                writer.close()
+                await arena.PERSONA_POOL.aclose()
+
+        summary = asyncio.run(run())
+        records = [json.loads(line) for line in writer.path.read_text(encoding="utf-8").splitlines()]
+        return summary, records
+
+    def test_batch_writes_one_judged_record_per_session(self):
+        summary, records = self._run_batch(sessions=5, concurrency=3, archetypes=["drifter"], max_rounds=2)
+
+        self.assertEqual(summary["sessions"], 5)
+        self.assertEqual(sorted(record["index"] for record in records), [0, 1, 2, 3, 4])
+        for record in records:
+            self.assertIsNone(record["error"])
+            self.assertIn(record["deal_status"], {"closed", "failed"})
+            self.assertEqual(record["rounds"], 2)
+            self.assertEqual(record["generation_modes"], {"non_stream": 4})
+            self.assertEqual([turn["agent"] for turn in record["transcript"]], ["counsellor", "student"] * 2)
+            self.assertEqual(record["metrics"]["round"], 2)
+
+    def test_failed_session_is_recorded_and_the_batch_continues(self):
+        original = arena._initial_negotiation_state
+        calls = []
+
+        def flaky(*args, **kwargs):
+            calls.append(1)
+            if len(calls) == 1:
+                raise RuntimeError("boom")
+            return original(*args, **kwargs)
+
+        with mock.patch.object(arena, "_initial_negotiation_state", side_effect=flaky):
+            summary, records = self._run_batch(sessions=2, concurrency=1, max_rounds=1)
+
+        self.assertEqual(summary["outcomes"].get("error"), 1)
+        self.assertEqual(records[0]["error"], "RuntimeError: boom")
+        self.assertIsNone(records[1]["error"])
+
+    def test_early_stop_ends_the_session_and_still_judges_it(self):
+        def stop_in_round_two(monitor, state, student_msg):
+            return "plateau" if state["round"] == 2 else None
+
+        with mock.patch.object(arena.ConvergenceMonitor, "observe", stop_in_round_two):
+            summary, records = self._run_batch(sessions=2, concurrency=2, max_rounds=6, early_stop=True)
+
+        self.assertEqual(summary["early_stops"], {"plateau": 2})
+        self.assertEqual(summary["agent_turns"], 8)
+        for record in records:
+            self.assertEqual(record["rounds"], 2)
+            self.assertEqual(record["early_stop"], {"reason": "plateau", "round": 2, "max_rounds": 6})
+            self.assertIn(record["deal_status"], {"closed", "failed"})
+            self.assertIn("negotiation_score", record["analysis"])
+
+    def test_early_stop_is_off_unless_enabled(self):
+        summary, records = self._run_batch(sessions=1, concurrency=1, max_rounds=3, early_stop=False)
+
+        self.assertEqual(summary["early_stops"], {})
+        self.assertEqual(records[0]["rounds"], 3)
+        self.assertIsNone(records[0]["early_stop"])
+
+
+if __name__ == "__main__":
+    unittest.main()
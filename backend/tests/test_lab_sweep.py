@@ -0,0 +1,111 @@
+import asyncio
+import importlib.util
+import json
+import pathlib
+import tempfile
+import unittest
+from unittest import mock
+
+
+def _load_module(name, relative_path):
+    repo_root = pathlib.Path(__file__).resolve().parents[2]
+    spec = importlib.util.spec_from_file_location(name, repo_root / "backend" / relative_path)
+    if spec is None or spec.loader is None:
+        raise RuntimeError(f"Unable to load backend/{relative_path} for tests")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+sweep = _load_module("negotiation_lab_sweep", "lab/sweep.py")
+arena = sweep.arena
+
+PROGRAM = {"program_name": "Applied Data Science", "program_fee_inr": "INR 2,50,000"}
+
+
+class LabSweepTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.root = pathlib.Path(self._tmp.name)
+        (self.root / "program.json").write_text(json.dumps(PROGRAM), encoding="utf-8")
+        self.spec = {
+            "name": "test",
+            "programs": ["program.json"],
+            "archetypes": ["drifter", "skeptical_shopper"],
+            "max_rounds": [2, 4],
+            "retry_mode": [False, True],
+            "replicates": 3,
+        }
+        self.calls = []
+
+    async def _fake_session(self, index, program, archetype_id=None, max_rounds=10, parse_turn=None, previous_analysis=None, persona=None):
+        self.calls.append((archetype_id, max_rounds, previous_analysis is not None))
+        return {
+            "session_id": f"s{len(self.calls)}",
+            "deal_status": "closed",
+            "winner": "counsellor",
+            "analysis": {"negotiation_score": 70},
+            "metrics": {},
+            "persona": persona or {"archetype_id": archetype_id},
+        }
+
+    def _run(self, shard=(0, 1), session=None):
+        ledger = sweep.SweepLedger(self.root / f"ledger-{shard[0]}of{shard[1]}.sqlite3")
+        self.addCleanup(ledger.close)
+        with mock.patch.object(sweep.runner, "run_session", session or self._fake_session):
+            return asyncio.run(sweep.run_sweep(self.spec, self.root, self.root / "sweep", ledger, shard=shard, concurrency=4))
+
+    def test_spec_expands_to_the_full_cross_product_with_stable_ids(self):
+        items = sweep.expand_sweep(self.spec)
+
+        self.assertEqual(len(items), 2 * 2 * 2 * 3)
+        self.assertEqual(len({item.item_id for item in items}), len(items))
+        self.assertEqual([item.item_id for item in items], [item.item_id for item in sweep.expand_sweep(self.spec)])
+        with self.assertRaises(ValueError):
+            sweep.expand_sweep({**self.spec, "archetypes": ["nobody"]})
+
+    def test_shards_partition_the_items(self):
+        items = sweep.expand_sweep(self.spec)
+        shards = [{item.item_id for item in items if item.shard(3) == index} for index in range(3)]
+
+        self.assertEqual(sum(len(shard) for shard in shards), len(items))
+        self.assertEqual(set().union(*shards), {item.item_id for item in items})
+        self.assertEqual(sweep.parse_shard("1/3"), (1, 3))
+        with self.assertRaises(ValueError):
+            sweep.parse_shard("3/3")
+
+    def test_retry_items_run_a_baseline_then_a_retry_with_the_same_persona(self):
+        summary = self._run()
+
+        self.assertEqual(summary["completed_this_run"], 24)
+        self.assertEqual(len(self.calls), 12 + 12 * 2)
+        records = [json.loads(path.read_text()) for path in (self.root / "sweep" / "results").glob("*.json")]
+        retries = [record for record in records if record["sweep"]["retry_mode"]]
+        self.assertEqual(len(retries), 12)
+        self.assertTrue(all(record["baseline"]["negotiation_score"] == 70 for record in retries))
+
+    def test_resume_skips_finished_items_and_requeues_interrupted_ones(self):
+        first = [0]
+
+        async def crash_after_five(*args, **kwargs):
+            first[0] += 1
+            if first[0] > 5:
+                raise KeyboardInterrupt
+            return await self._fake_session(*args, **kwargs)
+
+        self.spec["retry_mode"] = [False]
+        with self.assertRaises(KeyboardInterrupt):
+            self._run(session=crash_after_five)
+        self.calls.clear()
+
+        summary = self._run()
+
+        self.assertEqual(len(list((self.root / "sweep" / "results").glob("*.json"))), 12)
+        self.assertEqual(len(self.calls), summary["completed_this_run"])
+        self.assertLessEqual(summary["completed_this_run"], 12 - 5)
+        self.assertEqual(summary["ledger"], {"done": 12})
+
+
+if __name__ == "__main__":
+    unittest.main()
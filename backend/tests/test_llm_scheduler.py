@@ -0,0 +1,121 @@
+import asyncio
+import importlib.util
+import pathlib
+import threading
+import unittest
+
+
+def _load_module(name, relative_path):
+    repo_root = pathlib.Path(__file__).resolve().parents[2]
+    spec = importlib.util.spec_from_file_location(name, repo_root / "backend" / relative_path)
+    if spec is None or spec.loader is None:
+        raise RuntimeError(f"Unable to load backend/{relative_path} for tests")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+llm_scheduler = _load_module("negotiation_llm_scheduler", "llm_scheduler.py")
+
+
+def _scheduler(rpm=6000, burst=100, max_in_flight=1, overrides=None):
+    limits = llm_scheduler.ModelLimits(requests_per_minute=rpm, burst=burst, max_in_flight=max_in_flight)
+    return llm_scheduler.LLMScheduler(limits, overrides)
+
+
+class LLMSchedulerTests(unittest.TestCase):
+    def test_waiters_are_served_by_lane_priority(self):
+        scheduler = _scheduler(max_in_flight=1)
+        order = []
+
+        async def _worker(lane):
+            async with scheduler.slot("m", lane):
+                order.append(lane)
+                await asyncio.sleep(0)
+
+        async def _run():
+            first = await scheduler.acquire("m", llm_scheduler.LANE_SETUP)
+            tasks = [
+                asyncio.create_task(_worker(lane))
+                for lane in (
+                    llm_scheduler.LANE_BACKGROUND,
+                    llm_scheduler.LANE_JUDGE,
+                    llm_scheduler.LANE_INTERACTIVE,
+                    llm_scheduler.LANE_COPILOT,
+                )
+            ]
+            await asyncio.sleep(0)
+            self.assertEqual(scheduler.snapshot()["models"]["m"]["queue_depth"], 4)
+            scheduler.release(first)
+            await asyncio.gather(*tasks)
+
+        asyncio.run(_run())
+        self.assertEqual(order, ["interactive", "copilot", "judge", "background"])
+
+    def test_in_flight_cap_is_respected(self):
+        scheduler = _scheduler(max_in_flight=2)
+        peak = {"active": 0, "max": 0}
+
+        async def _worker():
+            async with scheduler.slot("m"):
+                peak["active"] += 1
+                peak["max"] = max(peak["max"], peak["active"])
+                await asyncio.sleep(0.01)
+                peak["active"] -= 1
+
+        async def _run():
+            await asyncio.gather(*[_worker() for _ in range(6)])
+
+        asyncio.run(_run())
+        self.assertEqual(peak["max"], 2)
+        self.assertEqual(scheduler.snapshot()["lanes"]["interactive"]["granted"], 6)
+
+    def test_token_bucket_delays_requests_beyond_burst(self):
+        scheduler = _scheduler(rpm=600, burst=1, max_in_flight=4)
+
+        async def _run():
+            first = await scheduler.acquire("m")
+            self.assertIsNone(scheduler.try_acquire("m"))
+            second = await scheduler.acquire("m")
+            scheduler.release(first)
+            scheduler.release(second)
+            return second
+
+        second = asyncio.run(_run())
+        # 600 rpm refills one token every 100ms.
+        self.assertGreaterEqual(second.wait_ms, 50)
+
+    def test_hold_from_worker_thread_waits_on_bound_loop(self):
+        scheduler = _scheduler(max_in_flight=1)
+        seen = []
+
+        async def _run():
+            scheduler.bind_loop(asyncio.get_running_loop())
+            blocker = await scheduler.acquire("m", llm_scheduler.LANE_SETUP)
+            started = threading.Event()
+
+            def _call():
+                started.set()
+                with scheduler.hold("m", llm_scheduler.LANE_BACKGROUND) as ticket:
+                    seen.append(ticket.lane)
+
+            task = asyncio.create_task(asyncio.to_thread(_call))
+            await asyncio.to_thread(started.wait)
+            await asyncio.sleep(0.02)
+            self.assertEqual(seen, [])
+            scheduler.release(blocker)
+            await task
+
+        asyncio.run(_run())
+        self.assertEqual(seen, ["background"])
+
+    def test_parse_model_limits_applies_overrides(self):
+        default = llm_scheduler.ModelLimits(requests_per_minute=300, burst=20, max_in_flight=16)
+        parsed = llm_scheduler.parse_model_limits("gemini-pro=60:4, bad, gemini-flash=:8", default)
+        self.assertEqual(parsed["gemini-pro"], llm_scheduler.ModelLimits(60.0, 20, 4))
+        self.assertEqual(parsed["gemini-flash"], llm_scheduler.ModelLimits(300, 20, 8))
+        self.assertNotIn("bad", parsed)
+
+
+if __name__ == "__main__":
+    unittest.main()
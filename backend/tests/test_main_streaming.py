@@ -0,0 +1,182 @@
+import asyncio
+import importlib.util
+import pathlib
+import tempfile
+import unittest
+from types import SimpleNamespace
+
+
+def _load_main_module():
+    repo_root = pathlib.Path(__file__).resolve().parents[2]
+    main_path = repo_root / "backend" / "main.py"
+    spec = importlib.util.spec_from_file_location("negotiation_main_streaming", main_path)
+    if spec is None or spec.loader is None:
+        raise RuntimeError("Unable to load backend/main.py for tests")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+main = _load_main_module()
+
+
+class _FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+        self.client_state = SimpleNamespace(name="CONNECTED")
+
+    async def send_json(self, payload):
+        self.sent.append(payload)
+
+
+class _FakeAsyncModels:
+    def __init__(self, chunks, stall_after=None):
+        self.chunks = chunks
+        self.stall_after = stall_after
+        self.closed = False
+
+    async def generate_content_stream(self, model, contents, config=None):
+        async def _gen():
+            try:
+                for idx, text in enumerate(self.chunks):
+                    if self.stall_after is not None and idx >= self.stall_after:
+                        await asyncio.sleep(3600)
+                    yield SimpleNamespace(text=text, candidates=[])
+            finally:
+                self.closed = True
+
+        return _gen()
+
+
+class _FakeClient:
+    def __init__(self, chunks, stall_after=None):
+        self.aio = SimpleNamespace(models=_FakeAsyncModels(chunks, stall_after))
+
+
+class _SlowFirstCallModels:
+    """First stream stalls before its first chunk; later calls answer immediately."""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.calls = 0
+        self.closed = []
+
+    async def generate_content_stream(self, model, contents, config=None):
+        call_index = self.calls
+        self.calls += 1
+
+        async def _gen():
+            try:
+                if call_index == 0:
+                    await asyncio.sleep(3600)
+                for text in self.chunks:
+                    yield SimpleNamespace(text=text, candidates=[])
+            finally:
+                self.closed.append(call_index)
+
+        return _gen()
+
+
+class StreamAgentResponseTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self._trace_root = main.TRACE_OUTPUT_ROOT
+        self._console_log = main.NEGOTIATION_STREAM_CONSOLE_LOG
+        main.TRACE_OUTPUT_ROOT = pathlib.Path(self._tmp.name)
+        main.NEGOTIATION_STREAM_CONSOLE_LOG = False
+
+    def tearDown(self):
+        main.TRACE_OUTPUT_ROOT = self._trace_root
+        main.NEGOTIATION_STREAM_CONSOLE_LOG = self._console_log
+        self._tmp.cleanup()
+
+    def _run(self, client, agent="counsellor"):
+        websocket = _FakeWebSocket()
+        msg = asyncio.run(
+            main._stream_agent_response(
+                websocket,
+                client,
+                "test-model",
+                "prompt",
+                agent,
+                1,
+                "msg-1",
+                False,
+                "RETRY_CONTEXT",
+                mode="ai_vs_ai",
+            )
+        )
+        return msg, websocket
+
+    def test_async_stream_forwards_chunks_and_closes_stream(self):
+        client = _FakeClient(["Hello there. ", "How can I help?"])
+        msg, websocket = self._run(client)
+        chunks = [p["data"]["text"] for p in websocket.sent if p["type"] == "stream_chunk"]
+        self.assertEqual(chunks, ["Hello there. ", "How can I help?"])
+        self.assertEqual(msg["content"], "Hello there. How can I help?")
+        self.assertEqual(msg["generation_mode"], "stream")
+        self.assertTrue(client.aio.models.closed)
+
+    def test_idle_timeout_cancels_stream_and_falls_back_to_structured_retry(self):
+        client = _FakeClient(["Partial"], stall_after=0)
+        original_timeout = main.NEGOTIATION_STREAM_IDLE_TIMEOUT_SECONDS
+        original_retry = main._retry_with_structured_json
+        original_samples = list(main.STREAM_TTFT_SAMPLES_MS)
+        main.NEGOTIATION_STREAM_IDLE_TIMEOUT_SECONDS = 0.05
+        main._retry_with_structured_json = lambda **kwargs: {"message": "Recovered reply."}
+        main.STREAM_TTFT_SAMPLES_MS.clear()
+        try:
+            msg, _ = self._run(client)
+            samples = list(main.STREAM_TTFT_SAMPLES_MS)
+        finally:
+            main.NEGOTIATION_STREAM_IDLE_TIMEOUT_SECONDS = original_timeout
+            main._retry_with_structured_json = original_retry
+            main.STREAM_TTFT_SAMPLES_MS.clear()
+            main.STREAM_TTFT_SAMPLES_MS.extend(original_samples)
+        self.assertEqual(msg["generation_mode"], "structured_retry")
+        self.assertEqual(msg["content"], "Recovered reply.")
+        self.assertTrue(client.aio.models.closed)
+        # The timed-out start still enters the TTFT window that sets the hedge delay.
+        self.assertEqual(len(samples), 1)
+        self.assertGreaterEqual(samples[0], 50)
+
+    def test_slow_first_chunk_is_hedged_and_loser_cancelled(self):
+        models = _SlowFirstCallModels(["Hedged reply."])
+        client = SimpleNamespace(aio=SimpleNamespace(models=models))
+        saved = (
+            main.NEGOTIATION_STREAM_HEDGE_ENABLED,
+            main.NEGOTIATION_STREAM_HEDGE_MIN_SAMPLES,
+            main.NEGOTIATION_STREAM_HEDGE_MIN_DELAY_MS,
+            list(main.STREAM_TTFT_SAMPLES_MS),
+            dict(main.STREAM_HEDGE_STATS),
+        )
+        main.NEGOTIATION_STREAM_HEDGE_ENABLED = True
+        main.NEGOTIATION_STREAM_HEDGE_MIN_SAMPLES = 3
+        main.NEGOTIATION_STREAM_HEDGE_MIN_DELAY_MS = 50
+        main.STREAM_TTFT_SAMPLES_MS.clear()
+        main.STREAM_TTFT_SAMPLES_MS.extend([20.0, 30.0, 40.0])
+        try:
+            msg, websocket = self._run(client)
+            stats = dict(main.STREAM_HEDGE_STATS)
+        finally:
+            (
+                main.NEGOTIATION_STREAM_HEDGE_ENABLED,
+                main.NEGOTIATION_STREAM_HEDGE_MIN_SAMPLES,
+                main.NEGOTIATION_STREAM_HEDGE_MIN_DELAY_MS,
+                samples,
+                hedge_stats,
+            ) = saved
+            main.STREAM_TTFT_SAMPLES_MS.clear()
+            main.STREAM_TTFT_SAMPLES_MS.extend(samples)
+            main.STREAM_HEDGE_STATS.update(hedge_stats)
+        self.assertEqual(msg["content"], "Hedged reply.")
+        self.assertEqual(msg["generation_mode"], "stream")
+        self.assertEqual(models.calls, 2)
+        self.assertEqual(sorted(models.closed), [0, 1])
+        self.assertEqual(stats["hedge_wins"] - saved[4]["hedge_wins"], 1)
+        chunks = [p["data"]["text"] for p in websocket.sent if p["type"] == "stream_chunk"]
+        self.assertEqual(chunks, ["Hedged reply."])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import importlib.util
+import pathlib
+import unittest
+
+
+def _load_module(name, relative_path):
+    repo_root = pathlib.Path(__file__).resolve().parents[2]
+    spec = importlib.util.spec_from_file_location(name, repo_root / "backend" / relative_path)
+    if spec is None or spec.loader is None:
+        raise RuntimeError(f"Unable to load backend/{relative_path} for tests")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+metrics_registry = _load_module("negotiation_metrics_registry", "metrics_registry.py")
+
+
+class MetricsRegistryTests(unittest.TestCase):
+    def test_counter_and_gauge_render_per_label_set(self):
+        registry = metrics_registry.MetricsRegistry()
+        turns = registry.counter("turns_total", "Agent turns.", ("agent",))
+        active = registry.gauge("active_sessions", "Open sockets.", ("mode",))
+
+        turns.labels("student").inc()
+        turns.labels("student").inc(2)
+        turns.labels("counsellor").inc()
+        active.labels("ai_vs_ai").inc()
+        active.labels("ai_vs_ai").inc()
+        active.labels("ai_vs_ai").dec()
+
+        text = registry.render()
+        self.assertIn("# HELP turns_total Agent turns.\n# TYPE turns_total counter\n", text)
+        self.assertIn('turns_total{agent="counsellor"} 1\n', text)
+        self.assertIn('turns_total{agent="student"} 3\n', text)
+        self.assertIn("# TYPE active_sessions gauge\n", text)
+        self.assertIn('active_sessions{mode="ai_vs_ai"} 1\n', text)
+        self.assertTrue(text.endswith("\n"))
+
+    def test_histogram_buckets_are_cumulative(self):
+        registry = metrics_registry.MetricsRegistry()
+        latency = registry.histogram("ttft_seconds", "TTFT.", ("agent",), buckets=(0.1, 1.0))
+
+        for value in (0.05, 0.1, 0.5, 3.0):
+            latency.labels("student").observe(value)
+
+        lines = registry.render().splitlines()
+        self.assertIn('ttft_seconds_bucket{agent="student",le="0.1"} 2', lines)
+        self.assertIn('ttft_seconds_bucket{agent="student",le="1"} 3', lines)
+        self.assertIn('ttft_seconds_bucket{agent="student",le="+Inf"} 4', lines)
+        self.assertIn('ttft_seconds_sum{agent="student"} 3.65', lines)
+        self.assertIn('ttft_seconds_count{agent="student"} 4', lines)
+
+    def test_unlabelled_metrics_and_label_validation(self):
+        registry = metrics_registry.MetricsRegistry()
+        sends = registry.histogram("ws_send_seconds", "Frame writes.", buckets=(0.01,))
+        sends.observe(0.002)
+        self.assertIn('ws_send_seconds_bucket{le="0.01"} 1', registry.render())
+
+        labelled = registry.counter("fallbacks_total", "Fallbacks.", ("agent",))
+        with self.assertRaises(ValueError):
+            labelled.labels()
+        with self.assertRaises(ValueError):
+            registry.counter("fallbacks_total", "Duplicate.")
+
+    def test_label_values_are_escaped(self):
+        registry = metrics_registry.MetricsRegistry()
+        calls = registry.counter("calls_total", "Calls.", ("function",))
+        calls.labels('say "hi"\\\n').inc()
+
+        self.assertIn('calls_total{function="say \\"hi\\"\\\\\\n"} 1', registry.render())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import asyncio
+import importlib.util
+import os
+import pathlib
+import tempfile
+import unittest
+from unittest import mock
+
+
+def _load_module(name, relative_path):
+    repo_root = pathlib.Path(__file__).resolve().parents[2]
+    spec = importlib.util.spec_from_file_location(name, repo_root / "backend" / relative_path)
+    if spec is None or spec.loader is None:
+        raise RuntimeError(f"Unable to load backend/{relative_path} for tests")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+mock_genai = _load_module("negotiation_mock_genai", "mock_genai.py")
+main = _load_module("negotiation_main_mock_genai", "main.py")
+
+
+class _FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+
+        class _State:
+            name = "CONNECTED"
+
+        self.client_state = _State()
+
+    async def send_json(self, payload):
+        self.sent.append(payload)
+
+
+def _instant_client(**overrides):
+    profile = mock_genai.MOCK_LATENCY_PROFILES["instant"]
+    for key, value in overrides.items():
+        profile = mock_genai.replace(profile, **{key: value})
+    return mock_genai.MockGenaiClient(profile, seed=7)
+
+
+class MockGenaiTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self._saved = (main.TRACE_OUTPUT_ROOT, main.RESPONSE_CACHE, main.NEGOTIATION_STREAM_CONSOLE_LOG)
+        main.TRACE_OUTPUT_ROOT = pathlib.Path(self._tmp.name)
+        main.RESPONSE_CACHE = None
+        main.NEGOTIATION_STREAM_CONSOLE_LOG = False
+
+    def tearDown(self):
+        main.TRACE_OUTPUT_ROOT, main.RESPONSE_CACHE, main.NEGOTIATION_STREAM_CONSOLE_LOG = self._saved
+        self._tmp.cleanup()
+
+    def test_structured_call_returns_schema_valid_args(self):
+        schema = main.JUDGE_PARAMETERS_SCHEMA
+        parsed = main._call_function_json(
+            client=_instant_client(),
+            model_name="mock-gemini",
+            prompt="judge this",
+            function_name="set_negotiation_judgement",
+            function_description="Return structured judgement for a negotiation run.",
+            parameters_schema=schema,
+            fallback={},
+        )
+        self.assertEqual(set(parsed), set(schema["required"]))
+        self.assertIn(parsed["commitment_signal"], schema["properties"]["commitment_signal"]["enum"])
+        self.assertIsInstance(parsed["strengths"], list)
+        self.assertIsInstance(parsed["enrollment_likelihood"], float)
+
+    def test_student_stream_is_tag_formatted_and_deterministic(self):
+        prompt = "ROLE: student\n<thought>raw</thought>\n<message>spoken response</message>"
+
+        def _run():
+            websocket = _FakeWebSocket()
+            msg = asyncio.run(
+                main._stream_agent_response(
+                    websocket, _instant_client(), "mock-gemini", prompt, "student", 1, "m1", False, "", mode="ai_vs_ai"
+                )
+            )
+            return msg, websocket
+
+        first, websocket = _run()
+        second, _ = _run()
+        self.assertEqual(first["generation_mode"], "stream")
+        self.assertTrue(first["content"])
+        self.assertNotIn("<message>", first["content"])
+        self.assertIn("skepticism_level", first["updated_stats"])
+        self.assertGreater(len([p for p in websocket.sent if p["type"] == "stream_chunk"]), 1)
+        self.assertEqual(first["content"], second["content"])
+
+    def test_error_rate_raises_server_error(self):
+        client = _instant_client(error_rate=1.0)
+        with self.assertRaises(mock_genai.errors.ServerError):
+            client.models.generate_content(model="mock-gemini", contents="hello")
+
+    def test_mock_backend_never_uses_the_real_model_names(self):
+        env = {"GEMINI_BACKEND": "mock", "GEMINI_MODEL": "gemini-2.5-flash", "GEMINI_JUDGE_MODEL": "gemini-2.5-pro"}
+        with mock.patch.dict(os.environ, env):
+            _, negotiation_model, judge_model = main._configure_models()
+        self.assertEqual((negotiation_model, judge_model), (mock_genai.MOCK_MODEL_NAME, mock_genai.MOCK_MODEL_NAME))
+
+
+if __name__ == "__main__":
+    unittest.main()
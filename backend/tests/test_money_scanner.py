@@ -0,0 +1,102 @@
+import importlib.util
+import pathlib
+import unittest
+
+
+def _load_module(name, relative_path):
+    repo_root = pathlib.Path(__file__).resolve().parents[2]
+    spec = importlib.util.spec_from_file_location(name, repo_root / "backend" / relative_path)
+    if spec is None or spec.loader is None:
+        raise RuntimeError(f"Unable to load backend/{relative_path} for tests")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+money_scanner = _load_module("negotiation_money_scanner", "money_scanner.py")
+main = _load_module("negotiation_main_money_scanner", "main.py")
+
+
+def _metrics_state(counsellor_offer=150000, student_offer=90000):
+    return {
+        "counsellor_position": {"current_offer": counsellor_offer, "floor_offer": 120000, "target_offer": 150000},
+        "student_position": {"current_offer": student_offer, "budget": 150000},
+        "negotiation_metrics": {
+            "concession_count_counsellor": 0,
+            "concession_count_student": 0,
+            "concession_score": 0,
+            "tone_escalation": 20,
+            "trust_index": 50,
+            "objection_intensity": 40,
+            "close_probability": 40,
+            "sentiment_indicator": "positive",
+        },
+        "persona": {"primary_objections": []},
+        "student_inner_state": {},
+    }
+
+
+class MoneyScannerTests(unittest.TestCase):
+    def test_candidates_are_typed_with_spans(self):
+        text = "The listed price is ₹1,50,000, or 1.5 lakh, about $1,800. Discount of Rs. 10,000 today."
+        scan = money_scanner.scan_amounts(text)
+
+        by_unit = {(c.unit, c.value): c for c in scan.candidates}
+        inr = by_unit[(money_scanner.UNIT_INR, 150000)]
+        self.assertTrue(inr.currency_marked)
+        self.assertTrue(inr.is_reference)
+        self.assertEqual(text.lower()[inr.span[0] : inr.span[1]], "₹1,50,000")
+        self.assertIn((money_scanner.UNIT_LAKH, 150000), by_unit)
+        self.assertIn((money_scanner.UNIT_USD, 1800), by_unit)
+        discount = by_unit[(money_scanner.UNIT_INR, 10000)]
+        self.assertTrue(discount.is_discount)
+        self.assertFalse(discount.is_reference)
+        self.assertTrue(scan.has_reference_phrase)
+        self.assertEqual(scan.discount_value(), 10000)
+
+    def test_offer_values_match_previous_extraction_rules(self):
+        self.assertEqual(money_scanner.scan_amounts("I can do 95,000").offer_values(), [95000])
+        self.assertEqual(money_scanner.scan_amounts("maybe 4000 or 2026").offer_values(), [])
+        self.assertEqual(money_scanner.scan_amounts("₹500 deposit").offer_values(), [500])
+        self.assertEqual(money_scanner.scan_amounts("2 L max").offer_values(), [200000])
+        self.assertEqual(money_scanner.scan_amounts("call 98765432101234").offer_values(), [])
+        # "rs" inside a word is not a currency marker.
+        self.assertEqual(money_scanner.scan_amounts("yours 2000").offer_values(), [])
+
+    def test_listed_amount_prefers_lakh_then_currency_then_generic(self):
+        self.assertEqual(main.extract_inr_amount("INR 1,20,000 or 3.5 Lakhs"), 350000)
+        self.assertEqual(main.extract_inr_amount("Rs. 85,000 (was 99999)"), 85000)
+        self.assertEqual(main.extract_inr_amount("Fee 1,10,000 + 18% GST"), 110000)
+        self.assertEqual(main.extract_inr_amount("Fee 1200"), 1200)
+        self.assertEqual(main.extract_inr_amount("Fee on request"), 4500)
+
+    def test_update_metrics_applies_discount_as_relative_offer(self):
+        state = _metrics_state()
+        main._update_metrics(
+            state,
+            {"content": "I can offer a discount of ₹20,000 on the fee."},
+            {"content": "Okay, I will think.", "emotional_state": "calm"},
+        )
+        self.assertEqual(state["counsellor_position"]["current_offer"], 130000)
+        self.assertEqual(state["negotiation_metrics"]["concession_count_counsellor"], 1)
+
+    def test_update_metrics_ignores_student_quoting_the_listed_price(self):
+        state = _metrics_state()
+        main._update_metrics(
+            state,
+            {"content": "The program is worth it."},
+            {"content": "The listed price of ₹1,50,000 is too much.", "emotional_state": "calm"},
+        )
+        self.assertEqual(state["student_position"]["current_offer"], 90000)
+
+        main._update_metrics(
+            state,
+            {"content": "The program is worth it."},
+            {"content": "Fine, I can stretch to ₹1,00,000.", "emotional_state": "calm"},
+        )
+        self.assertEqual(state["student_position"]["current_offer"], 100000)
+        self.assertEqual(state["negotiation_metrics"]["concession_count_student"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+import asyncio
+import importlib.util
+import pathlib
+import threading
+import unittest
+
+
+def _load_module(name, relative_path):
+    repo_root = pathlib.Path(__file__).resolve().parents[2]
+    spec = importlib.util.spec_from_file_location(name, repo_root / "backend" / relative_path)
+    if spec is None or spec.loader is None:
+        raise RuntimeError(f"Unable to load backend/{relative_path} for tests")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+persona_pool = _load_module("negotiation_persona_pool", "persona_pool.py")
+
+PROGRAM = {"program_name": "Applied Data Science", "program_fee_inr": "INR 2,50,000"}
+
+
+class _Factory:
+    def __init__(self, fail_for=()):
+        self.calls = []
+        self.fail_for = set(fail_for)
+        self._lock = threading.Lock()
+
+    def __call__(self, program, archetype_id):
+        with self._lock:
+            self.calls.append(archetype_id)
+            number = len(self.calls)
+        if archetype_id in self.fail_for:
+            raise RuntimeError("model unavailable")
+        return {"name": f"Persona {number}", "archetype_id": archetype_id}
+
+
+async def _settle(pool):
+    while pool.stats()["in_flight"]:
+        await asyncio.sleep(0.01)
+
+
+class PersonaPoolTests(unittest.TestCase):
+    def test_primed_slots_serve_hits_and_refill_after_take(self):
+        factory = _Factory()
+        pool = persona_pool.PersonaPool(factory, depth=2)
+
+        async def run():
+            pool.prime(PROGRAM, ["drifter", "fomo_victim"])
+            await _settle(pool)
+            self.assertEqual(pool.stats()["depth_by_archetype"], {"drifter": 2, "fomo_victim": 2})
+
+            persona = pool.take(dict(PROGRAM), "drifter")
+            self.assertEqual(persona["archetype_id"], "drifter")
+            await _settle(pool)
+            return pool.stats()
+
+        stats = asyncio.run(run())
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["hit_rate"], 1.0)
+        self.assertEqual(stats["depth_by_archetype"]["drifter"], 2)
+        self.assertEqual(len(factory.calls), 5)
+
+    def test_miss_refills_the_slot_so_the_next_take_hits(self):
+        factory = _Factory()
+        pool = persona_pool.PersonaPool(factory, depth=1)
+
+        async def run():
+            self.assertIsNone(pool.take(PROGRAM, "drifter"))
+            await _settle(pool)
+            persona = pool.take(PROGRAM, "drifter")
+            await _settle(pool)
+            return persona
+
+        self.assertEqual(asyncio.run(run())["archetype_id"], "drifter")
+        self.assertEqual((pool.stats()["misses"], pool.stats()["hits"]), (1, 1))
+        self.assertEqual(factory.calls, ["drifter", "drifter"])
+
+    def test_refill_errors_are_counted_and_concurrency_is_capped(self):
+        active = [0, 0]
+        lock = threading.Lock()
+        gate = threading.Event()
+
+        def slow(program, archetype_id):
+            with lock:
+                active[0] += 1
+                active[1] = max(active[1], active[0])
+            gate.wait(1)
+            with lock:
+                active[0] -= 1
+            if archetype_id == "drifter":
+                raise RuntimeError("model unavailable")
+            return {"archetype_id": archetype_id}
+
+        pool = persona_pool.PersonaPool(slow, depth=2, max_concurrent_refills=2)
+
+        async def run():
+            pool.prime(PROGRAM, ["drifter", "fomo_victim", "stagnant_pro"])
+            await asyncio.sleep(0.1)
+            gate.set()
+            await _settle(pool)
+
+        asyncio.run(run())
+        stats = pool.stats()
+        self.assertEqual(active[1], 2)
+        self.assertEqual(stats["refill_errors"], 2)
+        self.assertEqual(stats["ready_personas"], 4)
+
+    def test_least_recently_used_program_is_evicted(self):
+        pool = persona_pool.PersonaPool(_Factory(), depth=1, max_programs=1)
+
+        async def run():
+            pool.prime(PROGRAM, ["drifter"])
+            pool.prime({"program_name": "Cloud Bootcamp"}, ["drifter"])
+            await _settle(pool)
+
+        asyncio.run(run())
+        stats = pool.stats()
+        self.assertEqual((stats["programs"], stats["evicted"], stats["ready_personas"]), (1, 1, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import asyncio
+import gc
+import importlib.util
+import json
+import pathlib
+import unittest
+from unittest import mock
+
+
+def _load_module(name, relative_path):
+    repo_root = pathlib.Path(__file__).resolve().parents[2]
+    spec = importlib.util.spec_from_file_location(name, repo_root / "backend" / relative_path)
+    if spec is None or spec.loader is None:
+        raise RuntimeError(f"Unable to load backend/{relative_path} for tests")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+program_summaries = _load_module("negotiation_program_summaries", "program_summaries.py")
+main = _load_module("negotiation_main_program_summaries", "main.py")
+
+PAGE_TEXT = "Applied Data Science bootcamp. " * 20
+
+
+class FrozenSummaryTests(unittest.TestCase):
+    def test_frozen_summary_rejects_edits_but_serializes(self):
+        summary = program_summaries.freeze_summary({"program_name": "DS", "curriculum_modules": ["SQL", "ML"]})
+        with self.assertRaises(TypeError):
+            summary["program_name"] = "Other"
+        with self.assertRaises(TypeError):
+            summary.update(program_name="Other")
+        self.assertEqual(summary["curriculum_modules"], ("SQL", "ML"))
+        self.assertEqual(json.loads(json.dumps(summary)), {"program_name": "DS", "curriculum_modules": ["SQL", "ML"]})
+        self.assertEqual(dict(summary, program_name="Other")["program_name"], "Other")
+
+    def test_registry_shares_live_summaries_and_forgets_released_ones(self):
+        registry = program_summaries.ProgramSummaryRegistry()
+        key = program_summaries.summary_key(PAGE_TEXT, "PROGRAM", "gemini-2.5-flash", "1")
+        first = registry.intern(key, {"program_name": "DS"})
+        self.assertIs(registry.intern(key, {"program_name": "ignored"}), first)
+        self.assertNotEqual(key, program_summaries.summary_key(PAGE_TEXT, "PRODUCT", "gemini-2.5-flash", "1"))
+        self.assertNotEqual(key, program_summaries.summary_key(PAGE_TEXT, "PROGRAM", "mock-gemini", "1"))
+        self.assertNotEqual(key, program_summaries.summary_key(PAGE_TEXT, "PROGRAM", "gemini-2.5-flash", "2"))
+
+        del first
+        gc.collect()
+        self.assertIsNone(registry.get(key))
+        self.assertEqual(registry.stats()["interned"], 1)
+
+
+class AnalyzeProgramCacheTests(unittest.TestCase):
+    def setUp(self):
+        saved = {
+            name: getattr(main, name)
+            for name in (
+                "_call_function_json",
+                "fetch_program_page",
+                "get_client_and_models",
+                "RESPONSE_CACHE",
+                "PROGRAM_SUMMARIES",
+            )
+        }
+        self.addCleanup(lambda: [setattr(main, name, value) for name, value in saved.items()])
+        self.calls = 0
+
+        def summarize(**kwargs):
+            self.calls += 1
+            return {**kwargs["fallback"], "program_name": "Applied Data Science", "key_features": ["Projects"]}
+
+        async def fetch(url):
+            return PAGE_TEXT, "url_content"
+
+        main._call_function_json = summarize
+        main.fetch_program_page = fetch
+        main.get_client_and_models = lambda: (object(), "test-model", "test-model")
+        main.RESPONSE_CACHE = main.ResponseCache(None, ttls={"program_summary": 3600})
+        main.PROGRAM_SUMMARIES = program_summaries.ProgramSummaryRegistry()
+
+    def test_same_content_reuses_one_shared_summary(self):
+        first, _ = asyncio.run(main._analyze_program("https://example.com/a"))
+        second, source = asyncio.run(main._analyze_program("https://example.com/b?ref=ads"))
+        self.assertIs(first, second)
+        self.assertEqual(source, "url_content")
+        self.assertEqual(self.calls, 1)
+
+    def test_released_summary_is_restored_from_the_response_cache(self):
+        first, _ = asyncio.run(main._analyze_program("https://example.com/a"))
+        del first
+        gc.collect()
+        again, _ = asyncio.run(main._analyze_program("https://example.com/a"))
+        self.assertEqual(again["program_name"], "Applied Data Science")
+        self.assertEqual(self.calls, 1)
+
+    def test_model_or_prompt_change_does_not_reuse_cached_summaries(self):
+        asyncio.run(main._analyze_program("https://example.com/a"))
+        main.PROGRAM_SUMMARIES = program_summaries.ProgramSummaryRegistry()
+        main.get_client_and_models = lambda: (object(), "other-model", "other-model")
+        asyncio.run(main._analyze_program("https://example.com/a"))
+        self.assertEqual(self.calls, 2)
+
+        main.PROGRAM_SUMMARIES = program_summaries.ProgramSummaryRegistry()
+        with mock.patch.object(main, "PROGRAM_SUMMARY_PROMPT_VERSION", "test-bump"):
+            asyncio.run(main._analyze_program("https://example.com/a"))
+        self.assertEqual(self.calls, 3)
+
+    def test_product_pages_are_summarized_separately(self):
+        asyncio.run(main._analyze_program("https://example.com/a"))
+        asyncio.run(main._analyze_program("https://example.com/a", archetype_id="car_buyer"))
+        self.assertEqual(self.calls, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
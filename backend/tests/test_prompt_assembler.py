@@ -0,0 +1,102 @@
+import importlib.util
+import pathlib
+import unittest
+
+
+def _load_module(name, relative_path):
+    repo_root = pathlib.Path(__file__).resolve().parents[2]
+    spec = importlib.util.spec_from_file_location(name, repo_root / "backend" / relative_path)
+    if spec is None or spec.loader is None:
+        raise RuntimeError(f"Unable to load backend/{relative_path} for tests")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+main = _load_module("negotiation_main_prompt_assembler", "main.py")
+
+PROGRAM = {
+    "program_name": "Applied Data Science",
+    "value_proposition": "Job-ready analytics skills in six months",
+    "duration": "6 months",
+    "format": "Online",
+    "weekly_time_commitment": "10 hours",
+    "program_fee_inr": "₹1,50,000",
+    "placement_support_details": "Mock interviews and referrals",
+    "certification_details": "University certificate",
+    "curriculum_modules": [f"Module {index}" for index in range(10)],
+    "emi_or_financing_options": "No-cost EMI",
+    "key_features": ["Capstone", "Mentors"],
+}
+
+
+def _state(archetype_id, mode, is_retry=False):
+    return {
+        "program": PROGRAM,
+        "persona": {
+            "name": "Rahul Sharma",
+            "age": 28,
+            "current_role": "Software Developer",
+            "archetype_id": archetype_id,
+            "archetype_label": "Skeptical Shopper",
+            "city_tier": "Tier-1",
+            "backstory": "Has been weighing upskilling options for a year. " * 10,
+            "hidden_secret": "Already has an offer elsewhere.",
+            "misconception": "Thinks certificates guarantee jobs.",
+            "common_vocabulary": ["ROI", "placement"],
+        },
+        "mode": mode,
+        "messages": [],
+        "student_inner_state": {"sentiment": "curious", "skepticism_level": 60, "trust_score": 40, "unresolved_concerns": []},
+        "retry_context": {"is_retry": is_retry, "mistakes": ["Rushed the close"], "primary_unresolved_objection": "Fee"},
+    }
+
+
+class SessionPromptAssemblerTests(unittest.TestCase):
+    def test_prompts_match_stateless_builders_every_round(self):
+        cases = [
+            ("skeptical_shopper", "ai_vs_ai", False),
+            ("car_buyer", "ai_vs_ai", True),
+            ("desperate_switcher", "human_vs_ai", False),
+        ]
+        for archetype_id, mode, is_retry in cases:
+            with self.subTest(archetype_id=archetype_id, mode=mode):
+                state = _state(archetype_id, mode, is_retry)
+                assembler = main.SessionPromptAssembler()
+                for round_number in range(1, 9):
+                    self.assertEqual(assembler.counsellor_prompt(state), main._build_counsellor_prompt(state))
+                    state["messages"].append({"agent": "counsellor", "content": f"Round {round_number}: the fee is ₹1,50,000."})
+                    self.assertEqual(assembler.student_prompt(state), main._build_student_prompt(state))
+                    state["messages"].append({"agent": "student", "content": f"Round {round_number}: that is too much."})
+                    state["student_inner_state"]["trust_score"] += 5
+                    state["student_inner_state"]["unresolved_concerns"].append(f"Concern {round_number}")
+                self.assertEqual(assembler.stats["static_renders"], 2)
+                self.assertEqual(assembler.stats["static_reuses"], 14)
+                self.assertEqual(assembler.stats["lines_rendered"], 15)
+
+    def test_section_bytes_cover_the_whole_prompt(self):
+        state = _state("skeptical_shopper", "ai_vs_ai")
+        state["messages"].append({"agent": "counsellor", "content": "नमस्ते, फीस ₹1,50,000 है।"})
+        assembler = main.SessionPromptAssembler()
+
+        prompt = assembler.student_prompt(state)
+        sizes = assembler.section_bytes["student"]
+
+        self.assertEqual(list(sizes), ["persona", "state", "program", "transcript", "instructions", "total"])
+        self.assertEqual(sizes["total"], len(prompt.encode("utf-8")))
+        self.assertEqual(sizes["transcript"], len("COUNSELLOR: नमस्ते, फीस ₹1,50,000 है।".encode("utf-8")))
+
+    def test_new_session_state_re_renders_static_sections(self):
+        assembler = main.SessionPromptAssembler()
+        first = _state("desperate_switcher", "ai_vs_ai")
+        first["messages"].append({"agent": "counsellor", "content": "Hello"})
+        assembler.counsellor_prompt(first)
+
+        second = _state("car_buyer", "ai_vs_ai")
+        self.assertEqual(assembler.counsellor_prompt(second), main._build_counsellor_prompt(second))
+        self.assertEqual(assembler.stats["static_renders"], 2)
+        self.assertEqual(assembler.section_bytes["counsellor"]["transcript"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
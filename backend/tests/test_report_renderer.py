@@ -0,0 +1,106 @@
+import asyncio
+import importlib
+import pathlib
+import sys
+import tempfile
+import unittest
+
+
+# Imported by its real name (with backend/ on the path) so spawned render workers can unpickle its functions.
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+report_renderer = importlib.import_module("report_renderer")
+
+PROGRAM = {"program_name": "Applied Data Science"}
+PERSONA = {"name": "Asha", "archetype_id": "skeptical_shopper", "persona_type": "Skeptic"}
+TRANSCRIPT = [
+    {"agent": "counsellor", "round": 1, "content": "<message>The fee is INR 2,50,000.</message>"},
+    {"agent": "student", "round": 1, "content": "यह बहुत महंगा है।", "internal_thought": "Too costly."},
+]
+ANALYSIS = {"winner": "no-deal", "negotiation_score": 42, "mistakes": ["Rushed the discount"]}
+
+
+class ReportRendererTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.cache_dir = pathlib.Path(self._tmp.name) / "reports"
+
+    def _renderer(self, **kwargs):
+        renderer = report_renderer.ReportRenderer(self.cache_dir, **kwargs)
+        self.addCleanup(renderer.close)
+        return renderer
+
+    def test_renders_once_and_serves_repeats_from_cache(self):
+        renderer = self._renderer(workers=0)
+
+        async def run():
+            first = await renderer.render(PROGRAM, PERSONA, TRANSCRIPT, ANALYSIS)
+            second = await renderer.render(PROGRAM, PERSONA, TRANSCRIPT, ANALYSIS)
+            return first, second
+
+        first, second = asyncio.run(run())
+
+        self.assertEqual(first, second)
+        self.assertEqual(first.read_bytes()[:5], b"%PDF-")
+        self.assertEqual(renderer.stats()["renders"], 1)
+        self.assertEqual(renderer.stats()["hits"], 1)
+        self.assertEqual([path.name for path in self.cache_dir.iterdir()], [first.name])
+
+    def test_concurrent_requests_for_the_same_report_share_one_render(self):
+        renderer = self._renderer(workers=0)
+
+        async def run():
+            return await asyncio.gather(*(renderer.render(PROGRAM, PERSONA, TRANSCRIPT, ANALYSIS) for _ in range(4)))
+
+        paths = asyncio.run(run())
+
+        self.assertEqual(len(set(paths)), 1)
+        self.assertEqual(renderer.stats()["renders"], 1)
+        self.assertEqual(renderer.stats()["joined"], 3)
+
+    def test_cache_keeps_only_the_most_recent_reports(self):
+        renderer = self._renderer(workers=0, max_cached=2)
+
+        async def run():
+            return [await renderer.render(PROGRAM, PERSONA, TRANSCRIPT, {**ANALYSIS, "negotiation_score": score}) for score in range(3)]
+
+        paths = asyncio.run(run())
+
+        self.assertFalse(paths[0].exists())
+        self.assertTrue(paths[1].exists() and paths[2].exists())
+
+    def test_report_pruned_after_a_cache_hit_is_rendered_again(self):
+        renderer = self._renderer(workers=0)
+        real_touch = renderer._touch
+        touches = []
+
+        def touch_then_lose_file(path):
+            # First lookup sees the cached PDF, which is then pruned before it can be opened.
+            touches.append(path)
+            if len(touches) == 1:
+                path.unlink()
+                return True
+            return real_touch(path)
+
+        async def run():
+            await renderer.render(PROGRAM, PERSONA, TRANSCRIPT, ANALYSIS)
+            renderer._touch = touch_then_lose_file
+            handle = await renderer.open_report(PROGRAM, PERSONA, TRANSCRIPT, ANALYSIS)
+            with handle:
+                return handle.read(5)
+
+        self.assertEqual(asyncio.run(run()), b"%PDF-")
+        self.assertEqual(renderer.stats()["renders"], 2)
+
+    def test_process_pool_render_and_chunked_read(self):
+        renderer = self._renderer(workers=1)
+
+        path = asyncio.run(renderer.render(PROGRAM, PERSONA, TRANSCRIPT * 20, ANALYSIS))
+        chunks = list(report_renderer.iter_file_chunks(path.open("rb"), chunk_size=1024))
+
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(b"".join(chunks), path.read_bytes())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import importlib.util
+import pathlib
+import tempfile
+import time
+import unittest
+from types import SimpleNamespace
+
+
+def _load_module(name, relative_path):
+    repo_root = pathlib.Path(__file__).resolve().parents[2]
+    spec = importlib.util.spec_from_file_location(name, repo_root / "backend" / relative_path)
+    if spec is None or spec.loader is None:
+        raise RuntimeError(f"Unable to load backend/{relative_path} for tests")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+response_cache = _load_module("negotiation_response_cache", "response_cache.py")
+main = _load_module("negotiation_main_cache", "main.py")
+
+
+class ResponseCacheTests(unittest.TestCase):
+    def test_memory_hit_returns_independent_copy(self):
+        cache = response_cache.ResponseCache(None, ttls={"set_persona": 60})
+        key = cache.make_key("model", "prompt", "set_persona", {"type": "object"})
+        cache.put("set_persona", key, {"name": "Riya", "tags": ["a"]})
+        first = cache.get("set_persona", key)
+        first["tags"].append("mutated")
+        self.assertEqual(cache.get("set_persona", key), {"name": "Riya", "tags": ["a"]})
+        self.assertEqual(cache.stats()["by_namespace"]["set_persona"]["memory_hits"], 2)
+
+    def test_disk_tier_survives_new_instance_and_expires(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = pathlib.Path(tmp) / "cache.sqlite3"
+            writer = response_cache.ResponseCache(db_path, ttls={"set_program_summary": 60})
+            writer.put("set_program_summary", "k1", {"program_name": "AI Bootcamp"})
+            writer.put("set_program_summary", "k2", {"program_name": "Old"}, ttl=1)
+
+            reader = response_cache.ResponseCache(db_path, ttls={"set_program_summary": 60})
+            self.assertEqual(reader.get("set_program_summary", "k1"), {"program_name": "AI Bootcamp"})
+            self.assertEqual(reader.stats()["totals"]["disk_hits"], 1)
+            time.sleep(1.1)
+            self.assertIsNone(reader.get("set_program_summary", "k2"))
+
+    def test_zero_ttl_namespace_is_not_stored(self):
+        cache = response_cache.ResponseCache(None, ttls={"set_retry_student_response": 0})
+        cache.put("set_retry_student_response", "k", {"message": "hi"})
+        self.assertIsNone(cache.get("set_retry_student_response", "k"))
+
+    def test_parse_ttl_overrides_skips_malformed_pairs(self):
+        parsed = response_cache.parse_ttl_overrides("set_persona=120, bad, set_judge=x,set_program_summary=0")
+        self.assertEqual(parsed, {"set_persona": 120, "set_program_summary": 0})
+
+
+class CallFunctionJsonCacheTests(unittest.TestCase):
+    def test_repeated_structured_call_is_served_from_cache(self):
+        calls = []
+
+        def _generate_content(model, contents, config=None):
+            calls.append(model)
+            return SimpleNamespace(
+                function_calls=[SimpleNamespace(name="set_persona", args={"name": "Aman"})],
+                candidates=[],
+            )
+
+        client = SimpleNamespace(models=SimpleNamespace(generate_content=_generate_content))
+        original_cache = main.RESPONSE_CACHE
+        main.RESPONSE_CACHE = response_cache.ResponseCache(None, ttls={"set_persona": 60})
+        try:
+            kwargs = dict(
+                client=client,
+                model_name="test-model",
+                prompt="persona prompt",
+                function_name="set_persona",
+                function_description="Return persona",
+                parameters_schema={"type": "object", "properties": {"name": {"type": "string"}}},
+                fallback={"name": "fallback"},
+            )
+            first = main._call_function_json(**kwargs)
+            second = main._call_function_json(**kwargs)
+        finally:
+            main.RESPONSE_CACHE = original_cache
+        self.assertEqual(first, {"name": "Aman"})
+        self.assertEqual(second, {"name": "Aman"})
+        self.assertEqual(len(calls), 1)
+
+    def test_use_cache_false_always_samples_and_stores_nothing(self):
+        calls = []
+
+        def _generate_content(model, contents, config=None):
+            calls.append(model)
+            return SimpleNamespace(
+                function_calls=[SimpleNamespace(name="set_persona", args={"name": f"Persona {len(calls)}"})],
+                candidates=[],
+            )
+
+        client = SimpleNamespace(models=SimpleNamespace(generate_content=_generate_content))
+        original_cache = main.RESPONSE_CACHE
+        main.RESPONSE_CACHE = response_cache.ResponseCache(None, ttls={"set_persona": 60})
+        try:
+            kwargs = dict(
+                client=client,
+                model_name="test-model",
+                prompt="persona prompt",
+                function_name="set_persona",
+                function_description="Return persona",
+                parameters_schema={"type": "object", "properties": {"name": {"type": "string"}}},
+                fallback={"name": "fallback"},
+                use_cache=False,
+            )
+            first = main._call_function_json(**kwargs)
+            second = main._call_function_json(**kwargs)
+            cached = main._call_function_json(**{**kwargs, "use_cache": True})
+        finally:
+            main.RESPONSE_CACHE = original_cache
+        self.assertEqual((first["name"], second["name"], cached["name"]), ("Persona 1", "Persona 2", "Persona 3"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+import importlib.util
+import pathlib
+import tempfile
+import unittest
+from unittest import mock
+
+
+def _load_module(name, relative_path):
+    repo_root = pathlib.Path(__file__).resolve().parents[2]
+    spec = importlib.util.spec_from_file_location(name, repo_root / "backend" / relative_path)
+    if spec is None or spec.loader is None:
+        raise RuntimeError(f"Unable to load backend/{relative_path} for tests")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+session_store = _load_module("negotiation_session_store", "session_store.py")
+
+
+def _session(transcript_chars=0):
+    session = {"url": "https://example.com", "program": {"program_name": "Bootcamp"}, "persona": {"name": "Asha"}}
+    if transcript_chars:
+        session["last_run"] = {
+            "transcript": [{"agent": "student", "content": "x" * transcript_chars}],
+            "history_for_reporting": [],
+            "analysis": {"winner": "counsellor"},
+            "deal_status": "success",
+        }
+    return session
+
+
+class SessionStoreTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.spill_dir = pathlib.Path(self._tmp.name) / "sessions"
+        self.clock = [1000.0]
+        patcher = mock.patch.object(session_store.time, "time", side_effect=lambda: self.clock[0])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self._tmp.cleanup)
+
+    def test_idle_sessions_expire(self):
+        store = session_store.SessionStore(self.spill_dir, ttl_seconds=60)
+        store.put("a", _session())
+
+        self.clock[0] += 30
+        self.assertIsNotNone(store.get("a"))
+        self.clock[0] += 59
+        self.assertIsNotNone(store.get("a"))
+        self.clock[0] += 61
+        self.assertIsNone(store.get("a"))
+        self.assertEqual(store.stats()["expired"], 1)
+
+    def test_least_recently_used_session_is_evicted_past_max_sessions(self):
+        store = session_store.SessionStore(self.spill_dir, max_sessions=2)
+        store.put("a", _session())
+        store.put("b", _session())
+        store.get("a")
+        store.put("c", _session())
+
+        self.assertIn("a", store)
+        self.assertNotIn("b", store)
+        self.assertIn("c", store)
+        self.assertEqual(store.stats()["evicted"], 1)
+
+    def test_cold_last_run_spills_and_rehydrates(self):
+        store = session_store.SessionStore(self.spill_dir, spill_after_seconds=300)
+        original = _session(transcript_chars=5000)
+        store.put("a", original)
+        resident_before = store.stats()["resident_bytes"]
+
+        self.clock[0] += 301
+        store.sweep()
+        stats = store.stats()
+        self.assertEqual(stats["spilled_sessions"], 1)
+        self.assertLess(stats["resident_bytes"], resident_before - 5000)
+        self.assertNotIn("last_run", original)
+        self.assertEqual(len(list(self.spill_dir.glob("*.json.gz"))), 1)
+
+        session = store.get("a")
+        self.assertEqual(session["last_run"]["transcript"][0]["content"], "x" * 5000)
+        self.assertEqual(store.stats()["rehydrations"], 1)
+        self.assertEqual(store.stats()["resident_bytes"], resident_before)
+        self.assertEqual(list(self.spill_dir.glob("*.json.gz")), [])
+
+    def test_memory_budget_spills_before_evicting(self):
+        store = session_store.SessionStore(self.spill_dir, memory_budget_bytes=12000, spill_after_seconds=3600)
+        store.put("a", _session(transcript_chars=5000))
+        store.put("b", _session(transcript_chars=5000))
+        store.put("c", _session(transcript_chars=5000))
+
+        stats = store.stats()
+        self.assertEqual(stats["sessions"], 3)
+        self.assertEqual(stats["evicted"], 0)
+        self.assertGreaterEqual(stats["spilled_sessions"], 1)
+        self.assertLessEqual(stats["resident_bytes"], 12000)
+        self.assertEqual(store.get("a")["last_run"]["deal_status"], "success")
+
+    def test_without_spill_dir_budget_evicts_whole_sessions(self):
+        store = session_store.SessionStore(None, memory_budget_bytes=12000)
+        store.put("a", _session(transcript_chars=5000))
+        store.put("b", _session(transcript_chars=5000))
+        store.put("c", _session(transcript_chars=5000))
+
+        self.assertNotIn("a", store)
+        self.assertEqual(store.stats()["evicted"], 1)
+        self.assertLessEqual(store.stats()["resident_bytes"], 12000)
+
+    def test_put_of_a_session_with_spilled_last_run_keeps_the_spill(self):
+        store = session_store.SessionStore(self.spill_dir, spill_after_seconds=0)
+        held = _session(transcript_chars=2000)
+        store.put("a", held)
+        store.put("b", _session())
+        self.assertNotIn("last_run", held)
+
+        held["persona"] = {"name": "Asha", "archetype_id": "skeptical_shopper"}
+        store.put("a", held)
+
+        self.assertEqual(store.get("a")["last_run"]["transcript"][0]["content"], "x" * 2000)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+import asyncio
+import importlib.util
+import pathlib
+import random
+import tempfile
+import unittest
+from types import SimpleNamespace
+
+
+def _load_module(name, relative_path):
+    repo_root = pathlib.Path(__file__).resolve().parents[2]
+    spec = importlib.util.spec_from_file_location(name, repo_root / "backend" / relative_path)
+    if spec is None or spec.loader is None:
+        raise RuntimeError(f"Unable to load backend/{relative_path} for tests")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+tag_stream_parser = _load_module("negotiation_tag_stream_parser", "tag_stream_parser.py")
+main = _load_module("negotiation_main_tag_stream", "main.py")
+
+STUDENT_TURN = (
+    "<thought>They dodged the fee question again.</thought>\n"
+    '<stats>{"resistance": 72, "trust": 38, "sentiment": "skeptical", "unresolved_concerns": ["Price"]}</stats>\n'
+    "<message>\n  Honestly, ₹1,50,000 is a lot for me. If x < 3 months, can I still\nget a refund?  \n</message>\n"
+    "<emotional_state>skeptical</emotional_state>\n"
+    "<intent>Push back on price</intent>\n"
+    '<techniques>["Anchoring", "Reframing"]</techniques>\n'
+    "<confidence>81</confidence>"
+)
+
+
+def _feed_in_pieces(text, seed):
+    parser = tag_stream_parser.TagStreamParser()
+    rng = random.Random(seed)
+    events = []
+    index = 0
+    while index < len(text):
+        size = rng.randint(1, 9)
+        events.extend(parser.feed(text[index : index + size]))
+        index += size
+    events.extend(parser.finish())
+    return parser, events
+
+
+class TagStreamParserTests(unittest.TestCase):
+    def test_fields_match_regex_extraction_for_any_chunking(self):
+        expected = main._extract_response_fields(STUDENT_TURN)
+        for seed in range(25):
+            parser, events = _feed_in_pieces(STUDENT_TURN, seed)
+            self.assertEqual(main._fields_from_tag_blocks(parser.blocks), expected)
+            spoken = "".join(value for kind, value in events if kind == "message")
+            self.assertEqual(spoken, "Honestly, ₹1,50,000 is a lot for me. If x < 3 months, can I still\nget a refund?")
+
+    def test_closed_events_arrive_in_tag_order(self):
+        _, events = _feed_in_pieces(STUDENT_TURN, 3)
+        closed = [value for kind, value in events if kind == "closed"]
+        self.assertEqual(closed[:3], ["thought", "stats", "message"])
+
+    def test_missing_close_tag_does_not_leak_following_tags(self):
+        parser, events = _feed_in_pieces("<message>I need time<intent>stall</intent>", 1)
+        self.assertEqual(parser.blocks["message"], "I need time")
+        self.assertEqual(parser.blocks["intent"], "stall")
+        self.assertEqual("".join(v for k, v in events if k == "message"), "I need time")
+
+    def test_untagged_output_produces_no_message_block(self):
+        parser, events = _feed_in_pieces("MESSAGE: legacy format\nINTENT: none", 2)
+        self.assertNotIn("message", parser.blocks)
+        self.assertEqual(events, [])
+        self.assertIn("legacy format", parser.outside_text)
+
+
+class _FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+        self.client_state = SimpleNamespace(name="CONNECTED")
+
+    async def send_json(self, payload):
+        self.sent.append(payload)
+
+
+class StudentStreamForwardingTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self._saved = (main.TRACE_OUTPUT_ROOT, main.NEGOTIATION_STREAM_CONSOLE_LOG)
+        main.TRACE_OUTPUT_ROOT = pathlib.Path(self._tmp.name)
+        main.NEGOTIATION_STREAM_CONSOLE_LOG = False
+
+    def tearDown(self):
+        main.TRACE_OUTPUT_ROOT, main.NEGOTIATION_STREAM_CONSOLE_LOG = self._saved
+        self._tmp.cleanup()
+
+    def test_only_spoken_text_is_streamed_and_thought_arrives_before_message(self):
+        pieces = [STUDENT_TURN[i : i + 17] for i in range(0, len(STUDENT_TURN), 17)]
+
+        async def _stream(model, contents, config=None):
+            async def _gen():
+                for text in pieces:
+                    yield SimpleNamespace(text=text, candidates=[])
+
+            return _gen()
+
+        client = SimpleNamespace(aio=SimpleNamespace(models=SimpleNamespace(generate_content_stream=_stream)))
+        websocket = _FakeWebSocket()
+        msg = asyncio.run(
+            main._stream_agent_response(
+                websocket, client, "test-model", "prompt", "student", 2, "s-1", False, "", mode="ai_vs_ai",
+                student_inner_state={"sentiment": "curious", "skepticism_level": 50, "trust_score": 50, "unresolved_concerns": []},
+            )
+        )
+        types_sent = [p["type"] for p in websocket.sent]
+        chunks = "".join(p["data"]["text"] for p in websocket.sent if p["type"] == "stream_chunk")
+        self.assertNotIn("<", chunks.replace("x < 3", ""))
+        self.assertNotIn("thought", chunks)
+        # Once when </thought> closes and again when </stats> adds the stats; not repeated at the end.
+        thought_indexes = [i for i, kind in enumerate(types_sent) if kind == "student_thought"]
+        self.assertEqual(len(thought_indexes), 2)
+        self.assertLess(thought_indexes[-1], types_sent.index("stream_chunk"))
+        self.assertEqual(websocket.sent[thought_indexes[-1]]["data"]["updated_stats"]["skepticism_level"], 72)
+        self.assertEqual(msg["techniques"], ["Anchoring", "Reframing"])
+        self.assertEqual(msg["confidence_score"], 81)
+        self.assertEqual(types_sent[-1], "message_complete")
+
+
+if __name__ == "__main__":
+    unittest.main()
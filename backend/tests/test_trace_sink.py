@@ -0,0 +1,78 @@
+import gzip
+import importlib.util
+import json
+import pathlib
+import tempfile
+import unittest
+
+
+def _load_module(name, relative_path):
+    repo_root = pathlib.Path(__file__).resolve().parents[2]
+    spec = importlib.util.spec_from_file_location(name, repo_root / "backend" / relative_path)
+    if spec is None or spec.loader is None:
+        raise RuntimeError(f"Unable to load backend/{relative_path} for tests")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+trace_sink = _load_module("negotiation_trace_sink", "trace_sink.py")
+
+
+class TraceSinkTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = pathlib.Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_events_are_batched_per_file_and_flushed(self):
+        sink = trace_sink.TraceSink(flush_interval_seconds=5)
+        for idx in range(5):
+            sink.emit(self.root / "ai_vs_ai" / "trace.jsonl", "turn_start", {"round": idx})
+        sink.emit(self.root / "human_vs_ai" / "trace.jsonl", "turn_start", {"round": 99})
+        self.assertTrue(sink.flush())
+        lines = (self.root / "ai_vs_ai" / "trace.jsonl").read_text(encoding="utf-8").splitlines()
+        self.assertEqual([json.loads(line)["round"] for line in lines], [0, 1, 2, 3, 4])
+        self.assertEqual(json.loads(lines[0])["event"], "turn_start")
+        self.assertTrue((self.root / "human_vs_ai" / "trace.jsonl").exists())
+        sink.close()
+        self.assertEqual(sink.stats()["written"], 6)
+
+    def test_size_rotation_gzips_previous_file(self):
+        sink = trace_sink.TraceSink(batch_size=1, rotate_bytes=200)
+        target = self.root / "trace.jsonl"
+        for idx in range(6):
+            sink.emit(target, "stream_complete", {"buffer_head": "x" * 80, "idx": idx})
+        sink.close()
+        rotated = sorted(self.root.glob("trace.*.jsonl.gz"))
+        self.assertTrue(rotated)
+        restored = []
+        for path in rotated:
+            with gzip.open(path, "rt", encoding="utf-8") as handle:
+                restored.extend(json.loads(line)["idx"] for line in handle)
+        if target.exists():
+            restored.extend(json.loads(line)["idx"] for line in target.read_text(encoding="utf-8").splitlines())
+        self.assertEqual(sorted(restored), list(range(6)))
+
+    def test_sampling_drops_events_at_zero_rate(self):
+        sink = trace_sink.TraceSink(sample_rates=trace_sink.parse_sample_rates("stream_complete=0,*=1"))
+        target = self.root / "trace.jsonl"
+        sink.emit(target, "stream_complete", {"idx": 1})
+        sink.emit(target, "turn_start", {"idx": 2})
+        sink.close()
+        events = [json.loads(line)["event"] for line in target.read_text(encoding="utf-8").splitlines()]
+        self.assertEqual(events, ["turn_start"])
+        self.assertEqual(sink.stats()["sampled_out"], 1)
+
+    def test_serializer_runs_on_writer(self):
+        sink = trace_sink.TraceSink(serializer=lambda entry: {**entry, "serialized": True})
+        target = self.root / "trace.jsonl"
+        sink.emit(target, "parse_result", {"idx": 1})
+        sink.close()
+        self.assertTrue(json.loads(target.read_text(encoding="utf-8"))["serialized"])
+
+
+if __name__ == "__main__":
+    unittest.main()
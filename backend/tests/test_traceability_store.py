@@ -0,0 +1,82 @@
+import gzip
+import importlib.util
+import json
+import pathlib
+import tempfile
+import unittest
+
+
+def _load_module(name, relative_path):
+    repo_root = pathlib.Path(__file__).resolve().parents[2]
+    spec = importlib.util.spec_from_file_location(name, repo_root / "backend" / relative_path)
+    if spec is None or spec.loader is None:
+        raise RuntimeError(f"Unable to load backend/{relative_path} for tests")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+traceability_store = _load_module("negotiation_traceability_store", "traceability_store.py")
+
+
+def _payload(session_id, score=50, archetype_id="drifter", deal_status="failed"):
+    return {
+        "session_id": session_id,
+        "deal_status": deal_status,
+        "persona": {"name": "Asha", "archetype_id": archetype_id},
+        "analysis": {"winner": "no-deal", "negotiation_score": score},
+        "transcript": [{"agent": "student", "content": "यह बहुत महंगा है।"}],
+    }
+
+
+class TraceabilityStoreTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.root = pathlib.Path(self._tmp.name) / "sessions"
+
+    def _store(self, **kwargs):
+        store = traceability_store.TraceabilityStore(self.root, **kwargs)
+        self.addCleanup(store.close)
+        return store
+
+    def test_every_run_is_kept_and_get_returns_the_latest(self):
+        store = self._store()
+        store.append(_payload("s1", score=40), "ai_vs_ai", created_at=100)
+        store.append(_payload("s2"), "human_vs_ai", created_at=110)
+        store.append(_payload("s1", score=70, deal_status="closed"), "ai_vs_ai", created_at=120)
+
+        self.assertEqual(store.get("s1")["analysis"]["negotiation_score"], 70)
+        self.assertEqual([run["analysis"]["negotiation_score"] for run in store.runs("s1")], [40, 70])
+        self.assertEqual(store.get("s2")["transcript"][0]["content"], "यह बहुत महंगा है।")
+        self.assertIsNone(store.get("missing"))
+
+    def test_index_filters_by_time_range_and_fields(self):
+        store = self._store()
+        for index in range(6):
+            store.append(_payload(f"s{index}", score=index * 10), "ai_vs_ai" if index % 2 else "human_vs_ai", created_at=100 + index)
+
+        entries = store.query(start=101, end=105, mode="ai_vs_ai")
+        self.assertEqual([entry.session_id for entry in entries], ["s1", "s3"])
+        self.assertEqual(entries[1].score, 30.0)
+        self.assertEqual([run["session_id"] for run in store.iter_range(104)], ["s4", "s5"])
+
+    def test_segments_rotate_and_stay_readable_as_gzip_jsonl(self):
+        store = self._store(segment_bytes=1)
+        for index in range(3):
+            store.append(_payload(f"s{index}"), "ai_vs_ai")
+
+        segments = sorted(self.root.glob("traces-*.jsonl.gz"))
+        self.assertEqual(len(segments), 3)
+        with gzip.open(segments[0], "rt", encoding="utf-8") as handle:
+            self.assertEqual(json.loads(handle.readline())["session_id"], "s0")
+
+        reopened = traceability_store.TraceabilityStore(self.root, segment_bytes=1)
+        self.addCleanup(reopened.close)
+        reopened.append(_payload("s3"), "ai_vs_ai")
+        self.assertEqual(reopened.get("s0")["session_id"], "s0")
+        self.assertEqual(len(list(self.root.glob("traces-*.jsonl.gz"))), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,166 @@
+import asyncio
+import importlib.util
+import json
+import pathlib
+import tempfile
+import unittest
+
+
+def _load_module(name, relative_path):
+    repo_root = pathlib.Path(__file__).resolve().parents[2]
+    spec = importlib.util.spec_from_file_location(name, repo_root / "backend" / relative_path)
+    if spec is None or spec.loader is None:
+        raise RuntimeError(f"Unable to load backend/{relative_path} for tests")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+tracing = _load_module("negotiation_tracing", "tracing.py")
+
+
+def _exported(tracer):
+    tracer.close()
+    files = sorted(tracer.output_dir.glob("*.json"))
+    return [json.loads(path.read_text(encoding="utf-8")) for path in files]
+
+
+def _spans(document):
+    return [event for event in document["traceEvents"] if event["ph"] == "X"]
+
+
+class TracerTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.output_dir = pathlib.Path(self._tmp.name) / "spans"
+
+    def test_unsampled_sessions_record_nothing(self):
+        tracer = tracing.Tracer(self.output_dir, sample_rate=0.0)
+
+        @tracer.traced()
+        def build_prompt(state):
+            return "prompt"
+
+        trace = tracer.start_trace("negotiation", session_id="s1")
+        self.assertIsNone(trace)
+        self.assertIs(tracer.span("round"), tracing.NOOP_SPAN)
+        self.assertEqual(build_prompt({}), "prompt")
+        tracer.end_trace(trace)
+
+        self.assertEqual(_exported(tracer), [])
+        self.assertEqual(tracer.stats()["traces_sampled_out"], 1)
+
+    def test_sampled_session_exports_chrome_trace_with_tracks(self):
+        tracer = tracing.Tracer(self.output_dir, sample_rate=1.0)
+
+        @tracer.traced(attrs=("agent", "message_id"))
+        def stream_turn(agent, message_id, prompt=""):
+            with tracer.span("parse"):
+                return agent
+
+        @tracer.traced("ws_send", track="websocket")
+        async def send(payload):
+            await asyncio.sleep(0)
+
+        async def session():
+            trace = tracer.start_trace("negotiation", session_id="abc/1", mode="ai_vs_ai")
+            round_span = tracer.start_span("round", round=1)
+            await asyncio.to_thread(stream_turn, "student", message_id="m1")
+            await send({"type": "metrics_update"})
+            round_span.end(deal_status="ongoing")
+            tracer.end_trace(trace)
+            self.assertIsNone(tracer.current_trace())
+
+        asyncio.run(session())
+        documents = _exported(tracer)
+
+        self.assertEqual(len(documents), 1)
+        self.assertEqual(documents[0]["otherData"]["session_id"], "abc/1")
+        self.assertTrue(list(self.output_dir.glob("negotiation-abc_1-*.json")))
+        spans = {event["name"]: event for event in _spans(documents[0])}
+        self.assertEqual(set(spans), {"negotiation", "round", "stream_turn", "parse", "ws_send"})
+        self.assertEqual(spans["stream_turn"]["args"], {"agent": "student", "message_id": "m1"})
+        self.assertEqual(spans["round"]["args"], {"round": 1, "deal_status": "ongoing"})
+        self.assertEqual(spans["parse"]["tid"], spans["negotiation"]["tid"])
+        self.assertNotEqual(spans["ws_send"]["tid"], spans["negotiation"]["tid"])
+        root = spans["negotiation"]
+        for event in spans.values():
+            self.assertGreaterEqual(event["ts"], root["ts"])
+            self.assertLessEqual(event["ts"] + event["dur"], root["ts"] + root["dur"] + 1)
+        track_names = {
+            event["args"]["name"] for event in documents[0]["traceEvents"] if event["name"] == "thread_name"
+        }
+        self.assertEqual(track_names, {"session", "websocket"})
+
+    def test_trace_waits_for_background_spans_started_before_it_ended(self):
+        tracer = tracing.Tracer(self.output_dir, sample_rate=1.0)
+        release = None
+
+        @tracer.traced("post_session_jobs", track="post_session")
+        async def post_session_jobs():
+            await release.wait()
+
+        async def session():
+            nonlocal release
+            release = asyncio.Event()
+            trace = tracer.start_trace("negotiation", session_id="s2")
+            task = asyncio.create_task(post_session_jobs())
+            tracer.end_trace(trace)
+            self.assertEqual(tracer.stats()["pending_traces"], 1)
+            release.set()
+            await task
+            self.assertEqual(tracer.stats()["pending_traces"], 0)
+
+        asyncio.run(session())
+        documents = _exported(tracer)
+
+        self.assertEqual(len(documents), 1)
+        names = [event["name"] for event in _spans(documents[0])]
+        self.assertIn("post_session_jobs", names)
+
+    def test_task_cancelled_before_it_starts_does_not_hold_the_trace_open(self):
+        tracer = tracing.Tracer(self.output_dir, sample_rate=1.0)
+
+        @tracer.traced("post_session_jobs", track="post_session")
+        async def post_session_jobs():
+            await asyncio.sleep(0)
+
+        async def session():
+            trace = tracer.start_trace("negotiation", session_id="s3")
+            task = asyncio.create_task(post_session_jobs())
+            task.cancel()
+            tracer.end_trace(trace)
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            del task
+
+        asyncio.run(session())
+        self.assertEqual(tracer.stats()["pending_traces"], 0)
+        documents = _exported(tracer)
+
+        self.assertEqual(len(documents), 1)
+        spans = {event["name"]: event for event in _spans(documents[0])}
+        self.assertEqual(spans["post_session_jobs"]["args"], {"not_started": True})
+
+    def test_span_cap_drops_excess_spans_and_records_errors(self):
+        tracer = tracing.Tracer(self.output_dir, sample_rate=1.0, max_spans=3)
+        trace = tracer.start_trace("negotiation")
+        with self.assertRaises(RuntimeError):
+            with tracer.span("failing"):
+                raise RuntimeError("boom")
+        for _ in range(4):
+            with tracer.span("send"):
+                pass
+        tracer.end_trace(trace)
+        documents = _exported(tracer)
+
+        spans = _spans(documents[0])
+        self.assertEqual([event["name"] for event in spans], ["negotiation", "failing", "send", "send"])
+        self.assertEqual(spans[1]["args"], {"error": "RuntimeError"})
+        self.assertEqual(documents[0]["otherData"]["dropped_spans"], 2)
+        self.assertEqual(tracer.stats()["spans_dropped"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+import asyncio
+import importlib.util
+import pathlib
+import tempfile
+import unittest
+from unittest import mock
+
+import httpx
+
+
+def _load_module(name, relative_path):
+    repo_root = pathlib.Path(__file__).resolve().parents[2]
+    spec = importlib.util.spec_from_file_location(name, repo_root / "backend" / relative_path)
+    if spec is None or spec.loader is None:
+        raise RuntimeError(f"Unable to load backend/{relative_path} for tests")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+url_cache = _load_module("negotiation_url_cache", "url_cache.py")
+main = _load_module("negotiation_main_url_cache", "main.py")
+
+PROGRAM_URL = "https://Example.com:443/program?utm_source=ads&b=2&a=1#fees"
+JINA_TEXT = "Title: Applied Data Science\n\n" + "Jina formatted program details. " * 20
+
+
+class NormalizeUrlTests(unittest.TestCase):
+    def test_equivalent_urls_share_a_key(self):
+        self.assertEqual(url_cache.normalize_url(PROGRAM_URL), "https://example.com/program?a=1&b=2")
+        self.assertEqual(url_cache.normalize_url("HTTPS://example.com"), "https://example.com/")
+        self.assertEqual(url_cache.normalize_url("http://example.com:8080/x"), "http://example.com:8080/x")
+
+
+class UrlContentCacheTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.clock = [1000.0]
+        patcher = mock.patch.object(url_cache.time, "time", side_effect=lambda: self.clock[0])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache = url_cache.UrlContentCache(
+            pathlib.Path(self._tmp.name) / "urls.sqlite3", fresh_seconds=60, max_age_seconds=600
+        )
+
+    def test_entries_go_stale_then_expire(self):
+        self.cache.put(PROGRAM_URL, "text", "jina", etag='"v1"')
+        self.assertTrue(self.cache.get("https://example.com/program?a=1&b=2").fresh)
+
+        self.clock[0] += 61
+        stale = self.cache.get(PROGRAM_URL)
+        self.assertFalse(stale.fresh)
+        self.assertEqual(stale.conditional_headers(), {"If-None-Match": '"v1"'})
+
+        self.cache.mark_revalidated(PROGRAM_URL)
+        self.assertTrue(self.cache.get(PROGRAM_URL).fresh)
+
+        self.clock[0] += 601
+        self.assertIsNone(self.cache.get(PROGRAM_URL))
+        stats = self.cache.stats()
+        self.assertEqual((stats["fresh_hits"], stats["stale_hits"], stats["misses"]), (2, 1, 1))
+
+
+class FetchProgramPageTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.cache = url_cache.UrlContentCache(pathlib.Path(self._tmp.name) / "urls.sqlite3", fresh_seconds=60)
+        original = main.URL_CACHE
+        main.URL_CACHE = self.cache
+        self.addCleanup(setattr, main, "URL_CACHE", original)
+        self.requests = []
+
+    def _fetch(self, jina_status=200):
+        async def handler(request):
+            self.requests.append((request.url.host, dict(request.headers)))
+            if request.url.host != "r.jina.ai":
+                await asyncio.sleep(5)
+                return httpx.Response(500, request=request)
+            if jina_status == 304:
+                return httpx.Response(304, request=request)
+            return httpx.Response(200, text=JINA_TEXT, headers={"ETag": '"v1"'}, request=request)
+
+        async def run():
+            async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+                return await main.fetch_program_page(PROGRAM_URL, client=client)
+
+        return asyncio.run(run())
+
+    def test_fresh_hit_skips_the_network(self):
+        text, source = self._fetch()
+        self.assertEqual(source, "url_content")
+        self.requests.clear()
+
+        self.assertEqual(self._fetch(), (text, "url_cache"))
+        self.assertEqual(self.requests, [])
+
+    def test_stale_entry_is_revalidated_with_a_conditional_get(self):
+        text, _ = self._fetch()
+        self.cache.fresh_seconds = 0
+        self.requests.clear()
+
+        with mock.patch.object(url_cache.time, "time", return_value=url_cache.time.time() + 1):
+            self.assertEqual(self._fetch(jina_status=304), (text, "url_cache_revalidated"))
+        jina_headers = [headers for host, headers in self.requests if host == "r.jina.ai"][0]
+        self.assertEqual(jina_headers.get("if-none-match"), '"v1"')
+        self.assertEqual(self.cache.stats()["revalidated"], 1)
+
+    def test_failed_refetch_serves_the_stale_copy(self):
+        text, _ = self._fetch()
+        self.cache.fresh_seconds = 0
+
+        async def handler(request):
+            return httpx.Response(503, request=request)
+
+        async def run():
+            async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+                return await main.fetch_program_page(PROGRAM_URL, client=client)
+
+        with mock.patch.object(url_cache.time, "time", return_value=url_cache.time.time() + 1):
+            self.assertEqual(asyncio.run(run()), (text, "url_cache_stale"))
+        self.assertEqual(self.cache.stats()["revalidated"], 0)
+
+    def test_empty_direct_body_is_not_taken_as_not_modified(self):
+        self._fetch()
+        self.cache.fresh_seconds = 0
+
+        async def handler(request):
+            if request.url.host == "r.jina.ai":
+                await asyncio.sleep(0.05)
+                return httpx.Response(200, text="Loading...", request=request)
+            return httpx.Response(200, text="", request=request)
+
+        async def run():
+            async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+                return await main.fetch_program_page(PROGRAM_URL, client=client)
+
+        with mock.patch.object(url_cache.time, "time", return_value=url_cache.time.time() + 1):
+            text, source = asyncio.run(run())
+        self.assertEqual((text, source), ("", "url_content"))
+        self.assertEqual(self.cache.stats()["revalidated"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
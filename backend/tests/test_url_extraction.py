@@ -0,0 +1,128 @@
+import asyncio
+import importlib.util
+import pathlib
+import time
+import unittest
+
+import httpx
+
+
+def _load_module(name, relative_path):
+    repo_root = pathlib.Path(__file__).resolve().parents[2]
+    spec = importlib.util.spec_from_file_location(name, repo_root / "backend" / relative_path)
+    if spec is None or spec.loader is None:
+        raise RuntimeError(f"Unable to load backend/{relative_path} for tests")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+main = _load_module("negotiation_main_url_extraction", "main.py")
+main.URL_CACHE = None
+main.RESPONSE_CACHE = None
+
+PROGRAM_URL = "https://example.com/program"
+JINA_TEXT = "Title: Applied Data Science\n\n" + "Jina formatted program details. " * 20
+DIRECT_HTML = (
+    "<html><head><script>var tracking = 1;</script></head><body><nav>Menu</nav>"
+    + "<p>Direct program details.</p>" * 30
+    + "</body></html>"
+)
+
+
+def _client(jina=None, direct=None):
+    """Build an AsyncClient whose responses come from per-host async handlers."""
+    seen = []
+
+    async def handler(request):
+        seen.append(request.url.host)
+        route = jina if request.url.host == "r.jina.ai" else direct
+        return await route(request)
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler)), seen
+
+
+def _respond(status, text, delay=0.0):
+    async def route(request):
+        if delay:
+            await asyncio.sleep(delay)
+        return httpx.Response(status, text=text, request=request)
+
+    return route
+
+
+class UrlExtractionTests(unittest.TestCase):
+    def _extract(self, client):
+        async def run():
+            async with client:
+                return await main.extract_from_url(PROGRAM_URL, client=client)
+
+        return asyncio.run(run())
+
+    def test_first_usable_body_wins_and_the_slower_fetch_is_cancelled(self):
+        client, _ = _client(jina=_respond(200, JINA_TEXT, delay=5), direct=_respond(200, DIRECT_HTML))
+        started = time.perf_counter()
+        text = self._extract(client)
+        self.assertLess(time.perf_counter() - started, 2)
+        self.assertTrue(text.startswith("Direct program details."))
+        self.assertNotIn("tracking", text)
+        self.assertNotIn("Menu", text)
+
+    def test_thin_direct_page_waits_for_jina(self):
+        client, seen = _client(
+            jina=_respond(200, JINA_TEXT, delay=0.05),
+            direct=_respond(200, "<html><body><div id='root'>Loading</div></body></html>"),
+        )
+        text = self._extract(client)
+        self.assertTrue(text.startswith("Title: Applied Data Science"))
+        self.assertEqual(sorted(seen), ["example.com", "r.jina.ai"])
+
+    def test_thin_direct_page_is_used_when_jina_fails(self):
+        client, _ = _client(jina=_respond(502, "bad gateway"), direct=_respond(200, "<p>Short page</p>"))
+        self.assertEqual(self._extract(client), "Short page")
+
+    def test_both_fetches_failing_returns_the_error_marker(self):
+        client, _ = _client(jina=_respond(500, "error"), direct=_respond(404, "missing"))
+        self.assertTrue(self._extract(client).startswith("Error extracting from URL:"))
+
+    def test_program_analysis_keeps_the_event_loop_responsive(self):
+        original = (main._call_function_json, main.CLIENT, main.NEGOTIATION_MODEL_NAME, main.JUDGE_MODEL_NAME)
+
+        def slow_summary(**kwargs):
+            time.sleep(0.3)
+            return {**kwargs["fallback"], "program_name": "Applied Data Science"}
+
+        main._call_function_json = slow_summary
+        main.CLIENT, main.NEGOTIATION_MODEL_NAME, main.JUDGE_MODEL_NAME = object(), "test-model", "test-model"
+
+        async def run():
+            client, _ = _client(jina=_respond(200, JINA_TEXT), direct=_respond(200, DIRECT_HTML, delay=1))
+            main.HTTP_CLIENT, main.HTTP_CLIENT_LOOP = client, asyncio.get_running_loop()
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+
+            ticking = asyncio.create_task(ticker())
+            try:
+                result = await main._analyze_program(PROGRAM_URL)
+            finally:
+                ticking.cancel()
+                await client.aclose()
+            return result, ticks
+
+        try:
+            (program, source), ticks = asyncio.run(run())
+        finally:
+            main._call_function_json, main.CLIENT, main.NEGOTIATION_MODEL_NAME, main.JUDGE_MODEL_NAME = original
+            main.HTTP_CLIENT = main.HTTP_CLIENT_LOOP = None
+        self.assertEqual(program["program_name"], "Applied Data Science")
+        self.assertEqual(source, "url_content")
+        self.assertGreater(ticks, 15)
+
+
+if __name__ == "__main__":
+    unittest.main()
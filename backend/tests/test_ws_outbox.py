@@ -0,0 +1,109 @@
+import asyncio
+import importlib.util
+import pathlib
+import unittest
+
+
+def _load_module(name, relative_path):
+    repo_root = pathlib.Path(__file__).resolve().parents[2]
+    spec = importlib.util.spec_from_file_location(name, repo_root / "backend" / relative_path)
+    if spec is None or spec.loader is None:
+        raise RuntimeError(f"Unable to load backend/{relative_path} for tests")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+ws_outbox = _load_module("negotiation_ws_outbox", "ws_outbox.py")
+
+
+def _chunk(text, message_id="m1"):
+    return {"type": "stream_chunk", "data": {"agent": "student", "text": text, "message_id": message_id}}
+
+
+class WebSocketOutboxTests(unittest.TestCase):
+    def _run(self, frames, **kwargs):
+        sent = []
+
+        async def _send(payload):
+            sent.append(payload)
+
+        async def _main():
+            outbox = ws_outbox.WebSocketOutbox(_send, **kwargs)
+            for frame in frames:
+                await outbox.send(frame)
+            await outbox.aclose()
+            return outbox.stats
+
+        return sent, asyncio.run(_main())
+
+    def test_chunks_coalesce_and_message_complete_flushes_in_order(self):
+        frames = [
+            _chunk("Hello "),
+            _chunk("there, "),
+            _chunk("friend."),
+            {"type": "message_complete", "data": {"id": "m1"}},
+            _chunk("Next", message_id="m2"),
+        ]
+        sent, stats = self._run(frames, window_seconds=1.0)
+        self.assertEqual([frame["type"] for frame in sent], ["stream_chunk", "message_complete", "stream_chunk"])
+        self.assertEqual(sent[0]["data"]["text"], "Hello there, friend.")
+        self.assertEqual(sent[2]["data"]["message_id"], "m2")
+        self.assertEqual(stats["chunks_coalesced"], 2)
+        self.assertEqual(frames[0]["data"]["text"], "Hello ")
+
+    def test_successive_updates_keep_only_latest_snapshot(self):
+        frames = [
+            {"type": "state_update", "data": {"round": 1}},
+            {"type": "metrics_update", "data": {"trust_index": 50}},
+            {"type": "state_update", "data": {"round": 2}},
+            {"type": "metrics_update", "data": {"trust_index": 55}},
+            {"type": "analysis", "data": {}},
+        ]
+        sent, stats = self._run(frames, window_seconds=1.0)
+        self.assertEqual(
+            sent,
+            [
+                {"type": "state_update", "data": {"round": 2}},
+                {"type": "metrics_update", "data": {"trust_index": 55}},
+                {"type": "analysis", "data": {}},
+            ],
+        )
+        self.assertEqual(stats["updates_merged"], 2)
+
+    def test_large_chunk_flushes_without_waiting_for_window(self):
+        sent = []
+
+        async def _send(payload):
+            sent.append(payload)
+
+        async def _main():
+            outbox = ws_outbox.WebSocketOutbox(_send, window_seconds=10.0, max_chunk_chars=8)
+            await outbox.send(_chunk("0123456789"))
+            await asyncio.wait_for(outbox.drain(), timeout=1.0)
+            await outbox.aclose()
+
+        asyncio.run(_main())
+        self.assertEqual(len(sent), 1)
+
+    def test_send_failure_surfaces_on_next_send(self):
+        class _Closed(Exception):
+            pass
+
+        async def _send(payload):
+            raise _Closed()
+
+        async def _main():
+            outbox = ws_outbox.WebSocketOutbox(_send, window_seconds=0)
+            await outbox.send({"type": "message_complete", "data": {}})
+            with self.assertRaises(_Closed):
+                await outbox.drain()
+            with self.assertRaises(_Closed):
+                await outbox.send(_chunk("late"))
+            await outbox.aclose()
+
+        asyncio.run(_main())
+
+
+if __name__ == "__main__":
+    unittest.main()
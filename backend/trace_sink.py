@@ -0,0 +1,234 @@
+"""
+Buffered writer for the JSONL debug traces.
+
+`emit()` only stamps the event and puts it on a bounded queue, so the streaming
+hot path never touches the filesystem. A daemon thread drains the queue in
+batches, serializes entries, and appends them through file handles it keeps
+open per trace file. Files rotate by size and/or age; rotated files are gzipped
+by the same thread. Payloads are serialized on the writer thread, so callers
+must not mutate them after emitting.
+"""
+
+import gzip
+import json
+import logging
+import os
+import queue
+import random
+import shutil
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import IO, Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("negotiation-arena.trace")
+
+_FLUSH = object()
+_STOP = object()
+
+
+def parse_sample_rates(raw: Optional[str]) -> Dict[str, float]:
+    """Parse "event=rate,event=rate" (rate in 0..1, "*" sets the default) into a mapping."""
+    rates: Dict[str, float] = {}
+    for item in str(raw or "").split(","):
+        name, sep, value = item.partition("=")
+        name = name.strip()
+        if not sep or not name:
+            continue
+        try:
+            rates[name] = min(1.0, max(0.0, float(value.strip())))
+        except ValueError:
+            logger.warning("Ignoring invalid trace sample rate %r", item)
+    return rates
+
+
+class _OpenTraceFile:
+    def __init__(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.handle: IO[str] = path.open("a", encoding="utf-8")
+        self.size = path.stat().st_size
+        self.opened_at = time.time()
+
+
+class TraceSink:
+    def __init__(
+        self,
+        serializer: Callable[[Any], Any] = lambda value: value,
+        batch_size: int = 256,
+        flush_interval_seconds: float = 0.5,
+        max_queue: int = 20000,
+        rotate_bytes: int = 0,
+        rotate_seconds: float = 0,
+        compress_rotated: bool = True,
+        sample_rates: Optional[Dict[str, float]] = None,
+    ) -> None:
+        self.serializer = serializer
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval_seconds = max(0.01, float(flush_interval_seconds))
+        self.rotate_bytes = max(0, int(rotate_bytes))
+        self.rotate_seconds = max(0.0, float(rotate_seconds))
+        self.compress_rotated = compress_rotated
+        self.sample_rates: Dict[str, float] = dict(sample_rates or {})
+        self._default_rate = self.sample_rates.pop("*", 1.0)
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max(1, int(max_queue)))
+        self._files: Dict[Path, _OpenTraceFile] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._closed = False
+        self._counters: Dict[str, int] = {
+            "enqueued": 0,
+            "written": 0,
+            "sampled_out": 0,
+            "dropped_queue_full": 0,
+            "write_errors": 0,
+            "batches": 0,
+            "rotations": 0,
+        }
+
+    def emit(self, path: Path, event: str, payload: Dict[str, Any]) -> None:
+        rate = self.sample_rates.get(event, self._default_rate)
+        if rate < 1.0 and random.random() >= rate:
+            self._counters["sampled_out"] += 1
+            return
+        if self._closed:
+            return
+        self._ensure_started()
+        entry = {"ts": datetime.now().isoformat(), "event": event, **payload}
+        try:
+            self._queue.put_nowait((path, event, entry))
+            self._counters["enqueued"] += 1
+        except queue.Full:
+            self._counters["dropped_queue_full"] += 1
+
+    def flush(self, timeout: Optional[float] = 5.0) -> bool:
+        """Block until everything emitted so far is on disk; returns False on timeout."""
+        if self._thread is None or not self._thread.is_alive():
+            return True
+        done = threading.Event()
+        try:
+            self._queue.put((_FLUSH, done), timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def close(self, timeout: Optional[float] = 5.0) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            try:
+                self._queue.put(_STOP, timeout=timeout)
+            except queue.Full:
+                logger.warning("Trace queue full at shutdown; pending trace events may be lost")
+            thread.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._counters,
+            "queue_depth": self._queue.qsize(),
+            "open_files": len(self._files),
+            "sample_rates": {"*": self._default_rate, **self.sample_rates},
+        }
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="trace-sink", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            try:
+                item = self._queue.get(timeout=self.flush_interval_seconds)
+            except queue.Empty:
+                self._rotate_expired()
+                continue
+            batch: List[Tuple[Path, str, Dict[str, Any]]] = []
+            waiters: List[threading.Event] = []
+            while True:
+                if item is _STOP:
+                    stopping = True
+                elif isinstance(item, tuple) and item and item[0] is _FLUSH:
+                    waiters.append(item[1])
+                else:
+                    batch.append(item)
+                if stopping or len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            self._write_batch(batch)
+            self._rotate_expired()
+            for waiter in waiters:
+                waiter.set()
+        for open_file in self._files.values():
+            try:
+                open_file.handle.close()
+            except OSError:
+                pass
+        self._files.clear()
+
+    def _write_batch(self, batch: List[Tuple[Path, str, Dict[str, Any]]]) -> None:
+        if not batch:
+            return
+        lines_by_path: Dict[Path, List[str]] = {}
+        for path, event, entry in batch:
+            try:
+                line = json.dumps(self.serializer(entry), ensure_ascii=False)
+            except Exception:
+                self._counters["write_errors"] += 1
+                logger.exception("Failed to serialize debug trace event=%s", event)
+                continue
+            lines_by_path.setdefault(path, []).append(line)
+        for path, lines in lines_by_path.items():
+            try:
+                open_file = self._open(path)
+                data = "\n".join(lines) + "\n"
+                open_file.handle.write(data)
+                open_file.handle.flush()
+                open_file.size += len(data.encode("utf-8"))
+                self._counters["written"] += len(lines)
+                if self.rotate_bytes and open_file.size >= self.rotate_bytes:
+                    self._rotate(open_file)
+            except Exception:
+                self._counters["write_errors"] += len(lines)
+                logger.exception("Failed to write %s debug trace events to %s", len(lines), path)
+        self._counters["batches"] += 1
+
+    def _open(self, path: Path) -> _OpenTraceFile:
+        open_file = self._files.get(path)
+        if open_file is None or open_file.handle.closed:
+            open_file = _OpenTraceFile(path)
+            self._files[path] = open_file
+        return open_file
+
+    def _rotate_expired(self) -> None:
+        if not self.rotate_seconds:
+            return
+        now = time.time()
+        for open_file in list(self._files.values()):
+            if open_file.size and now - open_file.opened_at >= self.rotate_seconds:
+                self._rotate(open_file)
+
+    def _rotate(self, open_file: _OpenTraceFile) -> None:
+        path = open_file.path
+        open_file.handle.close()
+        self._files.pop(path, None)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        rotated = path.with_name(f"{path.stem}.{stamp}{path.suffix}")
+        try:
+            os.replace(path, rotated)
+            if self.compress_rotated:
+                with rotated.open("rb") as source, gzip.open(f"{rotated}.gz", "wb") as target:
+                    shutil.copyfileobj(source, target)
+                rotated.unlink()
+            self._counters["rotations"] += 1
+        except OSError:
+            logger.exception("Failed to rotate debug trace %s", path)
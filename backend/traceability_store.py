@@ -0,0 +1,203 @@
+"""
+Append-only store for per-session traceability payloads.
+
+Every finished run is serialized to one JSON line, gzip-compressed on its own,
+and appended to the current segment file; a new segment starts once the
+current one passes `segment_bytes`. Because each record is a complete gzip
+member, a segment is also a valid `.jsonl.gz` file (`zcat` prints every run in
+it). A SQLite index keeps the session, mode, archetype, outcome, score, time
+and the (segment, offset, length) of each record, so reading one session or a
+time range is an index lookup plus one seek per record.
+
+Records are never rewritten: a session that is retried gets one record per
+run, and `get()` returns the latest. Methods block on file I/O; call them from
+a worker thread when on the event loop.
+"""
+
+import gzip
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+_SEGMENT_PREFIX = "traces-"
+_SEGMENT_SUFFIX = ".jsonl.gz"
+_INDEX_COLUMNS = "trace_id, session_id, mode, archetype_id, deal_status, winner, score, created_at, segment, offset, length"
+
+
+@dataclass(frozen=True)
+class TraceEntry:
+    trace_id: int
+    session_id: str
+    mode: str
+    archetype_id: str
+    deal_status: str
+    winner: str
+    score: Optional[float]
+    created_at: float
+    segment: str
+    offset: int
+    length: int
+
+
+def _score(analysis: Dict[str, Any]) -> Optional[float]:
+    try:
+        return float(analysis.get("negotiation_score"))
+    except (TypeError, ValueError):
+        return None
+
+
+class TraceabilityStore:
+    def __init__(self, root: Path, segment_bytes: int = 64 * 1024 * 1024, compresslevel: int = 6) -> None:
+        self.root = root
+        self.segment_bytes = max(1, int(segment_bytes))
+        self.compresslevel = min(9, max(1, int(compresslevel)))
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._segment: Optional[Path] = None
+        self._counters: Dict[str, int] = {"appended": 0, "bytes_written": 0, "reads": 0}
+
+    def append(self, payload: Dict[str, Any], mode: str, created_at: Optional[float] = None) -> int:
+        """Append one run and index it; returns its trace_id."""
+        analysis = payload.get("analysis") or {}
+        persona = payload.get("persona") or {}
+        created_at = time.time() if created_at is None else float(created_at)
+        line = json.dumps(payload, ensure_ascii=False, default=str) + "\n"
+        blob = gzip.compress(line.encode("utf-8"), compresslevel=self.compresslevel, mtime=0)
+        with self._lock:
+            conn = self._connection()
+            segment = self._current_segment(len(blob))
+            with segment.open("ab") as handle:
+                offset = handle.tell()
+                handle.write(blob)
+                handle.flush()
+                os.fsync(handle.fileno())
+            # Data first, index second: a crash in between leaves unindexed bytes, never a dangling index row.
+            with conn:
+                cursor = conn.execute(
+                    "INSERT INTO traces (session_id, mode, archetype_id, deal_status, winner, score, created_at, "
+                    "segment, offset, length) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        str(payload.get("session_id", "")),
+                        str(mode or ""),
+                        str(persona.get("archetype_id", "") or ""),
+                        str(payload.get("deal_status", "") or ""),
+                        str(analysis.get("winner", "") or ""),
+                        _score(analysis),
+                        created_at,
+                        segment.name,
+                        offset,
+                        len(blob),
+                    ),
+                )
+            self._counters["appended"] += 1
+            self._counters["bytes_written"] += len(blob)
+            return int(cursor.lastrowid)
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Latest run recorded for `session_id`, or None."""
+        entries = self.query(session_id=session_id, newest_first=True, limit=1)
+        return self.read(entries[0]) if entries else None
+
+    def runs(self, session_id: str) -> List[Dict[str, Any]]:
+        return [self.read(entry) for entry in self.query(session_id=session_id)]
+
+    def query(
+        self,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        session_id: Optional[str] = None,
+        mode: Optional[str] = None,
+        archetype_id: Optional[str] = None,
+        deal_status: Optional[str] = None,
+        newest_first: bool = False,
+        limit: Optional[int] = None,
+    ) -> List[TraceEntry]:
+        """Index rows matching every given filter (`start` inclusive, `end` exclusive), oldest first by default."""
+        clauses: List[str] = []
+        params: List[Any] = []
+        for column, value in (
+            ("session_id", session_id),
+            ("mode", mode),
+            ("archetype_id", archetype_id),
+            ("deal_status", deal_status),
+        ):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if start is not None:
+            clauses.append("created_at >= ?")
+            params.append(float(start))
+        if end is not None:
+            clauses.append("created_at < ?")
+            params.append(float(end))
+        sql = f"SELECT {_INDEX_COLUMNS} FROM traces"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += f" ORDER BY created_at {'DESC' if newest_first else 'ASC'}, trace_id {'DESC' if newest_first else 'ASC'}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(max(0, int(limit)))
+        with self._lock:
+            rows = self._connection().execute(sql, params).fetchall()
+        return [TraceEntry(*row) for row in rows]
+
+    def read(self, entry: TraceEntry) -> Dict[str, Any]:
+        with (self.root / entry.segment).open("rb") as handle:
+            handle.seek(entry.offset)
+            blob = handle.read(entry.length)
+        self._counters["reads"] += 1
+        return json.loads(gzip.decompress(blob).decode("utf-8"))
+
+    def iter_range(self, start: Optional[float] = None, end: Optional[float] = None, **filters: Any) -> Iterator[Dict[str, Any]]:
+        for entry in self.query(start=start, end=end, **filters):
+            yield self.read(entry)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+            segment = self._segment.name if self._segment is not None else None
+        return {**counters, "segment": segment, "segment_bytes": self.segment_bytes}
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.root.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.root / "index.sqlite3"), check_same_thread=False, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS traces ("
+                "trace_id INTEGER PRIMARY KEY AUTOINCREMENT, session_id TEXT NOT NULL, mode TEXT NOT NULL, "
+                "archetype_id TEXT NOT NULL, deal_status TEXT NOT NULL, winner TEXT NOT NULL, score REAL, "
+                "created_at REAL NOT NULL, segment TEXT NOT NULL, offset INTEGER NOT NULL, length INTEGER NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS traces_session ON traces (session_id, created_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS traces_time ON traces (created_at)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _current_segment(self, incoming: int) -> Path:
+        if self._segment is None:
+            existing = sorted(self.root.glob(f"{_SEGMENT_PREFIX}*{_SEGMENT_SUFFIX}"))
+            self._segment = existing[-1] if existing else self._segment_path(1)
+        size = self._segment.stat().st_size if self._segment.exists() else 0
+        if size and size + incoming > self.segment_bytes:
+            self._segment = self._segment_path(self._segment_number(self._segment) + 1)
+        return self._segment
+
+    def _segment_path(self, number: int) -> Path:
+        return self.root / f"{_SEGMENT_PREFIX}{number:06d}{_SEGMENT_SUFFIX}"
+
+    @staticmethod
+    def _segment_number(path: Path) -> int:
+        return int(path.name[len(_SEGMENT_PREFIX) : -len(_SEGMENT_SUFFIX)])
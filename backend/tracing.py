@@ -0,0 +1,378 @@
+"""
+Sampled span tracing for negotiation sessions, exported as Chrome trace JSON.
+
+`Tracer.start_trace()` decides once per session whether it is sampled and, if
+so, binds the trace to the current context; everything that runs in that
+context afterwards (awaited coroutines, tasks created from it,
+`asyncio.to_thread` calls) records spans into it. Outside a sampled trace,
+`span()`, `start_span()` and `traced` functions cost one ContextVar lookup.
+
+Each span is stored as a Chrome "complete" event on a named track (one thread
+row in the viewer). The main negotiation flow runs on the `session` track;
+work that overlaps it (WebSocket writes, background judge updates, post-session
+jobs) should pass its own `track` so every row nests cleanly as a flame chart.
+When the root span has ended and the last open span closes, the trace is
+written to `<output_dir>/<name>-<session>-<trace_id>.json` on a writer thread;
+open it in Perfetto (ui.perfetto.dev) or chrome://tracing.
+
+    trace = TRACER.start_trace("negotiation", session_id=session_id)
+    with TRACER.span("judge", round=3):
+        ...
+    TRACER.end_trace(trace)
+"""
+
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+import uuid
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+logger = logging.getLogger("negotiation-arena.tracing")
+
+DEFAULT_TRACK = "session"
+
+_ARG_TYPES = (str, int, float, bool, type(None))
+
+
+def _plain_arg(value: Any) -> Any:
+    return value if isinstance(value, _ARG_TYPES) else str(value)
+
+
+class Trace:
+    def __init__(self, name: str, max_spans: int, args: Dict[str, Any]) -> None:
+        self.trace_id = uuid.uuid4().hex[:16]
+        self.name = name
+        self.args = {key: _plain_arg(value) for key, value in args.items()}
+        self.max_spans = max_spans
+        self.events: List[Dict[str, Any]] = []
+        self.tracks: Dict[str, int] = {}
+        self.dropped_spans = 0
+        self.lock = threading.Lock()
+        self.open_spans = 0
+        self.exported = False
+        self.root: Optional["Span"] = None
+        self.token: Optional[contextvars.Token] = None
+        self._wall_origin_us = time.time_ns() // 1000
+        self._perf_origin_ns = time.perf_counter_ns()
+
+    def timestamp_us(self, perf_ns: int) -> float:
+        return self._wall_origin_us + (perf_ns - self._perf_origin_ns) / 1000.0
+
+    def track_id(self, track: str) -> int:
+        tid = self.tracks.get(track)
+        if tid is None:
+            tid = self.tracks[track] = len(self.tracks) + 1
+        return tid
+
+
+class Span:
+    __slots__ = ("_tracer", "_trace", "name", "track", "args", "_started_ns", "_ended")
+
+    def __init__(self, tracer: "Tracer", trace: Trace, name: str, track: str, args: Dict[str, Any]) -> None:
+        self._tracer = tracer
+        self._trace = trace
+        self.name = name
+        self.track = track
+        self.args = args
+        self._started_ns = time.perf_counter_ns()
+        self._ended = False
+
+    def set(self, **args: Any) -> None:
+        self.args.update(args)
+
+    def end(self, **args: Any) -> None:
+        """Record the span; later calls are ignored, so it is safe to end a span from a `finally` as well."""
+        if self._ended:
+            return
+        self._ended = True
+        if args:
+            self.args.update(args)
+        self._tracer._record(self._trace, self, time.perf_counter_ns())
+
+    def __enter__(self) -> "Span":
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self.end()
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def set(self, **args: Any) -> None:
+        pass
+
+    def end(self, **args: Any) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class _TrackSpan(Span):
+    """A span that also moves everything started inside it onto its track."""
+
+    __slots__ = ("_token",)
+
+    def __enter__(self) -> "Span":
+        self._token = _CURRENT.set((self._trace, self.track))
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        _CURRENT.reset(self._token)
+        super().__exit__(exc_type, exc, tb)
+
+
+_CURRENT: contextvars.ContextVar[Optional[Tuple[Trace, str]]] = contextvars.ContextVar(
+    "negotiation_trace", default=None
+)
+
+
+class Tracer:
+    def __init__(self, output_dir: Path, sample_rate: float = 0.0, max_spans: int = 20000) -> None:
+        self.output_dir = output_dir
+        self.sample_rate = min(1.0, max(0.0, float(sample_rate)))
+        self.max_spans = max(1, int(max_spans))
+        self._lock = threading.Lock()
+        self._pending: Set[Trace] = set()
+        self._writer: Optional[ThreadPoolExecutor] = None
+        self._closed = False
+        self._counters: Dict[str, int] = {
+            "traces_started": 0,
+            "traces_sampled_out": 0,
+            "traces_exported": 0,
+            "spans_recorded": 0,
+            "spans_dropped": 0,
+            "export_errors": 0,
+        }
+
+    def start_trace(self, name: str, **args: Any) -> Optional[Trace]:
+        """Start a trace bound to the current context, or return None when this one is sampled out."""
+        if self._closed or self.sample_rate <= 0.0 or random.random() >= self.sample_rate:
+            self._counters["traces_sampled_out"] += 1
+            return None
+        trace = Trace(name, self.max_spans, args)
+        trace.root = Span(self, trace, name, DEFAULT_TRACK, dict(trace.args))
+        trace.open_spans = 1
+        trace.token = _CURRENT.set((trace, DEFAULT_TRACK))
+        with self._lock:
+            self._pending.add(trace)
+        self._counters["traces_started"] += 1
+        return trace
+
+    def end_trace(self, trace: Optional[Trace], **args: Any) -> None:
+        """End the root span; the file is written once every span still open has ended too."""
+        if trace is None or trace.root is None:
+            return
+        if trace.token is not None:
+            try:
+                _CURRENT.reset(trace.token)
+            except ValueError:
+                # Ended from another context (e.g. a task): the binding dies with the original context.
+                pass
+            trace.token = None
+        trace.root.end(**args)
+
+    def current_trace(self) -> Optional[Trace]:
+        current = _CURRENT.get()
+        return current[0] if current is not None else None
+
+    def span(self, name: str, track: Optional[str] = None, **args: Any) -> Any:
+        """Context manager timing a block; with `track`, nested spans land on that track as well."""
+        current = _CURRENT.get()
+        if current is None:
+            return NOOP_SPAN
+        trace, current_track = current
+        if not self._open(trace):
+            return NOOP_SPAN
+        if track is None or track == current_track:
+            return Span(self, trace, name, current_track, args)
+        return _TrackSpan(self, trace, name, track, args)
+
+    def start_span(self, name: str, track: Optional[str] = None, **args: Any) -> Any:
+        """Start a span that is ended explicitly with `.end()`; it does not change the current track."""
+        current = _CURRENT.get()
+        if current is None:
+            return NOOP_SPAN
+        trace, current_track = current
+        if not self._open(trace):
+            return NOOP_SPAN
+        return Span(self, trace, name, track or current_track, args)
+
+    def traced(
+        self,
+        name: Optional[str] = None,
+        track: Optional[str] = None,
+        attrs: Sequence[str] = (),
+    ) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+        """
+        Decorator recording one span per call, named after the function unless `name` is given.
+        `attrs` names parameters copied into the span args (e.g. "round_number", "message_id").
+        For coroutine functions the span opens when the coroutine is created, so a task created
+        just before the trace ends still keeps the trace open until it finishes. A coroutine that is
+        closed before its first step (e.g. its task was cancelled first) ends the span when it is
+        collected, so it cannot hold the trace open forever.
+        """
+
+        def decorate(func: Callable[..., Any]) -> Callable[..., Any]:
+            span_name = name or func.__name__.lstrip("_")
+            signature = inspect.signature(func) if attrs else None
+
+            def open_span(call_args: Tuple[Any, ...], call_kwargs: Dict[str, Any]) -> Any:
+                args: Dict[str, Any] = {}
+                if signature is not None:
+                    try:
+                        bound = signature.bind_partial(*call_args, **call_kwargs).arguments
+                    except TypeError:
+                        bound = {}
+                    args = {attr: _plain_arg(bound[attr]) for attr in attrs if attr in bound}
+                return self.span(span_name, track=track, **args)
+
+            if inspect.iscoroutinefunction(func):
+
+                @functools.wraps(func)
+                def async_wrapper(*call_args: Any, **call_kwargs: Any) -> Any:
+                    if _CURRENT.get() is None:
+                        return func(*call_args, **call_kwargs)
+                    span = open_span(call_args, call_kwargs)
+
+                    async def run() -> Any:
+                        with span:
+                            return await func(*call_args, **call_kwargs)
+
+                    coro = run()
+                    # The `with` above never runs for a coroutine closed before it starts; end() is idempotent.
+                    weakref.finalize(coro, span.end, not_started=True)
+                    return coro
+
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*call_args: Any, **call_kwargs: Any) -> Any:
+                if _CURRENT.get() is None:
+                    return func(*call_args, **call_kwargs)
+                with open_span(call_args, call_kwargs):
+                    return func(*call_args, **call_kwargs)
+
+            return wrapper
+
+        return decorate
+
+    def close(self, timeout: Optional[float] = 5.0) -> None:
+        """Write every trace that is still waiting on open spans, then stop the writer thread."""
+        if self._closed:
+            return
+        self._closed = True
+        with self._lock:
+            pending = list(self._pending)
+        for trace in pending:
+            if trace.root is not None and trace.root._ended:
+                self._finish(trace)
+        with self._lock:
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            writer.shutdown(wait=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pending = len(self._pending)
+        return {**self._counters, "pending_traces": pending, "sample_rate": self.sample_rate}
+
+    def _open(self, trace: Trace) -> bool:
+        with trace.lock:
+            if trace.exported:
+                return False
+            trace.open_spans += 1
+            return True
+
+    def _record(self, trace: Trace, span: Span, ended_ns: int) -> None:
+        with trace.lock:
+            # The root span is always kept so a capped trace still shows the whole session.
+            if len(trace.events) < trace.max_spans or span is trace.root:
+                trace.events.append(
+                    {
+                        "name": span.name,
+                        "cat": trace.name,
+                        "ph": "X",
+                        "ts": trace.timestamp_us(span._started_ns),
+                        "dur": (ended_ns - span._started_ns) / 1000.0,
+                        "pid": 1,
+                        "tid": trace.track_id(span.track),
+                        "args": {key: _plain_arg(value) for key, value in span.args.items()},
+                    }
+                )
+                self._counters["spans_recorded"] += 1
+            else:
+                trace.dropped_spans += 1
+                self._counters["spans_dropped"] += 1
+            trace.open_spans -= 1
+            complete = trace.open_spans == 0 and trace.root is not None and trace.root._ended
+        if complete:
+            self._finish(trace)
+
+    def _finish(self, trace: Trace) -> None:
+        with trace.lock:
+            if trace.exported:
+                return
+            trace.exported = True
+            events = list(trace.events)
+            tracks = dict(trace.tracks)
+            dropped = trace.dropped_spans
+        with self._lock:
+            self._pending.discard(trace)
+            if self._writer is None:
+                self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="span-export")
+            writer = self._writer
+        document = _chrome_trace(trace, events, tracks, dropped)
+        writer.submit(self._write, self._trace_path(trace), document)
+
+    def _trace_path(self, trace: Trace) -> Path:
+        session = re.sub(r"[^A-Za-z0-9_.-]+", "_", str(trace.args.get("session_id", "")))[:64]
+        parts = [trace.name, session, trace.trace_id] if session else [trace.name, trace.trace_id]
+        return self.output_dir / ("-".join(parts) + ".json")
+
+    def _write(self, path: Path, document: Dict[str, Any]) -> None:
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(prefix=".trace-", suffix=".tmp", dir=str(path.parent))
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                json.dump(document, handle, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp_name, path)
+            self._counters["traces_exported"] += 1
+        except Exception:
+            self._counters["export_errors"] += 1
+            logger.exception("Failed to export span trace to %s", path)
+
+
+def _chrome_trace(trace: Trace, events: List[Dict[str, Any]], tracks: Dict[str, int], dropped: int) -> Dict[str, Any]:
+    label = " ".join(str(part) for part in (trace.name, trace.args.get("session_id", "")) if part)
+    metadata: List[Dict[str, Any]] = [
+        {"name": "process_name", "ph": "M", "pid": 1, "tid": 0, "args": {"name": label}},
+    ]
+    for track, tid in tracks.items():
+        metadata.append({"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": track}})
+        metadata.append({"name": "thread_sort_index", "ph": "M", "pid": 1, "tid": tid, "args": {"sort_index": tid}})
+    return {
+        "traceEvents": metadata + sorted(events, key=lambda event: event["ts"]),
+        "displayTimeUnit": "ms",
+        "otherData": {"trace_id": trace.trace_id, **trace.args, "dropped_spans": dropped},
+    }
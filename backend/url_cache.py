@@ -0,0 +1,170 @@
+"""
+Disk-backed cache of extracted program page text.
+
+Entries are keyed by normalized URL and hold the sanitized text plus the
+validators (ETag / Last-Modified) of the response it came from and which
+fetcher produced it. Within `fresh_seconds` of the last successful fetch or
+revalidation an entry is served without touching the network; after that it is
+still offered to the caller as a revalidation candidate until `max_age_seconds`,
+so a conditional GET answered with 304 can reuse the stored text.
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+logger = logging.getLogger("negotiation-arena.url-cache")
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+_TRACKING_PARAM_PREFIXES = ("utm_",)
+_TRACKING_PARAMS = {"gclid", "fbclid", "msclkid"}
+
+
+def normalize_url(url: str) -> str:
+    """Canonical form used as the cache key: lowercase scheme/host, no fragment, default port or tracking params."""
+    parts = urlsplit(str(url).strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    netloc = host
+    if parts.port and parts.port != _DEFAULT_PORTS.get(scheme):
+        netloc = f"{host}:{parts.port}"
+    query = urlencode(
+        sorted(
+            (key, value)
+            for key, value in parse_qsl(parts.query, keep_blank_values=True)
+            if key.lower() not in _TRACKING_PARAMS and not key.lower().startswith(_TRACKING_PARAM_PREFIXES)
+        )
+    )
+    return urlunsplit((scheme, netloc, parts.path or "/", query, ""))
+
+
+@dataclass(frozen=True)
+class CachedPage:
+    url: str
+    text: str
+    fetcher: str
+    etag: str
+    last_modified: str
+    validated_at: float
+    fresh: bool
+
+    @property
+    def has_validators(self) -> bool:
+        return bool(self.etag or self.last_modified)
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers: Dict[str, str] = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class UrlContentCache:
+    def __init__(self, db_path: Path, fresh_seconds: int = 6 * 3600, max_age_seconds: int = 30 * 86400) -> None:
+        self.db_path = db_path
+        self.fresh_seconds = max(0, int(fresh_seconds))
+        self.max_age_seconds = max(self.fresh_seconds, int(max_age_seconds))
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._disabled = False
+        self._counters: Dict[str, int] = {"fresh_hits": 0, "stale_hits": 0, "misses": 0, "revalidated": 0, "stores": 0}
+
+    def get(self, url: str) -> Optional[CachedPage]:
+        key = normalize_url(url)
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return None
+            try:
+                row = conn.execute(
+                    "SELECT text, fetcher, etag, last_modified, validated_at FROM pages WHERE url = ?", (key,)
+                ).fetchone()
+                if row is not None and now - float(row[4]) > self.max_age_seconds:
+                    conn.execute("DELETE FROM pages WHERE url = ?", (key,))
+                    conn.commit()
+                    row = None
+            except sqlite3.Error:
+                logger.exception("URL cache read failed")
+                return None
+            if row is None:
+                self._counters["misses"] += 1
+                return None
+            fresh = now - float(row[4]) <= self.fresh_seconds
+            self._counters["fresh_hits" if fresh else "stale_hits"] += 1
+            return CachedPage(
+                url=key,
+                text=str(row[0]),
+                fetcher=str(row[1]),
+                etag=str(row[2] or ""),
+                last_modified=str(row[3] or ""),
+                validated_at=float(row[4]),
+                fresh=fresh,
+            )
+
+    def put(self, url: str, text: str, fetcher: str, etag: str = "", last_modified: str = "") -> None:
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO pages (url, text, fetcher, etag, last_modified, fetched_at, validated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (normalize_url(url), text, fetcher, etag or "", last_modified or "", now, now),
+                )
+                conn.commit()
+                self._counters["stores"] += 1
+            except sqlite3.Error:
+                logger.exception("URL cache write failed")
+
+    def mark_revalidated(self, url: str) -> None:
+        """Record a 304: the stored text is current again as of now."""
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return
+            try:
+                conn.execute("UPDATE pages SET validated_at = ? WHERE url = ?", (time.time(), normalize_url(url)))
+                conn.commit()
+                self._counters["revalidated"] += 1
+            except sqlite3.Error:
+                logger.exception("URL cache revalidation update failed")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._counters,
+                "enabled": not self._disabled,
+                "fresh_seconds": self.fresh_seconds,
+                "max_age_seconds": self.max_age_seconds,
+            }
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        if self._disabled:
+            return None
+        if self._conn is None:
+            try:
+                self.db_path.parent.mkdir(parents=True, exist_ok=True)
+                conn = sqlite3.connect(str(self.db_path), check_same_thread=False, timeout=5)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS pages ("
+                    "url TEXT PRIMARY KEY, text TEXT NOT NULL, fetcher TEXT NOT NULL, etag TEXT NOT NULL, "
+                    "last_modified TEXT NOT NULL, fetched_at REAL NOT NULL, validated_at REAL NOT NULL)"
+                )
+                conn.commit()
+                self._conn = conn
+            except sqlite3.Error:
+                logger.exception("URL cache unavailable at %s; fetching every time", self.db_path)
+                self._disabled = True
+                return None
+        return self._conn
@@ -0,0 +1,158 @@
+"""
+Per-connection outbound channel for negotiation WebSockets.
+
+Producers call `send()`, which only queues the frame; a writer task owns the
+socket. Within a short window, consecutive `stream_chunk` frames for the same
+message are concatenated and a queued `metrics_update` / `state_update` is
+replaced by a newer one of the same type. Any other frame (message_complete,
+analysis, errors, ...) flushes the queue immediately, so ordering is preserved.
+A send failure on the writer surfaces on the producer's next `send()`/`drain()`.
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger("negotiation-arena.ws")
+
+COALESCED_TYPES = {"stream_chunk"}
+MERGED_TYPES = {"metrics_update", "state_update"}
+
+
+class WebSocketOutbox:
+    def __init__(
+        self,
+        send_frame: Callable[[Dict[str, Any]], Awaitable[None]],
+        window_seconds: float = 0.03,
+        max_chunk_chars: int = 1024,
+        max_pending: int = 256,
+    ) -> None:
+        self._send_frame = send_frame
+        self.window_seconds = max(0.0, float(window_seconds))
+        self.max_chunk_chars = max(1, int(max_chunk_chars))
+        self.max_pending = max(1, int(max_pending))
+        self._pending: List[Dict[str, Any]] = []
+        self._has_frames = asyncio.Event()
+        self._urgent = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._error: Optional[BaseException] = None
+        self._writer: Optional["asyncio.Task[None]"] = None
+        self._closed = False
+        self.stats: Dict[str, int] = {
+            "frames_in": 0,
+            "frames_out": 0,
+            "chunks_coalesced": 0,
+            "updates_merged": 0,
+            "flushes": 0,
+        }
+
+    async def send(self, payload: Dict[str, Any]) -> None:
+        self._raise_if_failed()
+        if self._closed:
+            raise RuntimeError("WebSocketOutbox is closed")
+        self.stats["frames_in"] += 1
+        frame_type = str(payload.get("type", ""))
+        if frame_type in COALESCED_TYPES:
+            if self._coalesce_chunk(payload):
+                self._urgent.set()
+        elif frame_type in MERGED_TYPES:
+            self._merge_update(payload)
+        else:
+            self._pending.append(payload)
+            self._urgent.set()
+        self._idle.clear()
+        self._has_frames.set()
+        self._ensure_writer()
+        if len(self._pending) >= self.max_pending:
+            # Backpressure: a client that cannot keep up slows producers instead of growing the queue.
+            await self.drain()
+
+    async def drain(self) -> None:
+        """Wait until every queued frame has been written."""
+        if self._pending:
+            self._urgent.set()
+            self._has_frames.set()
+        await self._idle.wait()
+        self._raise_if_failed()
+
+    async def aclose(self, timeout: float = 5.0) -> None:
+        if self._closed:
+            return
+        try:
+            if self._error is None:
+                await asyncio.wait_for(self.drain(), timeout=timeout)
+        except Exception:
+            logger.debug("Dropping %s unsent frames on close", len(self._pending), exc_info=True)
+        finally:
+            self._closed = True
+            if self._writer is not None and not self._writer.done():
+                self._writer.cancel()
+                try:
+                    await self._writer
+                except BaseException:
+                    pass
+
+    def _raise_if_failed(self) -> None:
+        if self._error is not None:
+            raise self._error
+
+    def _ensure_writer(self) -> None:
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.create_task(self._run())
+
+    def _coalesce_chunk(self, payload: Dict[str, Any]) -> bool:
+        data = payload.get("data") or {}
+        tail = self._pending[-1] if self._pending else None
+        tail_data = (tail or {}).get("data") or {}
+        if (
+            tail is not None
+            and tail.get("type") == payload.get("type")
+            and tail_data.get("message_id") == data.get("message_id")
+            and tail_data.get("agent") == data.get("agent")
+        ):
+            text = f"{tail_data.get('text', '')}{data.get('text', '')}"
+            self._pending[-1] = {**tail, "data": {**tail_data, "text": text}}
+            self.stats["chunks_coalesced"] += 1
+        else:
+            text = str(data.get("text", ""))
+            self._pending.append(payload)
+        return len(text) >= self.max_chunk_chars
+
+    def _merge_update(self, payload: Dict[str, Any]) -> None:
+        frame_type = payload.get("type")
+        for index in range(len(self._pending) - 1, -1, -1):
+            queued = self._pending[index]
+            if queued.get("type") not in MERGED_TYPES:
+                break
+            if queued.get("type") == frame_type:
+                # Both update types carry full snapshots; the newest one wins.
+                self._pending[index] = payload
+                self.stats["updates_merged"] += 1
+                return
+        self._pending.append(payload)
+
+    async def _run(self) -> None:
+        while True:
+            await self._has_frames.wait()
+            if not self._urgent.is_set() and self.window_seconds:
+                try:
+                    await asyncio.wait_for(self._urgent.wait(), timeout=self.window_seconds)
+                except asyncio.TimeoutError:
+                    pass
+            batch, self._pending = self._pending, []
+            self._has_frames.clear()
+            self._urgent.clear()
+            if batch:
+                self.stats["flushes"] += 1
+            try:
+                for frame in batch:
+                    await self._send_frame(frame)
+                    self.stats["frames_out"] += 1
+            except Exception as exc:
+                self._error = exc
+                self._pending.clear()
+                self._idle.set()
+                return
+            if not self._pending:
+                self._idle.set()